@@ -0,0 +1,221 @@
+import json
+import os
+
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from data.compact import memory_report
+from data.shared_cache import get_shared_cache
+from util.config import (
+    COMPACT_DTYPES,
+    METRICS_FILE,
+    METRICS_PORT,
+    PROFILE_DIR,
+    PROFILE_TOP_N,
+    SHARED_CACHE,
+)
+from util.metrics import snapshot, render_prometheus, write_metrics_file, reset
+from util.profiling import list_profiles
+
+
+# -------------------------------------------------
+# Utility
+# -------------------------------------------------
+def operations_frame(operations):
+    rows = []
+    for name, s in operations.items():
+        count = max(s["count"], 1)
+        rows.append({
+            "Operation": name,
+            "Calls": s["count"],
+            "Avg (ms)": s["seconds_sum"] / count * 1000,
+            "Max (ms)": s["seconds_max"] * 1000,
+            "Last (ms)": s["seconds_last"] * 1000,
+            "Total (s)": s["seconds_sum"],
+            "Rows / call": s["rows"] / count,
+            "Last Mem Δ (MB)": s["memory_delta_last"] / 1e6,
+            "Errors": s["errors"],
+        })
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("Operation").sort_values("Total (s)", ascending=False)
+
+
+def caches_frame(caches):
+    rows = []
+    for name, s in caches.items():
+        total = s["hits"] + s["misses"]
+        rows.append({
+            "Cache": name,
+            "Hits": s["hits"],
+            "Misses": s["misses"],
+            "Hit Ratio": s["hits"] / total if total else 0.0,
+        })
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("Cache")
+
+
+# -------------------------------------------------
+# Page profiles
+# -------------------------------------------------
+def render_profile(profile):
+    """
+    Show a finished PageProfile below the page (saving it unless it
+    already saved itself on exit).
+    """
+    paths = profile.paths or profile.save(PROFILE_DIR, PROFILE_TOP_N)
+
+    st.divider()
+    st.subheader(f"🔬 Profile: {profile.name}")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Wall time", f"{profile.wall:.2f} s")
+    col2.metric("CPU (page thread)", f"{profile.cpu:.2f} s")
+    col3.metric("Peak traced memory",
+                f"{profile.peak_bytes / 1e6:.1f} MB" if profile.peak_bytes is not None else "—")
+
+    libraries = profile.library_breakdown()
+    if not libraries.empty:
+        st.caption("Sampled time by library (data load · model fit · rasterization)")
+        st.dataframe(libraries.style.format({"Seconds": "{:.3f}", "Share": "{:.1%}"}),
+                     use_container_width=True)
+
+    functions = profile.top_functions(PROFILE_TOP_N)
+    if not functions.empty:
+        st.caption(f"Top {PROFILE_TOP_N} functions by self time ({profile.mode})")
+        st.dataframe(functions.style.format({"Self (s)": "{:.4f}", "Total (s)": "{:.4f}"}),
+                     use_container_width=True)
+
+    allocations = profile.top_allocations(PROFILE_TOP_N)
+    if not allocations.empty:
+        st.caption(f"Top {PROFILE_TOP_N} allocation sites (still allocated at the end)")
+        st.dataframe(allocations.style.format({"Size (MB)": "{:.2f}"}), use_container_width=True)
+
+    cols = st.columns(len(paths))
+    for col, (kind, path) in zip(cols, paths.items()):
+        with open(path, "rb") as f:
+            col.download_button(f"⬇️ {kind}", f.read(), file_name=os.path.basename(path),
+                                key=f"profile_{kind}")
+    st.caption(f"Saved to `{PROFILE_DIR}`. Open `.speedscope.json` at https://www.speedscope.app "
+               "or feed `.folded` to flamegraph.pl.")
+
+
+# -------------------------------------------------
+# Main Render Function
+# -------------------------------------------------
+def render():
+    st.title("⚙️ Admin: Performance Metrics")
+
+    snap = snapshot()
+    ops = operations_frame(snap["operations"])
+    caches = caches_frame(snap["caches"])
+
+    # =================================================
+    # Operation Timings
+    # =================================================
+    st.subheader("Operation Timings")
+
+    if ops.empty:
+        st.info("No operations recorded yet. Open a few pages first.")
+    else:
+        st.dataframe(ops.style.format(precision=2), use_container_width=True)
+
+        fig, ax = plt.subplots()
+        ops["Total (s)"].sort_values().plot(kind="barh", ax=ax)
+        ax.set_xlabel("Total wall time (s)")
+        ax.set_title("Where the time goes")
+        st.pyplot(fig)
+
+    # =================================================
+    # Cache Effectiveness
+    # =================================================
+    st.subheader("Cache Hit Ratios")
+
+    if caches.empty:
+        st.info("No cache lookups recorded yet.")
+    else:
+        st.dataframe(caches.style.format({"Hit Ratio": "{:.1%}"}), use_container_width=True)
+
+    shared = get_shared_cache().status()
+    if not SHARED_CACHE:
+        st.caption("Shared data cache: disabled (`CRYPTO_SHARED_CACHE=0`).")
+    elif shared["generation"] is None:
+        st.caption("Shared data cache: nothing published "
+                   "(`python -m data.shared_cache --publish --all-cached`).")
+    else:
+        st.caption(
+            f"Shared data cache: generation **{shared['generation']}**, "
+            f"{shared['entries']} frames, {shared['bytes'] / 1e6:.1f} MB "
+            f"mapped from `{shared['root']}`"
+        )
+
+    # =================================================
+    # Memory
+    # =================================================
+    st.subheader("Cached Data Memory")
+
+    memory = memory_report()
+    if memory.empty:
+        st.info("No datasets cached in this process yet.")
+    else:
+        totals = memory.groupby("Cache")["Bytes"].sum() / 1e6
+        st.caption(
+            " · ".join(f"{name}: **{mb:,.1f} MB**" for name, mb in totals.items())
+            + (" (compact dtypes)" if COMPACT_DTYPES else " (float64, `CRYPTO_COMPACT_DTYPES=0`)")
+        )
+        memory["MB"] = memory.pop("Bytes") / 1e6
+        st.dataframe(
+            memory.set_index(["Cache", "Dataset"]).style.format({"MB": "{:,.2f}"}),
+            use_container_width=True,
+        )
+
+    # =================================================
+    # Saved Profiles
+    # =================================================
+    st.subheader("Saved Page Profiles")
+
+    profiles = [p for p in list_profiles(PROFILE_DIR) if p.endswith(".summary.json")]
+    if not profiles:
+        st.info("No profiles yet. Turn on **🔬 Profile page** in the sidebar and open a page.")
+    else:
+        path = st.selectbox("Profile", profiles, format_func=os.path.basename)
+        with open(path) as f:
+            summary = json.load(f)
+        st.caption(
+            f"{summary['page']} · {summary['mode']} · {summary['started_at']} · "
+            f"wall {summary['wall_seconds']:.2f} s · CPU {summary['cpu_seconds']:.2f} s"
+        )
+        st.dataframe(pd.DataFrame(summary["libraries"]), use_container_width=True)
+        st.dataframe(pd.DataFrame(summary["functions"]), use_container_width=True)
+
+    # =================================================
+    # Export
+    # =================================================
+    st.subheader("Export")
+
+    text = render_prometheus()
+
+    if METRICS_PORT:
+        st.caption(f"Prometheus endpoint: http://127.0.0.1:{METRICS_PORT}/metrics")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.download_button("⬇️ Download metrics.prom", text, file_name="metrics.prom")
+
+    with col2:
+        if st.button("💾 Write metrics file"):
+            write_metrics_file(METRICS_FILE)
+            st.success(f"Written to {METRICS_FILE}")
+
+    with col3:
+        if st.button("♻️ Reset counters"):
+            reset()
+            st.rerun()
+
+    with st.expander("Raw Prometheus output"):
+        st.code(text, language="text")
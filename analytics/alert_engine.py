@@ -0,0 +1,406 @@
+# =========================================================
+# alert_engine.py
+# Rule-based alerts evaluated incrementally on new bars (no Streamlit)
+#
+# Rules live per user in the auth database (auth/database.py). The
+# engine groups rules by signal (kind + parameters), advances each
+# signal once per new bar over every symbol from its streaming state,
+# and only then matches the (sparse) signal events against the rules.
+# Cost per bar is O(symbols x distinct signals), independent of history
+# length and of how many users share a signal.
+# =========================================================
+
+import json
+import os
+import pickle
+import sys
+import threading
+import urllib.request
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from analytics.indicators import bollinger, rolling
+from auth.database import get_alert_rules, last_alert_times, record_alert_event
+from data.bars import TIMEFRAMES
+from util.config import ALERTS_LOG, ALERTS_OUTBOX, ALERTS_WEBHOOK_URL
+from util.metrics import instrument
+
+WARMUP_BARS = 256  # closes kept to warm up signals of newly added rules
+DIRECTIONS = ("both", "up", "down")
+
+
+# -------------------------------------------------
+# Signals: (close rows x symbols, state, **params)
+#   -> (events: +1 up / -1 down / 0, values, state)
+# -------------------------------------------------
+def _crossings(x, prev_sign=None):
+    """
+    Sign changes of x through zero, row by row. NaN and exact zeros
+    carry the previous sign, so touching a level is not a cross.
+    """
+    sign = np.sign(x)
+    sign[sign == 0] = np.nan
+    prev_sign = np.full(x.shape[1], np.nan) if prev_sign is None else prev_sign
+
+    filled = pd.DataFrame(np.vstack([prev_sign[None, :], sign])).ffill().to_numpy()
+    before = filled[:-1]
+    events = np.where(np.isfinite(sign) & np.isfinite(before) & (sign != before), sign, 0)
+    return events.astype(np.int8), filled[-1]
+
+
+def ma_crossover(close, state=None, fast=7, slow=30):
+    state = state or {}
+    fast_ma, fast_tail = rolling(close, fast, np.mean, state.get("fast"))
+    slow_ma, slow_tail = rolling(close, slow, np.mean, state.get("slow"))
+    events, sign = _crossings(fast_ma - slow_ma, state.get("sign"))
+    return events, fast_ma, {"fast": fast_tail, "slow": slow_tail, "sign": sign}
+
+
+def price_threshold(close, state=None, level=0.0):
+    state = state or {}
+    events, sign = _crossings(close - level, state.get("sign"))
+    return events, close, {"sign": sign}
+
+
+def bollinger_breakout(close, state=None, window=20, num_std=2.0):
+    state = state or {}
+    bands, bb_state = bollinger(close, window, num_std, state.get("bands"))
+    upper, upper_sign = _crossings(close - bands["BB_Upper"], state.get("upper"))
+    lower, lower_sign = _crossings(close - bands["BB_Lower"], state.get("lower"))
+
+    events = np.where(upper == 1, 1, np.where(lower == -1, -1, 0)).astype(np.int8)
+    values = np.where(events == 1, bands["BB_Upper"], bands["BB_Lower"])
+    return events, values, {"bands": bb_state, "upper": upper_sign, "lower": lower_sign}
+
+
+def volatility_spike(close, state=None, window=14, baseline=90, ratio=2.0):
+    """
+    Short-window volatility crossing `ratio` x its long-window baseline
+    (up = spike, down = back to normal).
+    """
+    state = state or {}
+    prev = np.vstack([state.get("close", np.full((1, close.shape[1]), np.nan)), close])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_ret = np.diff(np.log(prev), axis=0)
+
+    std = lambda v, axis: np.std(v, axis=axis, ddof=1)
+    short, short_tail = rolling(log_ret, window, std, state.get("short"))
+    long, long_tail = rolling(log_ret, baseline, std, state.get("long"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        level = short / long
+
+    events, sign = _crossings(level - ratio, state.get("sign"))
+    return events, level, {
+        "close": prev[-1:], "short": short_tail, "long": long_tail, "sign": sign
+    }
+
+
+# name -> (signal, default params, message template)
+SIGNALS = {
+    "ma_crossover": (
+        ma_crossover, {"fast": 7, "slow": 30},
+        "MA {fast} crossed {dir} MA {slow} (close {close:,.4f})",
+    ),
+    "price_threshold": (
+        price_threshold, {"level": 0.0},
+        "price crossed {dir} {level:,.4f} (close {close:,.4f})",
+    ),
+    "bollinger_breakout": (
+        bollinger_breakout, {"window": 20, "num_std": 2.0},
+        "close {close:,.4f} broke {dir} the Bollinger band ({window}, {num_std}) at {value:,.4f}",
+    ),
+    "volatility_spike": (
+        volatility_spike, {"window": 14, "baseline": 90, "ratio": 2.0},
+        "{window}-bar volatility crossed {dir} {ratio}x its {baseline}-bar baseline "
+        "(now {value:.2f}x)",
+    ),
+}
+
+# Not bar-driven: fed by AlertEngine.on_sentiment
+SENTIMENT_DEFAULTS = {"threshold": 0.2}
+
+KINDS = list(SIGNALS) + ["sentiment_shift"]
+
+
+def rule_params(rule):
+    """
+    Rule params merged over the kind's defaults.
+    """
+    defaults = SENTIMENT_DEFAULTS if rule["kind"] == "sentiment_shift" else SIGNALS[rule["kind"]][1]
+    return {**defaults, **{k: v for k, v in rule["params"].items() if k in defaults}}
+
+
+# -------------------------------------------------
+# Sinks
+# -------------------------------------------------
+SINKS = {}
+
+
+def register_sink(name):
+    def decorator(cls):
+        SINKS[name] = cls
+        cls.name = name
+        return cls
+    return decorator
+
+
+def _append_json(path, payload):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(payload, default=str) + "\n")
+
+
+@register_sink("file")
+class FileSink:
+    """
+    One JSON line per alert in ALERTS_LOG.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or ALERTS_LOG
+
+    def send(self, alert):
+        _append_json(self.path, alert)
+
+
+@register_sink("webhook")
+class WebhookSink:
+    """
+    POSTs {"text", "alert"} JSON to ALERTS_WEBHOOK_URL. Without a URL (or
+    when the POST fails) the payload goes to the ALERTS_OUTBOX file, a
+    local stand-in for the remote endpoint.
+    """
+
+    def __init__(self, url=None, outbox=None, timeout=5):
+        self.url = ALERTS_WEBHOOK_URL if url is None else url
+        self.outbox = outbox or ALERTS_OUTBOX
+        self.timeout = timeout
+
+    def send(self, alert):
+        payload = {"text": alert["message"], "alert": alert}
+        if self.url:
+            request = urllib.request.Request(
+                self.url,
+                data=json.dumps(payload, default=str).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+                return
+            except OSError as exc:
+                print(f"[alerts] webhook failed ({exc}); queued in outbox", file=sys.stderr)
+        _append_json(self.outbox, payload)
+
+
+# -------------------------------------------------
+# Engine
+# -------------------------------------------------
+class AlertEngine:
+    """
+    Evaluates enabled alert rules over a fixed symbol universe.
+
+    update(close) takes only new bars (Date x Symbol closes) and returns
+    the alerts fired; on_bar() does the same for one (symbol, bar) at a
+    time, flushing a time step once the next one starts. Alerts are
+    de-duplicated per (rule, symbol, bar) in the auth database, limited
+    by each rule's cooldown (in bars), and sent to the rule's sinks.
+    """
+
+    def __init__(self, rules, symbols, timeframe="1d", sinks=None):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.sinks = dict(sinks or {})
+        self.states = {}
+        self.history = np.full((0, len(self.symbols)), np.nan)
+        self.last_time = None
+        self.sentiment = {}
+        self.last_fired = {k: pd.Timestamp(v) for k, v in last_alert_times().items()}
+        self._pending = (None, {})
+        self._lock = threading.Lock()
+        self.set_rules(rules)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    @classmethod
+    def from_database(cls, symbols, timeframe="1d", sinks=None):
+        return cls(get_alert_rules(enabled_only=True), symbols, timeframe, sinks)
+
+    @staticmethod
+    def _key(rule):
+        return rule["kind"], tuple(sorted(rule_params(rule).items()))
+
+    def set_rules(self, rules):
+        """
+        Replace the rule set. Signals new to the engine are warmed up on
+        the retained closes without firing.
+        """
+        with self._lock:
+            self.rules = [r for r in rules if r.get("enabled", True)]
+            self.signals = {}
+            for rule in self.rules:
+                if rule["kind"] in SIGNALS:
+                    self.signals.setdefault(self._key(rule), []).append(rule)
+
+            self.states = {k: v for k, v in self.states.items() if k in self.signals}
+            for key in self.signals:
+                if key not in self.states and len(self.history):
+                    _, self.states[key] = self._advance(key, self.history, None)
+
+    def _advance(self, key, close, state):
+        kind, params = key
+        events, values, state = SIGNALS[kind][0](close, state, **dict(params))
+        return (events, values), state
+
+    @instrument("alerts.update")
+    def update(self, close, notify=True):
+        """
+        Advance every signal over new closes (rows at or before the last
+        processed bar are skipped) and fire matching rules.
+        """
+        with self._lock:
+            close = close.reindex(columns=self.symbols)
+            if self.last_time is not None:
+                close = close[close.index > self.last_time]
+            if close.empty:
+                return []
+
+            data = close.to_numpy(dtype=float)
+            fired = []
+            for key, rules in self.signals.items():
+                (events, values), self.states[key] = self._advance(key, data, self.states.get(key))
+                if notify and events.any():
+                    fired += self._match(key, rules, events, values, data, close.index)
+
+            self.history = np.vstack([self.history, data])[-WARMUP_BARS:]
+            self.last_time = close.index[-1]
+        return fired
+
+    def warm(self, close):
+        """
+        Advance state over history without firing.
+        """
+        return self.update(close, notify=False)
+
+    def on_bar(self, symbol, timestamp, bar):
+        """
+        Streaming entry point (StreamEngine listener).
+        """
+        timestamp = pd.Timestamp(timestamp)
+        fired = []
+        if self._pending[0] is not None and timestamp != self._pending[0]:
+            fired = self.flush()
+        self._pending[1][symbol] = float(bar["Close"])
+        self._pending = (timestamp, self._pending[1])
+        return fired
+
+    def flush(self):
+        pending_time, closes = self._pending
+        self._pending = (None, {})
+        if pending_time is None:
+            return []
+        return self.update(pd.DataFrame(closes, index=[pending_time]))
+
+    def _match(self, key, rules, events, values, data, index):
+        kind, params = key
+        template = SIGNALS[kind][2]
+        fired = []
+
+        for rule in rules:
+            if rule["symbol"] == "*":
+                rows, cols = np.nonzero(events)
+            elif rule["symbol"] in self.symbols:
+                cols = self.symbols.index(rule["symbol"])
+                rows = np.flatnonzero(events[:, cols])
+                cols = np.full(len(rows), cols)
+            else:
+                continue
+
+            for i, j in zip(rows, cols):
+                direction = "up" if events[i, j] > 0 else "down"
+                if rule["direction"] not in ("both", direction):
+                    continue
+                message = template.format(
+                    dir="above" if direction == "up" else "below",
+                    close=data[i, j], value=values[i, j], **dict(params)
+                )
+                alert = self._fire(rule, self.symbols[j], index[i], direction,
+                                   values[i, j], message)
+                if alert:
+                    fired.append(alert)
+        return fired
+
+    def on_sentiment(self, symbol, score, timestamp=None):
+        """
+        Fire sentiment_shift rules when a symbol's score moves by at least
+        the rule threshold since the previous observation.
+        """
+        timestamp = pd.Timestamp.now().floor("s") if timestamp is None else pd.Timestamp(timestamp)
+        previous = self.sentiment.get(symbol)
+        self.sentiment[symbol] = score
+        if previous is None:
+            return []
+
+        delta = score - previous
+        direction = "up" if delta > 0 else "down"
+        fired = []
+        for rule in self.rules:
+            if rule["kind"] != "sentiment_shift" or rule["symbol"] not in ("*", symbol):
+                continue
+            if abs(delta) < rule_params(rule)["threshold"] or rule["direction"] not in ("both", direction):
+                continue
+            message = f"news sentiment moved {direction} from {previous:+.2f} to {score:+.2f}"
+            alert = self._fire(rule, symbol, timestamp, direction, score, message)
+            if alert:
+                fired.append(alert)
+        return fired
+
+    def _fire(self, rule, symbol, bar_time, direction, value, message):
+        bar_time = pd.Timestamp(bar_time)
+        last = self.last_fired.get((rule["id"], symbol))
+        cooldown = timedelta(seconds=rule["cooldown"] * TIMEFRAMES[self.timeframe])
+        if last is not None and bar_time - last < cooldown:
+            return None
+
+        alert = {
+            "rule_id": rule["id"],
+            "username": rule["username"],
+            "symbol": symbol,
+            "kind": rule["kind"],
+            "direction": direction,
+            "bar_time": str(bar_time),
+            "value": None if value != value else float(value),
+            "message": f"{symbol}: {message}",
+        }
+        if not record_alert_event(alert):
+            return None  # already fired for this bar (replay / restart)
+        self.last_fired[(rule["id"], symbol)] = bar_time
+
+        for name in rule["sinks"]:
+            try:
+                self._sink(name).send(alert)
+            except Exception as exc:
+                print(f"[alerts] sink {name} failed: {exc}", file=sys.stderr)
+        return alert
+
+    def _sink(self, name):
+        if name not in self.sinks:
+            self.sinks[name] = SINKS[name]()
+        return self.sinks[name]
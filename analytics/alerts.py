@@ -0,0 +1,94 @@
+import pandas as pd
+import streamlit as st
+
+from analytics.alert_engine import DIRECTIONS, KINDS, SENTIMENT_DEFAULTS, SIGNALS, SINKS
+from analytics.live import get_alert_engine
+from auth.database import (
+    add_alert_rule,
+    delete_alert_rule,
+    get_alert_events,
+    get_alert_rules,
+    set_alert_rule_enabled,
+)
+from util.config import CRYPTO_LIST
+from util.metrics import instrument
+
+
+def _reload_rules():
+    # The shared engine picks up rule changes without losing signal state
+    get_alert_engine().set_rules(get_alert_rules(enabled_only=True))
+
+
+# -------------------------------------------------
+# Main Render Function
+# -------------------------------------------------
+@instrument("render.alerts")
+def render():
+    st.title("🔔 Alerts")
+
+    username = st.session_state.get("username")
+
+    # =================================================
+    # New Rule
+    # =================================================
+    st.subheader("New Alert Rule")
+
+    symbols = {"All symbols": "*", **CRYPTO_LIST}
+    col1, col2 = st.columns(2)
+    with col1:
+        symbol = symbols[st.selectbox("Symbol", list(symbols))]
+        kind = st.selectbox("Condition", KINDS)
+        direction = st.selectbox("Direction", DIRECTIONS)
+    with col2:
+        defaults = SENTIMENT_DEFAULTS if kind == "sentiment_shift" else SIGNALS[kind][1]
+        params = {
+            name: st.number_input(name, value=float(value))
+            if isinstance(value, float) else st.number_input(name, value=value, step=1)
+            for name, value in defaults.items()
+        }
+        cooldown = st.number_input("Cooldown (bars)", min_value=0, value=1, step=1)
+        sinks = st.multiselect("Notify via", list(SINKS), default=["file"])
+
+    if st.button("➕ Add rule"):
+        add_alert_rule(username, symbol, kind, params, direction, cooldown, sinks)
+        _reload_rules()
+        st.success("Rule added.")
+
+    # =================================================
+    # My Rules
+    # =================================================
+    st.subheader("My Rules")
+
+    rules = get_alert_rules(username)
+    if not rules:
+        st.info("No alert rules yet.")
+
+    for rule in rules:
+        col1, col2, col3 = st.columns([6, 1, 1])
+        col1.write(
+            f"**#{rule['id']}** {rule['symbol']} · {rule['kind']} {rule['params']} · "
+            f"{rule['direction']} · cooldown {rule['cooldown']} · {', '.join(rule['sinks'])}"
+        )
+        enabled = col2.toggle("On", value=rule["enabled"], key=f"alert_on_{rule['id']}")
+        if enabled != rule["enabled"]:
+            set_alert_rule_enabled(rule["id"], username, enabled)
+            _reload_rules()
+        if col3.button("🗑️", key=f"alert_del_{rule['id']}"):
+            delete_alert_rule(rule["id"], username)
+            _reload_rules()
+            st.rerun()
+
+    # =================================================
+    # Recent Alerts
+    # =================================================
+    st.subheader("Recent Alerts")
+
+    events = get_alert_events(username, limit=100)
+    if events:
+        st.dataframe(
+            pd.DataFrame(events)[["bar_time", "symbol", "kind", "direction", "message", "fired_at"]],
+            use_container_width=True,
+        )
+    else:
+        st.caption("Alerts are evaluated on every new bar of the live stream and on each "
+                   "scheduler cycle (`python -m analytics.scheduler --alerts`).")
@@ -0,0 +1,343 @@
+# =========================================================
+# batch.py
+# Headless batch report runner (no Streamlit)
+#
+# Precomputes every page's per-symbol results in parallel, writes them
+# to the results store and produces static HTML/PNG reports.
+#
+# Usage (from the repository root):
+#   python -m analytics.batch --symbols BTC-USD ETH-USD
+#   python -m analytics.batch --all-cached --workers 8 --prophet
+#   python -m analytics.batch --symbols-file coins.txt --out reports/
+#   python -m analytics.batch --all-cached --data-as-of 2024-06-01 --out reports/2024-06-01
+# =========================================================
+
+import argparse
+import html
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+from analytics.compute import compute_symbol, store_key
+from analytics.models import MODELS
+from analytics.screen_engine import refresh_screener
+from data.results_store import (
+    begin_snapshot,
+    create_results_table,
+    pin_snapshot,
+    prune_snapshots,
+    publish_snapshot,
+    put_results,
+)
+from util.config import FORECAST_DAYS
+
+REPORTS_DIR = "reports"
+
+
+# -------------------------------------------------
+# Report figures
+# -------------------------------------------------
+def _save(fig, path):
+    fig.savefig(path, format="png", dpi=110, bbox_inches="tight")
+    plt.close(fig)
+
+
+def build_figures(symbol, results):
+    """
+    Yield (file stem, title, figure) for every chart in a symbol report.
+    """
+    close = results[("close", "")]
+
+    fig, ax = plt.subplots(figsize=(9, 4))
+    signals = results[("ma_signals", "7/30")]
+    ax.plot(close.index, close, label="Price")
+    ax.plot(signals.index, signals["MA_7"], label="MA 7")
+    ax.plot(signals.index, signals["MA_30"], label="MA 30")
+    ax.legend()
+    yield "price", f"{symbol} Price & Moving Averages", fig
+
+    volume = results[("volume", "")]
+    fig, ax = plt.subplots(figsize=(9, 3))
+    ax.plot(volume.index, volume)
+    yield "volume", f"{symbol} Trading Volume", fig
+
+    returns = results[("returns", "")]
+    fig, ax = plt.subplots(figsize=(9, 3))
+    ax.plot(returns.index, returns, color="green")
+    ax.axhline(0, linestyle="--", color="black")
+    yield "returns", f"{symbol} Daily Returns", fig
+
+    vol = results[("rolling_volatility", "14")]
+    fig, ax = plt.subplots(figsize=(9, 3))
+    ax.plot(vol.index, vol)
+    yield "rolling_volatility", f"{symbol} Rolling Volatility (14)", fig
+
+    bands = results[("bollinger", "20")]
+    fig, ax = plt.subplots(figsize=(9, 4))
+    ax.plot(bands.index, bands["Close"], label="Price")
+    ax.plot(bands.index, bands["Upper"], linestyle="--", label="Upper Band")
+    ax.plot(bands.index, bands["Lower"], linestyle="--", label="Lower Band")
+    ax.legend()
+    yield "bollinger", f"{symbol} Bollinger Bands (20)", fig
+
+    pivot = results[("monthly_returns", "M")]
+    if not pivot.empty:
+        fig, ax = plt.subplots(figsize=(9, 4))
+        sns.heatmap(pivot, cmap="RdYlGn", center=0, ax=ax)
+        yield "monthly_returns", f"{symbol} Monthly Returns", fig
+
+    dec = results.get(("decomposition", "30"))
+    if dec is not None:
+        fig, axes = plt.subplots(3, 1, figsize=(9, 7), sharex=True)
+        for ax, col in zip(axes, ["Trend", "Seasonal", "Residual"]):
+            ax.plot(dec.index, dec[col])
+            ax.set_ylabel(col)
+        yield "decomposition", f"{symbol} Decomposition", fig
+
+    arima = next((v for (m, _), v in results.items() if m == "arima_forecast"), None)
+    if arima is not None:
+        fig, ax = plt.subplots(figsize=(9, 4))
+        ax.plot(close[-200:], label="Actual")
+        ax.plot(arima.index, arima["Forecast"], label="Forecast")
+        ax.fill_between(arima.index, arima["Lower"], arima["Upper"], alpha=0.3)
+        ax.legend()
+        yield "arima_forecast", f"{symbol} ARIMA Forecast", fig
+
+    cheap = {
+        m[: -len("_forecast")]: v for (m, _), v in results.items()
+        if m.endswith("_forecast") and m not in ("arima_forecast", "prophet_forecast")
+    }
+    if cheap:
+        fig, ax = plt.subplots(figsize=(9, 4))
+        ax.plot(close[-200:], color="black", label="Actual")
+        for name, fc in cheap.items():
+            ax.plot(fc.index, fc["Forecast"], label=name)
+        ax.legend()
+        yield "model_forecasts", f"{symbol} Model Forecasts", fig
+
+    prophet = next((v for (m, _), v in results.items() if m == "prophet_forecast"), None)
+    if prophet is not None:
+        fig, ax = plt.subplots(figsize=(9, 4))
+        ax.plot(close.index, close, label="Actual")
+        ax.plot(prophet.index, prophet["yhat"], label="Prophet")
+        ax.fill_between(prophet.index, prophet["yhat_lower"], prophet["yhat_upper"], alpha=0.2)
+        ax.legend()
+        yield "prophet_forecast", f"{symbol} Prophet Forecast", fig
+
+
+def write_symbol_report(symbol, as_of, results, out_dir):
+    """
+    Write <out_dir>/<symbol>/index.html plus one PNG per chart.
+    """
+    symbol_dir = os.path.join(out_dir, symbol)
+    os.makedirs(symbol_dir, exist_ok=True)
+
+    sections = []
+    for stem, title, fig in build_figures(symbol, results):
+        fig.suptitle(title)
+        _save(fig, os.path.join(symbol_dir, f"{stem}.png"))
+        sections.append(f"<h2>{html.escape(title)}</h2><img src='{stem}.png'>")
+
+    kpis = results[("kpis", "")]
+    summary = results[("return_summary", "")]
+    kpi_rows = "".join(
+        f"<tr><th>{html.escape(k)}</th><td>{v}</td></tr>"
+        for k, v in [
+            ("As of", as_of),
+            ("ROI (%)", f"{kpis['roi']:.2f}"),
+            ("Volatility (%)", f"{kpis['volatility']:.2f}"),
+            ("Max Drawdown (%)", f"{kpis['max_drawdown']:.2f}"),
+            ("Trend", summary["trend"]),
+        ]
+    )
+
+    page = (
+        f"<html><head><meta charset='utf-8'><title>{html.escape(symbol)}</title></head>"
+        f"<body><h1>{html.escape(symbol)}</h1><table>{kpi_rows}</table>"
+        + "".join(sections) + "</body></html>"
+    )
+    with open(os.path.join(symbol_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+def write_index(summaries, out_dir):
+    """
+    Universe overview: one KPI row per symbol, linked to its report.
+    """
+    df = pd.DataFrame(summaries).set_index("Symbol").sort_values("ROI (%)", ascending=False)
+    df.index = [f"<a href='{html.escape(s)}/index.html'>{html.escape(s)}</a>" for s in df.index]
+
+    page = (
+        "<html><head><meta charset='utf-8'><title>Crypto Batch Report</title></head><body>"
+        "<h1>Crypto Batch Report</h1>"
+        + df.to_html(escape=False, float_format=lambda v: f"{v:.2f}")
+        + "</body></html>"
+    )
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+# -------------------------------------------------
+# Worker
+# -------------------------------------------------
+def run_symbol(symbol, out_dir, forecast=True, prophet=False, steps=FORECAST_DAYS, report=True,
+               timeframe=None, models=(), data_as_of=None, snapshot=None):
+    """
+    Compute and (optionally) render one symbol at one timeframe. Runs in
+    a worker process; returns (store key, as_of, results, error).
+    """
+    key = store_key(symbol, timeframe)
+    try:
+        as_of, results = compute_symbol(symbol, forecast=forecast, prophet=prophet,
+                                        steps=steps, timeframe=timeframe, models=models,
+                                        data_as_of=data_as_of, snapshot=snapshot)
+        if not results:
+            return key, None, {}, "no data"
+        if report:
+            write_symbol_report(key, as_of, results, out_dir)
+        return key, as_of, results, None
+    except Exception:
+        return key, None, {}, traceback.format_exc()
+
+
+def cached_symbols():
+    from data.data_fetcher import cached_symbols
+
+    return cached_symbols()
+
+
+def run_batch(symbols, out_dir=REPORTS_DIR, workers=None, forecast=True, prophet=False,
+              steps=FORECAST_DAYS, report=True, keep=3, timeframes=("1d",), db_path=None,
+              models=(), screener_db=None, data_as_of=None, data_snapshot=None):
+    """
+    Run every symbol through the compute layer in a process pool and
+    persist the results into a new results-store snapshot, published
+    atomically once all symbols are done. Returns a list of per-symbol
+    KPI summaries.
+
+    With `data_as_of` / `data_snapshot` the results are recomputed from
+    past raw data versions (data/versions.py) into a snapshot that is
+    stored but not published.
+    """
+    point_in_time = data_as_of is not None or data_snapshot is not None
+    note = f"batch: {len(symbols)} symbols"
+    if point_in_time:
+        note += f", data as of {data_as_of}" if data_as_of else f", data snapshot {data_snapshot}"
+
+    os.makedirs(out_dir, exist_ok=True)
+    create_results_table(db_path)
+    snapshot_id = begin_snapshot(note=note, db_path=db_path)
+
+    summaries = []
+    failures = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_symbol, s, out_dir, forecast, prophet, steps, report, tf, models,
+                        data_as_of, data_snapshot)
+            for s in symbols
+            for tf in timeframes
+        ]
+
+        for i, future in enumerate(as_completed(futures), 1):
+            symbol, as_of, results, error = future.result()
+
+            if error:
+                failures += 1
+                print(f"[{i}/{len(futures)}] {symbol}: FAILED\n{error}", file=sys.stderr)
+                continue
+
+            put_results(symbol, as_of, results, snapshot_id, db_path)
+            kpis = results[("kpis", "")]
+            summaries.append({
+                "Symbol": symbol,
+                "As of": str(as_of),
+                "ROI (%)": kpis["roi"],
+                "Volatility (%)": kpis["volatility"],
+                "Max Drawdown (%)": kpis["max_drawdown"],
+                "Data version": results.get(("data_version", "")),
+            })
+            print(f"[{i}/{len(futures)}] {symbol}: {len(results)} results", flush=True)
+
+    if summaries and point_in_time:
+        pin_snapshot(snapshot_id, db_path=db_path)
+        print(f"Stored point-in-time results snapshot {snapshot_id} (pinned, not published)")
+    elif summaries:
+        publish_snapshot(snapshot_id, db_path=db_path)
+        prune_snapshots(keep=keep, db_path=db_path)
+        print(f"Published results snapshot {snapshot_id}")
+
+        # Apply the new bars of the symbols that succeeded to the screener
+        ok = sorted({s["Symbol"] for s in summaries if "@" not in s["Symbol"]})
+        if ok:
+            refresh_screener(ok, db_path=screener_db)
+
+    if report and summaries:
+        write_index(summaries, out_dir)
+
+    print(f"Done: {len(summaries)} ok, {failures} failed in "
+          f"{time.perf_counter() - start:.1f}s")
+    return summaries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute analytics & reports for many symbols.")
+    parser.add_argument("--symbols", nargs="+", help="symbols, e.g. BTC-USD ETH-USD")
+    parser.add_argument("--symbols-file", help="file with one symbol per line")
+    parser.add_argument("--all-cached", action="store_true", help="every symbol in the price cache")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", default=REPORTS_DIR, help="report output directory")
+    parser.add_argument("--steps", type=int, default=FORECAST_DAYS, help="forecast horizon")
+    parser.add_argument("--no-forecast", action="store_true", help="skip decomposition & ARIMA")
+    parser.add_argument("--prophet", action="store_true", help="also fit Prophet (slow)")
+    parser.add_argument("--models", nargs="+", default=[], choices=sorted(MODELS),
+                        help="extra forecasting models, e.g. naive ets theta gbr")
+    parser.add_argument("--no-report", action="store_true", help="only fill the results store")
+    parser.add_argument("--keep", type=int, default=3, help="published snapshots to retain")
+    parser.add_argument("--timeframes", nargs="+", default=["1d"],
+                        help="bar timeframes to materialize, e.g. 1h 4h 1d 1w")
+    parser.add_argument("--data-as-of",
+                        help="recompute from the raw data versions committed at this time")
+    parser.add_argument("--data-snapshot", help="recompute from a pinned data snapshot")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols or [])
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols += [line.strip() for line in f if line.strip()]
+    if args.all_cached:
+        symbols += cached_symbols()
+    symbols = list(dict.fromkeys(symbols))
+
+    if not symbols:
+        parser.error("no symbols given (use --symbols, --symbols-file or --all-cached)")
+
+    summaries = run_batch(
+        symbols,
+        out_dir=args.out,
+        workers=args.workers,
+        forecast=not args.no_forecast,
+        prophet=args.prophet,
+        steps=args.steps,
+        report=not args.no_report,
+        keep=args.keep,
+        timeframes=args.timeframes,
+        models=args.models,
+        data_as_of=args.data_as_of,
+        data_snapshot=args.data_snapshot,
+    )
+    return 0 if summaries else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+# =========================================================
+# compute.py
+# Pure analytics layer (no Streamlit): every number and table the
+# dashboard pages display, computed from a preprocessed frame.
+# Used by the pages, the batch report runner and the results store.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from statsmodels.tsa.seasonal import seasonal_decompose
+
+from analytics.indicators import compute_indicators
+from analytics.models import ARIMAModel, ProphetModel, fit_forecast
+from analytics.regimes import get_tracker
+from analytics.screen_engine import load_wide
+from data.bars import annualization_factor
+from data.data_preprocessing import native_timeframe, preprocess_data
+from data.results_store import get_symbol_results
+from data.versions import current_version, resolve_version
+from data.tuning_store import get_best_params
+from util.config import CRYPTO_LIST, FORECAST_DAYS
+from util.metrics import instrument, record_cache
+
+
+# -------------------------------------------------
+# Timeframes
+# -------------------------------------------------
+def timeframe_of(df):
+    return df.attrs.get("timeframe", "1d")
+
+
+def store_key(symbol, timeframe=None):
+    """
+    Results-store symbol key: plain symbol for daily bars, symbol@tf
+    for every other timeframe. None (the native spacing) resolves to the
+    stored data's timeframe, so native minute bars and their daily
+    aggregate never share a key.
+    """
+    if timeframe is None:
+        try:
+            timeframe = native_timeframe(symbol)
+        except Exception:
+            timeframe = None  # no data: nothing is stored under either key
+    if timeframe in (None, "1d"):
+        return symbol
+    return f"{symbol}@{timeframe}"
+
+
+# -------------------------------------------------
+# EDA
+# -------------------------------------------------
+def normalized_close(df):
+    return df["Close"] / df["Close"].iloc[0]
+
+
+def return_summary(df):
+    avg = df["Returns"].mean()
+    return {
+        "mean_return": avg,
+        "volatility": df["Returns"].std(),
+        "trend": "Bullish 📈" if avg > 0 else "Bearish 📉",
+    }
+
+
+# -------------------------------------------------
+# Volatility & risk
+# -------------------------------------------------
+def rolling_volatility(df, window=14):
+    return df["Returns"].rolling(window=window).std()
+
+
+def bollinger_bands(df, window=20, num_std=2):
+    ma = df["Close"].rolling(window=window).mean()
+    std = df["Close"].rolling(window=window).std()
+
+    return pd.DataFrame({
+        "Close": df["Close"],
+        "MA": ma,
+        "Upper": ma + num_std * std,
+        "Lower": ma - num_std * std,
+    })
+
+
+def high_low_spread(df):
+    return df["High"] - df["Low"]
+
+
+def annualized_volatility(df):
+    return df["Returns"].std() * annualization_factor(timeframe_of(df))
+
+
+def risk_return(frames):
+    """
+    Mean / std of returns for {name: frame}.
+    """
+    return pd.DataFrame({
+        "Risk": [df["Returns"].std() for df in frames.values()],
+        "Return": [df["Returns"].mean() for df in frames.values()],
+    }, index=list(frames))
+
+
+# -------------------------------------------------
+# Insights & KPIs
+# -------------------------------------------------
+def total_return(df):
+    return (df["Close"].iloc[-1] / df["Close"].iloc[0] - 1) * 100
+
+
+def calculate_kpis(df):
+    roi = total_return(df)
+    volatility = annualized_volatility(df) * 100
+
+    cumulative = (1 + df["Returns"]).cumprod()
+    rolling_max = cumulative.cummax()
+    drawdown = (cumulative - rolling_max) / rolling_max
+    max_drawdown = drawdown.min() * 100
+
+    return roi, volatility, max_drawdown
+
+
+def monthly_returns_pivot(df):
+    # Compound bar returns within each calendar month
+    monthly = (1 + df["Returns"]).resample("MS").prod(min_count=1) - 1
+    monthly = monthly.dropna()
+    heatmap_df = monthly.to_frame("Returns")
+    heatmap_df["Year"] = heatmap_df.index.year
+    heatmap_df["Month"] = heatmap_df.index.month
+    return heatmap_df.pivot(index="Year", columns="Month", values="Returns")
+
+
+def ma_signals(df):
+    """
+    Price, MA_7, MA_30 and a Signal column (+1 buy, -1 sell, 0 neutral).
+    """
+    ma_df = df.dropna(subset=["MA_7", "MA_30"])[["Close", "MA_7", "MA_30"]].copy()
+    ma_df["Signal"] = np.sign(ma_df["MA_7"] - ma_df["MA_30"]).astype(int)
+    return ma_df
+
+
+def correlation_matrix(frames):
+    merged = pd.concat(
+        [df["Returns"] for df in frames.values()],
+        axis=1,
+        keys=list(frames)
+    ).dropna()
+    return merged.corr(), len(merged)
+
+
+# -------------------------------------------------
+# Forecasting
+# -------------------------------------------------
+def decompose(series, period=30):
+    dec = seasonal_decompose(series, model="additive", period=period)
+    return pd.DataFrame({
+        "Trend": dec.trend,
+        "Seasonal": dec.seasonal,
+        "Residual": dec.resid,
+    })
+
+
+@instrument("arima_forecast")
+def arima_forecast(series, steps=FORECAST_DAYS, order=(5, 1, 0)):
+    fc = ARIMAModel(order).fit(series).forecast(steps)
+    return fc["Forecast"], fc[["Lower", "Upper"]]
+
+
+@instrument("prophet_forecast")
+def prophet_forecast(series, steps=FORECAST_DAYS, **prophet_params):
+    model = ProphetModel(**prophet_params).fit(series)
+    return model.model_, model.full_forecast(steps)
+
+
+# -------------------------------------------------
+# Per-symbol bundle (batch runner / results store)
+# -------------------------------------------------
+def compute_core(df):
+    """
+    Every cheap per-symbol result, keyed by (metric, window).
+    """
+    roi, vol, mdd = calculate_kpis(df)
+
+    return {
+        ("kpis", ""): {"roi": roi, "volatility": vol, "max_drawdown": mdd},
+        ("return_summary", ""): return_summary(df),
+        ("annualized_volatility", ""): annualized_volatility(df),
+        ("close", ""): df["Close"],
+        ("volume", ""): df["Volume"],
+        ("returns", ""): df["Returns"],
+        ("log_returns", ""): df["Log_Returns"],
+        ("rolling_volatility", "14"): rolling_volatility(df, 14),
+        ("bollinger", "20"): bollinger_bands(df, 20),
+        ("high_low_spread", ""): high_low_spread(df),
+        ("monthly_returns", "M"): monthly_returns_pivot(df),
+        ("ma_signals", "7/30"): ma_signals(df),
+        ("indicators", ""): compute_indicators(df),
+        ("data_quality", ""): dict(df.attrs.get("quality", {})),
+    }
+
+
+def forecast_keys(steps=FORECAST_DAYS, prophet=False, models=()):
+    """
+    Result keys compute_forecasts() produces for these settings.
+    """
+    keys = [("decomposition", "30"), ("arima_forecast", str(steps))]
+    keys += [(f"{name}_forecast", str(steps)) for name in models]
+    if prophet:
+        keys.append(("prophet_forecast", str(steps)))
+    return keys
+
+
+def compute_forecasts(price, steps=FORECAST_DAYS, prophet=False, existing=None, models=(),
+                      progress=None, prophet_params=None):
+    """
+    Decomposition and model forecasts for a price series, skipping any
+    key already present in `existing`. `models` are extra registry
+    models (see analytics.models), stored as <name>_forecast.
+    `progress(fraction, message)` is called before every fit;
+    `prophet_params` are tuned Prophet parameters (analytics.tuning).
+    """
+    existing = existing or {}
+    results = {}
+
+    todo = [k for k in forecast_keys(steps, prophet, models) if k not in existing]
+
+    def step(key):
+        if progress is not None:
+            progress(todo.index(key) / len(todo), f"fitting {key[0]}")
+
+    if ("decomposition", "30") not in existing:
+        step(("decomposition", "30"))
+        results[("decomposition", "30")] = decompose(price, 30)
+
+    if ("arima_forecast", str(steps)) not in existing:
+        step(("arima_forecast", str(steps)))
+        fc, ci = arima_forecast(price, steps)
+        results[("arima_forecast", str(steps))] = pd.DataFrame({
+            "Forecast": fc,
+            "Lower": ci.iloc[:, 0],
+            "Upper": ci.iloc[:, 1],
+        })
+
+    for name in models:
+        if (f"{name}_forecast", str(steps)) not in existing:
+            step((f"{name}_forecast", str(steps)))
+            results[(f"{name}_forecast", str(steps))] = fit_forecast(price, name, steps)
+
+    if prophet and ("prophet_forecast", str(steps)) not in existing:
+        step(("prophet_forecast", str(steps)))
+        _, pf = prophet_forecast(price, steps, **(prophet_params or {}))
+        results[("prophet_forecast", str(steps))] = pf[
+            ["ds", "yhat", "yhat_lower", "yhat_upper"]
+        ].set_index("ds")
+
+    return results
+
+
+def compute_symbol(symbol, forecast=True, prophet=False, steps=FORECAST_DAYS, timeframe=None,
+                   models=(), data_as_of=None, snapshot=None):
+    """
+    Compute every per-symbol result the pages show, from the raw data
+    version committed at `data_as_of` or pinned by `snapshot` (see
+    data/versions.py; default: the current data).
+
+    Returns (as_of, results) where results maps (metric, window) to a
+    picklable payload (scalars, dicts, Series or DataFrames), tagged
+    with ("data_version", "") (None for unversioned symbols).
+    """
+    version = resolve_version(symbol, as_of=data_as_of, snapshot=snapshot)
+    df = preprocess_data(symbol, timeframe, version=version)
+    if df is None or df.empty:
+        return None, {}
+
+    results = compute_core(df)
+    results[("data_version", "")] = version
+    price = df["Close"].dropna()
+
+    if forecast and len(price) >= 150:
+        results.update(compute_forecasts(
+            price, steps, prophet, models=models,
+            prophet_params=get_best_params(symbol, timeframe) if prophet else None
+        ))
+
+    return df.index[-1], results
+
+
+SERIES_COLUMNS = {
+    "Close": ("close", ""),
+    "Volume": ("volume", ""),
+    "Returns": ("returns", ""),
+    "Log_Returns": ("log_returns", ""),
+}
+
+
+def results_frame(results, columns=None):
+    """
+    Rebuild a (Close, Volume, Returns, Log_Returns) frame from stored
+    series so page chart code can index it like a preprocessed frame.
+    `columns` limits it to the fields a page declares.
+    """
+    wanted = SERIES_COLUMNS if columns is None else {c: SERIES_COLUMNS[c] for c in columns}
+    return pd.DataFrame({
+        col: results[key] for col, key in wanted.items() if key in results
+    })
+
+
+def load_symbol(symbol, forecast=False, prophet=False, steps=FORECAST_DAYS, timeframe=None,
+                models=()):
+    """
+    Results for one symbol as the pages consume them: a lookup in the
+    live results-store snapshot, falling back to inline computation for
+    symbols (or forecasts) the scheduler hasn't materialized yet, or
+    materialized from an older data version than the current one.
+    """
+    results = get_symbol_results(store_key(symbol, timeframe))
+    if results and results.get(("data_version", "")) != current_version(symbol):
+        results = {}
+    record_cache("results_store", bool(results))
+
+    if not results:
+        _, results = compute_symbol(symbol, forecast=False, timeframe=timeframe)
+
+    if forecast and results and len(results[("close", "")].dropna()) >= 150:
+        results.update(compute_forecasts(
+            results[("close", "")].dropna(), steps, prophet, existing=results, models=models,
+            prophet_params=get_best_params(symbol, timeframe) if prophet else None
+        ))
+
+    return results
+
+
+def load_regimes(symbol, timeframe=None, results=None):
+    """
+    Per-bar regime frame for one symbol (see analytics.regimes): the one
+    the scheduler published with the symbol's results, else the
+    process-wide tracker over the configured coins, advanced with the
+    bars that arrived since its last call.
+    """
+    if results is None:
+        results = get_symbol_results(store_key(symbol, timeframe))
+    record_cache("regimes", ("regimes", "") in results)
+    if ("regimes", "") in results:
+        return results[("regimes", "")]
+
+    symbols = list(CRYPTO_LIST.values())
+    if symbol not in symbols:
+        symbols = [symbol]
+    tracker = get_tracker(symbols, timeframe)
+    tracker.update(load_wide(symbols, timeframe, since=tracker.last_time)["Close"])
+    return tracker.frame(symbol)
@@ -1,11 +1,19 @@
 import streamlit as st
-import matplotlib.pyplot as plt
+import pandas as pd
 import seaborn as sns
 
-from data.data_preprocessing import preprocess_data
+from analytics.compute import load_regimes, load_symbol, normalized_close, results_frame
+from analytics.regimes import regime_spans, regime_summary
+from util.charts import hist_chart, line_chart, lines_chart, regime_chart
+from util.config import REPAIR_POLICY
+from util.metrics import instrument
+from util.rendering import Chart, draw_charts
 
 sns.set_style("darkgrid")
 
+# Price fields this page charts (see results_frame)
+FIELDS = ["Close", "Volume", "Returns", "Log_Returns"]
+
 
 # -------------------------------------------------
 # Utility
@@ -14,39 +22,75 @@ def has_enough_data(df, min_rows=50):
     return df is not None and not df.empty and len(df) >= min_rows
 
 
+def regime_line(name, summary, trend):
+    """
+    One summary bullet: the current regime and the regime mix, or the
+    whole-period trend when no regime model is fitted yet.
+    """
+    if summary["regime"] is None:
+        return f"• **{name}** exhibits a **{trend}** return trend over the analyzed period.  "
+
+    mix = ", ".join(f"{share:.0%} {label}" for label, share in summary["share"].items())
+    return (
+        f"• **{name}** has been in a **{summary['regime']}** regime since "
+        f"**{summary['since']:%Y-%m-%d}** ({summary['confidence']:.0%} confidence); "
+        f"bars by regime: {mix}, with {summary['changepoints']} changepoints.  "
+    )
+
+
 # -------------------------------------------------
 # Main Render Function
 # -------------------------------------------------
+@instrument("render.eda")
 def render():
     st.title("📊 Exploratory Data Analysis (EDA)")
 
-    # Load processed data
-    btc = preprocess_data("BTC-USD")
-    eth = preprocess_data("ETH-USD")
+    # Load precomputed results (computed inline if not materialized yet)
+    timeframe = st.session_state.get("timeframe")
+    btc_results = load_symbol("BTC-USD", timeframe=timeframe)
+    eth_results = load_symbol("ETH-USD", timeframe=timeframe)
+
+    btc = results_frame(btc_results, FIELDS)
+    eth = results_frame(eth_results, FIELDS)
+
+    btc_regimes = load_regimes("BTC-USD", timeframe, btc_results)
+    eth_regimes = load_regimes("ETH-USD", timeframe, eth_results)
 
     # =================================================
-    # Chart 1 & 2: Price Trend (Side-by-Side)
+    # Data Quality
+    # =================================================
+    quality = {
+        name: results.get(("data_quality", ""), {})
+        for name, results in (("Bitcoin", btc_results), ("Ethereum", eth_results))
+    }
+    issues = sum(v for q in quality.values() for k, v in q.items() if k != "rows")
+
+    with st.expander(f"Data Quality ({issues} issues flagged)" if issues else "Data Quality"):
+        st.caption(f"Repair policy: **{REPAIR_POLICY}**")
+        st.dataframe(pd.DataFrame(quality).T)
+
+    # Figures are laid out as placeholders, then rasterized in parallel
+    # (util/rendering.py) and filled in as each one finishes
+    charts = []
+
+    # =================================================
+    # Chart 1 & 2: Price Trend with Regimes (Side-by-Side)
     # =================================================
     st.subheader("Price Trend Comparison")
 
     if has_enough_data(btc) and has_enough_data(eth):
+        st.caption("Shaded: market regime per bar (Gaussian HMM) · dotted: detected changepoints")
         col1, col2 = st.columns(2)
 
-        with col1:
-            fig, ax = plt.subplots()
-            ax.plot(btc.index, btc["Close"])
-            ax.set_title("Bitcoin Price Trend")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price (USD)")
-            st.pyplot(fig)
-
-        with col2:
-            fig, ax = plt.subplots()
-            ax.plot(eth.index, eth["Close"], color="orange")
-            ax.set_title("Ethereum Price Trend")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price (USD)")
-            st.pyplot(fig)
+        for col, df, regimes, name, color in (
+            (col1, btc, btc_regimes, "Bitcoin", None),
+            (col2, eth, eth_regimes, "Ethereum", "orange"),
+        ):
+            changepoints = tuple(regimes.index[regimes["Changepoint"].to_numpy(dtype=bool)])
+            charts.append((col.empty(), Chart(
+                regime_chart, df["Close"], regime_spans(regimes), changepoints,
+                title=f"{name} Price Trend", xlabel="Date", ylabel="Price (USD)", color=color
+            )))
 
     # =================================================
     # Chart 3 & 4: Trading Volume (Side-by-Side)
@@ -56,21 +100,14 @@ def render():
     if has_enough_data(btc) and has_enough_data(eth):
         col1, col2 = st.columns(2)
 
-        with col1:
-            fig, ax = plt.subplots()
-            ax.plot(btc.index, btc["Volume"])
-            ax.set_title("Bitcoin Trading Volume")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Volume")
-            st.pyplot(fig)
-
-        with col2:
-            fig, ax = plt.subplots()
-            ax.plot(eth.index, eth["Volume"], color="orange")
-            ax.set_title("Ethereum Trading Volume")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Volume")
-            st.pyplot(fig)
+        charts.append((col1.empty(), Chart(
+            line_chart, btc["Volume"], title="Bitcoin Trading Volume",
+            xlabel="Date", ylabel="Volume"
+        )))
+        charts.append((col2.empty(), Chart(
+            line_chart, eth["Volume"], title="Ethereum Trading Volume",
+            xlabel="Date", ylabel="Volume", color="orange"
+        )))
 
     # =================================================
     # Chart 5: Market Strength Comparison (NORMALIZED)
@@ -78,17 +115,15 @@ def render():
     st.subheader("Market Strength Comparison (Normalized Prices)")
 
     if has_enough_data(btc) and has_enough_data(eth):
-        btc_norm = btc["Close"] / btc["Close"].iloc[0]
-        eth_norm = eth["Close"] / eth["Close"].iloc[0]
-
-        fig, ax = plt.subplots()
-        ax.plot(btc.index, btc_norm, label="Bitcoin (Normalized)")
-        ax.plot(eth.index, eth_norm, label="Ethereum (Normalized)")
-        ax.set_title("BTC vs ETH Relative Price Growth")
-        ax.set_xlabel("Date")
-        ax.set_ylabel("Normalized Price")
-        ax.legend()
-        st.pyplot(fig)
+        normalized = pd.DataFrame({
+            "Bitcoin (Normalized)": normalized_close(btc),
+            "Ethereum (Normalized)": normalized_close(eth),
+        })
+
+        charts.append((st.empty(), Chart(
+            lines_chart, normalized, title="BTC vs ETH Relative Price Growth",
+            xlabel="Date", ylabel="Normalized Price"
+        )))
 
     # =================================================
     # Chart 6: Daily Returns (Side-by-Side)
@@ -98,19 +133,14 @@ def render():
     if has_enough_data(btc) and has_enough_data(eth):
         col1, col2 = st.columns(2)
 
-        with col1:
-            fig, ax = plt.subplots()
-            ax.plot(btc.index, btc["Returns"], color="green")
-            ax.axhline(0, linestyle="--", color="black")
-            ax.set_title("Bitcoin Daily Returns")
-            st.pyplot(fig)
-
-        with col2:
-            fig, ax = plt.subplots()
-            ax.plot(eth.index, eth["Returns"], color="green")
-            ax.axhline(0, linestyle="--", color="black")
-            ax.set_title("Ethereum Daily Returns")
-            st.pyplot(fig)
+        charts.append((col1.empty(), Chart(
+            line_chart, btc["Returns"], title="Bitcoin Daily Returns",
+            color="green", zero_line=True
+        )))
+        charts.append((col2.empty(), Chart(
+            line_chart, eth["Returns"], title="Ethereum Daily Returns",
+            color="green", zero_line=True
+        )))
 
     # =================================================
     # Chart 7: Log Returns (Side-by-Side)
@@ -120,19 +150,14 @@ def render():
     if has_enough_data(btc) and has_enough_data(eth):
         col1, col2 = st.columns(2)
 
-        with col1:
-            fig, ax = plt.subplots()
-            ax.plot(btc.index, btc["Log_Returns"], color="purple")
-            ax.axhline(0, linestyle="--", color="black")
-            ax.set_title("Bitcoin Log Returns")
-            st.pyplot(fig)
-
-        with col2:
-            fig, ax = plt.subplots()
-            ax.plot(eth.index, eth["Log_Returns"], color="purple")
-            ax.axhline(0, linestyle="--", color="black")
-            ax.set_title("Ethereum Log Returns")
-            st.pyplot(fig)
+        charts.append((col1.empty(), Chart(
+            line_chart, btc["Log_Returns"], title="Bitcoin Log Returns",
+            color="purple", zero_line=True
+        )))
+        charts.append((col2.empty(), Chart(
+            line_chart, eth["Log_Returns"], title="Ethereum Log Returns",
+            color="purple", zero_line=True
+        )))
 
     # =================================================
     # Chart 8: Price Distribution (Side-by-Side)
@@ -142,17 +167,12 @@ def render():
     if has_enough_data(btc) and has_enough_data(eth):
         col1, col2 = st.columns(2)
 
-        with col1:
-            fig, ax = plt.subplots()
-            sns.histplot(btc["Close"], bins=50, kde=True, ax=ax)
-            ax.set_title("Bitcoin Price Distribution")
-            st.pyplot(fig)
-
-        with col2:
-            fig, ax = plt.subplots()
-            sns.histplot(eth["Close"], bins=50, kde=True, ax=ax)
-            ax.set_title("Ethereum Price Distribution")
-            st.pyplot(fig)
+        charts.append((col1.empty(), Chart(
+            hist_chart, btc["Close"], bins=50, kde=True, title="Bitcoin Price Distribution"
+        )))
+        charts.append((col2.empty(), Chart(
+            hist_chart, eth["Close"], bins=50, kde=True, title="Ethereum Price Distribution"
+        )))
 
         # =========================================================
         # EDA Summary Insights
@@ -160,23 +180,22 @@ def render():
         st.subheader("📌EDA Summary Insights")
 
         if has_enough_data(btc) and has_enough_data(eth):
-            btc_avg = btc["Returns"].mean()
-            eth_avg = eth["Returns"].mean()
+            btc_summary = btc_results[("return_summary", "")]
+            eth_summary = eth_results[("return_summary", "")]
 
-            btc_vol = btc["Returns"].std()
-            eth_vol = eth["Returns"].std()
-
-            btc_trend = "Bullish 📈" if btc_avg > 0 else "Bearish 📉"
-            eth_trend = "Bullish 📈" if eth_avg > 0 else "Bearish 📉"
+            btc_vol, btc_trend = btc_summary["volatility"], btc_summary["trend"]
+            eth_vol, eth_trend = eth_summary["volatility"], eth_summary["trend"]
 
             st.success(
                 f"""
                 **Key Observations**
 
-                • **Bitcoin** exhibits a **{btc_trend}** return trend over the analyzed period.  
-                • **Ethereum** exhibits a **{eth_trend}** return trend over the analyzed period.  
+                {regime_line("Bitcoin", regime_summary(btc_regimes), btc_trend)}
+                {regime_line("Ethereum", regime_summary(eth_regimes), eth_trend)}
 
                 • **Bitcoin** shows return volatility of **{btc_vol:.4f}**, reflecting its price fluctuations.  
                 • **Ethereum** shows return volatility of **{eth_vol:.4f}**, indicating relative risk behavior.
                 """
                         )
+
+    draw_charts(charts)
@@ -1,13 +1,34 @@
+import time
+import uuid
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.tsa.arima.model import ARIMA
-from prophet import Prophet
 
-from data.data_preprocessing import preprocess_data
+from analytics.compute import forecast_keys, load_symbol
+from analytics.jobs import (
+    backtest_params,
+    forecast_params,
+    job_key,
+    run_inline,
+    start_workers,
+    submit,
+)
+from analytics.models import MODELS
+from analytics.risk import probability_cone, risk_summary, simulate
+from data.job_store import cancel_job, get_job, get_job_result
+from data.tuning_store import get_tuning_summary
+from util.config import (
+    FORECAST_DAYS,
+    FORECAST_MODELS,
+    JOBS_POLL_SECONDS,
+    JOBS_WORKERS,
+    RISK_MEMORY_MB,
+    RISK_PATHS,
+    RISK_WORKERS,
+)
+from util.charts import cone_chart, forecast_chart, interval_chart, line_chart, prophet_chart
+from util.metrics import instrument
+from util.rendering import Chart, draw_charts
 
 
 # -------------------------------------------------
@@ -18,47 +39,128 @@ def has_enough_data(df, min_rows=150):
 
 
 # -------------------------------------------------
-# Helper: ARIMA forecast
-# -------------------------------------------------
-def arima_forecast(series, steps=30):
-    model = ARIMA(series, order=(5, 1, 0))
-    fit = model.fit()
-    forecast = fit.get_forecast(steps=steps)
-    return forecast.predicted_mean, forecast.conf_int()
-
-
-# -------------------------------------------------
-# Helper: Prophet forecast
+# Background jobs
 # -------------------------------------------------
-def prophet_forecast(series, steps=30):
-    df = series.reset_index()
-    df.columns = ["ds", "y"]
-
-    model = Prophet(daily_seasonality=True)
-    model.fit(df)
+@st.cache_resource
+def get_job_workers():
+    # One pool per server process; all pools share the SQLite queue
+    return start_workers(JOBS_WORKERS) if JOBS_WORKERS > 0 else []
+
+
+def await_jobs(requests):
+    """
+    Submit {label: (kind, params)} (joining identical in-flight or cached
+    jobs) and return {label: result} once all are done. Until then, draw
+    their progress and return None; the caller polls with poll_jobs().
+    """
+    get_job_workers()
+    subscriber = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    session_jobs = st.session_state.setdefault("jobs", {})
+
+    jobs = {}
+    for label, (kind, params) in requests.items():
+        key = job_key(kind, params)
+        job = get_job(session_jobs[key]) if key in session_jobs else None
+        if job is None or job["status"] == "cancelled":
+            session_jobs[key] = submit(kind, params, subscriber)
+            if JOBS_WORKERS <= 0:
+                run_inline(session_jobs[key])
+            job = get_job(session_jobs[key])
+        jobs[label] = (key, job)
+
+    if all(job["status"] == "done" for _, job in jobs.values()):
+        return {label: get_job_result(job["id"]) for label, (_, job) in jobs.items()}
+
+    for label, (key, job) in jobs.items():
+        if job["status"] == "failed":
+            st.error(f"{label}: {job['error']}")
+            if st.button("🔁 Retry", key=f"retry_{key}"):
+                session_jobs.pop(key)
+                st.rerun()
+        else:
+            st.progress(job["progress"], text=f"{label}: {job['status']} {job['message']}")
+
+    in_flight = [job for _, job in jobs.values() if job["status"] in ("queued", "running")]
+    if in_flight and st.button("✖️ Cancel", key=f"cancel_{'_'.join(jobs)}"):
+        for job in in_flight:
+            cancel_job(job["id"], subscriber)
+        st.session_state["jobs_cancelled"] = True
+        st.rerun()
+    return None
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_simulation(log_returns, n_paths, steps):
+    """
+    Monte Carlo summary for a log-return frame, kept across the reruns
+    job polling triggers (recomputed only when the returns change).
+    """
+    return simulate(
+        log_returns,
+        n_paths=n_paths,
+        steps=steps,
+        model="block_bootstrap",
+        memory_mb=RISK_MEMORY_MB,
+        workers=RISK_WORKERS
+    )
 
-    future = model.make_future_dataframe(periods=steps)
-    forecast = model.predict(future)
 
-    return model, forecast
+def poll_jobs():
+    """
+    Re-run the page shortly to refresh job progress. Navigating away
+    stops the polling; the jobs keep running.
+    """
+    time.sleep(JOBS_POLL_SECONDS)
+    st.rerun()
 
 
 # -------------------------------------------------
 # Main Render Function
 # -------------------------------------------------
+@instrument("render.forecasting")
 def render():
     st.title("⏳ Time Series Forecasting (BTC vs ETH)")
 
-    # Load data
-    btc = preprocess_data("BTC-USD")
-    eth = preprocess_data("ETH-USD")
+    # Load precomputed results; fits the scheduler hasn't materialized
+    # run as background jobs shared by every session
+    timeframe = st.session_state.get("timeframe")
+    btc = load_symbol("BTC-USD", timeframe=timeframe)
+    eth = load_symbol("ETH-USD", timeframe=timeframe)
+    horizon = str(FORECAST_DAYS)
 
-    if not has_enough_data(btc) or not has_enough_data(eth):
+    btc_price = btc[("close", "")].dropna() if btc else None
+    eth_price = eth[("close", "")].dropna() if eth else None
+
+    if not has_enough_data(btc_price) or not has_enough_data(eth_price):
         st.warning("Not enough data for forecasting.")
         return
 
-    btc_price = btc["Close"].dropna()
-    eth_price = eth["Close"].dropna()
+    if st.session_state.get("jobs_cancelled"):
+        st.info("Model fitting was cancelled.")
+        if st.button("▶️ Fit models"):
+            st.session_state.pop("jobs_cancelled")
+            st.rerun()
+        return
+
+    needed = forecast_keys(FORECAST_DAYS, prophet=True, models=FORECAST_MODELS)
+    requests = {
+        name: ("forecast", forecast_params(symbol, timeframe, FORECAST_DAYS, True, FORECAST_MODELS))
+        for name, symbol, results in [("Bitcoin", "BTC-USD", btc), ("Ethereum", "ETH-USD", eth)]
+        if any(key not in results for key in needed)
+    }
+    if requests:
+        fits = await_jobs(requests)
+        if fits is None:
+            st.caption("Fitting forecast models in the background; "
+                       "you can leave this page and come back.")
+            poll_jobs()
+            return
+        btc.update(fits.get("Bitcoin", {}))
+        eth.update(fits.get("Ethereum", {}))
+
+    # Figures are laid out as placeholders, then rasterized in parallel
+    # (util/rendering.py) and filled in as each one finishes
+    charts = []
 
     # =================================================
     # Charts 16–18: Decomposition
@@ -67,68 +169,30 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    btc_dec = seasonal_decompose(btc_price, model="additive", period=30)
-    eth_dec = seasonal_decompose(eth_price, model="additive", period=30)
-
-    with col1:
-        fig, ax = plt.subplots()
-        ax.plot(btc_dec.trend)
-        ax.set_title("Bitcoin Trend")
-        st.pyplot(fig)
-
-        fig, ax = plt.subplots()
-        ax.plot(btc_dec.seasonal)
-        ax.set_title("Bitcoin Seasonality")
-        st.pyplot(fig)
-
-        fig, ax = plt.subplots()
-        ax.plot(btc_dec.resid)
-        ax.set_title("Bitcoin Residuals")
-        st.pyplot(fig)
-
-    with col2:
-        fig, ax = plt.subplots()
-        ax.plot(eth_dec.trend)
-        ax.set_title("Ethereum Trend")
-        st.pyplot(fig)
-
-        fig, ax = plt.subplots()
-        ax.plot(eth_dec.seasonal)
-        ax.set_title("Ethereum Seasonality")
-        st.pyplot(fig)
-
-        fig, ax = plt.subplots()
-        ax.plot(eth_dec.resid)
-        ax.set_title("Ethereum Residuals")
-        st.pyplot(fig)
+    for col, results, name in ((col1, btc, "Bitcoin"), (col2, eth, "Ethereum")):
+        decomposition = results[("decomposition", "30")]
+        for component, label in (("Trend", "Trend"), ("Seasonal", "Seasonality"),
+                                 ("Residual", "Residuals")):
+            charts.append((col.empty(), Chart(
+                line_chart, decomposition[component], title=f"{name} {label}"
+            )))
 
     # =================================================
     # Chart 19: ARIMA Forecast
     # =================================================
     st.subheader("ARIMA Forecast")
 
-    btc_fc, btc_ci = arima_forecast(btc_price)
-    eth_fc, eth_ci = arima_forecast(eth_price)
+    btc_arima = btc[("arima_forecast", horizon)]
+    eth_arima = eth[("arima_forecast", horizon)]
 
     col1, col2 = st.columns(2)
 
-    with col1:
-        fig, ax = plt.subplots()
-        ax.plot(btc_price, label="Actual")
-        ax.plot(btc_fc, label="Forecast")
-        ax.fill_between(btc_ci.index, btc_ci.iloc[:, 0], btc_ci.iloc[:, 1], alpha=0.3)
-        ax.set_title("Bitcoin ARIMA Forecast")
-        ax.legend()
-        st.pyplot(fig)
-
-    with col2:
-        fig, ax = plt.subplots()
-        ax.plot(eth_price, label="Actual")
-        ax.plot(eth_fc, label="Forecast")
-        ax.fill_between(eth_ci.index, eth_ci.iloc[:, 0], eth_ci.iloc[:, 1], alpha=0.3)
-        ax.set_title("Ethereum ARIMA Forecast")
-        ax.legend()
-        st.pyplot(fig)
+    for col, price, arima, name in ((col1, btc_price, btc_arima, "Bitcoin"),
+                                    (col2, eth_price, eth_arima, "Ethereum")):
+        charts.append((col.empty(), Chart(
+            forecast_chart, price, arima[["Forecast"]], band=arima[["Lower", "Upper"]],
+            title=f"{name} ARIMA Forecast"
+        )))
 
     # =================================================
     # Chart 20: Prophet Forecast
@@ -137,17 +201,26 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    with col1:
-        model, forecast = prophet_forecast(btc_price)
-        fig = model.plot(forecast)
-        plt.title("Bitcoin Prophet Forecast")
-        st.pyplot(fig)
-
-    with col2:
-        model, forecast = prophet_forecast(eth_price)
-        fig = model.plot(forecast)
-        plt.title("Ethereum Prophet Forecast")
-        st.pyplot(fig)
+    for col, price, results, name in ((col1, btc_price, btc, "Bitcoin"),
+                                      (col2, eth_price, eth, "Ethereum")):
+        charts.append((col.empty(), Chart(
+            prophet_chart, price, results[("prophet_forecast", horizon)],
+            title=f"{name} Prophet Forecast"
+        )))
+
+    for name, symbol in [("Bitcoin", "BTC-USD"), ("Ethereum", "ETH-USD")]:
+        tuned = get_tuning_summary(symbol, timeframe)
+        if tuned is None:
+            st.caption(f"{name}: Prophet defaults (not tuned yet; "
+                       f"`python -m analytics.tuning --symbols {symbol}`).")
+        else:
+            params = ", ".join(f"{k}={v}" for k, v in tuned["params"].items())
+            st.caption(
+                f"{name}: tuned {tuned['tuned_at'][:10]} over {tuned['configs']} configurations × "
+                f"{tuned['folds']} folds ({params}); CV {tuned['metric']} {tuned['score']:,.2f}"
+                + (f" vs {tuned['default_score']:,.2f} with defaults"
+                   if tuned["default_score"] is not None else "")
+            )
 
     # =================================================
     # Chart 21: Actual vs Predicted (ARIMA)
@@ -156,21 +229,12 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    with col1:
-        fig, ax = plt.subplots()
-        ax.plot(btc_price[-100:], label="Actual")
-        ax.plot(btc_fc, label="Predicted")
-        ax.set_title("Bitcoin Actual vs Predicted")
-        ax.legend()
-        st.pyplot(fig)
-
-    with col2:
-        fig, ax = plt.subplots()
-        ax.plot(eth_price[-100:], label="Actual")
-        ax.plot(eth_fc, label="Predicted")
-        ax.set_title("Ethereum Actual vs Predicted")
-        ax.legend()
-        st.pyplot(fig)
+    for col, price, arima, name in ((col1, btc_price, btc_arima, "Bitcoin"),
+                                    (col2, eth_price, eth_arima, "Ethereum")):
+        predicted = arima[["Forecast"]].rename(columns={"Forecast": "Predicted"})
+        charts.append((col.empty(), Chart(
+            forecast_chart, price[-100:], predicted, title=f"{name} Actual vs Predicted"
+        )))
 
     # =================================================
     # Chart 22: Forecast Confidence Interval (COLOR FIX)
@@ -179,33 +243,80 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    with col1:
-        fig, ax = plt.subplots()
-        ax.plot(btc_ci.index, btc_ci.iloc[:, 0], color="blue", label="Lower Bound")
-        ax.plot(btc_ci.index, btc_ci.iloc[:, 1], color="orange", label="Upper Bound")
-        ax.fill_between(
-            btc_ci.index,
-            btc_ci.iloc[:, 0],
-            btc_ci.iloc[:, 1],
-            alpha=0.2
-        )
-        ax.set_title("Bitcoin Forecast Confidence Interval")
-        ax.legend()
-        st.pyplot(fig)
-
-    with col2:
-        fig, ax = plt.subplots()
-        ax.plot(eth_ci.index, eth_ci.iloc[:, 0], color="blue", label="Lower Bound")
-        ax.plot(eth_ci.index, eth_ci.iloc[:, 1], color="orange", label="Upper Bound")
-        ax.fill_between(
-            eth_ci.index,
-            eth_ci.iloc[:, 0],
-            eth_ci.iloc[:, 1],
-            alpha=0.2
-        )
-        ax.set_title("Ethereum Forecast Confidence Interval")
-        ax.legend()
-        st.pyplot(fig)
+    for col, arima, name in ((col1, btc_arima, "Bitcoin"), (col2, eth_arima, "Ethereum")):
+        charts.append((col.empty(), Chart(
+            interval_chart, arima[["Lower", "Upper"]],
+            title=f"{name} Forecast Confidence Interval"
+        )))
+
+    # =================================================
+    # Model Comparison (cheap models + ARIMA)
+    # =================================================
+    st.subheader(f"Model Comparison ({FORECAST_DAYS}-Bar Forecasts)")
+
+    col1, col2 = st.columns(2)
+
+    for (name, results, price), col in zip(
+        [("Bitcoin", btc, btc_price), ("Ethereum", eth, eth_price)], [col1, col2]
+    ):
+        forecasts = pd.DataFrame({
+            model: results[(f"{model}_forecast", horizon)]["Forecast"]
+            for model in FORECAST_MODELS + ["arima"]
+            if (f"{model}_forecast", horizon) in results
+        })
+        charts.append((col.empty(), Chart(
+            forecast_chart, price[-100:], forecasts, title=f"{name} Model Forecasts",
+            actual_color="black"
+        )))
+
+    selected = st.multiselect(
+        "Models to backtest (last forecast horizon held out)",
+        [m for m in MODELS if m not in ("prophet", "auto_arima")],
+        default=[m for m in FORECAST_MODELS if m in MODELS]
+    )
+
+    pending = False
+    if selected:
+        requests = {
+            name: ("backtest", backtest_params(symbol, timeframe, selected, FORECAST_DAYS))
+            for name, symbol in [("Bitcoin", "BTC-USD"), ("Ethereum", "ETH-USD")]
+        }
+        backtests = await_jobs(requests)
+        pending = backtests is None
+
+        if backtests is not None:
+            col1, col2 = st.columns(2)
+            for name, col in zip(["Bitcoin", "Ethereum"], [col1, col2]):
+                with col:
+                    st.caption(f"{name} holdout errors")
+                    st.dataframe(backtests[name].sort_values("MAPE (%)").style.format("{:.2f}"))
+
+    # =================================================
+    # Monte Carlo Probability Cone & Tail Risk
+    # =================================================
+    st.subheader(f"Monte Carlo Probability Cone ({FORECAST_DAYS} Bars)")
+
+    log_returns = pd.concat(
+        [btc[("log_returns", "")], eth[("log_returns", "")]],
+        axis=1,
+        keys=["Bitcoin", "Ethereum"]
+    ).dropna()
+
+    simulation = cached_simulation(log_returns, RISK_PATHS, FORECAST_DAYS)
+
+    col1, col2 = st.columns(2)
+
+    for (name, price), col in zip([("Bitcoin", btc_price), ("Ethereum", eth_price)], [col1, col2]):
+        cone = probability_cone(simulation, name, start_price=price.iloc[-1])
+        charts.append((col.empty(), Chart(
+            cone_chart, price, cone, title=f"{name} Probability Cone"
+        )))
+
+    st.caption(
+        f"{RISK_PATHS:,} block-bootstrap paths of historical log returns "
+        "(Portfolio = 50/50 buy-and-hold). Losses are positive; drawdowns negative."
+    )
+    st.dataframe(risk_summary(simulation).style.format("{:.2%}"))
 
        # =========================================================
        # Forecasting: Executive Summary
@@ -223,3 +334,7 @@ def render():
 """
     )
 
+    draw_charts(charts)
+
+    if pending:
+        poll_jobs()
@@ -0,0 +1,396 @@
+# =========================================================
+# indicators.py
+# Technical indicator library (no Streamlit)
+#
+# Every kernel works on wide T x N arrays (one column per symbol), so a
+# whole multi-asset panel is one call. Recursive indicators (EMA / Wilder
+# smoothing) run through scipy's lfilter along time, or a numba kernel
+# when numba is installed; window indicators use strided views.
+#
+# Each indicator takes an optional `state` and returns (outputs, state):
+# feeding only new bars with the previous state continues the series
+# exactly, which is how the live and screening paths stay O(new bars).
+# =========================================================
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from util.metrics import instrument
+
+try:
+    from numba import njit
+except ImportError:  # optional accelerator
+    njit = None
+
+
+# -------------------------------------------------
+# Core kernels
+# -------------------------------------------------
+def _ema_loop(x, alpha, prev, out):
+    """
+    NaN-aware EMA along axis 0: NaN inputs give NaN outputs and leave
+    the running value untouched; the first valid input seeds it.
+    """
+    for j in range(x.shape[1]):
+        p = prev[j]
+        for t in range(x.shape[0]):
+            v = x[t, j]
+            if v != v:
+                out[t, j] = np.nan
+                continue
+            p = v if p != p else alpha * v + (1 - alpha) * p
+            out[t, j] = p
+        prev[j] = p
+
+
+if njit is not None:
+    _ema_loop = njit(cache=True)(_ema_loop)
+
+
+def _ema_vectorized(x, alpha, prev, out):
+    """
+    Pure NumPy/SciPy path. Leading NaNs (symbols listed later, warm-up
+    rows) are handled exactly; interior gaps fall back to a time loop
+    vectorized across symbols.
+    """
+    t, n = x.shape
+    if t == 0:
+        return
+
+    finite = np.isfinite(x)
+    has = finite.any(axis=0)
+    first = np.where(has, finite.argmax(axis=0), t)
+    leading = np.arange(t)[:, None] < first
+
+    if not (finite | leading).all():
+        for i in range(t):
+            xi = x[i]
+            valid = ~np.isnan(xi)
+            prev[:] = np.where(valid, np.where(np.isnan(prev), xi, alpha * xi + (1 - alpha) * prev), prev)
+            out[i] = np.where(valid, prev, np.nan)
+        return
+
+    seed = prev.copy()
+    fresh = np.isnan(seed) & has
+    seed[fresh] = x[first[fresh], np.flatnonzero(fresh)]
+
+    filled = np.where(leading, seed, x)
+    out[:] = lfilter([alpha], [1, alpha - 1], filled, axis=0, zi=((1 - alpha) * seed)[None, :])[0]
+    out[leading] = np.nan
+    prev[:] = np.where(has, out[-1], prev)
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=float)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def ema(x, span=None, alpha=None, state=None):
+    """
+    Exponential moving average (pandas ewm(adjust=False) recursion).
+    Returns (values, state) where state is the last value per column.
+    """
+    x = _as_2d(x)
+    alpha = alpha if alpha is not None else 2 / (span + 1)
+    prev = np.full(x.shape[1], np.nan) if state is None else np.array(state, dtype=float)
+    out = np.empty_like(x)
+
+    if njit is not None:
+        _ema_loop(np.ascontiguousarray(x), alpha, prev, out)
+    else:
+        _ema_vectorized(x, alpha, prev, out)
+    return out, prev
+
+
+def wilder(x, window, state=None):
+    """
+    Wilder's smoothing (EMA with alpha = 1 / window).
+    """
+    return ema(x, alpha=1 / window, state=state)
+
+
+def _with_tail(x, tail):
+    return x if tail is None else np.vstack([tail, x])
+
+
+def rolling(x, window, func, tail=None):
+    """
+    Rolling reduction over the last `window` rows (NaN until full).
+    `tail` holds the previous window - 1 input rows when streaming.
+    Returns (values for the rows of x, new tail).
+    """
+    x = _as_2d(x)
+    full = _with_tail(x, tail)
+    out = np.full(full.shape, np.nan)
+
+    if len(full) >= window:
+        out[window - 1:] = func(sliding_window_view(full, window, axis=0), axis=-1)
+    return out[len(full) - len(x):], full[-(window - 1):] if window > 1 else full[:0]
+
+
+def _shifted(x, prev):
+    """
+    x shifted down one row, with `prev` (or NaN) in the first row.
+    """
+    out = np.empty_like(x)
+    out[1:] = x[:-1]
+    out[0] = np.nan if prev is None else prev
+    return out
+
+
+# -------------------------------------------------
+# Indicators: (outputs dict, state)
+# -------------------------------------------------
+def ema_family(close, span=20, state=None):
+    """
+    EMA, DEMA and TEMA of the same span.
+    """
+    state = state or {}
+    e1, s1 = ema(close, span, state=state.get("e1"))
+    e2, s2 = ema(e1, span, state=state.get("e2"))
+    e3, s3 = ema(e2, span, state=state.get("e3"))
+    return {
+        f"EMA_{span}": e1,
+        f"DEMA_{span}": 2 * e1 - e2,
+        f"TEMA_{span}": 3 * e1 - 3 * e2 + e3,
+    }, {"e1": s1, "e2": s2, "e3": s3}
+
+
+def rsi(close, window=14, state=None):
+    state = state or {}
+    close = _as_2d(close)
+    delta = close - _shifted(close, state.get("prev_close"))
+
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0))
+    avg_gain, g = wilder(gain, window, state.get("gain"))
+    avg_loss, l = wilder(loss, window, state.get("loss"))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    value[np.isnan(avg_gain)] = np.nan
+
+    return {f"RSI_{window}": value}, {"prev_close": close[-1], "gain": g, "loss": l}
+
+
+def macd(close, fast=12, slow=26, signal=9, state=None):
+    state = state or {}
+    fast_ema, f = ema(close, fast, state=state.get("fast"))
+    slow_ema, s = ema(close, slow, state=state.get("slow"))
+    line = fast_ema - slow_ema
+    sig, g = ema(line, signal, state=state.get("signal"))
+    return {"MACD": line, "MACD_Signal": sig, "MACD_Hist": line - sig}, {
+        "fast": f, "slow": s, "signal": g
+    }
+
+
+def true_range(high, low, close, prev_close=None):
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    pc = _shifted(close, prev_close)
+    return np.fmax(high - low, np.fmax(np.abs(high - pc), np.abs(low - pc)))
+
+
+def atr(high, low, close, window=14, state=None):
+    state = state or {}
+    tr = true_range(high, low, close, state.get("prev_close"))
+    value, s = wilder(tr, window, state.get("atr"))
+    return {f"ATR_{window}": value}, {"prev_close": _as_2d(close)[-1], "atr": s}
+
+
+def stochastic(high, low, close, k=14, d=3, state=None):
+    state = state or {}
+    hh, high_tail = rolling(high, k, np.max, state.get("high"))
+    ll, low_tail = rolling(low, k, np.min, state.get("low"))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_k = 100 * (_as_2d(close) - ll) / (hh - ll)
+    pct_d, k_tail = rolling(pct_k, d, np.mean, state.get("k"))
+
+    return {"Stoch_K": pct_k, "Stoch_D": pct_d}, {"high": high_tail, "low": low_tail, "k": k_tail}
+
+
+def obv(close, volume, state=None):
+    state = state or {}
+    close, volume = _as_2d(close), _as_2d(volume)
+    direction = np.sign(close - _shifted(close, state.get("prev_close")))
+    flow = np.nan_to_num(direction * volume)
+
+    start = state.get("obv", np.zeros(close.shape[1]))
+    value = start + np.cumsum(flow, axis=0)
+    return {"OBV": value}, {"prev_close": close[-1], "obv": value[-1]}
+
+
+def vwap(high, low, close, volume, window=20, state=None):
+    """
+    Rolling volume-weighted average price over `window` bars (crypto has
+    no session open to anchor to).
+    """
+    state = state or {}
+    typical = (_as_2d(high) + _as_2d(low) + _as_2d(close)) / 3
+    volume = _as_2d(volume)
+
+    pv, pv_tail = rolling(typical * volume, window, np.sum, state.get("pv"))
+    vol, vol_tail = rolling(volume, window, np.sum, state.get("volume"))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = pv / vol
+    return {f"VWAP_{window}": value}, {"pv": pv_tail, "volume": vol_tail}
+
+
+def keltner(high, low, close, window=20, atr_window=10, mult=2.0, state=None):
+    state = state or {}
+    mid, m = ema(close, window, state=state.get("mid"))
+    out, a = atr(high, low, close, atr_window, state.get("atr"))
+    band = mult * out[f"ATR_{atr_window}"]
+    return {"Keltner_Mid": mid, "Keltner_Upper": mid + band, "Keltner_Lower": mid - band}, {
+        "mid": m, "atr": a
+    }
+
+
+def bollinger(close, window=20, num_std=2.0, state=None):
+    state = state or {}
+    mean, tail = rolling(close, window, np.mean, state.get("close"))
+    std, _ = rolling(close, window, lambda v, axis: np.std(v, axis=axis, ddof=1), state.get("close"))
+    return {"BB_Mid": mean, "BB_Upper": mean + num_std * std, "BB_Lower": mean - num_std * std}, {
+        "close": tail
+    }
+
+
+def adx(high, low, close, window=14, state=None):
+    """
+    Average Directional Index with +DI / -DI (Wilder).
+    """
+    state = state or {}
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+
+    up = high - _shifted(high, state.get("prev_high"))
+    down = _shifted(low, state.get("prev_low")) - low
+    nan = np.isnan(up) | np.isnan(down)
+
+    plus_dm = np.where(nan, np.nan, np.where((up > down) & (up > 0), up, 0.0))
+    minus_dm = np.where(nan, np.nan, np.where((down > up) & (down > 0), down, 0.0))
+    tr = np.where(nan, np.nan, true_range(high, low, close, state.get("prev_close")))
+
+    s_tr, a = wilder(tr, window, state.get("tr"))
+    s_plus, p = wilder(plus_dm, window, state.get("plus"))
+    s_minus, m = wilder(minus_dm, window, state.get("minus"))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * s_plus / s_tr
+        minus_di = 100 * s_minus / s_tr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    value, x = wilder(dx, window, state.get("adx"))
+
+    return {f"ADX_{window}": value, "Plus_DI": plus_di, "Minus_DI": minus_di}, {
+        "prev_high": high[-1], "prev_low": low[-1], "prev_close": close[-1],
+        "tr": a, "plus": p, "minus": m, "adx": x,
+    }
+
+
+# name -> (function, input columns)
+INDICATORS = {
+    "ema": (ema_family, ("Close",)),
+    "rsi": (rsi, ("Close",)),
+    "macd": (macd, ("Close",)),
+    "atr": (atr, ("High", "Low", "Close")),
+    "stochastic": (stochastic, ("High", "Low", "Close")),
+    "obv": (obv, ("Close", "Volume")),
+    "vwap": (vwap, ("High", "Low", "Close", "Volume")),
+    "keltner": (keltner, ("High", "Low", "Close")),
+    "bollinger": (bollinger, ("Close",)),
+    "adx": (adx, ("High", "Low", "Close")),
+}
+
+DEFAULT_INDICATORS = {
+    "ema": {"span": 20},
+    "rsi": {"window": 14},
+    "macd": {},
+    "atr": {"window": 14},
+    "stochastic": {},
+    "obv": {},
+    "vwap": {"window": 20},
+    "keltner": {},
+    "bollinger": {},
+    "adx": {"window": 14},
+}
+
+
+# -------------------------------------------------
+# Panel layout
+# -------------------------------------------------
+def to_wide(panel, columns=("Open", "High", "Low", "Close", "Volume")):
+    """
+    Long panel (Symbol, Date, OHLCV) -> {column: Date x Symbol DataFrame}.
+    """
+    wide = panel.pivot_table(index="Date", columns="Symbol", values=list(columns),
+                             aggfunc="last", observed=True, dropna=False)
+    return {c: wide[c] for c in columns}
+
+
+def frame_to_wide(df, symbol="value"):
+    """
+    Single-symbol OHLCV frame -> wide dict with one column.
+    """
+    return {c: df[[c]].set_axis([symbol], axis=1) for c in df.columns if c in
+            ("Open", "High", "Low", "Close", "Volume")}
+
+
+class IndicatorEngine:
+    """
+    Computes a set of indicators over a wide panel and keeps each
+    indicator's state so later bars can be added incrementally.
+    """
+
+    def __init__(self, indicators=None):
+        self.indicators = dict(DEFAULT_INDICATORS if indicators is None else indicators)
+        self.states = {}
+        self.columns = None
+
+    def _run(self, wide, states):
+        ref = wide["Close"]
+        if self.columns is None:
+            self.columns = list(ref.columns)
+        elif list(ref.columns) != self.columns:
+            raise ValueError("symbol columns changed; build a new IndicatorEngine")
+
+        outputs = {}
+        for name, params in self.indicators.items():
+            func, inputs = INDICATORS[name]
+            arrays = [wide[c].to_numpy(dtype=float) for c in inputs]
+            values, self.states[name] = func(*arrays, state=states.get(name), **params)
+            outputs.update({
+                k: pd.DataFrame(v, index=ref.index, columns=ref.columns)
+                for k, v in values.items()
+            })
+        return outputs
+
+    @instrument("indicators.compute")
+    def compute(self, wide):
+        """
+        Full computation from scratch: {output name: Date x Symbol frame}.
+        """
+        self.states = {}
+        return self._run(wide, {})
+
+    @instrument("indicators.update")
+    def update(self, wide):
+        """
+        Continue every indicator over new bars only (same symbol columns).
+        """
+        return self._run(wide, dict(self.states))
+
+    def latest(self, outputs):
+        """
+        Last row of every output as a Symbol x indicator frame (a screen).
+        """
+        return pd.DataFrame({k: v.iloc[-1] for k, v in outputs.items()})
+
+
+def compute_indicators(df, indicators=None):
+    """
+    Indicator columns for one symbol's OHLCV frame (same index as df).
+    """
+    outputs = IndicatorEngine(indicators).compute(frame_to_wide(df))
+    return pd.DataFrame({k: v.iloc[:, 0] for k, v in outputs.items()}, index=df.index)
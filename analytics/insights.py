@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from data.data_preprocessing import preprocess_data
+from analytics.compute import correlation_matrix, load_regimes, load_symbol, results_frame
+from analytics.regimes import regime_spans, regime_summary
+from util.charts import regime_chart
+from util.metrics import instrument
+
+# Price fields this page uses (see results_frame)
+FIELDS = ["Returns"]
 
 
 # -------------------------------------------------
@@ -14,27 +19,23 @@ def has_enough_data(df, min_rows=50):
     return df is not None and not df.empty and len(df) >= min_rows
 
 
-def calculate_kpis(df):
-    roi = (df["Close"].iloc[-1] / df["Close"].iloc[0] - 1) * 100
-    volatility = df["Returns"].std() * np.sqrt(252) * 100
-
-    cumulative = (1 + df["Returns"]).cumprod()
-    rolling_max = cumulative.cummax()
-    drawdown = (cumulative - rolling_max) / rolling_max
-    max_drawdown = drawdown.min() * 100
-
-    return roi, volatility, max_drawdown
-
-
 # -------------------------------------------------
 # Main render function
 # -------------------------------------------------
+@instrument("render.insights")
 def render():
     st.title("📌 Decision Support & Insights Dashboard")
 
-    # Load data
-    btc = preprocess_data("BTC-USD")
-    eth = preprocess_data("ETH-USD")
+    # Load precomputed results (computed inline if not materialized yet)
+    timeframe = st.session_state.get("timeframe")
+    btc_results = load_symbol("BTC-USD", timeframe=timeframe)
+    eth_results = load_symbol("ETH-USD", timeframe=timeframe)
+
+    btc = results_frame(btc_results, FIELDS)
+    eth = results_frame(eth_results, FIELDS)
+
+    btc_kpi = tuple(btc_results[("kpis", "")].values())
+    eth_kpi = tuple(eth_results[("kpis", "")].values())
 
     # =================================================
     # 23 & 24: Best / Worst Performing Crypto
@@ -42,8 +43,8 @@ def render():
     st.subheader("Best & Worst Performing Crypto")
 
     returns = {
-        "Bitcoin": (btc["Close"].iloc[-1] / btc["Close"].iloc[0] - 1) * 100,
-        "Ethereum": (eth["Close"].iloc[-1] / eth["Close"].iloc[0] - 1) * 100,
+        "Bitcoin": btc_kpi[0],
+        "Ethereum": eth_kpi[0],
     }
 
     perf_df = pd.DataFrame.from_dict(
@@ -63,12 +64,8 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    def plot_heatmap(df, title):
-        monthly = df["Returns"].resample("M").sum().dropna()
-        heatmap_df = monthly.to_frame("Returns")
-        heatmap_df["Year"] = heatmap_df.index.year
-        heatmap_df["Month"] = heatmap_df.index.month
-        pivot = heatmap_df.pivot(index="Year", columns="Month", values="Returns")
+    def plot_heatmap(results, title):
+        pivot = results[("monthly_returns", "M")]
 
         fig, ax = plt.subplots()
         sns.heatmap(pivot, cmap="RdYlGn", center=0, ax=ax)
@@ -77,11 +74,11 @@ def render():
 
     with col1:
         if has_enough_data(btc):
-            plot_heatmap(btc, "Bitcoin Monthly Returns")
+            plot_heatmap(btc_results, "Bitcoin Monthly Returns")
 
     with col2:
         if has_enough_data(eth):
-            plot_heatmap(eth, "Ethereum Monthly Returns")
+            plot_heatmap(eth_results, "Ethereum Monthly Returns")
 
     # =================================================
     # 26 & 27: MA Crossover + Buy/Sell Signals
@@ -90,9 +87,9 @@ def render():
 
     c1, c2 = st.columns(2)
 
-    for crypto, df, col in [("Bitcoin", btc, c1), ("Ethereum", eth, c2)]:
+    for crypto, results, col in [("Bitcoin", btc_results, c1), ("Ethereum", eth_results, c2)]:
         with col:
-            ma_df = df.dropna(subset=["MA_7", "MA_30"])
+            ma_df = results[("ma_signals", "7/30")]
 
             if has_enough_data(ma_df):
                 fig, ax = plt.subplots()
@@ -100,8 +97,8 @@ def render():
                 ax.plot(ma_df.index, ma_df["MA_7"], label="MA 7")
                 ax.plot(ma_df.index, ma_df["MA_30"], label="MA 30")
 
-                buy = ma_df[ma_df["MA_7"] > ma_df["MA_30"]]
-                sell = ma_df[ma_df["MA_7"] < ma_df["MA_30"]]
+                buy = ma_df[ma_df["Signal"] > 0]
+                sell = ma_df[ma_df["Signal"] < 0]
 
                 ax.scatter(buy.index, buy["Close"], marker="^", label="Buy")
                 ax.scatter(sell.index, sell["Close"], marker="v", label="Sell")
@@ -110,14 +107,39 @@ def render():
                 ax.legend()
                 st.pyplot(fig)
 
+    # =================================================
+    # Technical Indicators: RSI & MACD
+    # =================================================
+    st.subheader("Momentum Indicators (RSI 14 & MACD)")
+
+    c1, c2 = st.columns(2)
+
+    for crypto, results, col in [("Bitcoin", btc_results, c1), ("Ethereum", eth_results, c2)]:
+        with col:
+            ind = results.get(("indicators", ""))
+
+            if has_enough_data(ind):
+                ind = ind.iloc[-250:]
+                fig, (ax1, ax2) = plt.subplots(2, 1, sharex=True)
+
+                ax1.plot(ind.index, ind["RSI_14"])
+                ax1.axhline(70, linestyle="--", color="red")
+                ax1.axhline(30, linestyle="--", color="green")
+                ax1.set_ylabel("RSI")
+
+                ax2.plot(ind.index, ind["MACD"], label="MACD")
+                ax2.plot(ind.index, ind["MACD_Signal"], label="Signal")
+                ax2.bar(ind.index, ind["MACD_Hist"], color="gray", alpha=0.5)
+                ax2.legend()
+
+                ax1.set_title(f"{crypto} RSI & MACD")
+                st.pyplot(fig)
+
     # =================================================
     # 28: KPI Cards (BTC vs ETH)
     # =================================================
     st.subheader("Key Performance Indicators")
 
-    btc_kpi = calculate_kpis(btc)
-    eth_kpi = calculate_kpis(eth)
-
     k1, k2 = st.columns(2)
 
     with k1:
@@ -137,18 +159,45 @@ def render():
     # =================================================
     st.subheader("BTC vs ETH Correlation Matrix")
 
-    merged = pd.concat(
-        [btc["Returns"], eth["Returns"]],
-        axis=1,
-        keys=["BTC", "ETH"]
-    ).dropna()
+    corr, overlap = correlation_matrix({"BTC": btc, "ETH": eth})
 
-    if has_enough_data(merged):
+    if overlap >= 50:
         fig, ax = plt.subplots()
-        sns.heatmap(merged.corr(), annot=True, cmap="coolwarm", ax=ax)
+        sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
         ax.set_title("Return Correlation")
         st.pyplot(fig)
 
+    # =================================================
+    # Market Regimes & Changepoints
+    # =================================================
+    st.subheader("Market Regimes & Changepoints")
+
+    regimes = {}
+    c1, c2 = st.columns(2)
+
+    for crypto, symbol, results, col in [("Bitcoin", "BTC-USD", btc_results, c1),
+                                         ("Ethereum", "ETH-USD", eth_results, c2)]:
+        with col:
+            frame = load_regimes(symbol, timeframe, results)
+            summary = regimes[crypto] = regime_summary(frame)
+
+            if summary["regime"] is None:
+                st.info(f"Not enough {crypto} history for a regime model yet.")
+                continue
+
+            m1, m2 = st.columns(2)
+            m1.metric("Current Regime", summary["regime"], f"since {summary['since']:%Y-%m-%d}",
+                      delta_color="off")
+            m2.metric("Confidence", f"{summary['confidence']:.0%}")
+
+            recent = frame.iloc[-250:]
+            changepoints = tuple(recent.index[recent["Changepoint"].to_numpy(dtype=bool)])
+            fig = regime_chart(results[("close", "")].iloc[-250:], regime_spans(recent), changepoints,
+                               title=f"{crypto} Regimes (last 250 bars)")
+            st.pyplot(fig)
+            st.caption(f"{summary['changepoints']} changepoints over the period; "
+                       + ", ".join(f"{share:.0%} {label}" for label, share in summary["share"].items()))
+
     # =================================================
     # 30: Executive Summary
     # =================================================
@@ -156,11 +205,16 @@ def render():
 
     better = "Bitcoin" if btc_kpi[0] > eth_kpi[0] else "Ethereum"
     riskier = "Ethereum" if eth_kpi[1] > btc_kpi[1] else "Bitcoin"
+    current = ", ".join(
+        f"**{crypto}** {s['regime']} since {s['since']:%Y-%m-%d}"
+        for crypto, s in regimes.items() if s["regime"] is not None
+    )
 
     st.success(
         f"""
         • **{better}** delivered higher overall returns in the selected period.  
         • **{riskier}** exhibits higher volatility and risk exposure.  
+        • Current market regimes: {current or "not enough history yet"}.  
         • Trend-following signals are visible for both assets.  
         • High correlation indicates limited diversification within crypto portfolios.
         """
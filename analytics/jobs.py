@@ -0,0 +1,294 @@
+# =========================================================
+# jobs.py
+# Background jobs for long-running analytics (forecast fits,
+# backtests), executed by worker processes from the SQLite queue in
+# data/job_store.py
+#
+# Pages submit a job and poll its progress instead of blocking the
+# script; navigating away leaves the job running and its result cached
+# for the next visit. Identical requests share one job.
+#
+# Usage (from the repository root):
+#   python -m analytics.jobs --workers 2
+#   python -m analytics.jobs --status
+# =========================================================
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+from data import job_store
+from util.metrics import track
+
+JOBS = {}
+
+
+def register_job(kind):
+    """
+    Register `func(progress, **params)` as job kind `kind`.
+    """
+    def decorator(func):
+        JOBS[kind] = func
+        return func
+    return decorator
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_key(kind, params):
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+# -------------------------------------------------
+# Client side (pages)
+# -------------------------------------------------
+def submit(kind, params, subscriber=None, db_path=None):
+    """
+    Queue `kind(**params)` (or join the identical in-flight / cached
+    job) and return the job id.
+    """
+    from util.config import JOBS_RESULT_TTL
+
+    if kind not in JOBS:
+        raise ValueError(f"unknown job kind: {kind}")
+    return job_store.submit_job(kind, params, job_key(kind, params), subscriber=subscriber,
+                                result_ttl=JOBS_RESULT_TTL, db_path=db_path)
+
+
+def _signature(symbol):
+    # Part of every job key, so cached results expire when the price file changes
+    from data.data_fetcher import raw_data_signature
+
+    signature = raw_data_signature(symbol)
+    return list(signature) if signature else None
+
+
+def forecast_params(symbol, timeframe=None, steps=30, prophet=False, models=()):
+    """
+    Parameters of a "forecast" job, including the symbol's tuned Prophet
+    parameters (a new tuning run means a new fit).
+    """
+    from data.tuning_store import get_best_params
+
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "steps": int(steps),
+        "prophet": bool(prophet),
+        "models": list(models),
+        "prophet_params": get_best_params(symbol, timeframe) if prophet else {},
+        "signature": _signature(symbol),
+    }
+
+
+def backtest_params(symbol, timeframe=None, names=(), steps=30, data_as_of=None):
+    """
+    Parameters of a "backtest" job; with `data_as_of` the backtest sees
+    only the raw data version committed by then (data/versions.py).
+    """
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "names": list(names),
+        "steps": int(steps),
+        "data_as_of": str(data_as_of) if data_as_of is not None else None,
+        "signature": _signature(symbol),
+    }
+
+
+# -------------------------------------------------
+# Job kinds
+# -------------------------------------------------
+@register_job("forecast")
+def forecast_job(progress, symbol, timeframe, steps, prophet, models, prophet_params=None,
+                 signature=None):
+    """
+    Decomposition and model forecasts for one symbol, skipping whatever
+    the published results snapshot already holds.
+    """
+    from analytics.compute import compute_forecasts, load_symbol
+
+    progress(0.0, "loading prices")
+    results = load_symbol(symbol, timeframe=timeframe)
+    price = results[("close", "")].dropna() if results else pd.Series(dtype=float)
+    if len(price) < 150:
+        raise ValueError(f"{symbol}: not enough data for forecasting ({len(price)} bars)")
+
+    return compute_forecasts(price, steps, prophet, existing=results, models=models,
+                             progress=progress, prophet_params=prophet_params)
+
+
+@register_job("backtest")
+def backtest_job(progress, symbol, timeframe, names, steps, data_as_of=None, signature=None):
+    """
+    Holdout errors of `names` on the last `steps` bars of one symbol.
+    """
+    from analytics.compute import load_symbol
+    from analytics.models import backtest
+    from data.data_preprocessing import preprocess_data
+    from data.versions import resolve_version
+
+    progress(0.0, "loading prices")
+    if data_as_of is not None:
+        version = resolve_version(symbol, as_of=data_as_of)
+        price = preprocess_data(symbol, timeframe, version=version)["Close"].dropna()
+    else:
+        price = load_symbol(symbol, timeframe=timeframe)[("close", "")].dropna()
+    errors, _ = backtest(price, names, steps)
+    return errors
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+def worker_id():
+    """
+    Claim owner of the calling thread (pages run inline jobs from several
+    threads of one process).
+    """
+    return f"{socket.gethostname()}:{multiprocessing.current_process().pid}:{threading.get_ident()}"
+
+
+def _beat(job_id, worker, every, stop, db_path=None):
+    while not stop.wait(every):
+        if not job_store.heartbeat(job_id, worker, db_path=db_path):
+            return
+
+
+def run_job(job_id, kind, params, worker, db_path=None):
+    """
+    Execute one job `worker` claimed and record its outcome. A side
+    thread keeps the heartbeat fresh while a single long fit runs
+    between progress reports, so the job isn't requeued as stale. If it
+    was requeued anyway, the result is dropped ("lost"): the job belongs
+    to whoever claimed it next.
+    """
+    from util.config import JOBS_STALE_SECONDS
+
+    def progress(fraction, message=""):
+        if job_store.report_progress(job_id, worker, fraction, message, db_path=db_path):
+            raise JobCancelled()
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_beat,
+                            args=(job_id, worker, max(JOBS_STALE_SECONDS / 3, 1), stop),
+                            kwargs={"db_path": db_path}, daemon=True)
+    beat.start()
+
+    with track(f"job.{kind}"):
+        try:
+            result = JOBS[kind](progress, **params)
+            status, outcome = "done", {"result": result}
+        except JobCancelled:
+            status, outcome = "cancelled", {}
+        except Exception as exc:
+            traceback.print_exc(file=sys.stderr)
+            status, outcome = "failed", {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            stop.set()
+            beat.join()
+
+    if not job_store.finish_job(job_id, worker, status, db_path=db_path, **outcome):
+        return "lost"
+    return status
+
+
+def run_worker(poll=0.5, stale_after=900, max_jobs=None, db_path=None):
+    """
+    Claim and run queued jobs until `max_jobs` have run (forever when
+    None). Jobs of workers that stopped reporting are requeued.
+    """
+    worker = worker_id()
+    done = 0
+
+    while max_jobs is None or done < max_jobs:
+        job_store.requeue_stale(stale_after, db_path=db_path)
+        claimed = job_store.claim_job(worker, kinds=list(JOBS), db_path=db_path)
+        if claimed is None:
+            if max_jobs is not None:
+                return done
+            time.sleep(poll)
+            continue
+
+        job_id, kind, params = claimed
+        status = run_job(job_id, kind, params, worker, db_path=db_path)
+        print(f"[jobs] {worker} job {job_id} ({kind}) {status}", flush=True)
+        done += 1
+    return done
+
+
+def run_inline(job_id, db_path=None):
+    """
+    Run a queued job in the calling process (no worker pool). Returns
+    False if another worker already claimed it.
+    """
+    worker = worker_id()
+    claimed = job_store.claim_job(worker, job_id=job_id, db_path=db_path)
+    if claimed is None:
+        return False
+    run_job(*claimed, worker, db_path=db_path)
+    return True
+
+
+def start_workers(n, db_path=None):
+    """
+    Start `n` daemon worker processes (spawned, so they are safe to
+    launch from the Streamlit server). Returns the processes.
+    """
+    from util.config import JOBS_STALE_SECONDS
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(n):
+        p = ctx.Process(target=run_worker,
+                        kwargs={"stale_after": JOBS_STALE_SECONDS, "db_path": db_path},
+                        daemon=True)
+        p.start()
+        processes.append(p)
+    return processes
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from util.config import JOBS_RESULT_TTL, JOBS_STALE_SECONDS
+
+    parser = argparse.ArgumentParser(description="Run or inspect the analytics job queue.")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to run")
+    parser.add_argument("--status", action="store_true", help="print recent jobs and exit")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete finished jobs older than the result TTL and exit")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        for job in job_store.list_jobs():
+            print(f"{job['id']:>6} {job['kind']:<10} {job['status']:<10} "
+                  f"{job['progress']:>4.0%} {job['subscribers']:>3} waiting  {job['message']}")
+        return 0
+
+    if args.prune:
+        print(f"[jobs] pruned {job_store.prune_jobs(JOBS_RESULT_TTL)} jobs")
+        return 0
+
+    if args.workers <= 1:
+        run_worker(stale_after=JOBS_STALE_SECONDS)
+    else:
+        for p in start_workers(args.workers):
+            p.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
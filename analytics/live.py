@@ -0,0 +1,112 @@
+import time
+
+import streamlit as st
+
+from analytics.alert_engine import AlertEngine
+from analytics.regimes import RegimeTracker, regime_summary
+from auth.database import get_alert_events
+from data.streaming import SOURCES, StreamEngine
+from util.config import (
+    CRYPTO_LIST,
+    REGIME_CHANGEPOINT,
+    REGIME_STATES,
+    STREAM_BUFFER_SIZE,
+    STREAM_INTERVAL_SECONDS,
+    STREAM_REFRESH_SECONDS,
+    STREAM_SOURCE,
+)
+from util.metrics import instrument
+
+
+# Replay emits the cached daily bars; the synthetic feed emits 1m bars
+STREAM_TIMEFRAME = "1m" if STREAM_SOURCE == "synthetic" else "1d"
+
+
+# -------------------------------------------------
+# Shared stream, alert engine & regime tracker (one per server process)
+# -------------------------------------------------
+@st.cache_resource
+def get_alert_engine():
+    return AlertEngine.from_database(list(CRYPTO_LIST.values()), STREAM_TIMEFRAME)
+
+
+@st.cache_resource
+def get_regime_tracker():
+    # Fitted on the first streamed bars, then advanced bar by bar
+    return RegimeTracker(list(CRYPTO_LIST.values()), REGIME_STATES, REGIME_CHANGEPOINT,
+                         fit_bars=STREAM_BUFFER_SIZE, min_bars=min(250, STREAM_BUFFER_SIZE))
+
+
+@st.cache_resource
+def get_stream():
+    engine = StreamEngine(capacity=STREAM_BUFFER_SIZE, timeframe=STREAM_TIMEFRAME)
+    symbols = list(CRYPTO_LIST.values())
+    engine.add_listener(get_alert_engine().on_bar)
+    engine.add_listener(get_regime_tracker().on_bar)
+    engine.start(SOURCES[STREAM_SOURCE](symbols, interval=STREAM_INTERVAL_SECONDS))
+    return engine
+
+
+# -------------------------------------------------
+# Main Render Function
+# -------------------------------------------------
+@instrument("render.live")
+def render():
+    st.title("🔴 Live Prices (Streaming)")
+
+    engine = get_stream()
+    tracker = get_regime_tracker()
+
+    st.caption(
+        f"Source: **{STREAM_SOURCE}** · buffer {STREAM_BUFFER_SIZE} bars/symbol · "
+        f"{engine.bars_seen:,} bars received · "
+        f"{'running' if engine.running else 'stopped'}"
+    )
+
+    auto = st.toggle("Auto-refresh", value=True)
+
+    cols = st.columns(len(CRYPTO_LIST))
+
+    for (name, symbol), col in zip(CRYPTO_LIST.items(), cols):
+        with col:
+            st.subheader(name)
+            frame, kpis = engine.snapshot(symbol)
+
+            if frame is None or frame.empty:
+                st.info("Waiting for first bar...")
+                continue
+
+            last = frame.iloc[-1]
+
+            m1, m2 = st.columns(2)
+            m1.metric("Last Price", f"{last['Close']:,.2f}", f"{last['Returns'] * 100:.2f}%")
+            m2.metric("30-bar Volatility", f"{last['Volatility']:.4f}")
+
+            k1, k2, k3 = st.columns(3)
+            k1.metric("ROI (%)", f"{kpis['roi']:.2f}")
+            k2.metric("Volatility (%)", f"{kpis['volatility']:.2f}")
+            k3.metric("Max Drawdown (%)", f"{kpis['max_drawdown']:.2f}")
+
+            regime = regime_summary(tracker.frame(symbol))
+            if regime["regime"] is None:
+                seen = int(tracker.seen[tracker.symbols.index(symbol)])
+                st.caption(f"Regime: warming up ({seen}/{tracker.min_bars} bars)")
+            else:
+                st.caption(
+                    f"Regime: **{regime['regime']}** since {regime['since']} "
+                    f"({regime['confidence']:.0%} confidence) · last changepoint: "
+                    f"{regime['last_changepoint'] or 'none'}"
+                )
+
+            st.line_chart(frame[["Close", "MA_7", "MA_30"]])
+            st.caption(f"Last bar: {frame.index[-1]}")
+
+    alerts = get_alert_events(st.session_state.get("username"), limit=5)
+    if alerts:
+        st.subheader("🔔 Latest Alerts")
+        for alert in alerts:
+            st.write(f"• **{alert['bar_time']}** — {alert['message']}")
+
+    if auto:
+        time.sleep(STREAM_REFRESH_SECONDS)
+        st.rerun()
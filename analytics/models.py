@@ -0,0 +1,434 @@
+# =========================================================
+# models.py
+# Forecasting model registry (no Streamlit)
+#
+# Every model has the same interface:
+#   model = get_model("theta").fit(series)
+#   model.predict(steps)            -> Series of point forecasts
+#   model.interval(steps, level)    -> DataFrame with Lower / Upper
+#   model.forecast(steps, level)    -> DataFrame Forecast / Lower / Upper
+#
+# Cheap models (naive baselines, ETS, theta, lag-feature GBR) fit in
+# milliseconds and can cover the whole universe; ARIMA order search
+# runs its candidate fits in a process pool; Prophet is kept for the
+# assets that need it.
+# =========================================================
+
+import itertools
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from data.bars import PANDAS_FREQ, infer_timeframe
+from util.metrics import instrument
+
+MODELS = {}
+
+
+def register_model(name):
+    """
+    Class decorator adding a ForecastModel subclass to the registry.
+    """
+    def decorator(cls):
+        cls.name = name
+        MODELS[name] = cls
+        return cls
+    return decorator
+
+
+def get_model(name, **params):
+    if name not in MODELS:
+        raise ValueError(f"unknown forecasting model {name!r}; available: {sorted(MODELS)}")
+    return MODELS[name](**params)
+
+
+def future_index(series, steps):
+    """
+    Index for the `steps` bars after the end of `series` (same spacing).
+    """
+    index = series.index
+    if isinstance(index, pd.DatetimeIndex) and len(index) > 1:
+        step = index[-1] - index[-2]
+        return pd.date_range(index[-1] + step, periods=steps, freq=step, name=index.name)
+    return pd.RangeIndex(len(series), len(series) + steps)
+
+
+# -------------------------------------------------
+# Base class
+# -------------------------------------------------
+class ForecastModel:
+    """
+    Subclasses implement _fit(values) and _predict(steps, level) ->
+    (mean, lower, upper) NumPy arrays; the base class handles indexes.
+    """
+
+    name = None
+
+    def fit(self, series):
+        self.series_ = series.dropna()
+        self._fit(self.series_.to_numpy(dtype=float))
+        return self
+
+    def predict(self, steps):
+        return self.forecast(steps)["Forecast"]
+
+    def interval(self, steps, level=0.95):
+        return self.forecast(steps, level)[["Lower", "Upper"]]
+
+    def forecast(self, steps, level=0.95):
+        mean, lower, upper = self._predict(steps, level)
+        return pd.DataFrame(
+            {"Forecast": mean, "Lower": lower, "Upper": upper},
+            index=future_index(self.series_, steps)
+        )
+
+    def _fit(self, y):
+        raise NotImplementedError
+
+    def _predict(self, steps, level):
+        raise NotImplementedError
+
+
+def _random_walk_band(mean, sigma, level):
+    """
+    Symmetric band whose width grows with sqrt(horizon).
+    """
+    z = norm.ppf(0.5 + level / 2)
+    width = z * sigma * np.sqrt(np.arange(1, len(mean) + 1))
+    return mean, mean - width, mean + width
+
+
+# -------------------------------------------------
+# Baselines
+# -------------------------------------------------
+@register_model("naive")
+class NaiveModel(ForecastModel):
+    """
+    Last observation carried forward (random walk).
+    """
+
+    def _fit(self, y):
+        self.last_ = y[-1]
+        self.sigma_ = np.std(np.diff(y), ddof=1)
+
+    def _predict(self, steps, level):
+        return _random_walk_band(np.full(steps, self.last_), self.sigma_, level)
+
+
+@register_model("drift")
+class DriftModel(NaiveModel):
+    """
+    Random walk with drift (straight line through the first and last
+    observations).
+    """
+
+    def _fit(self, y):
+        super()._fit(y)
+        self.drift_ = (y[-1] - y[0]) / max(len(y) - 1, 1)
+
+    def _predict(self, steps, level):
+        mean = self.last_ + self.drift_ * np.arange(1, steps + 1)
+        return _random_walk_band(mean, self.sigma_, level)
+
+
+@register_model("seasonal_naive")
+class SeasonalNaiveModel(ForecastModel):
+    """
+    Repeat the last full season (default: weekly on daily bars).
+    """
+
+    def __init__(self, season=7):
+        self.season = season
+
+    def _fit(self, y):
+        self.last_season_ = y[-self.season:]
+        self.sigma_ = np.std(y[self.season:] - y[:-self.season], ddof=1)
+
+    def _predict(self, steps, level):
+        mean = np.resize(self.last_season_, steps)
+        z = norm.ppf(0.5 + level / 2)
+        seasons = np.arange(steps) // self.season + 1
+        width = z * self.sigma_ * np.sqrt(seasons)
+        return mean, mean - width, mean + width
+
+
+# -------------------------------------------------
+# Exponential smoothing & theta
+# -------------------------------------------------
+@register_model("ets")
+class ETSModel(ForecastModel):
+    """
+    Holt-Winters / ETS with additive errors and a damped additive trend
+    (statsmodels state-space implementation, analytic intervals).
+    """
+
+    def __init__(self, trend="add", damped_trend=True, seasonal=None, seasonal_periods=None):
+        self.params = dict(trend=trend, damped_trend=damped_trend, seasonal=seasonal,
+                           seasonal_periods=seasonal_periods)
+
+    def _fit(self, y):
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel as _ETS
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # RangeIndex Series: get_prediction needs a pandas endog
+            self.result_ = _ETS(pd.Series(y), error="add", **self.params).fit(disp=False)
+
+    def _predict(self, steps, level):
+        n = self.result_.nobs
+        frame = self.result_.get_prediction(start=n, end=n + steps - 1).summary_frame(alpha=1 - level)
+        return frame["mean"].to_numpy(), frame["pi_lower"].to_numpy(), frame["pi_upper"].to_numpy()
+
+
+@register_model("theta")
+class ThetaModel(ForecastModel):
+    """
+    Theta method (Assimakopoulos & Nikolopoulos), with optional
+    deseasonalization when a seasonality test passes.
+    """
+
+    def __init__(self, period=7, deseasonalize=True):
+        self.period = period
+        self.deseasonalize = deseasonalize
+
+    def _fit(self, y):
+        from statsmodels.tsa.forecasting.theta import ThetaModel as _Theta
+
+        deseasonalize = self.deseasonalize and len(y) >= 2 * self.period
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.result_ = _Theta(y, period=self.period, deseasonalize=deseasonalize).fit()
+
+    def _predict(self, steps, level):
+        mean = np.asarray(self.result_.forecast(steps))
+        bounds = np.asarray(self.result_.prediction_intervals(steps, alpha=1 - level))
+        return mean, bounds[:, 0], bounds[:, 1]
+
+
+# -------------------------------------------------
+# Gradient-boosted lag regressor
+# -------------------------------------------------
+@register_model("gbr")
+class LagGBRModel(ForecastModel):
+    """
+    Histogram gradient boosting on lagged log returns plus rolling
+    mean / volatility features, forecasting recursively. Intervals use
+    the held-out residual spread, widened with sqrt(horizon).
+    """
+
+    def __init__(self, lags=14, windows=(7, 30), max_iter=100, learning_rate=0.1, max_depth=3, seed=0):
+        self.lags = lags
+        self.windows = windows
+        self.params = dict(max_iter=max_iter, learning_rate=learning_rate, max_depth=max_depth,
+                           random_state=seed)
+
+    def _features(self, r):
+        """
+        Feature row for predicting the return after the last one in r.
+        """
+        cols = [r[-self.lags:][::-1]]
+        for w in self.windows:
+            cols.append([r[-w:].mean(), r[-w:].std()])
+        return np.concatenate(cols)
+
+    def _design(self, r):
+        n = len(r)
+        start = max(self.lags, max(self.windows))
+        lagged = np.lib.stride_tricks.sliding_window_view(r, self.lags)[start - self.lags:n - self.lags, ::-1]
+
+        cols = [lagged]
+        s = pd.Series(r)
+        for w in self.windows:
+            cols.append(s.rolling(w).mean().to_numpy()[start - 1:n - 1, None])
+            cols.append(s.rolling(w).std(ddof=0).to_numpy()[start - 1:n - 1, None])
+        return np.hstack(cols), r[start:]
+
+    def _fit(self, y):
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        r = np.diff(np.log(y))
+        x, target = self._design(r)
+
+        split = int(len(x) * 0.8)
+        holdout = HistGradientBoostingRegressor(**self.params).fit(x[:split], target[:split])
+        self.sigma_ = np.std(target[split:] - holdout.predict(x[split:]), ddof=1)
+
+        self.model_ = HistGradientBoostingRegressor(**self.params).fit(x, target)
+        self.returns_ = r
+        self.last_ = y[-1]
+
+    def _predict(self, steps, level):
+        r = list(self.returns_[-max(self.lags, max(self.windows)):])
+        path = []
+        for _ in range(steps):
+            step = float(self.model_.predict(self._features(np.asarray(r))[None, :])[0])
+            path.append(step)
+            r.append(step)
+
+        cum = np.cumsum(path)
+        z = norm.ppf(0.5 + level / 2)
+        width = z * self.sigma_ * np.sqrt(np.arange(1, steps + 1))
+        return self.last_ * np.exp(cum), self.last_ * np.exp(cum - width), self.last_ * np.exp(cum + width)
+
+
+# -------------------------------------------------
+# ARIMA
+# -------------------------------------------------
+@register_model("arima")
+class ARIMAModel(ForecastModel):
+    """
+    Fixed-order ARIMA (statsmodels).
+    """
+
+    def __init__(self, order=(5, 1, 0)):
+        self.order = tuple(order)
+
+    def _fit(self, y):
+        from statsmodels.tsa.arima.model import ARIMA
+
+        self.result_ = ARIMA(y, order=self.order).fit()
+
+    def _predict(self, steps, level):
+        fc = self.result_.get_forecast(steps=steps)
+        ci = np.asarray(fc.conf_int(alpha=1 - level))
+        return np.asarray(fc.predicted_mean), ci[:, 0], ci[:, 1]
+
+
+def _fit_arima_aic(y, order):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return order, ARIMA(y, order=order).fit().aic
+    except Exception:
+        return order, np.inf
+
+
+def _differencing_order(y, max_d=2, alpha=0.05):
+    """
+    Smallest d for which the ADF test rejects a unit root.
+    """
+    from statsmodels.tsa.stattools import adfuller
+
+    for d in range(max_d + 1):
+        series = np.diff(y, n=d) if d else y
+        if adfuller(series, autolag="AIC")[1] < alpha:
+            return d
+    return max_d
+
+
+@register_model("auto_arima")
+class AutoARIMAModel(ARIMAModel):
+    """
+    ARIMA with d chosen by repeated ADF tests and (p, q) by AIC over a
+    grid; the candidate fits run in a process pool when workers > 1.
+    """
+
+    def __init__(self, max_p=3, max_q=3, max_d=2, workers=None):
+        self.max_p, self.max_q, self.max_d = max_p, max_q, max_d
+        self.workers = workers
+
+    def _fit(self, y):
+        d = _differencing_order(y, self.max_d)
+        orders = [(p, d, q) for p, q in itertools.product(range(self.max_p + 1), range(self.max_q + 1))]
+
+        if self.workers and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                scores = list(pool.map(_fit_arima_aic, itertools.repeat(y), orders))
+        else:
+            scores = [_fit_arima_aic(y, order) for order in orders]
+
+        self.order, self.aic_ = min(scores, key=lambda s: s[1])
+        super()._fit(y)
+
+
+# -------------------------------------------------
+# Prophet
+# -------------------------------------------------
+@register_model("prophet")
+class ProphetModel(ForecastModel):
+    """
+    Facebook Prophet (imported lazily; slow to fit, use sparingly).
+    Seasonalities are left on Prophet's "auto" (daily seasonality only
+    for intraday bars); tuned priors come from analytics.tuning.
+    """
+
+    def __init__(self, **prophet_params):
+        self.prophet_params = dict(prophet_params)
+
+    def fit(self, series):
+        from prophet import Prophet
+
+        self.series_ = series.dropna()
+        df = self.series_.reset_index()
+        df.columns = ["ds", "y"]
+
+        self.model_ = Prophet(**self.prophet_params)
+        self.model_.fit(df)
+        return self
+
+    def full_forecast(self, steps):
+        """
+        Prophet's own frame (history fit + future), as Prophet returns it.
+        Future rows are spaced like the fitted bars, not Prophet's daily
+        default.
+        """
+        freq = PANDAS_FREQ[infer_timeframe(self.series_.index)]
+        future = self.model_.make_future_dataframe(periods=steps, freq=freq)
+        return self.model_.predict(future)
+
+    def forecast(self, steps, level=0.95):
+        if level != self.model_.interval_width:
+            self.model_.interval_width = level
+        future = pd.DataFrame({"ds": future_index(self.series_, steps)})
+        pf = self.model_.predict(future)
+        return pd.DataFrame({
+            "Forecast": pf["yhat"].to_numpy(),
+            "Lower": pf["yhat_lower"].to_numpy(),
+            "Upper": pf["yhat_upper"].to_numpy(),
+        }, index=future["ds"].rename(self.series_.index.name))
+
+
+# -------------------------------------------------
+# Batch helpers
+# -------------------------------------------------
+@instrument("fit_forecast")
+def fit_forecast(series, name, steps, level=0.95, **params):
+    """
+    Fit one registered model and return its Forecast / Lower / Upper frame.
+    """
+    return get_model(name, **params).fit(series).forecast(steps, level)
+
+
+def forecast_errors(actual, predicted):
+    err = np.asarray(actual) - np.asarray(predicted)
+    return {
+        "MAE": np.mean(np.abs(err)),
+        "RMSE": np.sqrt(np.mean(err ** 2)),
+        "MAPE (%)": np.mean(np.abs(err / np.asarray(actual))) * 100,
+    }
+
+
+def backtest(series, names, steps):
+    """
+    Hold out the last `steps` bars, fit each model on the rest and score
+    it. Returns (errors DataFrame, {name: forecast frame}).
+    """
+    series = series.dropna()
+    train, test = series.iloc[:-steps], series.iloc[-steps:]
+
+    scores, forecasts = {}, {}
+    for name in names:
+        try:
+            fc = fit_forecast(train, name, steps)
+        except Exception as exc:
+            warnings.warn(f"{name} failed: {exc}")
+            continue
+        forecasts[name] = fc
+        scores[name] = forecast_errors(test.to_numpy(), fc["Forecast"].to_numpy())
+
+    return pd.DataFrame.from_dict(scores, orient="index"), forecasts
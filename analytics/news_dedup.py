@@ -0,0 +1,256 @@
+# =========================================================
+# news_dedup.py
+# Near-duplicate headline clustering (MinHash / LSH, no Streamlit)
+#
+# Google News returns the same story once per syndicating outlet. Each
+# headline is normalized, split into character 4-gram shingles and
+# summarized by a MinHash signature; banding the signature gives LSH
+# bucket keys, so near-duplicate candidates are an index lookup in
+# data/news_store.py instead of a scan of every stored headline.
+# Headlines whose estimated Jaccard similarity with a candidate reaches
+# the threshold join its story; sentiment is scored once per story.
+#
+# Usage (from the repository root):
+#   python -m analytics.news_dedup           # headline / story counts
+#   python -m analytics.news_dedup --prune
+# =========================================================
+
+import argparse
+import hashlib
+import re
+import sys
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from data import news_store
+from util.metrics import instrument
+
+SHINGLE_SIZE = 4
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+# -------------------------------------------------
+# Shingles & signatures
+# -------------------------------------------------
+def normalize_headline(text):
+    """
+    Lowercase alphanumerics of a headline without Google News's
+    trailing " - Publisher".
+    """
+    text = str(text)
+    if " - " in text:
+        text = text.rsplit(" - ", 1)[0]
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def text_hash(normalized):
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+def shingles(normalized, k=SHINGLE_SIZE):
+    """
+    Unique 32-bit hashes of the character k-grams of a normalized headline.
+    """
+    grams = {normalized[i:i + k] for i in range(max(len(normalized) - k + 1, 1))}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """
+    `num_perm` universal hash functions (a * x + b) mod (2^61 - 1); the
+    signature is the minimum of each over a headline's shingles.
+    Coefficients stay below 2^32 so the products fit in uint64.
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+
+    def signature(self, hashes):
+        phv = (np.outer(hashes, self.a) + self.b) % _PRIME & _MAX_HASH
+        return phv.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts):
+        """
+        One signature row per normalized headline.
+        """
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(shingles(text))
+        return out
+
+
+@lru_cache(maxsize=4)
+def get_minhasher(num_perm, seed=1):
+    return MinHasher(num_perm, seed)
+
+
+def lsh_keys(signature, bands):
+    """
+    One signed 64-bit bucket key per band (band index mixed in, so equal
+    rows in different bands don't collide).
+    """
+    rows = len(signature) // bands
+    band_rows = np.asarray(signature[:bands * rows], dtype=np.uint64).reshape(bands, rows)
+    keys = np.arange(bands, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    for column in band_rows.T:
+        keys = keys * np.uint64(1099511628211) + column
+    return keys.view(np.int64)
+
+
+def jaccard(sig_a, sig_b):
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return float(np.mean(sig_a == sig_b))
+
+
+# -------------------------------------------------
+# Scoring
+# -------------------------------------------------
+@instrument("analyze_sentiment")
+def analyze_sentiment(headlines):
+    analyzer = SentimentIntensityAnalyzer()
+    return [analyzer.polarity_scores(h)["compound"] for h in headlines]
+
+
+# -------------------------------------------------
+# Clustering
+# -------------------------------------------------
+MAX_CANDIDATES = 256  # per headline; generic wording can fill a bucket
+
+
+def _best_match(signature, clusters, signatures):
+    """
+    (cluster, estimated Jaccard similarity) of the closest candidate.
+    """
+    if not len(clusters):
+        return None, 0.0
+    sims = (signatures == signature).mean(axis=1)
+    best = int(sims.argmax())
+    return clusters[best], float(sims[best])
+
+
+@instrument("cluster_news")
+def cluster_news(news_df, score=None, threshold=None, num_perm=None, bands=None, db_path=None):
+    """
+    Assign every headline of a fetch_news() frame to a story, storing new
+    headlines in the news store, and score each new story once with
+    `score` (a list of headlines -> list of scores; VADER by default).
+
+    Returns a copy of `news_df` with cluster_id, sentiment_score (the
+    story's) and story_size (headlines of the story in this frame).
+    """
+    from util.config import NEWS_DEDUP_THRESHOLD, NEWS_LSH_BANDS, NEWS_MINHASH_PERM
+
+    score = score or analyze_sentiment
+    threshold = NEWS_DEDUP_THRESHOLD if threshold is None else threshold
+    minhasher = get_minhasher(num_perm or NEWS_MINHASH_PERM)
+    bands = bands or NEWS_LSH_BANDS
+
+    df = news_df.copy()
+    if df.empty:
+        return df.assign(cluster_id=pd.Series(dtype="int64"),
+                         sentiment_score=pd.Series(dtype=float),
+                         story_size=pd.Series(dtype="int64"))
+
+    normalized = [normalize_headline(h) for h in df["headline"]]
+    hashes = [text_hash(n) for n in normalized]
+    known = news_store.find_exact(set(hashes), db_path=db_path)
+
+    # First occurrence of every headline not stored yet
+    first = {}
+    for i, h in enumerate(hashes):
+        if h not in known and h not in first:
+            first[h] = i
+    rows = list(first.values())
+
+    items = []
+    if rows:
+        signatures = minhasher.signatures([normalized[i] for i in rows])
+        keys = [lsh_keys(sig, bands) for sig in signatures]
+        stored = news_store.find_candidates(keys, minhasher.num_perm, limit=MAX_CANDIDATES,
+                                            db_path=db_path)
+
+        batch = {}  # bucket key -> positions in `items`
+        for pos, (i, sig, item_keys) in enumerate(zip(rows, signatures, keys)):
+            in_batch = sorted({j for k in item_keys.tolist() for j in batch.get(k, ())})
+            in_batch = in_batch[-MAX_CANDIDATES:]
+            clusters, candidates = stored[pos]
+            cluster, sim = _best_match(
+                sig,
+                clusters + [("item", j) for j in in_batch],
+                np.concatenate([candidates, signatures[in_batch]]),
+            )
+            items.append({
+                "text_hash": hashes[i],
+                "headline": str(df["headline"].iloc[i]),
+                "source": str(df["source"].iloc[i]) if "source" in df else None,
+                "published": str(df["published"].iloc[i]) if "published" in df else None,
+                "signature": sig,
+                "keys": item_keys,
+                "cluster": cluster if sim >= threshold else None,
+            })
+            for k in item_keys.tolist():
+                batch.setdefault(k, []).append(pos)
+
+        for h, cluster in zip(first, news_store.add_headlines(items, db_path=db_path)):
+            known[h] = cluster
+
+    cluster_ids = [known[h] for h in hashes]
+    clusters = news_store.get_clusters(cluster_ids, db_path=db_path)
+
+    unscored = [c for c, info in clusters.items() if info["sentiment"] is None]
+    if unscored:
+        scores = score([clusters[c]["headline"] for c in unscored])
+        news_store.set_cluster_sentiment(dict(zip(unscored, scores)), db_path=db_path)
+        for c, s in zip(unscored, scores):
+            clusters[c]["sentiment"] = float(s)
+
+    df["cluster_id"] = cluster_ids
+    df["sentiment_score"] = [clusters[c]["sentiment"] for c in cluster_ids]
+    df["story_size"] = df.groupby("cluster_id")["cluster_id"].transform("size")
+    return df
+
+
+def weighted_sentiment(clustered):
+    """
+    Mean story sentiment of a cluster_news() frame, each story weighted
+    by 1 + log(story_size): wider coverage counts for more, without
+    letting one syndicated story dominate the average.
+    """
+    stories = clustered.drop_duplicates("cluster_id")
+    if stories.empty:
+        return float("nan")
+    weights = 1.0 + np.log(stories["story_size"].to_numpy(dtype=float))
+    return float(np.average(stories["sentiment_score"].to_numpy(dtype=float), weights=weights))
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from util.config import NEWS_RETENTION_DAYS
+
+    parser = argparse.ArgumentParser(description="Inspect or prune the headline store.")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete headlines older than the retention period")
+    parser.add_argument("--days", type=float, default=NEWS_RETENTION_DAYS)
+    args = parser.parse_args(argv)
+
+    if args.prune:
+        print(f"[news] pruned {news_store.prune_news(args.days)} headlines", flush=True)
+    stats = news_store.news_stats()
+    print(f"[news] {stats['headlines']} headlines in {stats['stories']} stories", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
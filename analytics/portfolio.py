@@ -0,0 +1,362 @@
+# =========================================================
+# portfolio.py
+# Portfolio construction over the asset universe (no Streamlit)
+#
+# Covariance estimators (sample, Ledoit-Wolf, EWMA) feed four long-only,
+# fully invested portfolios: mean-variance, minimum-variance, risk parity
+# and maximum Sharpe. Every solver accepts a starting weight vector so a
+# rebalance warm-starts from the previous solution.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from data.bars import periods_per_year
+from util.metrics import instrument
+
+
+# -------------------------------------------------
+# Inputs
+# -------------------------------------------------
+def returns_matrix(frames, column="Returns"):
+    """
+    {symbol: frame} -> aligned T x N returns (rows with any gap dropped).
+    """
+    return pd.concat(
+        [df[column] for df in frames.values()], axis=1, keys=list(frames)
+    ).dropna()
+
+
+def expected_returns(returns, timeframe="1d"):
+    """
+    Annualized mean bar return per asset.
+    """
+    return returns.mean() * periods_per_year(timeframe)
+
+
+# -------------------------------------------------
+# Covariance estimators (all annualized, N x N DataFrames)
+# -------------------------------------------------
+def _demeaned(returns):
+    x = np.asarray(returns, dtype=float)
+    return x - x.mean(axis=0)
+
+
+def sample_covariance(returns, timeframe="1d"):
+    x = _demeaned(returns)
+    cov = x.T @ x / max(len(x) - 1, 1)
+    return pd.DataFrame(cov * periods_per_year(timeframe), returns.columns, returns.columns)
+
+
+def ledoit_wolf_covariance(returns, timeframe="1d"):
+    """
+    Ledoit-Wolf (2004) shrinkage towards a scaled identity, with the
+    optimal shrinkage intensity estimated from the data.
+    """
+    x = _demeaned(returns)
+    t, n = x.shape
+
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+
+    x2 = x ** 2
+    beta = ((x2.T @ x2).sum() / t - (sample ** 2).sum()) / (n * t)
+    delta = ((sample - mu * np.eye(n)) ** 2).sum() / n
+    shrinkage = 0.0 if delta == 0 else min(beta, delta) / delta
+
+    cov = (1 - shrinkage) * sample + shrinkage * mu * np.eye(n)
+    out = pd.DataFrame(cov * periods_per_year(timeframe), returns.columns, returns.columns)
+    out.attrs["shrinkage"] = shrinkage
+    return out
+
+
+def ewma_covariance(returns, timeframe="1d", halflife=60):
+    """
+    Exponentially weighted covariance (RiskMetrics style); `halflife` is
+    in bars.
+    """
+    x = np.asarray(returns, dtype=float)
+    w = 0.5 ** (np.arange(len(x))[::-1] / halflife)
+    w /= w.sum()
+
+    xc = x - w @ x
+    cov = (xc * w[:, None]).T @ xc
+    return pd.DataFrame(cov * periods_per_year(timeframe), returns.columns, returns.columns)
+
+
+COVARIANCE_ESTIMATORS = {
+    "sample": sample_covariance,
+    "ledoit_wolf": ledoit_wolf_covariance,
+    "ewma": ewma_covariance,
+}
+
+
+def estimate_covariance(returns, method="ledoit_wolf", timeframe="1d", **kwargs):
+    if method not in COVARIANCE_ESTIMATORS:
+        raise ValueError(f"unknown covariance estimator {method!r}")
+    return COVARIANCE_ESTIMATORS[method](returns, timeframe=timeframe, **kwargs)
+
+
+# -------------------------------------------------
+# Solver building blocks
+# -------------------------------------------------
+def project_capped_simplex(v, cap=1.0):
+    """
+    Euclidean projection onto {w : sum(w) = 1, 0 <= w <= cap}.
+    """
+    n = len(v)
+    if cap * n < 1 - 1e-12:
+        raise ValueError(f"max_weight={cap} cannot hold a fully invested {n}-asset portfolio")
+
+    lo, hi = v.min() - cap, v.max()
+    for _ in range(100):
+        tau = (lo + hi) / 2
+        if np.clip(v - tau, 0, cap).sum() > 1:
+            lo = tau
+        else:
+            hi = tau
+        if hi - lo < 1e-15:
+            break
+    return np.clip(v - (lo + hi) / 2, 0, cap)
+
+
+def _largest_eigenvalue(q, iterations=50):
+    v = np.full(len(q), 1 / np.sqrt(len(q)))
+    value = 0.0
+    for _ in range(iterations):
+        w = q @ v
+        value_new = np.linalg.norm(w)
+        if value_new == 0:
+            return 0.0
+        v = w / value_new
+        if abs(value_new - value) <= 1e-6 * value_new:
+            break
+        value = value_new
+    return value_new * 1.01  # small margin keeps the step size safe
+
+
+def _fista(q, c, project, w0, tol=1e-9, max_iter=5000):
+    """
+    Accelerated projected gradient for min 0.5 w'Qw - c'w over a convex
+    set given by `project`, with adaptive restart.
+    """
+    step = 1 / max(_largest_eigenvalue(q), 1e-18)
+    w = project(w0)
+    y, t = w.copy(), 1.0
+
+    for _ in range(max_iter):
+        w_next = project(y - step * (q @ y - c))
+
+        if (w_next - w) @ (y - w_next) > 0:  # momentum overshoot: restart
+            t = 1.0
+
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + (t - 1) / t_next * (w_next - w)
+
+        if np.max(np.abs(w_next - w)) < tol:
+            return w_next
+        w, t = w_next, t_next
+
+    return w
+
+
+def _start(n, w0):
+    return np.full(n, 1 / n) if w0 is None else np.asarray(w0, dtype=float)
+
+
+def _series(weights, cov):
+    return pd.Series(weights, index=cov.index, name="Weight")
+
+
+# -------------------------------------------------
+# Portfolios
+# -------------------------------------------------
+def min_variance(cov, max_weight=1.0, w0=None, **_):
+    q = np.asarray(cov, dtype=float)
+    w = _fista(q, np.zeros(len(q)), lambda v: project_capped_simplex(v, max_weight), _start(len(q), w0))
+    return _series(w, cov)
+
+
+def mean_variance(mu, cov, risk_aversion=3.0, max_weight=1.0, w0=None, **_):
+    """
+    max  w'mu - risk_aversion / 2 * w'Σw  (long-only, fully invested).
+    """
+    q = risk_aversion * np.asarray(cov, dtype=float)
+    c = np.asarray(mu, dtype=float)
+    w = _fista(q, c, lambda v: project_capped_simplex(v, max_weight), _start(len(q), w0))
+    return _series(w, cov)
+
+
+def max_sharpe(mu, cov, risk_free=0.0, w0=None, **_):
+    """
+    Tangency portfolio via the convex reformulation
+    min y'Σy s.t. (mu - rf)'y = 1, y >= 0, then w = y / sum(y).
+    Falls back to minimum variance when no asset beats the risk-free rate.
+    """
+    excess = np.asarray(mu, dtype=float) - risk_free
+    if not (excess > 0).any():
+        return min_variance(cov, w0=w0)
+
+    def project(v):
+        # max(v - tau * a, 0) has a'y decreasing in tau: bisect for a'y = 1
+        lo, hi = -1.0, 1.0
+        while excess @ np.maximum(v - lo * excess, 0) < 1:
+            lo *= 2
+        while excess @ np.maximum(v - hi * excess, 0) > 1:
+            hi *= 2
+        for _ in range(100):
+            tau = (lo + hi) / 2
+            if excess @ np.maximum(v - tau * excess, 0) > 1:
+                lo = tau
+            else:
+                hi = tau
+            if hi - lo < 1e-15 * max(1.0, abs(tau)):
+                break
+        return np.maximum(v - (lo + hi) / 2 * excess, 0)
+
+    q = np.asarray(cov, dtype=float)
+    start = _start(len(q), w0)
+    start = start / max(excess @ start, 1e-12)
+
+    y = _fista(q, np.zeros(len(q)), project, start, tol=1e-12)
+    return _series(y / y.sum(), cov)
+
+
+def risk_parity(cov, budgets=None, w0=None, tol=1e-10, max_iter=50, **_):
+    """
+    Equal (or budgeted) risk contributions. Newton's method on the convex
+    formulation min 0.5 y'Σy - sum(b log y), then w = y / sum(y).
+    """
+    q = np.asarray(cov, dtype=float)
+    n = len(q)
+    b = np.full(n, 1 / n) if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+
+    y = _start(n, w0)
+    y = y / np.sqrt(y @ q @ y)  # optimum satisfies y'Σy = sum(b) = 1
+
+    def objective(y):
+        return 0.5 * y @ q @ y - b @ np.log(y)
+
+    f = objective(y)
+    for _ in range(max_iter):
+        grad = q @ y - b / y
+        hess = q + np.diag(b / y ** 2)
+        d = -np.linalg.solve(hess, grad)
+
+        decrement = -grad @ d
+        if decrement / 2 < tol:
+            break
+
+        # Backtracking line search, staying inside y > 0
+        neg = d < 0
+        s = min(1.0, 0.99 * np.min(-y[neg] / d[neg])) if neg.any() else 1.0
+        while True:
+            f_new = objective(y + s * d)
+            if f_new <= f - 0.25 * s * decrement or s < 1e-12:
+                break
+            s /= 2
+        y, f = y + s * d, f_new
+
+    return _series(y / y.sum(), cov)
+
+
+PORTFOLIOS = {
+    "Mean-Variance": "mean_variance",
+    "Minimum Variance": "min_variance",
+    "Risk Parity": "risk_parity",
+    "Max Sharpe": "max_sharpe",
+}
+
+
+@instrument("optimize_portfolio")
+def optimize(mu, cov, method="min_variance", w0=None, **kwargs):
+    """
+    Dispatch to one of the portfolio constructors by name.
+    """
+    if method == "min_variance":
+        return min_variance(cov, w0=w0, **kwargs)
+    if method == "mean_variance":
+        return mean_variance(mu, cov, w0=w0, **kwargs)
+    if method == "risk_parity":
+        return risk_parity(cov, w0=w0, **kwargs)
+    if method == "max_sharpe":
+        return max_sharpe(mu, cov, w0=w0, **kwargs)
+    raise ValueError(f"unknown portfolio method {method!r}")
+
+
+# -------------------------------------------------
+# Statistics & frontier
+# -------------------------------------------------
+def portfolio_stats(weights, mu, cov, risk_free=0.0):
+    ret = float(np.asarray(weights) @ np.asarray(mu))
+    risk = float(np.sqrt(np.asarray(weights) @ np.asarray(cov) @ np.asarray(weights)))
+    return {"Return": ret, "Risk": risk, "Sharpe": (ret - risk_free) / risk if risk else np.nan}
+
+
+def risk_contributions(weights, cov):
+    """
+    Fraction of portfolio variance contributed by each asset.
+    """
+    w = np.asarray(weights, dtype=float)
+    marginal = np.asarray(cov) @ w
+    return pd.Series(w * marginal / (w @ marginal), index=cov.index)
+
+
+def random_portfolios(mu, cov, n_portfolios=20_000, risk_free=0.0, seed=0, chunk_size=5_000):
+    """
+    Monte Carlo cloud of long-only portfolios (flat Dirichlet weights),
+    evaluated in matrix form chunk by chunk. Returns Return/Risk/Sharpe.
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mu, dtype=float)
+    q = np.asarray(cov, dtype=float)
+
+    rets, risks = [], []
+    for start in range(0, n_portfolios, chunk_size):
+        w = rng.dirichlet(np.ones(len(mu)), size=min(chunk_size, n_portfolios - start))
+        rets.append(w @ mu)
+        risks.append(np.sqrt(np.einsum("ij,ij->i", w @ q, w)))
+
+    ret, risk = np.concatenate(rets), np.concatenate(risks)
+    return pd.DataFrame({"Return": ret, "Risk": risk, "Sharpe": (ret - risk_free) / risk})
+
+
+def efficient_frontier(mu, cov, n_points=40, max_weight=1.0):
+    """
+    Exact long-only frontier, traced by sweeping the risk aversion from
+    the highest-return end down to minimum variance; each point is
+    warm-started from the previous one.
+    """
+    q = np.asarray(cov, dtype=float)
+    scale = np.abs(np.asarray(mu)).max() / max(np.diag(q).mean(), 1e-18)
+
+    points, w = [], None
+    for aversion in scale * np.logspace(-2, 3, n_points):
+        w = mean_variance(mu, cov, aversion, max_weight, w0=w).to_numpy()
+        points.append(portfolio_stats(w, mu, cov))
+    return pd.DataFrame(points).drop_duplicates().sort_values("Risk", ignore_index=True)
+
+
+# -------------------------------------------------
+# Rebalancing
+# -------------------------------------------------
+def rebalance(returns, method="min_variance", estimator="ledoit_wolf", lookback=252,
+              every=21, timeframe="1d", **kwargs):
+    """
+    Weights re-optimized every `every` bars from the trailing `lookback`
+    bars, each solve warm-started from the previous weights. Returns a
+    DataFrame (rebalance dates x assets).
+    """
+    weights, dates, w = [], [], None
+
+    for end in range(lookback, len(returns) + 1, every):
+        window = returns.iloc[end - lookback:end]
+        cov = estimate_covariance(window, estimator, timeframe)
+        mu = expected_returns(window, timeframe)
+
+        w = optimize(mu, cov, method, w0=w, **kwargs).to_numpy()
+        weights.append(w)
+        dates.append(returns.index[end - 1])
+
+    return pd.DataFrame(weights, index=pd.Index(dates, name=returns.index.name),
+                        columns=returns.columns)
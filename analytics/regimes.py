@@ -0,0 +1,698 @@
+# =========================================================
+# regimes.py
+# Market regime labels and changepoints per bar (no Streamlit)
+#
+# A Gaussian HMM over (log return, log EWMA volatility) is fitted once
+# per symbol on its recent history; after that every new bar runs one
+# step of the forward filter (O(states^2) per symbol), so labels update
+# online without refitting. Changepoints come from a two-sided CUSUM on
+# volatility-standardized returns or from Bayesian online changepoint
+# detection (Adams & MacKay) with a truncated run-length posterior.
+#
+# Like analytics/indicators.py, kernels work on wide T x N arrays and
+# take / return a `state`, so a whole universe advances in one call.
+# =========================================================
+
+import pickle
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+
+from analytics.indicators import _as_2d, ema
+from util.metrics import instrument
+
+# Labels by ascending mean return of the state
+REGIME_LABELS = {2: ["Bear", "Bull"], 3: ["Bear", "Sideways", "Bull"]}
+
+EWMA_ALPHA = 0.06  # RiskMetrics variance recursion (lambda = 0.94)
+VAR_FLOOR = 1e-3   # on the standardized feature scale
+
+
+def state_labels(n_states):
+    return REGIME_LABELS.get(n_states, [f"Regime {k + 1}" for k in range(n_states)])
+
+
+# -------------------------------------------------
+# Features
+# -------------------------------------------------
+def regime_features(close, state=None, alpha=EWMA_ALPHA):
+    """
+    Per-bar inputs of the detectors: T x N x 2 HMM observations (log
+    return, log EWMA volatility), the log returns, and the returns
+    standardized by the previous bar's volatility. Missing closes give
+    NaN rows; the next return spans the gap.
+    """
+    state = state or {}
+    close = _as_2d(close)
+    n = close.shape[1]
+
+    prev_close = state.get("prev_close", np.full(n, np.nan))
+    filled = pd.DataFrame(np.vstack([prev_close[None, :], close])).ffill().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_ret = np.where(np.isfinite(close), np.log(filled[1:] / filled[:-1]), np.nan)
+
+    prev_var = state.get("var", np.full(n, np.nan))
+    var, var_state = ema(log_ret ** 2, alpha=alpha, state=prev_var)
+
+    # Variance known before each bar: the last valid EWMA value so far
+    before = pd.DataFrame(np.vstack([prev_var[None, :], var])).ffill().to_numpy()[:-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(before > 0, log_ret / np.sqrt(before), np.nan)
+        log_vol = 0.5 * np.log(np.maximum(var, 1e-12))
+
+    obs = np.stack([log_ret, log_vol], axis=-1)
+    return {"obs": obs, "returns": log_ret, "z": z, "sigma": np.sqrt(before)}, {
+        "prev_close": filled[-1], "var": var_state
+    }
+
+
+# -------------------------------------------------
+# Gaussian HMM (batched over symbols, diagonal covariance)
+#   model: pi (N x K), A (N x K x K), mu / var (N x K x D) on the
+#   standardized scale given by center / scale (N x D)
+# -------------------------------------------------
+def _log_emissions(obs, model):
+    xs = (obs - model["center"]) / model["scale"]
+    diff = xs[:, :, None, :] - model["mu"]
+    ll = -0.5 * (np.log(2 * np.pi * model["var"]) + diff ** 2 / model["var"]).sum(axis=-1)
+    missing = np.isnan(xs).any(axis=-1)
+    ll[missing] = 0.0  # missing bars only propagate the state
+    return ll, xs, missing
+
+
+def _forward(b, model, prev=None):
+    """
+    Scaled forward pass over emission likelihoods b (T x N x K).
+    Returns (filtered probabilities, per-step normalizers).
+    """
+    T, n, k = b.shape
+    alpha = np.empty((T, n, k))
+    norm = np.empty((T, n))
+    last = prev
+    for t in range(T):
+        predicted = model["pi"] if last is None else np.matmul(last[:, None, :], model["A"])[:, 0]
+        a = predicted * b[t]
+        norm[t] = a.sum(axis=1)
+        alpha[t] = a / norm[t][:, None]
+        last = alpha[t]
+    return alpha, norm
+
+
+def _backward(b, norm, model):
+    T, n, k = b.shape
+    beta = np.ones((T, n, k))
+    for t in range(T - 2, -1, -1):
+        beta[t] = np.matmul(model["A"], (b[t + 1] * beta[t + 1])[:, :, None])[:, :, 0]
+        beta[t] /= norm[t + 1][:, None]
+    return beta
+
+
+def _init_model(obs, n_states):
+    """
+    Standardize each symbol's features and seed the states on quantile
+    bands of volatility, with sticky transitions.
+    """
+    n, d = obs.shape[1], obs.shape[2]
+    center = np.nanmean(obs, axis=0)
+    scale = np.nanstd(obs, axis=0)
+    scale = np.where(scale > 0, scale, 1.0)
+    xs = (obs - center) / scale
+
+    mu = np.zeros((n, n_states, d))
+    var = np.ones((n, n_states, d))
+    for j in range(n):
+        x = xs[:, j][~np.isnan(xs[:, j]).any(axis=1)]
+        for k, band in enumerate(np.array_split(x[np.argsort(x[:, 1])], n_states)):
+            if len(band) > 1:
+                mu[j, k] = band.mean(axis=0)
+                var[j, k] = band.var(axis=0) + VAR_FLOOR
+
+    stay = 0.95
+    A = np.full((n, n_states, n_states), (1 - stay) / (n_states - 1))
+    A[:, np.arange(n_states), np.arange(n_states)] = stay
+    return {
+        "pi": np.full((n, n_states), 1 / n_states), "A": A, "mu": mu, "var": var,
+        "center": center, "scale": scale,
+    }
+
+
+def _sort_states(model):
+    # State 0 = lowest mean return, so labels line up across symbols
+    order = np.argsort(model["mu"][:, :, 0], axis=1)
+    rows = np.arange(len(order))[:, None]
+    model["pi"] = model["pi"][rows, order]
+    model["A"] = model["A"][rows[:, :, None], order[:, :, None], order[:, None, :]]
+    model["mu"] = model["mu"][rows, order]
+    model["var"] = model["var"][rows, order]
+    return model
+
+
+@instrument("regimes.fit_hmm")
+def fit_hmm(obs, n_states=3, max_iter=50, tol=1e-4):
+    """
+    Baum-Welch fit of one Gaussian HMM per column of obs (T x N x D),
+    all symbols in the same vectorized passes. Returns the model with
+    states sorted by mean return.
+    """
+    model = _init_model(obs, n_states)
+    n_obs = np.maximum((~np.isnan(obs).any(axis=-1)).sum(axis=0), 1)
+    previous = np.full(obs.shape[1], -np.inf)
+
+    for _ in range(max_iter):
+        ll, xs, missing = _log_emissions(obs, model)
+        peak = ll.max(axis=2, keepdims=True)
+        b = np.exp(ll - peak)
+        alpha, norm = _forward(b, model)
+        beta = _backward(b, norm, model)
+
+        loglik = np.log(norm).sum(axis=0) + peak[:, :, 0].sum(axis=0)
+        converged = np.all(loglik - previous < tol * n_obs)
+        previous = loglik
+
+        gamma = alpha * beta
+        gamma /= gamma.sum(axis=2, keepdims=True)
+        # Sums over time as batched (N x K x T) @ (N x T x .) products
+        ahead = (b[1:] * beta[1:] / norm[1:, :, None]).transpose(1, 0, 2)
+        xi = np.matmul(alpha[:-1].transpose(1, 2, 0), ahead) * model["A"]
+
+        weights = np.where(missing[:, :, None], 0.0, gamma).transpose(1, 2, 0)
+        total = weights.sum(axis=2)[:, :, None]
+        x0 = np.nan_to_num(xs).transpose(1, 0, 2)
+        used = total > 1e-8
+        denom = np.where(used, total, 1.0)
+        mu = np.matmul(weights, x0) / denom
+        var = np.maximum(np.matmul(weights, x0 ** 2) / denom - mu ** 2, 0.0) + VAR_FLOOR
+
+        model["mu"] = np.where(used, mu, model["mu"])
+        model["var"] = np.where(used, var, model["var"])
+        model["A"] = (xi + 1e-6) / (xi + 1e-6).sum(axis=2, keepdims=True)
+        model["pi"] = gamma[0]
+
+        if converged:
+            break
+
+    return _sort_states(model)
+
+
+def hmm_filter(obs, model, state=None):
+    """
+    Filtered state probabilities (T x N x K) for new observations,
+    continuing from `state` (the previous filtered probabilities).
+    Missing bars are NaN in the output. Returns (probs, state).
+    """
+    if len(obs) == 0:
+        return np.empty((0,) + model["pi"].shape), state
+    ll, _, missing = _log_emissions(obs, model)
+    b = np.exp(ll - ll.max(axis=2, keepdims=True))
+    probs, _ = _forward(b, model, state)
+    state = probs[-1].copy()
+    probs[missing] = np.nan
+    return probs, state
+
+
+def _take(model, cols):
+    return {k: v[cols] for k, v in model.items()}
+
+
+def _put(model, cols, sub):
+    for k, v in sub.items():
+        model[k][cols] = v
+
+
+# -------------------------------------------------
+# Changepoint detectors: (features, state, **params) -> (flags, state)
+# flags is T x N int8 (1 = changepoint detected at that bar)
+# -------------------------------------------------
+def cusum(features, state=None, threshold=6.0, drift=0.5, clip=3.0):
+    """
+    Two-sided CUSUM on standardized returns (mean shifts) and on their
+    centred squares (volatility shifts). Returns are clipped at `clip`
+    sigmas so one outlier bar is not a regime change; the statistics
+    reset after each alarm.
+    """
+    z = np.clip(features["z"], -clip, clip)
+    n = z.shape[1]
+    s = np.zeros((4, n)) if state is None else state["s"].copy()
+
+    flags = np.zeros(z.shape, dtype=np.int8)
+    for t in range(len(z)):
+        x = z[t]
+        valid = np.isfinite(x)
+        u = (x ** 2 - 1) / np.sqrt(2)
+        step = np.stack([x - drift, -x - drift, u - drift, -u - drift])
+        s = np.where(valid, np.maximum(0.0, s + np.nan_to_num(step)), s)
+        alarm = (s > threshold).any(axis=0)
+        flags[t] = alarm
+        s[:, alarm] = 0.0
+    return flags, {"s": s}
+
+
+def _student_logpdf(x, mu, kappa, a, b):
+    df = 2 * a
+    scale2 = b * (kappa + 1) / (a * kappa)
+    return (gammaln((df + 1) / 2) - gammaln(df / 2) - 0.5 * np.log(np.pi * df * scale2)
+            - (df + 1) / 2 * np.log1p((x - mu) ** 2 / (df * scale2)))
+
+
+def bocpd(features, state=None, hazard=250.0, max_run=200, min_drop=10):
+    """
+    Bayesian online changepoint detection on log returns with a
+    Normal-inverse-gamma prior (unknown mean and variance) and constant
+    hazard 1 / `hazard`. The run-length posterior is truncated to
+    `max_run` entries, so each bar costs O(max_run) per symbol. A
+    changepoint is flagged when the most likely run length drops by at
+    least `min_drop` bars.
+    """
+    x_all = features["returns"]
+    n = x_all.shape[1]
+    h = 1.0 / hazard
+
+    if state is None:
+        state = {"scale": np.full(n, np.nan), "seen": np.zeros(n, dtype=int),
+                 "map": np.zeros(n, dtype=int)}
+        state["log_r"] = np.full((n, max_run), -np.inf)
+        state["log_r"][:, 0] = 0.0
+        for key, value in (("mu", 0.0), ("kappa", 1.0), ("a", 1.0), ("b", 1.0)):
+            state[key] = np.full((n, max_run), value)
+    state = {k: v.copy() for k, v in state.items()}
+
+    flags = np.zeros(x_all.shape, dtype=np.int8)
+    log_h, log_1h = np.log(h), np.log1p(-h)
+    prior = {"mu": 0.0, "kappa": 1.0, "a": 1.0, "b": 1.0}
+
+    for t in range(len(x_all)):
+        # Returns are scaled by the symbol's EWMA volatility once it has
+        # seen 20 bars, so the unit prior suits any bar size
+        state["seen"] += np.isfinite(x_all[t])
+        ready = np.isnan(state["scale"]) & (state["seen"] >= 20) & (features["sigma"][t] > 0)
+        state["scale"][ready] = features["sigma"][t][ready]
+
+        x = x_all[t] / state["scale"]
+        valid = np.isfinite(x)
+        if not valid.any():
+            continue
+        xv = np.where(valid, x, 0.0)[:, None]
+        mu, kappa, a, b = state["mu"], state["kappa"], state["a"], state["b"]
+
+        log_pred = _student_logpdf(xv, mu, kappa, a, b)
+        joint = state["log_r"] + log_pred
+        growth = joint + log_1h
+        change = np.logaddexp.reduce(joint + log_h, axis=1)
+
+        log_r = np.empty_like(growth)
+        log_r[:, 0] = change
+        log_r[:, 1:] = growth[:, :-1]
+        log_r[:, -1] = np.logaddexp(log_r[:, -1], growth[:, -1])  # truncated tail
+        log_r -= np.logaddexp.reduce(log_r, axis=1)[:, None]
+
+        updated = {
+            "mu": (kappa * mu + xv) / (kappa + 1),
+            "kappa": kappa + 1,
+            "a": a + 0.5,
+            "b": b + kappa * (xv - mu) ** 2 / (2 * (kappa + 1)),
+        }
+        for key, new in updated.items():
+            shifted = np.empty_like(new)
+            shifted[:, 0] = prior[key]
+            shifted[:, 1:] = new[:, :-1]
+            state[key] = np.where(valid[:, None], shifted, state[key])
+        state["log_r"] = np.where(valid[:, None], log_r, state["log_r"])
+
+        run = np.argmax(state["log_r"], axis=1)
+        flags[t] = valid & (run <= state["map"] - min_drop)
+        state["map"] = np.where(valid, run, state["map"])
+
+    return flags, state
+
+
+# name -> (detector, default params)
+CHANGEPOINTS = {
+    "cusum": (cusum, {"threshold": 6.0, "drift": 0.5, "clip": 3.0}),
+    "bocpd": (bocpd, {"hazard": 250.0, "max_run": 200, "min_drop": 10}),
+}
+
+
+# -------------------------------------------------
+# Online tracker
+# -------------------------------------------------
+class _Rows:
+    """
+    The last `size` rows of an array that grows at the end. The buffer
+    holds 2 x size rows and compacts when full, so appends cost
+    O(new rows) amortized instead of a copy of the history per bar.
+    """
+
+    def __init__(self, size, shape=(), dtype=float, fill=np.nan):
+        self.size = size
+        self.data = np.full((2 * size,) + tuple(shape), fill, dtype=dtype)
+        self.end = 0
+
+    def append(self, rows):
+        rows = rows[-self.size:]
+        if self.end + len(rows) > len(self.data):
+            keep = min(self.size - len(rows), self.end)
+            self.data[:keep] = self.data[self.end - keep:self.end]
+            self.end = keep
+        self.data[self.end:self.end + len(rows)] = rows
+        self.end += len(rows)
+
+    def view(self):
+        return self.data[max(self.end - self.size, 0):self.end]
+
+
+class RegimeTracker:
+    """
+    Online regime labels and changepoints for a fixed symbol universe.
+
+    update(close) takes only new bars (Date x Symbol closes); features,
+    the HMM filter and the changepoint detector advance from their state,
+    so a bar costs O(symbols x states^2) whatever the history length.
+    A symbol's HMM is fitted when it first has `min_bars` observations,
+    on its last `fit_bars`, and refitted every `refit_bars` observations
+    after that (default fit_bars, 0 = never) so the model follows the
+    market; refit() re-estimates on demand. Re-create the tracker to
+    change the universe.
+    """
+
+    def __init__(self, symbols, n_states=3, changepoint="cusum", fit_bars=1000,
+                 min_bars=250, history=2000, changepoint_params=None, refit_bars=None):
+        if changepoint not in CHANGEPOINTS:
+            raise ValueError(f"unknown changepoint detector: {changepoint}")
+        if n_states < 2:
+            raise ValueError("n_states must be at least 2")
+
+        self.symbols = list(symbols)
+        self.n_states = n_states
+        self.labels = state_labels(n_states)
+        self.changepoint = changepoint
+        self.changepoint_params = {**CHANGEPOINTS[changepoint][1], **(changepoint_params or {})}
+        self.fit_bars = fit_bars
+        self.refit_bars = fit_bars if refit_bars is None else refit_bars
+        self.min_bars = min_bars
+        self.history = max(history, fit_bars)
+
+        n = len(self.symbols)
+        self.model = {
+            "pi": np.full((n, n_states), np.nan),
+            "A": np.full((n, n_states, n_states), np.nan),
+            "mu": np.full((n, n_states, 2), np.nan),
+            "var": np.full((n, n_states, 2), np.nan),
+            "center": np.full((n, 2), np.nan),
+            "scale": np.full((n, 2), np.nan),
+        }
+        self.fitted = np.zeros(n, dtype=bool)
+        self.filter_state = np.full((n, n_states), np.nan)
+        self.feature_state = None
+        self.changepoint_state = None
+
+        self.seen = np.zeros(n, dtype=int)  # observed bars per symbol
+        self.fitted_at = np.zeros(n, dtype=int)  # seen at the last fit
+        self._index = _Rows(self.history, dtype="datetime64[ns]", fill=np.datetime64("NaT"))
+        self._obs = _Rows(self.history, (n, 2), np.float32)
+        self._probs = _Rows(self.history, (n, n_states), np.float32)
+        self._flags = _Rows(self.history, (n,), np.int8, 0)
+        self.last_time = None
+        self._pending = (None, {})
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        # Trackers pickled before periodic refits count from their load
+        state.setdefault("refit_bars", state["fit_bars"])
+        state.setdefault("fitted_at", state["seen"].copy())
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self._index.view())
+
+    @property
+    def obs(self):
+        return self._obs.view()
+
+    @property
+    def probs(self):
+        return self._probs.view()
+
+    @property
+    def flags(self):
+        return self._flags.view()
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    @instrument("regimes.update")
+    def update(self, close):
+        """
+        Advance over new closes (rows at or before the last processed bar
+        are skipped). Returns the events of the new bars: regime switches
+        and changepoints, as dicts.
+        """
+        with self._lock:
+            close = close.reindex(columns=self.symbols)
+            if self.last_time is not None:
+                close = close[close.index > self.last_time]
+            if close.empty:
+                return []
+
+            before = self._state_at(-1) if self._index.end else np.full(len(self.symbols), -1)
+            features, self.feature_state = regime_features(close.to_numpy(dtype=float),
+                                                           self.feature_state)
+            detector = CHANGEPOINTS[self.changepoint][0]
+            flags, self.changepoint_state = detector(features, self.changepoint_state,
+                                                     **self.changepoint_params)
+
+            probs = np.full(features["obs"].shape[:2] + (self.n_states,), np.nan)
+            cols = np.flatnonzero(self.fitted)
+            if len(cols):
+                probs[:, cols], self.filter_state[cols] = hmm_filter(
+                    features["obs"][:, cols], _take(self.model, cols), self.filter_state[cols]
+                )
+
+            self._index.append(close.index.to_numpy(dtype="datetime64[ns]"))
+            self._obs.append(features["obs"])
+            self._probs.append(probs)
+            self._flags.append(flags)
+            self.seen += (~np.isnan(features["obs"]).any(axis=-1)).sum(axis=0)
+            self.last_time = close.index[-1]
+
+            self._fit_ready()
+            return self._events(before, min(len(close), self.history))
+
+    def _fit_ready(self):
+        """
+        Fit symbols that just reached `min_bars` observations and backfill
+        their labels over the buffered bars; refit the ones `refit_bars`
+        observations past their last fit, keeping the labels already
+        emitted.
+        """
+        cols = np.flatnonzero(~self.fitted & (self.seen >= self.min_bars))
+        if len(cols):
+            self._fit(cols)
+        if self.refit_bars:
+            cols = np.flatnonzero(self.fitted & (self.seen - self.fitted_at >= self.refit_bars))
+            if len(cols):
+                self._fit(cols, relabel=False)
+
+    def _fit(self, cols, relabel=True):
+        # Fit on the last fit_bars, then filter every retained bar
+        obs = self.obs[:, cols].astype(float)
+        model = fit_hmm(obs[-self.fit_bars:], self.n_states)
+        _put(self.model, cols, model)
+        self.fitted[cols] = True
+        self.fitted_at[cols] = self.seen[cols]
+
+        probs, self.filter_state[cols] = hmm_filter(obs, model)
+        if relabel:
+            self.probs[-len(obs):, cols] = probs.astype(np.float32)
+
+    def refit(self, symbols=None):
+        """
+        Re-estimate the HMMs of `symbols` (default: every symbol with
+        enough bars) on their buffered bars.
+        """
+        with self._lock:
+            wanted = self.symbols if symbols is None else symbols
+            cols = [self.symbols.index(s) for s in wanted if s in self.symbols]
+            cols = np.array([j for j in cols if self.seen[j] >= self.min_bars], dtype=int)
+            if len(cols):
+                self._fit(cols)
+
+    def warm(self, close):
+        """
+        Advance over history, discarding the events.
+        """
+        self.update(close)
+        return self
+
+    def on_bar(self, symbol, timestamp, bar):
+        """
+        Streaming entry point (StreamEngine listener).
+        """
+        timestamp = pd.Timestamp(timestamp)
+        events = []
+        if self._pending[0] is not None and timestamp != self._pending[0]:
+            events = self.flush()
+        self._pending[1][symbol] = float(bar["Close"])
+        self._pending = (timestamp, self._pending[1])
+        return events
+
+    def flush(self):
+        pending_time, closes = self._pending
+        self._pending = (None, {})
+        if pending_time is None:
+            return []
+        return self.update(pd.DataFrame(closes, index=[pending_time]))
+
+    # -------------------------
+    # Results
+    # -------------------------
+    def _state_at(self, rows):
+        # Most likely state index (-1 = unknown)
+        p = self.probs[rows]
+        return np.where(np.isnan(p).any(axis=-1), -1, np.argmax(np.nan_to_num(p), axis=-1))
+
+    def _events(self, before, new_rows):
+        """
+        Regime switches and changepoints among the last `new_rows` bars.
+        """
+        rows = slice(len(self.index) - new_rows, len(self.index))
+        states = np.vstack([before[None, :], self._state_at(rows)]).astype(float)
+        states[states < 0] = np.nan
+        states = pd.DataFrame(states).ffill().to_numpy()
+
+        current, previous = states[1:], states[:-1]
+        switched = np.isfinite(current) & np.isfinite(previous) & (current != previous)
+        index = self.index[rows]
+
+        events = []
+        for i, j in zip(*np.nonzero(switched)):
+            events.append({"symbol": self.symbols[j], "bar_time": index[i], "kind": "regime",
+                           "regime": self.labels[int(current[i, j])],
+                           "previous": self.labels[int(previous[i, j])]})
+        for i, j in zip(*np.nonzero(self.flags[rows])):
+            label = self.labels[int(current[i, j])] if np.isfinite(current[i, j]) else None
+            events.append({"symbol": self.symbols[j], "bar_time": index[i],
+                           "kind": "changepoint", "regime": label})
+        return sorted(events, key=lambda e: e["bar_time"])
+
+    def frame(self, symbol):
+        """
+        Per-bar regimes of one symbol: P_<label> columns, Regime (most
+        likely label, None before the HMM is fitted), Confidence and
+        Changepoint.
+        """
+        j = self.symbols.index(symbol)
+        return regime_frame(self.index, self.probs[:, j].astype(float), self.flags[:, j],
+                            self.labels)
+
+    def current(self):
+        """
+        Latest regime per symbol (one row per symbol).
+        """
+        rows = []
+        for symbol in self.symbols:
+            summary = regime_summary(self.frame(symbol))
+            rows.append({"symbol": symbol, **{k: summary[k] for k in
+                         ("regime", "confidence", "since", "last_changepoint")}})
+        return pd.DataFrame(rows).set_index("symbol")
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(symbols, timeframe="1d"):
+    """
+    Process-wide tracker for (symbols, timeframe), configured from
+    util.config.
+    """
+    from util.config import REGIME_CHANGEPOINT, REGIME_FIT_BARS, REGIME_STATES
+
+    key = (tuple(symbols), timeframe or "1d")
+    with _trackers_lock:
+        if key not in _trackers:
+            _trackers[key] = RegimeTracker(symbols, REGIME_STATES, REGIME_CHANGEPOINT,
+                                           REGIME_FIT_BARS)
+        return _trackers[key]
+
+
+# -------------------------------------------------
+# Per-symbol frames (results store / pages)
+# -------------------------------------------------
+def regime_frame(index, probs, flags, labels):
+    frame = pd.DataFrame(probs, index=index, columns=[f"P_{label}" for label in labels])
+    known = ~np.isnan(probs).any(axis=1)
+    best = np.argmax(np.nan_to_num(probs, nan=-1.0), axis=1)
+    frame["Regime"] = pd.Series(np.array(labels, dtype=object)[best], index=index).where(known, None)
+    frame["Confidence"] = np.where(known, np.nanmax(np.where(known[:, None], probs, 0.0), axis=1), np.nan)
+    frame["Changepoint"] = flags.astype(bool)
+    return frame
+
+
+@instrument("regimes.detect")
+def detect_regimes(close, n_states=3, changepoint="cusum", fit_bars=1000):
+    """
+    Regime frame (see RegimeTracker.frame) for one close series: the HMM
+    is fitted on the last `fit_bars` bars and filtered over the whole
+    series.
+    """
+    symbol = close.name or "close"
+    tracker = RegimeTracker([symbol], n_states, changepoint, fit_bars,
+                            min_bars=min(250, max(len(close) // 2, 50)), history=len(close))
+    tracker.update(close.to_frame(symbol).astype(float))
+    return tracker.frame(symbol)
+
+
+def regime_spans(frame):
+    """
+    Contiguous runs of one regime as rows (start, end, regime), for
+    chart overlays.
+    """
+    regime = frame["Regime"].dropna()
+    run = (regime != regime.shift()).cumsum().to_numpy()
+    bars = pd.DataFrame({"date": regime.index, "regime": regime.to_numpy()})
+    spans = bars.groupby(run).agg(start=("date", "first"), end=("date", "last"),
+                                  regime=("regime", "first"))
+    return spans.reset_index(drop=True)
+
+
+def regime_summary(frame):
+    """
+    Current regime, when it started, its confidence, the share of bars
+    per regime and the changepoints of a regime frame.
+    """
+    regime = frame["Regime"].dropna()
+    changepoints = frame.index[frame["Changepoint"].to_numpy(dtype=bool)]
+    summary = {
+        "regime": None, "confidence": None, "since": None,
+        "share": {}, "changepoints": len(changepoints),
+        "last_changepoint": changepoints[-1] if len(changepoints) else None,
+    }
+    if regime.empty:
+        return summary
+
+    spans = regime_spans(frame)
+    summary.update({
+        "regime": regime.iloc[-1],
+        "confidence": float(frame["Confidence"].loc[regime.index[-1]]),
+        "since": spans["start"].iloc[-1],
+        "share": regime.value_counts(normalize=True).to_dict(),
+    })
+    return summary
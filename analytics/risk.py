@@ -0,0 +1,265 @@
+# =========================================================
+# risk.py
+# Monte Carlo / bootstrap risk engine (no Streamlit)
+#
+# Simulates joint log-return paths for a set of assets, chunk by chunk,
+# and keeps only per-path summaries (terminal return, max drawdown) and
+# per-step histograms for probability cones. Memory is bounded by the
+# chunk budget, not by paths x steps x assets; shards can run in a
+# process pool and are merged exactly.
+# =========================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from util.metrics import instrument
+
+MODELS = ("bootstrap", "block_bootstrap", "normal", "student_t")
+
+CONE_BINS = 512
+CONE_RANGE = 8.0  # histogram spans +-8 sigma * sqrt(step) around zero
+
+
+# -------------------------------------------------
+# Path generators: (rng, n_paths) -> log returns (n_paths, steps, assets)
+# -------------------------------------------------
+def _bootstrap(log_returns, steps, block_size, rng, n):
+    idx = rng.integers(0, len(log_returns), size=(n, steps))
+    return log_returns[idx]
+
+
+def _block_bootstrap(log_returns, steps, block_size, rng, n):
+    """
+    Moving-block bootstrap: contiguous blocks keep volatility clustering
+    and short-range autocorrelation.
+    """
+    block_size = min(block_size, len(log_returns))
+    n_blocks = -(-steps // block_size)
+    starts = rng.integers(0, len(log_returns) - block_size + 1, size=(n, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n, -1)[:, :steps]
+    return log_returns[idx]
+
+
+def _parametric(mean, chol, steps, dof, rng, n):
+    z = rng.standard_normal((n, steps, len(mean)))
+    if dof:
+        # Student-t with the same covariance: scale by sqrt((dof - 2) / chi2)
+        z *= np.sqrt((dof - 2) / rng.chisquare(dof, size=(n, steps, 1)))
+    shocks = z @ chol.T
+    shocks += mean
+    return shocks
+
+
+# -------------------------------------------------
+# Per-chunk summaries
+# -------------------------------------------------
+def _max_drawdown(cum):
+    """
+    Worst peak-to-trough simple return along axis 1 (the start counts as
+    a peak).
+    """
+    peak = np.maximum.accumulate(cum, axis=1)
+    np.maximum(peak, 0, out=peak)
+    np.subtract(cum, peak, out=peak)
+    return np.expm1(peak.min(axis=1))
+
+
+def _histogram(cum, scale):
+    """
+    Counts of cum (n, steps, k) in CONE_BINS bins per (step, k), with bin
+    edges at +-CONE_RANGE * scale[step, k].
+    """
+    _, steps, k = cum.shape
+    pos = cum / scale
+    pos += CONE_RANGE
+    pos *= CONE_BINS / (2 * CONE_RANGE)
+    np.clip(pos, 0, CONE_BINS - 1, out=pos)
+    bins = pos.astype(np.int32)
+    del pos
+    bins += (np.arange(steps * k, dtype=np.int32) * CONE_BINS).reshape(steps, k)
+    return np.bincount(bins.ravel(), minlength=steps * k * CONE_BINS).reshape(steps, k, CONE_BINS)
+
+
+def _simulate_shard(spec, n_paths, seed):
+    """
+    Run `n_paths` paths in memory-bounded chunks; returns mergeable
+    summaries (terminal and drawdown arrays, cone histograms).
+    """
+    rng = np.random.default_rng(seed)
+    steps, weights = spec["steps"], spec["weights"]
+    n_assets = len(weights)
+
+    # Peak working set per path, in float64 values per (step, column):
+    # cum, one same-sized temporary (parametric shocks, drawdown peaks,
+    # histogram positions) plus its int32 bin indices, and the
+    # portfolio's exp(cum) with its columns
+    bytes_per_path = steps * 8 * (3.5 * n_assets + 2)
+    # The cone histograms and one chunk's counts are fixed costs
+    hist_bytes = 2 * steps * (n_assets + 1) * CONE_BINS * 8
+    budget = max(spec["memory_mb"] * 1e6 - hist_bytes, 0)
+    chunk = max(1, min(n_paths, int(budget // bytes_per_path)))
+
+    terminal, drawdown = [], []
+    hist = np.zeros((steps, n_assets + 1, CONE_BINS), dtype=np.int64)
+
+    for start in range(0, n_paths, chunk):
+        n = min(chunk, n_paths - start)
+
+        if spec["model"] in ("normal", "student_t"):
+            cum = _parametric(spec["mean"], spec["chol"], steps, spec["dof"], rng, n)
+        else:
+            generate = _bootstrap if spec["model"] == "bootstrap" else _block_bootstrap
+            cum = generate(spec["log_returns"], steps, spec["block_size"], rng, n)
+        np.cumsum(cum, axis=1, out=cum)
+
+        # Buy-and-hold portfolio of the simulated assets
+        portfolio = np.log(np.exp(cum) @ weights)[:, :, None]
+
+        terminal.append(np.expm1(np.concatenate([cum[:, -1], portfolio[:, -1]], axis=1)))
+        drawdown.append(np.concatenate([_max_drawdown(cum), _max_drawdown(portfolio)], axis=1))
+        hist[:, :n_assets] += _histogram(cum, spec["scale"][:, :n_assets])
+        hist[:, n_assets:] += _histogram(portfolio, spec["scale"][:, n_assets:])
+
+    return np.concatenate(terminal), np.concatenate(drawdown), hist
+
+
+# -------------------------------------------------
+# Engine
+# -------------------------------------------------
+@instrument("simulate_paths")
+def simulate(log_returns, n_paths=10_000, steps=30, model="block_bootstrap", weights=None,
+             block_size=10, dof=4, seed=0, memory_mb=256, workers=None):
+    """
+    Simulate `n_paths` joint paths of `steps` bars from historical log
+    returns (T x assets DataFrame).
+
+    model: bootstrap (iid rows), block_bootstrap (moving blocks),
+           normal or student_t (correlated shocks, fitted mean/covariance).
+    weights: buy-and-hold portfolio weights (default equal weight); the
+             portfolio is reported as an extra "Portfolio" column.
+    workers: shard paths over a process pool (None/1 = in-process).
+
+    Returns a dict with "terminal" and "max_drawdown" (paths x columns
+    DataFrames of simple returns) and "cone" (histograms, see
+    probability_cone).
+    """
+    if model not in MODELS:
+        raise ValueError(f"unknown model {model!r}; use one of {MODELS}")
+
+    log_returns = log_returns.dropna()
+    columns = list(log_returns.columns) + ["Portfolio"]
+    data = log_returns.to_numpy(dtype=float)
+    n_assets = data.shape[1]
+
+    weights = np.full(n_assets, 1 / n_assets) if weights is None else np.asarray(weights, float)
+    weights = weights / weights.sum()
+
+    mean = data.mean(axis=0)
+    cov = np.atleast_2d(np.cov(data, rowvar=False))
+    sigma = np.sqrt(np.append(np.diag(cov), weights @ cov @ weights))
+    spec = {
+        "model": model,
+        "steps": steps,
+        "weights": weights,
+        "block_size": block_size,
+        "dof": dof if model == "student_t" else None,
+        "memory_mb": memory_mb,
+        "log_returns": data,
+        "mean": mean,
+        "chol": np.linalg.cholesky(cov + 1e-12 * np.eye(n_assets)),
+        "scale": np.sqrt(np.arange(1, steps + 1))[:, None] * np.maximum(sigma, 1e-12),
+    }
+
+    seeds = np.random.SeedSequence(seed).spawn(workers or 1)
+    shards = np.array_split(np.arange(n_paths), len(seeds))
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_shard, [spec] * len(seeds),
+                                  [len(s) for s in shards], seeds))
+    else:
+        parts = [_simulate_shard(spec, len(shards[0]), seeds[0])]
+
+    return {
+        "terminal": pd.DataFrame(np.concatenate([p[0] for p in parts]), columns=columns),
+        "max_drawdown": pd.DataFrame(np.concatenate([p[1] for p in parts]), columns=columns),
+        "cone": {
+            "hist": sum(p[2] for p in parts),
+            "scale": spec["scale"],
+            "columns": columns,
+        },
+    }
+
+
+def default_workers():
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+# -------------------------------------------------
+# Risk measures
+# -------------------------------------------------
+def value_at_risk(returns, level=0.95):
+    """
+    Historical VaR: loss not exceeded with probability `level` (positive
+    number = loss).
+    """
+    return -np.quantile(returns, 1 - level, axis=0)
+
+
+def conditional_var(returns, level=0.95):
+    """
+    Expected shortfall: mean loss in the worst (1 - level) tail.
+    """
+    returns = np.asarray(returns)
+    cutoff = np.quantile(returns, 1 - level, axis=0)
+    tail = np.where(returns <= cutoff, returns, np.nan)
+    return -np.nanmean(tail, axis=0)
+
+
+def risk_summary(result, levels=(0.95, 0.99), drawdown_thresholds=(0.2, 0.5)):
+    """
+    One row per asset (plus Portfolio): expected return, VaR/CVaR at each
+    level, and the max-drawdown distribution.
+    """
+    terminal, drawdown = result["terminal"], result["max_drawdown"]
+
+    summary = {"Expected Return": terminal.mean()}
+    for level in levels:
+        pct = f"{level:.0%}"
+        summary[f"VaR {pct}"] = pd.Series(value_at_risk(terminal, level), terminal.columns)
+        summary[f"CVaR {pct}"] = pd.Series(conditional_var(terminal, level), terminal.columns)
+
+    summary["Median Max Drawdown"] = drawdown.median()
+    summary["95% Max Drawdown"] = drawdown.quantile(0.05)
+    for threshold in drawdown_thresholds:
+        summary[f"P(Drawdown > {threshold:.0%})"] = (drawdown < -threshold).mean()
+
+    return pd.DataFrame(summary)
+
+
+def probability_cone(result, column, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), start_price=1.0):
+    """
+    Price quantiles per step for one column (asset or "Portfolio"),
+    interpolated within the simulation histograms.
+    """
+    cone = result["cone"]
+    j = cone["columns"].index(column)
+    hist = cone["hist"][:, j, :]
+    scale = cone["scale"][:, j]
+
+    cdf = np.cumsum(hist, axis=1) / hist.sum(axis=1, keepdims=True)
+    width = 2 * CONE_RANGE / CONE_BINS
+
+    out = {}
+    for q in quantiles:
+        b = (cdf < q).sum(axis=1)
+        below = np.where(b > 0, cdf[np.arange(len(b)), np.maximum(b - 1, 0)], 0.0)
+        inside = hist[np.arange(len(b)), b] / hist.sum(axis=1)
+        frac = np.where(inside > 0, (q - below) / np.where(inside > 0, inside, 1), 0.5)
+        z = -CONE_RANGE + (b + frac) * width
+        out[q] = start_price * np.exp(z * scale)
+
+    return pd.DataFrame(out, index=pd.RangeIndex(1, len(scale) + 1, name="Step"))
@@ -0,0 +1,251 @@
+# =========================================================
+# scheduler.py
+# Periodically refreshes the results store the dashboard reads from
+#
+# Usage (from the repository root):
+#   python -m analytics.scheduler --all-cached --interval 3600
+#   python -m analytics.scheduler --symbols BTC-USD ETH-USD --once
+#   python -m analytics.scheduler --all-cached --alerts --interval 86400
+#   python -m analytics.scheduler --symbols BTC-USD ETH-USD --tune --interval 86400
+#   python -m analytics.scheduler --all-cached --regimes --interval 3600
+#   python -m analytics.scheduler --all-cached --refresh-data --interval 86400
+#   python -m analytics.scheduler --watchlists --interval 3600
+#   python -m analytics.scheduler --all-cached --alerts --sentiment --interval 3600
+# =========================================================
+
+import argparse
+import os
+import sys
+import time
+
+from analytics.alert_engine import AlertEngine
+from analytics.batch import REPORTS_DIR, cached_symbols, run_batch
+from analytics.compute import store_key
+from analytics.models import MODELS
+from analytics.regimes import RegimeTracker
+from analytics.screen_engine import load_wide
+from analytics.tuning import tune_symbol
+from auth.database import get_alert_rules, watched_symbols
+from data.results_store import begin_snapshot, prune_snapshots, publish_snapshot, put_results
+
+
+def check_alerts(engine, symbols):
+    """
+    Evaluate alert rules on the daily bars that arrived since the last
+    cycle. The engine is kept on disk, so after a restart the bars that
+    arrived while the scheduler was down are evaluated too; only a new
+    engine (first run or a changed universe) just warms up state.
+    """
+    from util.config import ALERTS_STATE_FILE
+
+    if engine is None and os.path.exists(ALERTS_STATE_FILE):
+        engine = AlertEngine.load(ALERTS_STATE_FILE)
+
+    if engine is None or engine.symbols != list(symbols):
+        engine = AlertEngine.from_database(symbols, "1d")
+        engine.warm(load_wide(symbols)["Close"])
+        fired = []
+    else:
+        engine.set_rules(get_alert_rules(enabled_only=True))
+        fired = engine.update(load_wide(symbols, since=engine.last_time)["Close"])
+
+    os.makedirs(os.path.dirname(ALERTS_STATE_FILE) or ".", exist_ok=True)
+    engine.save(ALERTS_STATE_FILE)
+    return engine, fired
+
+
+def check_sentiment(engine, symbols):
+    """
+    Score the latest headlines of every configured coin in `symbols`
+    (one score per story, see analytics.news_dedup), store the score in
+    the screener and fire sentiment_shift rules, whether or not anyone
+    opens the Sentiment page. The previous scores are restored from the
+    screener after a restart.
+    """
+    from analytics.news_dedup import cluster_news, weighted_sentiment
+    from data.newsfetcher import fetch_news
+    from data.screener_store import create_screener_table, query, set_sentiment
+    from util.config import CRYPTO_LIST
+
+    if engine is None or engine.symbols != list(symbols):
+        engine = AlertEngine.from_database(symbols, "1d")
+        create_screener_table()
+        stored = query(order_by="sentiment", limit=None)["sentiment"]
+        engine.sentiment = {s: v for s, v in stored.items() if s in symbols}
+    else:
+        engine.set_rules(get_alert_rules(enabled_only=True))
+
+    fired = []
+    for name, symbol in CRYPTO_LIST.items():
+        if symbol not in symbols:
+            continue
+        news = fetch_news(name, limit=25)
+        if news.empty:
+            continue
+        score = weighted_sentiment(cluster_news(news))
+        set_sentiment(symbol, score)
+        fired += engine.on_sentiment(symbol, score)
+    return engine, fired
+
+
+def check_regimes(tracker, symbols):
+    """
+    Advance the regime tracker over the daily bars that arrived since the
+    last cycle and publish every symbol's regime frame. The tracker is
+    kept on disk, so a restart resumes without refitting; a changed
+    universe starts a new one.
+    """
+    from util.config import REGIME_CHANGEPOINT, REGIME_FIT_BARS, REGIME_STATE_FILE, REGIME_STATES
+
+    if tracker is None and os.path.exists(REGIME_STATE_FILE):
+        tracker = RegimeTracker.load(REGIME_STATE_FILE)
+    if tracker is None or tracker.symbols != list(symbols):
+        tracker = RegimeTracker(symbols, REGIME_STATES, REGIME_CHANGEPOINT, REGIME_FIT_BARS)
+
+    events = tracker.update(load_wide(symbols, since=tracker.last_time)["Close"])
+    os.makedirs(os.path.dirname(REGIME_STATE_FILE) or ".", exist_ok=True)
+    tracker.save(REGIME_STATE_FILE)
+
+    snapshot_id = begin_snapshot(note="regimes")
+    for symbol in tracker.symbols:
+        put_results(store_key(symbol), tracker.last_time, {("regimes", ""): tracker.frame(symbol)},
+                    snapshot_id)
+    publish_snapshot(snapshot_id)
+    prune_snapshots()
+    return tracker, events
+
+
+def refresh_symbols(symbols):
+    """
+    Commit a new raw data version for every symbol the provider has new
+    or revised bars for (see data/versions.py).
+    """
+    from data.data_fetcher import refresh_raw_data
+
+    for symbol in symbols:
+        try:
+            version, rows = refresh_raw_data(symbol)
+            if rows:
+                print(f"[scheduler] {symbol}: data version {version} ({rows} rows)", flush=True)
+        except Exception as exc:
+            print(f"[scheduler] refreshing {symbol} failed: {exc}", file=sys.stderr, flush=True)
+
+
+def tune_symbols(symbols):
+    """
+    Re-tune Prophet for `symbols` (only new folds / configurations are
+    fitted thanks to the fold cache).
+    """
+    from util.config import TUNING_BUDGET_SECONDS, TUNING_WORKERS
+
+    for symbol in symbols:
+        try:
+            tune_symbol(symbol, workers=TUNING_WORKERS, budget=TUNING_BUDGET_SECONDS)
+        except Exception as exc:
+            print(f"[scheduler] tuning {symbol} failed: {exc}", file=sys.stderr, flush=True)
+
+
+def run_scheduler(symbols_fn, interval, workers=None, prophet=False, report=False,
+                  keep=3, timeframes=("1d",), models=(), once=False, alerts=False, tune=False,
+                  regimes=False, refresh_data=False, sentiment=False):
+    """
+    Build and publish a new snapshot every `interval` seconds. The symbol
+    list is re-resolved on each cycle so newly cached coins are picked up.
+    """
+    alert_engine = regime_tracker = sentiment_engine = None
+
+    while True:
+        started = time.monotonic()
+        symbols = symbols_fn()
+        print(f"[scheduler] refreshing {len(symbols)} symbols", flush=True)
+
+        if refresh_data:
+            refresh_symbols(symbols)
+
+        # Tune first so the Prophet forecasts of this cycle use the new parameters
+        if tune:
+            tune_symbols(symbols)
+
+        try:
+            run_batch(symbols, out_dir=REPORTS_DIR, workers=workers, prophet=prophet,
+                      report=report, keep=keep, timeframes=timeframes, models=models)
+        except Exception as exc:
+            print(f"[scheduler] cycle failed: {exc}", file=sys.stderr, flush=True)
+
+        if alerts:
+            try:
+                alert_engine, fired = check_alerts(alert_engine, symbols)
+                print(f"[scheduler] {len(fired)} alerts fired", flush=True)
+            except Exception as exc:
+                print(f"[scheduler] alerts failed: {exc}", file=sys.stderr, flush=True)
+
+        if sentiment:
+            try:
+                sentiment_engine, fired = check_sentiment(sentiment_engine, symbols)
+                print(f"[scheduler] {len(fired)} sentiment alerts fired", flush=True)
+            except Exception as exc:
+                print(f"[scheduler] sentiment failed: {exc}", file=sys.stderr, flush=True)
+
+        if regimes:
+            try:
+                regime_tracker, events = check_regimes(regime_tracker, symbols)
+                switches = sum(e["kind"] == "regime" for e in events)
+                print(f"[scheduler] {switches} regime switches, "
+                      f"{len(events) - switches} changepoints", flush=True)
+            except Exception as exc:
+                print(f"[scheduler] regimes failed: {exc}", file=sys.stderr, flush=True)
+
+        if once:
+            return
+
+        elapsed = time.monotonic() - started
+        time.sleep(max(interval - elapsed, 0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the results store fresh.")
+    parser.add_argument("--symbols", nargs="+", help="symbols to refresh")
+    parser.add_argument("--all-cached", action="store_true", help="every symbol in the price cache")
+    parser.add_argument("--watchlists", action="store_true",
+                        help="every symbol on a user's watchlist (each once)")
+    parser.add_argument("--interval", type=int, default=3600, help="seconds between refreshes")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--prophet", action="store_true", help="also materialize Prophet forecasts")
+    parser.add_argument("--report", action="store_true", help="also write HTML/PNG reports")
+    parser.add_argument("--keep", type=int, default=3, help="published snapshots to retain")
+    parser.add_argument("--timeframes", nargs="+", default=["1d"],
+                        help="bar timeframes to materialize, e.g. 1h 4h 1d 1w")
+    parser.add_argument("--models", nargs="+", default=[], choices=sorted(MODELS),
+                        help="cheap forecasting models to run for every symbol")
+    parser.add_argument("--alerts", action="store_true", help="evaluate alert rules on new bars")
+    parser.add_argument("--tune", action="store_true", help="re-tune Prophet parameters each cycle")
+    parser.add_argument("--sentiment", action="store_true",
+                        help="score the latest news and evaluate sentiment_shift rules")
+    parser.add_argument("--regimes", action="store_true",
+                        help="advance regime labels / changepoints on new bars")
+    parser.add_argument("--refresh-data", action="store_true",
+                        help="fetch new bars and commit a new data version each cycle")
+    parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    args = parser.parse_args(argv)
+
+    if not args.symbols and not args.all_cached and not args.watchlists:
+        parser.error("give --symbols, --all-cached or --watchlists")
+
+    def symbols_fn():
+        symbols = list(args.symbols or [])
+        if args.all_cached:
+            symbols += cached_symbols()
+        if args.watchlists:
+            symbols += watched_symbols()
+        return list(dict.fromkeys(symbols))
+
+    run_scheduler(symbols_fn, args.interval, workers=args.workers, prophet=args.prophet,
+                  report=args.report, keep=args.keep, timeframes=args.timeframes,
+                  models=args.models, once=args.once, alerts=args.alerts, tune=args.tune,
+                  regimes=args.regimes, refresh_data=args.refresh_data,
+                  sentiment=args.sentiment)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# =========================================================
+# screen_engine.py
+# Maintains the screener table (data/screener_store.py) for a universe
+#
+# ScreenerUpdater keeps a short tail of closes / volumes, running
+# drawdown state and indicator states for every symbol, so new bars
+# update the screen in O(new bars x symbols) instead of recomputing
+# each symbol's history. The updater is persisted next to the screener
+# database; refresh_screener() (batch runs, the scheduler, the page)
+# applies only the bars that arrived since it was saved.
+#
+# Usage (from the repository root):
+#   python -m analytics.screen_engine --build --all-cached
+#   python -m analytics.screen_engine --sort return_30 --where "volatility_30 < 0.8" --top 20
+# =========================================================
+
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+from analytics.indicators import IndicatorEngine
+from data import screener_store
+from data.bars import OHLCV, annualization_factor
+from data.screener_store import (
+    METRIC_COLUMNS,
+    create_screener_table,
+    query,
+    upsert_rows,
+)
+from util.metrics import instrument
+
+SCREEN_INDICATORS = {
+    "rsi": {"window": 14},
+    "macd": {},
+    "adx": {"window": 14},
+    "atr": {"window": 14},
+}
+
+TAIL = 31  # bars kept per symbol: 30-bar returns / volatility
+
+
+class ScreenerUpdater:
+    """
+    Incremental screener maintenance for a fixed symbol universe.
+
+    initialize(wide) computes everything from full history; update(wide)
+    takes only the new bars (same symbols) and upserts the rows of the
+    symbols that received one.
+    """
+
+    def __init__(self, timeframe="1d", db_path=None):
+        self.timeframe = timeframe
+        self.db_path = db_path
+        self.engine = IndicatorEngine(SCREEN_INDICATORS)
+        self.symbols = None
+        self.last_time = None
+
+    def initialize(self, wide):
+        self.symbols = list(wide["Close"].columns)
+        n = len(self.symbols)
+        self.close_tail = np.full((0, n), np.nan)
+        self.volume_tail = np.full((0, n), np.nan)
+        self.last_close = np.full(n, np.nan)
+        self.peak = np.full(n, np.nan)
+        self.max_drawdown = np.zeros(n)
+
+        create_screener_table(self.db_path)
+        indicators = self.engine.compute(wide)
+        return self._advance(wide, indicators)
+
+    def update(self, wide):
+        """
+        Apply new bars. Symbols outside the initialized universe are
+        ignored (re-initialize to add listings).
+        """
+        wide = {c: wide[c].reindex(columns=self.symbols) for c in OHLCV}
+        indicators = self.engine.update(wide)
+        return self._advance(wide, indicators)
+
+    @instrument("screener.update")
+    def _advance(self, wide, indicators):
+        close = wide["Close"].to_numpy(dtype=float)
+        volume = wide["Volume"].to_numpy(dtype=float)
+        touched = np.isfinite(close).any(axis=0)
+
+        # Forward-fill within the new rows from the last known close
+        filled = pd.DataFrame(np.vstack([self.last_close[None, :], close])).ffill().to_numpy()[1:]
+        self.last_close = filled[-1] if len(filled) else self.last_close
+
+        # Running peak / max drawdown
+        peaks = np.fmax.accumulate(np.vstack([self.peak[None, :], filled]), axis=0)[1:]
+        with np.errstate(invalid="ignore"):
+            drawdown = np.nanmin(np.vstack([filled / peaks - 1, self.max_drawdown[None, :]]), axis=0)
+        self.peak = peaks[-1] if len(peaks) else self.peak
+        self.max_drawdown = np.where(np.isnan(drawdown), self.max_drawdown, drawdown)
+
+        if len(close):
+            self.last_time = wide["Close"].index[-1]
+        self.close_tail = np.vstack([self.close_tail, filled])[-TAIL:]
+        self.volume_tail = np.vstack([self.volume_tail, np.where(np.isfinite(close), volume, np.nan)])[-TAIL:]
+
+        latest = self.engine.latest(indicators)
+        rows = self._rows(latest, wide["Close"].index[-1] if len(close) else None, touched)
+        upsert_rows(rows, self.timeframe, self.db_path)
+        return rows
+
+    def _returns(self, k):
+        if len(self.close_tail) <= k:
+            return np.full(len(self.symbols), np.nan)
+        return self.close_tail[-1] / self.close_tail[-1 - k] - 1
+
+    def _rows(self, latest, as_of, touched):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            log_ret = np.diff(np.log(self.close_tail), axis=0)
+            vol = (np.nanstd(log_ret, axis=0, ddof=1) * annualization_factor(self.timeframe)
+                   if len(log_ret) > 2 else np.full(len(self.symbols), np.nan))
+            volume = np.nanmean(self.volume_tail[-30:], axis=0) if len(self.volume_tail) else vol * np.nan
+
+        metrics = {
+            "close": self.last_close,
+            "return_1": self._returns(1),
+            "return_7": self._returns(7),
+            "return_30": self._returns(30),
+            "volatility_30": vol,
+            "max_drawdown": self.max_drawdown,
+            "rsi_14": latest["RSI_14"].to_numpy(),
+            "macd_hist": latest["MACD_Hist"].to_numpy(),
+            "adx_14": latest["ADX_14"].to_numpy(),
+            "atr_pct": latest["ATR_14"].to_numpy() / self.last_close,
+            "volume_avg_30": volume,
+        }
+
+        return [
+            {"symbol": s, "as_of": as_of, **{k: v[j] for k, v in metrics.items()}}
+            for j, s in enumerate(self.symbols)
+            if touched[j]
+        ]
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+# -------------------------------------------------
+# Full build from the price cache
+# -------------------------------------------------
+def load_wide(symbols, timeframe=None, since=None):
+    """
+    Clean OHLCV bars for many symbols as {column: Date x Symbol frame},
+    only from `since` on when given (incremental consumers pass their
+    last processed bar, so a cycle costs the new bars, not the history).
+    """
+    from data.data_preprocessing import get_bars
+
+    frames = {}
+    for symbol in symbols:
+        try:
+            frames[symbol] = get_bars(symbol, timeframe, since=since)
+        except Exception as exc:
+            print(f"[screener] skipping {symbol}: {exc}", file=sys.stderr)
+
+    return {
+        c: pd.concat([df[c] for df in frames.values()], axis=1, keys=list(frames)).sort_index()
+        for c in OHLCV
+    }
+
+
+def state_path(timeframe="1d", db_path=None):
+    """
+    Where the updater of `timeframe` is persisted (beside the database).
+    """
+    return f"{os.path.splitext(db_path or screener_store.SCREENER_DB)[0]}-{timeframe}.pkl"
+
+
+@instrument("screener.build")
+def build_screener(symbols, timeframe="1d", db_path=None, wide=None):
+    """
+    Recompute the screener rows of `symbols` from full history, persist
+    the updater and return it (ready for incremental updates).
+    """
+    updater = ScreenerUpdater(timeframe, db_path)
+    updater.initialize(wide if wide is not None
+                       else load_wide(symbols, None if timeframe == "1d" else timeframe))
+    os.makedirs(os.path.dirname(state_path(timeframe, db_path)) or ".", exist_ok=True)
+    updater.save(state_path(timeframe, db_path))
+    return updater
+
+
+def _can_resume(updater, symbols, wide):
+    """
+    True when `wide` (bars from the updater's last one on) extends the
+    history it has seen: same universe, and the closes at its last bar
+    are unchanged (no data revision).
+    """
+    close = wide["Close"]
+    if updater.last_time not in close.index:
+        return False
+    if not set(close.columns) <= set(updater.symbols) <= set(symbols):
+        return False
+    seen = close.loc[updater.last_time].reindex(updater.symbols).to_numpy(dtype=float)
+    traded = np.isfinite(seen)
+    return np.allclose(seen[traded], updater.last_close[traded], rtol=1e-6)
+
+
+@instrument("screener.refresh")
+def refresh_screener(symbols, timeframe="1d", db_path=None):
+    """
+    Bring the screener rows of `symbols` up to date by feeding the
+    persisted updater only the bars newer than its last one. A changed
+    universe, a missing state or revised history falls back to a full
+    build. Returns the number of new bars applied (None after a build).
+    """
+    bar_timeframe = None if timeframe == "1d" else timeframe
+    path = state_path(timeframe, db_path)
+    try:
+        updater = ScreenerUpdater.load(path)
+    except (OSError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+        updater = None
+
+    if updater is not None and updater.timeframe == timeframe and updater.last_time is not None:
+        wide = load_wide(symbols, bar_timeframe, since=updater.last_time)
+        if _can_resume(updater, symbols, wide):
+            updater.db_path = db_path
+            new = {c: frame[frame.index > updater.last_time] for c, frame in wide.items()}
+            if len(new["Close"]):
+                updater.update(new)
+                updater.save(path)
+            return len(new["Close"])
+
+    build_screener(symbols, timeframe, db_path, wide=load_wide(symbols, bar_timeframe))
+    return None
+
+
+def parse_filter(text):
+    """
+    "volatility_30 < 0.8" -> ("volatility_30", "<", 0.8)
+    """
+    for op in ("<=", ">=", "!=", "<", ">", "="):
+        if op in text:
+            column, value = text.split(op, 1)
+            return column.strip(), op, float(value)
+    raise ValueError(f"cannot parse filter {text!r}")
+
+
+def main(argv=None):
+    from analytics.batch import cached_symbols
+
+    parser = argparse.ArgumentParser(description="Build or query the market screener.")
+    parser.add_argument("--build", action="store_true", help="rebuild rows from the price cache")
+    parser.add_argument("--symbols", nargs="+", help="symbols to build")
+    parser.add_argument("--all-cached", action="store_true", help="every symbol in the price cache")
+    parser.add_argument("--timeframe", default="1d")
+    parser.add_argument("--where", action="append", default=[], help='e.g. "rsi_14 < 30"')
+    parser.add_argument("--sort", default="return_30", choices=METRIC_COLUMNS)
+    parser.add_argument("--ascending", action="store_true")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.build:
+        symbols = list(args.symbols or []) + (cached_symbols() if args.all_cached else [])
+        if not symbols:
+            parser.error("--build needs --symbols or --all-cached")
+        build_screener(list(dict.fromkeys(symbols)), args.timeframe)
+
+    result = query([parse_filter(w) for w in args.where], args.sort, not args.ascending,
+                   args.top, args.timeframe)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import streamlit as st
+
+from analytics.batch import cached_symbols
+from analytics.screen_engine import refresh_screener
+from data.screener_store import METRIC_COLUMNS, count_symbols, query
+from util.metrics import instrument
+
+PERCENT_COLUMNS = ["return_1", "return_7", "return_30", "volatility_30", "max_drawdown", "atr_pct"]
+
+
+# -------------------------------------------------
+# Main Render Function
+# -------------------------------------------------
+@instrument("render.screener")
+def render():
+    st.title("🔎 Market Screener")
+
+    n_symbols = count_symbols()
+    st.caption(f"{n_symbols:,} symbols in the screener (daily bars).")
+
+    if st.button("🔄 Update from price cache"):
+        with st.spinner("Computing screening metrics..."):
+            refresh_screener(cached_symbols())
+        st.rerun()
+
+    if not n_symbols:
+        st.info("The screener is empty. Build it above or run the batch job "
+                "(`python -m analytics.batch --all-cached`).")
+        return
+
+    # =================================================
+    # Filters
+    # =================================================
+    st.subheader("Filters")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        max_vol = st.slider("Max annualized volatility (%)", 10, 300, 300, step=10)
+        min_momentum = st.slider("Min 30-bar return (%)", -100, 100, -100, step=5)
+    with col2:
+        rsi_low, rsi_high = st.slider("RSI (14) range", 0, 100, (0, 100))
+        min_sentiment = st.slider("Min news sentiment", -1.0, 1.0, -1.0, step=0.05)
+
+    filters = []
+    if max_vol < 300:
+        filters.append(("volatility_30", "<=", max_vol / 100))
+    if min_momentum > -100:
+        filters.append(("return_30", ">=", min_momentum / 100))
+    if rsi_low > 0:
+        filters.append(("rsi_14", ">=", rsi_low))
+    if rsi_high < 100:
+        filters.append(("rsi_14", "<=", rsi_high))
+    if min_sentiment > -1:
+        filters.append(("sentiment", ">=", min_sentiment))
+
+    col1, col2, col3 = st.columns(3)
+    order_by = col1.selectbox("Sort by", METRIC_COLUMNS, index=METRIC_COLUMNS.index("return_30"))
+    descending = col2.radio("Order", ["Descending", "Ascending"], horizontal=True) == "Descending"
+    top_k = col3.number_input("Top", min_value=5, max_value=500, value=25, step=5)
+
+    # =================================================
+    # Results
+    # =================================================
+    result = query(filters, order_by, descending, int(top_k))
+    st.subheader(f"Results ({len(result)})")
+
+    if result.empty:
+        st.warning("No symbols match the filters.")
+        return
+
+    formats = {c: "{:.2%}" for c in PERCENT_COLUMNS}
+    formats.update({"close": "{:,.4f}", "rsi_14": "{:.1f}", "adx_14": "{:.1f}",
+                    "macd_hist": "{:.4f}", "volume_avg_30": "{:,.0f}", "sentiment": "{:.2f}"})
+    st.dataframe(result.style.format(formats, na_rep="—"), use_container_width=True)
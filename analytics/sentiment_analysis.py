@@ -1,22 +1,17 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from analytics.news_dedup import analyze_sentiment, cluster_news, weighted_sentiment
 from data.newsfetcher import fetch_news
-
-
-# -------------------------------------------------
-# Utility
-# -------------------------------------------------
-def analyze_sentiment(headlines):
-    analyzer = SentimentIntensityAnalyzer()
-    return [analyzer.polarity_scores(h)["compound"] for h in headlines]
+from data.screener_store import set_sentiment
+from util.config import CRYPTO_LIST
+from util.metrics import instrument
 
 
 # -------------------------------------------------
 # Main Render Function
 # -------------------------------------------------
+@instrument("render.sentiment_analysis")
 def render():
     st.title("🧠 NLP-Based Sentiment Analysis (News)")
 
@@ -28,37 +23,39 @@ def render():
         st.warning("No news data available.")
         return
 
-    # Sentiment scores
-    news_df["sentiment_score"] = analyze_sentiment(news_df["headline"])
+    # Syndicated copies of a story share one cluster and one score
+    news_df = cluster_news(news_df, score=analyze_sentiment)
+    stories = news_df.drop_duplicates("cluster_id")
+    st.caption(f"{len(news_df)} headlines → {len(stories)} distinct stories")
 
     # Sentiment labels
-    news_df["sentiment"] = news_df["sentiment_score"].apply(
+    stories = stories.assign(sentiment=stories["sentiment_score"].apply(
         lambda x: "Positive" if x > 0.05 else "Negative" if x < -0.05 else "Neutral"
-    )
+    ))
 
     # =================================================
     # Chart 31: Sentiment Distribution
     # =================================================
     st.subheader("Sentiment Distribution")
 
-    sentiment_counts = news_df["sentiment"].value_counts()
+    sentiment_counts = stories["sentiment"].value_counts()
 
     fig, ax = plt.subplots()
     sentiment_counts.plot(kind="bar", ax=ax)
-    ax.set_ylabel("Number of Headlines")
+    ax.set_ylabel("Number of Stories")
     ax.set_title(f"{crypto} News Sentiment Distribution")
     st.pyplot(fig)
 
     # =================================================
     # Chart 32: Sentiment Score Trend
     # =================================================
-    st.subheader("Headline-wise Sentiment Scores")
+    st.subheader("Story-wise Sentiment Scores")
 
     fig, ax = plt.subplots()
-    ax.plot(news_df["sentiment_score"].values, marker="o")
+    ax.plot(stories["sentiment_score"].values, marker="o")
     ax.axhline(0, linestyle="--", color="black")
     ax.set_ylabel("Sentiment Score")
-    ax.set_title("Sentiment Polarity per Headline")
+    ax.set_title("Sentiment Polarity per Story")
     st.pyplot(fig)
 
     # =================================================
@@ -66,7 +63,10 @@ def render():
     # =================================================
     st.subheader("📌 Sentiment Insights")
 
-    avg_sentiment = news_df["sentiment_score"].mean()
+    # Weighted by coverage, sublinearly (see weighted_sentiment).
+    # sentiment_shift alerts are evaluated by the scheduler (--sentiment)
+    avg_sentiment = weighted_sentiment(news_df)
+    set_sentiment(CRYPTO_LIST[crypto], avg_sentiment)
 
     if avg_sentiment > 0.05:
         st.success("Overall market sentiment is **POSITIVE 📈**")
@@ -76,6 +76,7 @@ def render():
         st.info("Overall market sentiment is **NEUTRAL ⚖️**")
 
     st.markdown("### 📰 Recent Headlines")
-    for _, row in news_df.head(5).iterrows():
-        st.write(f"• **{row['headline']}**")
+    for _, row in stories.head(5).iterrows():
+        similar = f" (+{row['story_size'] - 1} similar)" if row["story_size"] > 1 else ""
+        st.write(f"• **{row['headline']}**{similar}")
         st.caption(f"{row['source']} | {row['published']}")
@@ -0,0 +1,288 @@
+# =========================================================
+# tuning.py
+# Prophet hyperparameter search with rolling-origin cross-validation
+#
+# Every (configuration, cutoff) fit is an independent task run in a
+# process pool; fold forecasts are cached in data/tuning_store.py by
+# data fingerprint + parameters, and cutoffs sit on a grid anchored at
+# the start of the series, so a nightly re-run after new bars only fits
+# new configurations and the newest fold. The best parameters per
+# (symbol, timeframe) are persisted for the forecasting page and jobs.
+#
+# Usage (from the repository root):
+#   python -m analytics.tuning --symbols BTC-USD ETH-USD --workers 4
+#   python -m analytics.tuning --all-cached --n-iter 20 --budget 1800
+# =========================================================
+
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data import tuning_store
+from util.metrics import instrument
+
+# Prophet's defaults are (0.05, 10.0, "additive")
+PARAM_GRID = {
+    "changepoint_prior_scale": [0.001, 0.01, 0.05, 0.1, 0.5],
+    "seasonality_prior_scale": [0.01, 0.1, 1.0, 10.0],
+    "seasonality_mode": ["additive", "multiplicative"],
+}
+DEFAULT_PARAMS = {
+    "changepoint_prior_scale": 0.05,
+    "seasonality_prior_scale": 10.0,
+    "seasonality_mode": "additive",
+}
+METRICS = ["rmse", "mae", "mape", "smape"]
+
+
+# -------------------------------------------------
+# Search space & folds
+# -------------------------------------------------
+def candidate_params(grid=None, n_iter=None, seed=0):
+    """
+    Every configuration of `grid` (or `n_iter` random ones), always
+    including Prophet's defaults as the baseline.
+    """
+    grid = grid or PARAM_GRID
+    names = sorted(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+    if n_iter is not None and n_iter < len(configs):
+        configs = random.Random(seed).sample(configs, n_iter)
+
+    baseline = {k: v for k, v in DEFAULT_PARAMS.items() if k in grid}
+    if baseline not in configs:
+        configs.insert(0, baseline)
+    return configs
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def fold_cutoffs(index, horizon, initial, period, n_folds=3):
+    """
+    The last `n_folds` cutoffs on the grid start + initial + k * period
+    that leave a full `horizon` of data after them.
+    """
+    start, end = index[0], index[-1]
+    cutoffs = []
+    cutoff = start + initial
+    while cutoff + horizon <= end:
+        cutoffs.append(cutoff)
+        cutoff += period
+    return cutoffs[-n_folds:]
+
+
+def _fingerprint(df):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+def _fit_fold(df, params, cutoff, horizon):
+    """
+    Fit Prophet on df.ds <= cutoff and forecast the next `horizon`.
+    Returns the fold frame (ds, yhat, y, cutoff) Prophet's
+    performance_metrics expects.
+    """
+    import logging
+
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    history = df[df["ds"] <= cutoff]
+    test = df[(df["ds"] > cutoff) & (df["ds"] <= cutoff + horizon)]
+
+    model = Prophet(uncertainty_samples=0, **params).fit(history)
+    yhat = model.predict(test[["ds"]])
+    return pd.DataFrame({
+        "ds": test["ds"].to_numpy(),
+        "yhat": yhat["yhat"].to_numpy(),
+        "y": test["y"].to_numpy(),
+        "cutoff": cutoff,
+    })
+
+
+def score_folds(folds, metric="rmse"):
+    """
+    `metric` over all folds and horizons (Prophet's performance_metrics).
+    """
+    from prophet.diagnostics import performance_metrics
+
+    metrics = performance_metrics(pd.concat(folds, ignore_index=True), metrics=[metric],
+                                  rolling_window=1)
+    return float(metrics[metric].iloc[0])
+
+
+# -------------------------------------------------
+# Search
+# -------------------------------------------------
+@instrument("tune_prophet")
+def tune_prophet(series, grid=None, n_iter=None, horizon=30, n_folds=3, initial=None,
+                 metric="rmse", workers=1, budget=None, seed=0, db_path=None):
+    """
+    Cross-validate every candidate configuration on `series` (horizon in
+    bars) and return a DataFrame of configurations sorted by `metric`
+    (column "params" holds the dict), with attrs cached / fitted /
+    timed_out counts.
+
+    Configurations whose folds did not all finish within `budget`
+    seconds are left out; their finished folds are still cached.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+
+    series = series.dropna().astype(np.float64)
+    df = pd.DataFrame({"ds": series.index, "y": series.to_numpy()})
+
+    step = series.index[-1] - series.index[-2]
+    horizon_td = step * horizon
+    if not initial:
+        # About half the series, rounded down to whole horizons so the
+        # grid (and every fold fingerprint) stays put as bars arrive
+        initial = max(len(series) // 2 // horizon, 1) * horizon
+    initial = step * initial
+    cutoffs = fold_cutoffs(series.index, horizon_td, initial, horizon_td, n_folds)
+    if not cutoffs:
+        raise ValueError(f"not enough data for {n_folds} folds of {horizon} bars")
+
+    fingerprints = {c: _fingerprint(df[df["ds"] <= c + horizon_td]) for c in cutoffs}
+    configs = candidate_params(grid, n_iter, seed)
+    tasks = {
+        (fingerprints[c], params_key(p), c.isoformat(), str(horizon_td)): (p, c)
+        for p in configs for c in cutoffs
+    }
+
+    folds = tuning_store.get_folds(list(tasks), db_path=db_path)
+    cached = len(folds)
+    missing = [key for key in tasks if key not in folds]
+
+    fitted, timed_out = {}, 0
+    deadline = time.monotonic() + budget if budget else None
+    if missing and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = {pool.submit(_fit_fold, df, *tasks[key], horizon_td): key for key in missing}
+        try:
+            timeout = max(deadline - time.monotonic(), 0) if deadline else None
+            for future in as_completed(futures, timeout=timeout):
+                if future.exception() is None:
+                    fitted[futures[future]] = future.result()
+        except FuturesTimeout:
+            timed_out = len(futures) - len(fitted)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    else:
+        for key in missing:
+            if deadline and time.monotonic() > deadline:
+                timed_out = len(missing) - len(fitted)
+                break
+            try:
+                fitted[key] = _fit_fold(df, *tasks[key], horizon_td)
+            except Exception:
+                continue
+
+    tuning_store.put_folds(fitted, db_path=db_path)
+    folds.update(fitted)
+
+    rows = []
+    for p in configs:
+        keys = [(fingerprints[c], params_key(p), c.isoformat(), str(horizon_td)) for c in cutoffs]
+        if all(k in folds for k in keys):
+            rows.append({**p, "params": p, metric: score_folds([folds[k] for k in keys], metric)})
+
+    table = pd.DataFrame(rows)
+    if not table.empty:
+        table = table.sort_values(metric).reset_index(drop=True)
+    table.attrs.update({"metric": metric, "folds": len(cutoffs), "configs": len(configs),
+                        "cached": cached, "fitted": len(fitted), "timed_out": timed_out})
+    return table
+
+
+def tune_symbol(symbol, timeframe="1d", db_path=None, **kwargs):
+    """
+    Tune Prophet for one symbol and persist its best parameters.
+    Returns the tune_prophet() table.
+    """
+    from analytics.compute import load_symbol
+
+    results = load_symbol(symbol, timeframe=timeframe)
+    price = results[("close", "")] if results else pd.Series(dtype=float)
+
+    table = tune_prophet(price, db_path=db_path, **kwargs)
+    if table.empty:
+        return table
+
+    metric = table.attrs["metric"]
+    default = table[table["params"].map(lambda p: p == {
+        k: v for k, v in DEFAULT_PARAMS.items() if k in p
+    })]
+    tuning_store.save_best_params(
+        symbol, table["params"].iloc[0], metric, table[metric].iloc[0],
+        default[metric].iloc[0] if not default.empty else None,
+        configs=len(table), folds=table.attrs["folds"], timeframe=timeframe, db_path=db_path,
+    )
+    return table
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from analytics.batch import cached_symbols
+    from util.config import FORECAST_DAYS, TUNING_BUDGET_SECONDS, TUNING_WORKERS
+
+    parser = argparse.ArgumentParser(description="Tune Prophet per symbol.")
+    parser.add_argument("--symbols", nargs="+", help="symbols to tune")
+    parser.add_argument("--all-cached", action="store_true", help="every symbol in the price cache")
+    parser.add_argument("--timeframe", default="1d")
+    parser.add_argument("--n-iter", type=int, default=None,
+                        help="random configurations to try (default: the full grid)")
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--horizon", type=int, default=FORECAST_DAYS, help="forecast horizon in bars")
+    parser.add_argument("--metric", default="rmse", choices=METRICS)
+    parser.add_argument("--workers", type=int, default=TUNING_WORKERS)
+    parser.add_argument("--budget", type=float, default=TUNING_BUDGET_SECONDS,
+                        help="seconds per symbol before unfinished configurations are dropped")
+    args = parser.parse_args(argv)
+
+    symbols = list(dict.fromkeys(
+        list(args.symbols or []) + (cached_symbols() if args.all_cached else [])
+    ))
+    if not symbols:
+        parser.error("give --symbols or --all-cached")
+
+    for symbol in symbols:
+        started = time.monotonic()
+        try:
+            table = tune_symbol(symbol, args.timeframe, n_iter=args.n_iter,
+                                horizon=args.horizon, n_folds=args.folds, metric=args.metric,
+                                workers=args.workers, budget=args.budget)
+        except Exception as exc:
+            print(f"[tuning] {symbol}: failed: {exc}", file=sys.stderr, flush=True)
+            continue
+
+        if table.empty:
+            print(f"[tuning] {symbol}: no configuration finished", flush=True)
+            continue
+        a = table.attrs
+        print(f"[tuning] {symbol}: best {args.metric}={table[args.metric].iloc[0]:.4g} "
+              f"{table['params'].iloc[0]} ({a['fitted']} fits, {a['cached']} cached, "
+              f"{a['timed_out']} timed out, {time.monotonic() - started:.0f}s)", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,23 @@
 import streamlit as st
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
 
-from data.data_preprocessing import preprocess_data
+from analytics.compute import load_symbol, results_frame, risk_return
+from analytics.portfolio import (
+    PORTFOLIOS,
+    estimate_covariance,
+    expected_returns,
+    optimize,
+    portfolio_stats,
+    random_portfolios,
+    returns_matrix,
+)
+from data.bars import infer_timeframe
+from util.config import RISK_FREE_RATE
+from util.metrics import instrument
+
+# Price fields this page uses (see results_frame)
+FIELDS = ["Returns"]
 
 
 # -------------------------------------------------
@@ -16,12 +30,22 @@ def has_enough_data(df, min_rows=50):
 # -------------------------------------------------
 # Main Render Function
 # -------------------------------------------------
+@instrument("render.volatility")
 def render():
     st.title("📉 Volatility & Risk Analysis")
 
-    # Load processed data
-    btc = preprocess_data("BTC-USD")
-    eth = preprocess_data("ETH-USD")
+    # Load precomputed results (computed inline if not materialized yet)
+    timeframe = st.session_state.get("timeframe")
+    btc_results = load_symbol("BTC-USD", timeframe=timeframe)
+    eth_results = load_symbol("ETH-USD", timeframe=timeframe)
+
+    btc = results_frame(btc_results, FIELDS)
+    eth = results_frame(eth_results, FIELDS)
+
+    assets = [
+        ("Bitcoin", btc, btc_results),
+        ("Ethereum", eth, eth_results),
+    ]
 
     # =================================================
     # Chart 9 & 10: Rolling Volatility
@@ -30,10 +54,10 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    for name, df, col in [("Bitcoin", btc, col1), ("Ethereum", eth, col2)]:
+    for (name, df, results), col in zip(assets, [col1, col2]):
         with col:
             if has_enough_data(df):
-                rolling_vol = df["Returns"].rolling(window=14).std()
+                rolling_vol = results[("rolling_volatility", "14")]
 
                 fig, ax = plt.subplots()
                 ax.plot(df.index, rolling_vol)
@@ -49,19 +73,15 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    for name, df, col in [("Bitcoin", btc, col1), ("Ethereum", eth, col2)]:
+    for (name, df, results), col in zip(assets, [col1, col2]):
         with col:
             if has_enough_data(df):
-                ma_20 = df["Close"].rolling(window=20).mean()
-                std_20 = df["Close"].rolling(window=20).std()
-
-                upper = ma_20 + 2 * std_20
-                lower = ma_20 - 2 * std_20
+                bands = results[("bollinger", "20")]
 
                 fig, ax = plt.subplots()
-                ax.plot(df.index, df["Close"], label="Price")
-                ax.plot(df.index, upper, linestyle="--", label="Upper Band")
-                ax.plot(df.index, lower, linestyle="--", label="Lower Band")
+                ax.plot(df.index, bands["Close"], label="Price")
+                ax.plot(df.index, bands["Upper"], linestyle="--", label="Upper Band")
+                ax.plot(df.index, bands["Lower"], linestyle="--", label="Lower Band")
                 ax.set_title(f"{name} Bollinger Bands")
                 ax.legend()
                 st.pyplot(fig)
@@ -73,10 +93,10 @@ def render():
 
     col1, col2 = st.columns(2)
 
-    for name, df, col in [("Bitcoin", btc, col1), ("Ethereum", eth, col2)]:
+    for (name, df, results), col in zip(assets, [col1, col2]):
         with col:
             if has_enough_data(df):
-                spread = df["High"] - df["Low"]
+                spread = results[("high_low_spread", "")]
 
                 fig, ax = plt.subplots()
                 ax.plot(df.index, spread)
@@ -91,8 +111,8 @@ def render():
     st.subheader("Volatility Comparison")
 
     vol_data = {
-        "Bitcoin": btc["Returns"].std() * np.sqrt(252),
-        "Ethereum": eth["Returns"].std() * np.sqrt(252),
+        "Bitcoin": btc_results[("annualized_volatility", "")],
+        "Ethereum": eth_results[("annualized_volatility", "")],
     }
 
     vol_df = pd.DataFrame.from_dict(vol_data, orient="index", columns=["Annualized Volatility"])
@@ -108,22 +128,67 @@ def render():
     # =================================================
     st.subheader("Risk vs Return")
 
-    risk_return = pd.DataFrame({
-        "Risk": [btc["Returns"].std(), eth["Returns"].std()],
-        "Return": [btc["Returns"].mean(), eth["Returns"].mean()]
-    }, index=["Bitcoin", "Ethereum"])
+    rr = risk_return({"Bitcoin": btc, "Ethereum": eth})
 
     fig, ax = plt.subplots()
-    ax.scatter(risk_return["Risk"], risk_return["Return"])
+    ax.scatter(rr["Risk"], rr["Return"])
 
-    for i, txt in enumerate(risk_return.index):
-        ax.annotate(txt, (risk_return["Risk"][i], risk_return["Return"][i]))
+    for name, row in rr.iterrows():
+        ax.annotate(name, (row["Risk"], row["Return"]))
 
     ax.set_xlabel("Risk (Std Dev)")
     ax.set_ylabel("Mean Return")
     ax.set_title("Risk vs Return Comparison")
     st.pyplot(fig)
 
+    # =================================================
+    # Portfolio Optimization
+    # =================================================
+    st.subheader("Portfolio Optimization")
+
+    returns = returns_matrix({"Bitcoin": btc, "Ethereum": eth})
+
+    if len(returns) >= 50:
+        estimator = st.selectbox(
+            "Covariance Estimator",
+            ["ledoit_wolf", "sample", "ewma"],
+            format_func=lambda m: {"ledoit_wolf": "Ledoit-Wolf", "sample": "Sample", "ewma": "EWMA"}[m]
+        )
+
+        tf = timeframe or infer_timeframe(returns.index)
+        cov = estimate_covariance(returns, estimator, tf)
+        mu = expected_returns(returns, tf)
+
+        portfolios = {
+            label: optimize(mu, cov, method, risk_free=RISK_FREE_RATE)
+            for label, method in PORTFOLIOS.items()
+        }
+        cloud = random_portfolios(mu, cov, 5_000, risk_free=RISK_FREE_RATE)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            fig, ax = plt.subplots()
+            points = ax.scatter(cloud["Risk"], cloud["Return"], c=cloud["Sharpe"], s=4, cmap="viridis")
+            fig.colorbar(points, ax=ax, label="Sharpe")
+
+            for label, weights in portfolios.items():
+                stats = portfolio_stats(weights, mu, cov)
+                ax.scatter(stats["Risk"], stats["Return"], marker="*", s=150, edgecolor="black")
+                ax.annotate(label, (stats["Risk"], stats["Return"]))
+
+            ax.set_xlabel("Annualized Risk")
+            ax.set_ylabel("Annualized Return")
+            ax.set_title("Monte Carlo Efficient Frontier")
+            st.pyplot(fig)
+
+        with col2:
+            table = pd.DataFrame(portfolios).T
+            stats = pd.DataFrame(
+                {label: portfolio_stats(w, mu, cov, RISK_FREE_RATE) for label, w in portfolios.items()}
+            ).T
+            st.dataframe(pd.concat([table, stats], axis=1).style.format("{:.3f}"))
+
     # =================================================
     # Chart 15: Returns Distribution
     # =================================================
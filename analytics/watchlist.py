@@ -0,0 +1,106 @@
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from analytics.watchlist_registry import default_watchlist, get_shared_results, load_watchlist, user_watchlist
+from auth.database import set_preferences, set_watchlist
+from data.data_fetcher import cached_symbols
+from util.charts import lines_chart
+from util.config import FORECAST_DAYS, WATCHLIST_MAX
+from util.metrics import instrument
+from util.rendering import Chart, get_renderer
+
+
+def save_preferences(username, **prefs):
+    """
+    Store changed page preferences for the user and this session.
+    """
+    current = st.session_state.setdefault("prefs", {})
+    changed = {k: v for k, v in prefs.items() if current.get(k) != v}
+    if changed:
+        set_preferences(username, changed)
+        current.update(changed)
+
+
+# -------------------------------------------------
+# Main Render Function
+# -------------------------------------------------
+@instrument("render.watchlist")
+def render():
+    st.title("⭐ My Watchlist")
+
+    username = st.session_state.get("username")
+    timeframe = st.session_state.get("timeframe")
+    prefs = st.session_state.get("prefs", {})
+
+    symbols = st.session_state.get("watchlist")
+    if symbols is None:
+        symbols = st.session_state["watchlist"] = user_watchlist(username)
+
+    # =================================================
+    # Edit
+    # =================================================
+    choices = list(dict.fromkeys(symbols + default_watchlist() + cached_symbols()))
+    edited = st.multiselect("Watched symbols", choices, default=symbols,
+                            max_selections=WATCHLIST_MAX)
+    if edited != symbols and st.button("💾 Save watchlist"):
+        set_watchlist(username, edited)
+        st.session_state["watchlist"] = edited
+        st.rerun()
+
+    forecasts = st.toggle(f"ARIMA forecast ({FORECAST_DAYS} bars)",
+                          value=prefs.get("watchlist_forecasts", False))
+    save_preferences(username, watchlist_forecasts=forecasts)
+
+    if not symbols:
+        st.info("Your watchlist is empty. Pick symbols above and save.")
+        return
+
+    # =================================================
+    # Summary (shared across every user watching the same symbols)
+    # =================================================
+    specs = [("summary",)] + ([("forecast", FORECAST_DAYS)] if forecasts else [])
+    # Held per session, so two tabs of one user don't evict each other
+    holder = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    watched = load_watchlist(holder, symbols, timeframe, specs)
+
+    rows = {}
+    for symbol in symbols:
+        summary = watched[symbol]["summary"]
+        if summary is None:
+            continue
+        row = dict(summary["row"])
+        fc = watched[symbol].get("forecast")
+        if fc is not None:
+            row[f"Forecast Δ {FORECAST_DAYS} bars (%)"] = (
+                fc["Forecast"].iloc[-1] / row["Last Close"] - 1
+            ) * 100
+        rows[symbol] = row
+
+    missing = [s for s in symbols if s not in rows]
+    if missing:
+        st.warning(f"No data for {', '.join(missing)}.")
+    if not rows:
+        return
+
+    st.dataframe(pd.DataFrame(rows).T, use_container_width=True)
+
+    # =================================================
+    # Relative Performance
+    # =================================================
+    st.subheader("Relative Price Growth (Normalized)")
+
+    closes = pd.DataFrame({symbol: watched[symbol]["summary"]["close"] for symbol in rows})
+    normalized = closes / closes.bfill().iloc[0]
+    st.image(get_renderer().render(Chart(
+        lines_chart, normalized, title="Watchlist Relative Price Growth",
+        xlabel="Date", ylabel="Normalized Price"
+    )), use_column_width=True)
+
+    stats = get_shared_results().stats()
+    st.caption(
+        f"{stats['entries']} cached results shared by {stats['holders']} sessions "
+        f"({stats['references']} references) · {stats['computes']} computed, "
+        f"{stats['hits']} reused, {stats['evictions']} evicted"
+    )
@@ -0,0 +1,294 @@
+# =========================================================
+# watchlist_registry.py
+# Per-user watchlists served from one shared result cache (no Streamlit)
+#
+# Watchlists live in the auth database (auth/database.py). The results
+# a watchlist shows are keyed by (symbol, timeframe, spec), never by
+# user, so a symbol watched by a hundred users is summarized once per
+# data update. Every cache entry counts the sessions whose watchlist
+# references it and is evicted as soon as the last one drops the
+# symbol, switches timeframe, logs out or goes idle. Concurrent misses on one key are single-flight:
+# the first caller computes and the others wait for its result.
+#
+# Usage (from the repository root):
+#   python -m analytics.watchlist_registry       # watched symbols and watcher counts
+# =========================================================
+
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.compute import arima_forecast, load_symbol
+from auth.database import all_watchlists, get_watchlist
+from data.data_fetcher import raw_data_signature
+from data.results_store import live_snapshot_id
+from util.config import CRYPTO_LIST, FORECAST_DAYS, WATCHLIST_IDLE_SECONDS
+from util.metrics import instrument, record_cache
+
+
+def default_watchlist():
+    return list(CRYPTO_LIST.values())
+
+
+def user_watchlist(username):
+    """
+    The user's saved watchlist, or the configured coins if they never
+    saved one.
+    """
+    symbols = get_watchlist(username)
+    return default_watchlist() if symbols is None else symbols
+
+
+# -------------------------------------------------
+# Result specs
+# -------------------------------------------------
+def summary_spec(symbol, timeframe):
+    """
+    One watchlist row (last close, KPIs, trend, current regime) and the
+    close series for the comparison chart.
+    """
+    results = load_symbol(symbol, timeframe=timeframe)
+    if not results:
+        return None
+
+    close = results[("close", "")].dropna()
+    kpis = results[("kpis", "")]
+    regimes = results.get(("regimes", ""))
+    row = {
+        "Last Close": float(close.iloc[-1]) if len(close) else np.nan,
+        "ROI (%)": kpis["roi"],
+        "Volatility": results[("annualized_volatility", "")],
+        "Max Drawdown (%)": kpis["max_drawdown"],
+        "Trend": results[("return_summary", "")]["trend"],
+        "Regime": regimes["Regime"].iloc[-1] if regimes is not None and len(regimes) else None,
+        "Bars": len(close),
+    }
+    return {"row": row, "close": close}
+
+
+def forecast_spec(symbol, timeframe, steps=FORECAST_DAYS):
+    """
+    ARIMA forecast over `steps` bars: the one the scheduler materialized,
+    else fitted here.
+    """
+    results = load_symbol(symbol, timeframe=timeframe)
+    if not results or len(results[("close", "")].dropna()) < 150:
+        return None
+
+    key = ("arima_forecast", str(steps))
+    if key in results:
+        return results[key]
+    fc, ci = arima_forecast(results[("close", "")].dropna(), steps)
+    return pd.DataFrame({"Forecast": fc, "Lower": ci.iloc[:, 0], "Upper": ci.iloc[:, 1]})
+
+
+SPECS = {
+    "summary": summary_spec,
+    "forecast": forecast_spec,
+}
+
+
+def watch_keys(symbols, timeframe=None, specs=(("summary",),)):
+    """
+    Cache keys of a watchlist: one (symbol, timeframe, spec) per symbol
+    and spec, where a spec is (name, *args) of SPECS.
+    """
+    return [(symbol, timeframe or "1d", tuple(spec)) for symbol in symbols for spec in specs]
+
+
+# -------------------------------------------------
+# Shared, reference-counted cache
+# -------------------------------------------------
+class _Flight:
+    def __init__(self, signature):
+        self.signature = signature
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+
+
+class SharedResults:
+    """
+    Process-wide results keyed by (symbol, timeframe, spec). A holder (a
+    browser session) references the keys of its watchlist through
+    watch(); only referenced keys are kept, and each is dropped once its
+    last holder lets go of it. Holders that have not called watch() for
+    `idle_seconds` are released, since closed sessions never log out.
+    """
+
+    def __init__(self, idle_seconds=WATCHLIST_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (signature, value)
+        self._refs = {}      # key -> holders referencing it
+        self._held = {}      # holder -> keys it references
+        self._seen = {}      # holder -> monotonic time of its last watch()
+        self._flights = {}   # key -> _Flight of the caller computing it
+        self.computes = self.hits = self.evictions = 0
+
+    def _set(self, holder, keys):
+        held = self._held.pop(holder, set())
+        evicted = 0
+        for key in keys - held:
+            self._refs.setdefault(key, set()).add(holder)
+        for key in held - keys:
+            refs = self._refs[key]
+            refs.discard(holder)
+            if not refs:
+                del self._refs[key]
+                evicted += self._entries.pop(key, None) is not None
+        if keys:
+            self._held[holder] = keys
+        return evicted
+
+    def watch(self, holder, keys):
+        """
+        Make `holder` reference exactly `keys`. Returns the number of
+        entries evicted because no holder references them any more.
+        """
+        keys = set(keys)
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._set(holder, keys)
+            if keys:
+                self._seen[holder] = now
+            else:
+                self._seen.pop(holder, None)
+
+            idle = [h for h, seen in self._seen.items() if now - seen > self.idle_seconds]
+            for other in idle:
+                del self._seen[other]
+                evicted += self._set(other, set())
+            self.evictions += evicted
+        return evicted
+
+    def release(self, holder):
+        """
+        Drop every reference of `holder` (e.g. on logout).
+        """
+        return self.watch(holder, ())
+
+    def refcount(self, key):
+        with self._lock:
+            return len(self._refs.get(key, ()))
+
+    def get(self, key, signature, compute):
+        """
+        The value of `key` for data `signature`, calling `compute()` at
+        most once per (key, signature) across concurrent callers. The
+        value is kept only while some holder references the key.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self.hits += 1
+                    record_cache("watchlist", True)
+                    return entry[1]
+                flight = self._flights.get(key)
+                if flight is None or flight.signature != signature:
+                    flight = self._flights[key] = _Flight(signature)
+                    break
+
+            # Another caller is computing this key; share its result
+            flight.done.wait()
+            if flight.ok:
+                record_cache("watchlist", True)
+                return flight.value
+
+        record_cache("watchlist", False)
+        try:
+            flight.value = compute()
+            flight.ok = True
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.ok:
+                    self.computes += 1
+                    if key in self._refs:
+                        self._entries[key] = (signature, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "keys": len(self._refs),
+                "holders": len(self._held),
+                "references": sum(len(refs) for refs in self._refs.values()),
+                "computes": self.computes,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_results():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedResults()
+        return _shared
+
+
+# -------------------------------------------------
+# Watchlist loading
+# -------------------------------------------------
+@instrument("load_watchlist")
+def load_watchlist(holder, symbols, timeframe=None, specs=(("summary",),), shared=None):
+    """
+    {symbol: {spec name: value}} for a watchlist, registering `holder`'s
+    (the session's) references first so entries other watchlists dropped are evicted
+    and the ones computed here are kept.
+    """
+    shared = shared or get_shared_results()
+    timeframe = timeframe or "1d"
+    keys = watch_keys(symbols, timeframe, specs)
+    shared.watch(holder, keys)
+
+    # A new results snapshot or raw data version changes the signature,
+    # so entries never outlive the data they were computed from
+    snapshot_id = live_snapshot_id()
+    out = {}
+    for symbol, _, spec in keys:
+        name, *args = spec
+        value = shared.get(
+            (symbol, timeframe, spec),
+            (snapshot_id, raw_data_signature(symbol)),
+            lambda: SPECS[name](symbol, timeframe, *args),
+        )
+        out.setdefault(symbol, {})[name] = value
+    return out
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show what users' watchlists share.")
+    parser.parse_args(argv)
+
+    watchlists = all_watchlists()
+    watchers = {}
+    for symbols in watchlists.values():
+        for symbol in symbols:
+            watchers[symbol] = watchers.get(symbol, 0) + 1
+
+    print(f"[watchlists] {len(watchlists)} watchlists, {len(watchers)} distinct symbols, "
+          f"{sum(watchers.values())} entries", flush=True)
+    for symbol, count in sorted(watchers.items(), key=lambda kv: (-kv[1], kv[0])):
+        print(f"  {symbol:<16} {count} watchers", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
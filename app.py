@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+
 import streamlit as st
 
 # =========================
@@ -21,8 +23,28 @@ from analytics import (
     volatility,
     forecasting,
     insights,
-    sentiment_analysis
+    sentiment_analysis,
+    screener,
+    alerts,
+    live,
+    watchlist,
+    admin
+)
+from analytics.watchlist_registry import get_shared_results, user_watchlist
+from auth.database import get_preferences
+from data.api import start_api_server
+from data.data_preprocessing import available_timeframes
+from util.config import (
+    ADMIN_USERS,
+    API_HOST,
+    API_PORT,
+    METRICS_PORT,
+    PROFILE_DIR,
+    PROFILE_INTERVAL_MS,
+    PROFILE_TOP_N,
 )
+from util.metrics import start_metrics_server
+from util.profiling import PROFILER_MODES, PageProfile
 
 # =========================
 # App Configuration
@@ -32,6 +54,18 @@ st.set_page_config(
     layout="wide"
 )
 
+# =========================
+# Metrics Endpoint (optional)
+# =========================
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
+
+# =========================
+# Data API (optional)
+# =========================
+if API_PORT:
+    start_api_server(API_PORT, API_HOST)
+
 # =========================
 # Session State Init
 # =========================
@@ -64,42 +98,101 @@ def dashboard():
     st.sidebar.title("📊 Dashboard")
     st.sidebar.write(f"👤 User: {st.session_state.username}")
 
+    # Saved watchlist and page preferences, loaded once per session
+    if st.session_state.get("prefs") is None:
+        st.session_state.prefs = get_preferences(st.session_state.username)
+        st.session_state.watchlist = user_watchlist(st.session_state.username)
+    prefs = st.session_state.prefs
+
+    pages = [
+        "EDA",
+        "Volatility Analysis",
+        "Forecasting",
+        "Insights",
+        "Sentiment Analysis",
+        "Screener",
+        "Alerts",
+        "Live Prices",
+        "Watchlist"
+    ]
+
+    is_admin = st.session_state.username in ADMIN_USERS
+    if is_admin:
+        pages.append("Admin")
+
     page = st.sidebar.radio(
         "Go to",
-        [
-            "EDA",
-            "Volatility Analysis",
-            "Forecasting",
-            "Insights",
-            "Sentiment Analysis"
-        ]
+        pages,
+        index=pages.index(prefs["page"]) if prefs.get("page") in pages else 0
     )
 
+    timeframes = available_timeframes("BTC-USD")
+    default_timeframe = prefs.get("timeframe", "1d")
+    st.session_state.timeframe = st.sidebar.selectbox(
+        "Bar Timeframe",
+        timeframes,
+        index=timeframes.index(default_timeframe) if default_timeframe in timeframes else 0
+    )
+    watchlist.save_preferences(st.session_state.username, page=page,
+                               timeframe=st.session_state.timeframe)
+
+    # -------- Profiling (admins, per session) --------
+    profile = nullcontext()
+    if is_admin and st.sidebar.toggle("🔬 Profile page", key="profiling"):
+        mode = st.sidebar.selectbox("Profiler", PROFILER_MODES, key="profiler_mode")
+        memory = st.sidebar.checkbox("Track allocations", value=True, key="profiler_memory")
+        # Saved on exit, so a page that calls st.rerun() is still recorded
+        profile = PageProfile(page, mode=mode, interval=PROFILE_INTERVAL_MS / 1000, memory=memory,
+                              out_dir=PROFILE_DIR, top_n=PROFILE_TOP_N)
+
     st.sidebar.button("🚪 Logout", on_click=logout)
 
     # -------- Routing Only --------
-    if page == "EDA":
-        eda.render()
+    with profile:
+        if page == "EDA":
+            eda.render()
+
+        elif page == "Volatility Analysis":
+            volatility.render()
+
+        elif page == "Forecasting":
+            forecasting.render()
+
+        elif page == "Insights":
+            insights.render()
+
+        elif page == "Sentiment Analysis":
+            sentiment_analysis.render()
+
+        elif page == "Screener":
+            screener.render()
+
+        elif page == "Alerts":
+            alerts.render()
 
-    elif page == "Volatility Analysis":
-        volatility.render()
+        elif page == "Live Prices":
+            live.render()
 
-    elif page == "Forecasting":
-        forecasting.render()
+        elif page == "Watchlist":
+            watchlist.render()
 
-    elif page == "Insights":
-        insights.render()
+        elif page == "Admin":
+            admin.render()
 
-    elif page == "Sentiment Analysis":
-        sentiment_analysis.render()
+    if isinstance(profile, PageProfile):
+        admin.render_profile(profile)
 
 
 # =========================
 # Logout
 # =========================
 def logout():
+    if st.session_state.get("session_id"):
+        get_shared_results().release(st.session_state.session_id)
     st.session_state.logged_in = False
     st.session_state.username = None
+    st.session_state.prefs = None
+    st.session_state.watchlist = None
     st.rerun()
 
 
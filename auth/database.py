@@ -1,3 +1,4 @@
+import json
 import sqlite3
 
 DB_NAME = "auth/users.db"
@@ -52,3 +53,321 @@ def get_user(username):
     user = cursor.fetchone()
     conn.close()
     return user
+
+
+# -------------------------
+# Alert Rules & Events
+# -------------------------
+def create_alert_tables():
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alert_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL DEFAULT '{}',
+            direction TEXT NOT NULL DEFAULT 'both',
+            cooldown INTEGER NOT NULL DEFAULT 1,
+            sinks TEXT NOT NULL DEFAULT 'file',
+            enabled INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # UNIQUE (rule, symbol, bar) de-duplicates replays and restarts
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alert_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rule_id INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            direction TEXT NOT NULL,
+            bar_time TEXT NOT NULL,
+            value REAL,
+            message TEXT NOT NULL,
+            fired_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (rule_id, symbol, bar_time)
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_alert_events_user ON alert_events (username, id)"
+    )
+
+    conn.commit()
+    conn.close()
+
+
+def add_alert_rule(username, symbol, kind, params=None, direction="both", cooldown=1,
+                   sinks=("file",)):
+    create_alert_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "INSERT INTO alert_rules (username, symbol, kind, params, direction, cooldown, sinks) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (username, symbol, kind, json.dumps(params or {}), direction, int(cooldown),
+         ",".join(sinks))
+    )
+    conn.commit()
+    rule_id = cursor.lastrowid
+    conn.close()
+    return rule_id
+
+
+def get_alert_rules(username=None, enabled_only=False):
+    """
+    Alert rules as dicts (params decoded, sinks as a list); all users'
+    rules when username is None.
+    """
+    create_alert_tables()
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    sql = "SELECT * FROM alert_rules WHERE 1 = 1"
+    args = []
+    if username is not None:
+        sql += " AND username = ?"
+        args.append(username)
+    if enabled_only:
+        sql += " AND enabled = 1"
+
+    rules = []
+    for row in cursor.execute(sql + " ORDER BY id", args):
+        rule = dict(row)
+        rule["params"] = json.loads(rule["params"])
+        rule["sinks"] = [s for s in rule["sinks"].split(",") if s]
+        rule["enabled"] = bool(rule["enabled"])
+        rules.append(rule)
+
+    conn.close()
+    return rules
+
+
+def set_alert_rule_enabled(rule_id, username, enabled):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "UPDATE alert_rules SET enabled = ? WHERE id = ? AND username = ?",
+        (int(enabled), rule_id, username)
+    )
+    conn.commit()
+    conn.close()
+
+
+def delete_alert_rule(rule_id, username):
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "DELETE FROM alert_rules WHERE id = ? AND username = ?",
+        (rule_id, username)
+    )
+    conn.commit()
+    conn.close()
+
+
+def record_alert_event(event):
+    """
+    Store a fired alert; False if the same (rule, symbol, bar) was
+    already recorded.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "INSERT OR IGNORE INTO alert_events "
+        "(rule_id, username, symbol, kind, direction, bar_time, value, message) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (event["rule_id"], event["username"], event["symbol"], event["kind"],
+         event["direction"], event["bar_time"], event["value"], event["message"])
+    )
+    conn.commit()
+    inserted = cursor.rowcount == 1
+    conn.close()
+    return inserted
+
+
+def get_alert_events(username, limit=50):
+    create_alert_tables()
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT * FROM alert_events WHERE username = ? ORDER BY id DESC LIMIT ?",
+        (username, limit)
+    )
+    events = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return events
+
+
+def last_alert_times():
+    """
+    {(rule_id, symbol): latest bar_time} used to restore cooldowns.
+    """
+    create_alert_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT rule_id, symbol, MAX(bar_time) FROM alert_events GROUP BY rule_id, symbol"
+    )
+    times = {(rule_id, symbol): bar_time for rule_id, symbol, bar_time in cursor.fetchall()}
+    conn.close()
+    return times
+
+
+# -------------------------
+# Watchlists & Preferences
+# -------------------------
+def create_watchlist_tables():
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS watchlists (
+            username TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (username, symbol)
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_watchlists_symbol ON watchlists (symbol)"
+    )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            username TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (username, key)
+        )
+    """)
+
+    conn.commit()
+    conn.close()
+
+
+def get_watchlist(username):
+    """
+    The user's watched symbols in display order; None if the user has
+    never saved a watchlist.
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT symbol FROM watchlists WHERE username = ? ORDER BY position",
+        (username,)
+    )
+    symbols = [row[0] for row in cursor.fetchall()]
+    if not symbols:
+        cursor.execute(
+            "SELECT 1 FROM user_preferences WHERE username = ? AND key = 'watchlist_saved'",
+            (username,)
+        )
+        if cursor.fetchone() is None:
+            symbols = None
+    conn.close()
+    return symbols
+
+
+def set_watchlist(username, symbols):
+    """
+    Replace the user's watchlist (duplicates dropped, order kept).
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("DELETE FROM watchlists WHERE username = ?", (username,))
+    cursor.executemany(
+        "INSERT INTO watchlists (username, symbol, position) VALUES (?, ?, ?)",
+        [(username, symbol, i) for i, symbol in enumerate(dict.fromkeys(symbols))]
+    )
+    # An emptied watchlist stays empty instead of falling back to the default
+    cursor.execute(
+        "INSERT OR REPLACE INTO user_preferences (username, key, value) "
+        "VALUES (?, 'watchlist_saved', 'true')",
+        (username,)
+    )
+    conn.commit()
+    conn.close()
+
+
+def all_watchlists():
+    """
+    {username: [symbols]} for every saved watchlist.
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    watchlists = {}
+    for username, symbol in cursor.execute(
+        "SELECT username, symbol FROM watchlists ORDER BY username, position"
+    ):
+        watchlists.setdefault(username, []).append(symbol)
+    conn.close()
+    return watchlists
+
+
+def watched_symbols():
+    """
+    Every symbol on at least one watchlist, most watched first.
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT symbol FROM watchlists GROUP BY symbol ORDER BY COUNT(*) DESC, symbol"
+    )
+    symbols = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return symbols
+
+
+def get_preferences(username):
+    """
+    {key: value} of the user's saved page preferences (values decoded
+    from JSON).
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT key, value FROM user_preferences WHERE username = ? AND key != 'watchlist_saved'",
+        (username,)
+    )
+    prefs = {key: json.loads(value) for key, value in cursor.fetchall()}
+    conn.close()
+    return prefs
+
+
+def set_preferences(username, prefs):
+    """
+    Store (insert or overwrite) the given preference values.
+    """
+    create_watchlist_tables()
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT OR REPLACE INTO user_preferences (username, key, value) VALUES (?, ?, ?)",
+        [(username, key, json.dumps(value)) for key, value in prefs.items()]
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,84 @@
+# =========================================================
+# datasets.py
+# Synthetic datasets for the benchmark suite
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from data.synthetic import synthetic_symbols, write_cache
+
+
+def build_cache_dir(cache_dir, n_rows, n_symbols, seed=0):
+    """
+    Populate cache_dir with one CSV per synthetic symbol (correlated GBM
+    with jumps, see data.synthetic) and return the list of symbols
+    written. Large cases switch to minute bars so the date range stays
+    within pandas' Timestamp bounds.
+    """
+    symbols = synthetic_symbols(n_symbols)
+    freq = "D" if n_rows <= 36_500 else "min"
+    write_cache(symbols, n_rows, cache_dir, freq=freq, start="2015-01-01", seed=seed)
+    return symbols
+
+
+def synthetic_headlines(n, seed=0):
+    """
+    Headline-like strings with a mix of positive, negative and neutral
+    vocabulary for the sentiment benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    subjects = ["Bitcoin", "Ethereum", "Crypto market", "Altcoins", "Traders"]
+    verbs = ["surges", "plunges", "holds steady", "rallies", "crashes",
+             "recovers", "stalls", "soars", "slumps", "trades flat"]
+    tails = ["after ETF news", "amid regulatory fears", "as volume climbs",
+             "on strong demand", "despite weak outlook", "ahead of halving"]
+
+    return [
+        f"{subjects[a]} {verbs[b]} {tails[c]}"
+        for a, b, c in zip(
+            rng.integers(0, len(subjects), n),
+            rng.integers(0, len(verbs), n),
+            rng.integers(0, len(tails), n),
+        )
+    ]
+
+
+def synthetic_news(n, seed=0):
+    """
+    Frame shaped like data.newsfetcher.fetch_news output.
+    """
+    return pd.DataFrame({
+        "headline": synthetic_headlines(n, seed=seed),
+        "published": pd.Timestamp("2024-01-01").strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        "source": "Synthetic Wire",
+    })
+
+
+def syndicated_news(n, copies=3, seed=0):
+    """
+    fetch_news-shaped frame of n headlines in which each story is carried
+    by up to `copies` outlets with small wording changes, for the news
+    de-duplication benchmark.
+    """
+    rng = np.random.default_rng(seed)
+    outlets = ["CoinDesk", "Reuters", "Bloomberg", "Yahoo Finance", "The Block", "Decrypt"]
+    stories = [
+        f"{h} at ${p:,} with ${v}M volume"
+        for h, p, v in zip(synthetic_headlines(n, seed=seed),
+                           rng.integers(10_000, 99_999, n), rng.integers(1, 999, n))
+    ]
+    story = np.sort(rng.integers(0, max(n // copies, 1), n))
+
+    headlines = []
+    for k in story:
+        text = stories[k]
+        if rng.random() < 0.5:
+            text = text.replace(" with ", " on ")
+        headlines.append(f"{text} - {outlets[rng.integers(len(outlets))]}")
+
+    return pd.DataFrame({
+        "headline": headlines,
+        "published": pd.Timestamp("2024-01-01").strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        "source": "Synthetic Wire",
+    })
@@ -0,0 +1,670 @@
+# =========================================================
+# run_benchmarks.py
+# Reproducible benchmark harness for the data & analytics hot paths
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run_benchmarks --preset quick
+#   python -m benchmarks.run_benchmarks --preset full --label nightly
+#   python -m benchmarks.run_benchmarks --only preprocess_data \
+#       --compare benchmarks/results/baseline.json
+# =========================================================
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Page modules resolve paths (assets/, data/cached_data) relative to the
+# repository root, exactly as `streamlit run app.py` does.
+os.chdir(ROOT)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+# Page benchmarks time analytics jobs in-process instead of handing them
+# to worker processes
+os.environ.setdefault("CRYPTO_JOBS_WORKERS", "0")
+
+from benchmarks.datasets import (
+    build_cache_dir, syndicated_news, synthetic_headlines, synthetic_news
+)
+from benchmarks.streamlit_stub import patched_streamlit
+
+
+# -------------------------------------------------
+# Presets: rows per symbol x number of symbols
+# -------------------------------------------------
+PRESETS = {
+    "quick": {
+        "rows": [1_000, 10_000, 100_000],
+        "symbols": [2, 20],
+        "max_total_rows": 2_000_000,
+    },
+    "full": {
+        "rows": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+        "symbols": [2, 50, 500],
+        "max_total_rows": 20_000_000,
+    },
+}
+
+
+# -------------------------------------------------
+# Benchmark registry
+# -------------------------------------------------
+BENCHMARKS = {}
+
+
+def benchmark(name, max_rows=None, per_symbol=False):
+    """
+    Register a benchmark.
+
+    The decorated function receives the case context and returns a
+    zero-argument callable; only that callable is timed.
+    max_rows caps the case sizes a benchmark runs at (model fits do not
+    scale to millions of rows). Benchmarks that are not per_symbol only
+    run at the smallest symbol count.
+    """
+    def decorator(func):
+        BENCHMARKS[name] = {
+            "setup": func,
+            "max_rows": max_rows,
+            "per_symbol": per_symbol,
+        }
+        return func
+    return decorator
+
+
+@benchmark("get_raw_data", per_symbol=True)
+def bench_get_raw_data(ctx):
+    from data.data_fetcher import get_raw_data
+
+    return lambda: [get_raw_data(s) for s in ctx["symbols"]]
+
+
+@benchmark("preprocess_data", per_symbol=True)
+def bench_preprocess_data(ctx):
+    from data.data_preprocessing import preprocess_data
+
+    return lambda: [preprocess_data(s) for s in ctx["symbols"]]
+
+
+@benchmark("compact_frame", per_symbol=True)
+def bench_compact_frame(ctx):
+    from data.compact import compact_frame
+
+    frames = [df.astype("float64") for df in ctx["frames"]()]
+    return lambda: [compact_frame(df) for df in frames]
+
+
+@benchmark("shared_cache.attach", per_symbol=True)
+def bench_shared_cache_attach(ctx):
+    from data.shared_cache import SharedCache, build_frames, publish
+
+    root = os.path.join(ctx["cache_dir"], "shared")
+    publish(build_frames(ctx["symbols"]), root)
+
+    # A fresh worker attaching every symbol's frame (zero-copy)
+    return lambda: [SharedCache(root).get(s) for s in ctx["symbols"]]
+
+
+@benchmark("calculate_kpis", per_symbol=True)
+def bench_calculate_kpis(ctx):
+    from analytics.compute import calculate_kpis
+
+    frames = ctx["frames"]()
+    return lambda: [calculate_kpis(df) for df in frames]
+
+
+@benchmark("load_symbol.store", per_symbol=True)
+def bench_load_symbol_store(ctx):
+    from analytics.compute import compute_symbol, load_symbol
+    from data import results_store
+
+    # Own database file so the render benchmarks keep measuring the
+    # cold (empty store) path.
+    db_path = os.path.join(ctx["cache_dir"], "results-warm.db")
+
+    results_store.create_results_table(db_path)
+    snapshot_id = results_store.begin_snapshot(note="benchmark", db_path=db_path)
+    for symbol in ctx["symbols"]:
+        as_of, results = compute_symbol(symbol, forecast=False)
+        results_store.put_results(symbol, as_of, results, snapshot_id, db_path)
+    results_store.publish_snapshot(snapshot_id, db_path=db_path)
+
+    def run():
+        original = results_store.RESULTS_DB
+        results_store.RESULTS_DB = db_path
+        try:
+            return [load_symbol(s) for s in ctx["symbols"]]
+        finally:
+            results_store.RESULTS_DB = original
+    return run
+
+
+@benchmark("seasonal_decompose", max_rows=1_000_000, per_symbol=True)
+def bench_seasonal_decompose(ctx):
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    series = [df["Close"] for df in ctx["frames"]()]
+    return lambda: [seasonal_decompose(s, model="additive", period=30) for s in series]
+
+
+@benchmark("arima_forecast", max_rows=10_000)
+def bench_arima_forecast(ctx):
+    from analytics.compute import arima_forecast
+
+    series = ctx["frames"]()[0]["Close"]
+    return lambda: arima_forecast(series)
+
+
+@benchmark("prophet_forecast", max_rows=10_000)
+def bench_prophet_forecast(ctx):
+    from analytics.compute import prophet_forecast
+
+    series = ctx["frames"]()[0]["Close"]
+    return lambda: prophet_forecast(series)
+
+
+@benchmark("tune_prophet.cached", max_rows=2_000)
+def bench_tune_prophet_cached(ctx):
+    from analytics.tuning import tune_prophet
+
+    series = ctx["frames"]()[0]["Close"]
+    grid = {"changepoint_prior_scale": [0.01, 0.5], "seasonality_prior_scale": [10.0],
+            "seasonality_mode": ["additive"]}
+    db_path = os.path.join(ctx["cache_dir"], "tuning.db")
+
+    # The warm-up run fits every fold; the timed repeat search is served
+    # from the fold cache
+    return lambda: tune_prophet(series, grid=grid, n_folds=2, db_path=db_path)
+
+
+@benchmark("forecast_models", max_rows=10_000)
+def bench_forecast_models(ctx):
+    from analytics.models import fit_forecast
+
+    series = ctx["frames"]()[0]["Close"]
+    return lambda: [fit_forecast(series, m, 30) for m in ("naive", "ets", "theta", "gbr")]
+
+
+@benchmark("analyze_sentiment", max_rows=100_000)
+def bench_analyze_sentiment(ctx):
+    from analytics.sentiment_analysis import analyze_sentiment
+
+    headlines = synthetic_headlines(ctx["rows"])
+    return lambda: analyze_sentiment(headlines)
+
+
+@benchmark("portfolio.rebalance", max_rows=10_000, per_symbol=True)
+def bench_portfolio_rebalance(ctx):
+    from analytics.portfolio import (
+        PORTFOLIOS, estimate_covariance, expected_returns, optimize, returns_matrix
+    )
+
+    returns = returns_matrix(dict(zip(ctx["symbols"], ctx["frames"]())))
+    cov = estimate_covariance(returns, "ledoit_wolf")
+    mu = expected_returns(returns)
+    previous = {m: optimize(mu, cov, m).to_numpy() for m in PORTFOLIOS.values()}
+
+    # One warm-started rebalance of every portfolio type
+    return lambda: [optimize(mu, cov, m, w0=previous[m]) for m in PORTFOLIOS.values()]
+
+
+@benchmark("indicators.panel", per_symbol=True)
+def bench_indicators_panel(ctx):
+    import pandas as pd
+
+    from analytics.indicators import IndicatorEngine
+
+    frames = ctx["frames"]()
+    wide = {
+        c: pd.concat([df[c] for df in frames], axis=1, keys=ctx["symbols"])
+        for c in ("Open", "High", "Low", "Close", "Volume")
+    }
+    return lambda: IndicatorEngine().compute(wide)
+
+
+@benchmark("screener.update", per_symbol=True)
+def bench_screener_update(ctx):
+    from analytics.indicators import to_wide
+    from analytics.screen_engine import ScreenerUpdater
+    from data.bars import to_panel
+
+    wide = to_wide(to_panel(dict(zip(ctx["symbols"], ctx["frames"]()))))
+    history = {c: v.iloc[:-1] for c, v in wide.items()}
+    latest = {c: v.iloc[-1:] for c, v in wide.items()}
+
+    updater = ScreenerUpdater()
+    updater.initialize(history)
+
+    # One new bar for every symbol, applied to a fresh copy of the state
+    return lambda: copy.deepcopy(updater).update(latest)
+
+
+@benchmark("screener.query", per_symbol=True)
+def bench_screener_query(ctx):
+    from analytics.screen_engine import build_screener
+    from data.screener_store import query
+
+    build_screener(ctx["symbols"])
+    filters = [("volatility_30", "<", 2.0), ("rsi_14", ">", 30)]
+    return lambda: query(filters, "return_30", limit=20)
+
+
+@benchmark("alerts.update", per_symbol=True)
+def bench_alerts_update(ctx):
+    from analytics.alert_engine import AlertEngine, FileSink
+    from analytics.indicators import to_wide
+    from auth.database import add_alert_rule
+    from data.bars import to_panel
+
+    close = to_wide(to_panel(dict(zip(ctx["symbols"], ctx["frames"]()))), ["Close"])["Close"]
+    for kind in ("ma_crossover", "bollinger_breakout", "volatility_spike"):
+        add_alert_rule("bench", "*", kind, cooldown=0)
+
+    sinks = {"file": FileSink(os.path.join(ctx["cache_dir"], "alerts.jsonl"))}
+    engine = AlertEngine.from_database(ctx["symbols"], "1d", sinks)
+    engine.warm(close.iloc[:-1])
+
+    # One new bar for every symbol, evaluated against all rules
+    return lambda: copy.deepcopy(engine).update(close.iloc[-1:])
+
+
+@benchmark("regimes.update", max_rows=5_000, per_symbol=True)
+def bench_regimes_update(ctx):
+    from analytics.indicators import to_wide
+    from analytics.regimes import RegimeTracker
+    from data.bars import to_panel
+
+    close = to_wide(to_panel(dict(zip(ctx["symbols"], ctx["frames"]()))), ["Close"])["Close"]
+    tracker = RegimeTracker(ctx["symbols"], min_bars=min(250, len(close) // 2))
+    tracker.warm(close.iloc[:-1])
+
+    # One new bar for every symbol: HMM filter step + changepoint update
+    return lambda: copy.deepcopy(tracker).update(close.iloc[-1:])
+
+
+@benchmark("news_dedup.cluster", max_rows=100_000)
+def bench_news_dedup(ctx):
+    from analytics.news_dedup import cluster_news
+
+    db_path = os.path.join(ctx["cache_dir"], f"news-{ctx['rows']}.db")
+    no_score = lambda headlines: [0.0] * len(headlines)
+    stored = syndicated_news(ctx["rows"], seed=1)
+    for start in range(0, len(stored), 5_000):
+        cluster_news(stored.iloc[start:start + 5_000], score=no_score, db_path=db_path)
+    fetches = iter(range(2, 1_000_000))
+
+    # One 25-headline fetch of unseen headlines against `rows` stored ones
+    return lambda: cluster_news(syndicated_news(25, seed=next(fetches)), score=no_score,
+                                db_path=db_path)
+
+
+@benchmark("versions.read", max_rows=1_000_000, per_symbol=True)
+def bench_versions_read(ctx):
+    from data import versions
+    from data.data_fetcher import get_raw_data
+
+    # A base version plus 30 refreshes, each revising the last bar and adding one
+    root = os.path.join(ctx["cache_dir"], f"versions-{ctx['rows']}")
+    for symbol in ctx["symbols"]:
+        raw = versions.normalize_raw(get_raw_data(symbol))
+        versions.commit(symbol, raw.iloc[:-30], root=root)
+        for k in range(29, -1, -1):
+            day = raw.iloc[:len(raw) - k].copy()
+            day.loc[day.index[-1], "Close"] *= 1.001
+            versions.commit(symbol, day, root=root)
+
+    # Point-in-time read of a version in the middle of the delta chain
+    return lambda: [versions.read_version(s, 16, root=root) for s in ctx["symbols"]]
+
+
+@benchmark("api.prices", max_rows=1_000_000, per_symbol=True)
+def bench_api_prices(ctx):
+    from http.server import ThreadingHTTPServer
+
+    from data.api import _ApiHandler, fetch_table
+
+    ctx["frames"]()  # warm the bar caches, as a running app would have
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Every row and column of every symbol over HTTP, as Arrow IPC pages
+    return lambda: fetch_table(f"http://127.0.0.1:{server.server_port}", "prices",
+                               symbols=",".join(ctx["symbols"])).num_rows
+
+
+@benchmark("render.figures", max_rows=100_000)
+def bench_render_figures(ctx):
+    from util.charts import hist_chart, line_chart
+    from util.config import RENDER_WORKERS
+    from util.rendering import Chart, FigureRenderer
+
+    charts = [
+        Chart(builder, df[column], title=f"{symbol} {column}")
+        for symbol, df in zip(ctx["symbols"], ctx["frames"]())
+        for builder, column in ((line_chart, "Close"), (line_chart, "Volume"),
+                                (line_chart, "Returns"), (hist_chart, "Close"))
+    ]
+    renderer = FigureRenderer(workers=RENDER_WORKERS)
+
+    def run():
+        # Cold: every figure is rasterized (the pool stays warm)
+        renderer.clear()
+        return sum(len(data) for _, data in renderer.render_iter(charts))
+    return run
+
+
+@benchmark("simulate_paths", max_rows=10_000, per_symbol=True)
+def bench_simulate_paths(ctx):
+    import pandas as pd
+
+    from analytics.risk import risk_summary, simulate
+
+    log_returns = pd.concat(
+        [df["Log_Returns"] for df in ctx["frames"]()], axis=1, keys=ctx["symbols"]
+    ).dropna()
+
+    # 10k block-bootstrap paths over a one-year daily horizon
+    return lambda: risk_summary(simulate(log_returns, n_paths=10_000, steps=365))
+
+
+def _render_bench(module_name, reset=None):
+    """
+    Time one page's render(); `reset(module)` runs first in every
+    timed run to drop caches the warm-up filled.
+    """
+    def setup(ctx):
+        import importlib
+
+        module = importlib.import_module(f"analytics.{module_name}")
+
+        def run():
+            if reset is not None:
+                reset(module)
+            with patched_streamlit(module) as stub:
+                module.render()
+            return stub.calls
+        return run
+    return setup
+
+
+def _clear_renderer(module):
+    # Cold: every figure is rasterized, as in render.figures
+    from util.rendering import get_renderer
+
+    get_renderer().clear()
+
+
+benchmark("render.eda", max_rows=100_000)(_render_bench("eda", reset=_clear_renderer))
+benchmark("render.volatility", max_rows=100_000)(_render_bench("volatility"))
+benchmark("render.insights", max_rows=100_000)(_render_bench("insights"))
+def _clear_forecasting(module):
+    module.cached_simulation.clear()
+    _clear_renderer(module)
+
+
+benchmark("render.forecasting", max_rows=2_000)(
+    _render_bench("forecasting", reset=_clear_forecasting)
+)
+
+
+@benchmark("watchlists.shared", max_rows=100_000, per_symbol=True)
+def bench_watchlists_shared(ctx):
+    from analytics.watchlist_registry import SharedResults, load_watchlist
+
+    # 50 users, each watching an overlapping slice of the universe
+    symbols = ctx["symbols"]
+    users = {f"user{i}": symbols[i % len(symbols):] + symbols[:i % len(symbols)]
+             for i in range(50)}
+
+    def run():
+        shared = SharedResults()
+        for username, watched in users.items():
+            load_watchlist(username, watched, shared=shared)
+        return shared.stats()
+    return run
+
+
+@benchmark("render.sentiment_analysis", max_rows=1_000)
+def bench_render_sentiment(ctx):
+    from analytics import sentiment_analysis
+
+    def fake_fetch_news(crypto="Bitcoin", limit=20):
+        return synthetic_news(limit)
+
+    def run():
+        original = sentiment_analysis.fetch_news
+        sentiment_analysis.fetch_news = fake_fetch_news
+        try:
+            with patched_streamlit(sentiment_analysis) as stub:
+                sentiment_analysis.render()
+        finally:
+            sentiment_analysis.fetch_news = original
+        return stub.calls
+    return run
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def _time_callable(fn, repeat):
+    fn()  # warm-up: imports, lazy init, page cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_case(rows, n_symbols, selected, repeat, smallest_symbols):
+    """
+    Build one synthetic cache directory and run every selected benchmark
+    against it.
+    """
+    import auth.database as auth_database
+    import data.data_fetcher as data_fetcher
+    import data.job_store as job_store
+    import data.news_store as news_store
+    import data.results_store as results_store
+    import data.screener_store as screener_store
+    import data.tuning_store as tuning_store
+    from data.data_preprocessing import preprocess_data
+
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="crypto-bench-") as cache_dir:
+        symbols = build_cache_dir(cache_dir, rows, n_symbols)
+
+        original_cache_dir = data_fetcher.CACHE_DIR
+        original_results_db = results_store.RESULTS_DB
+        original_screener_db = screener_store.SCREENER_DB
+        original_auth_db = auth_database.DB_NAME
+        original_jobs_db = job_store.JOBS_DB
+        original_news_db = news_store.NEWS_DB
+        original_tuning_db = tuning_store.TUNING_DB
+        data_fetcher.CACHE_DIR = cache_dir
+        # Render benchmarks measure the cold path (empty results store)
+        results_store.RESULTS_DB = os.path.join(cache_dir, "results.db")
+        screener_store.SCREENER_DB = os.path.join(cache_dir, "screener.db")
+        auth_database.DB_NAME = os.path.join(cache_dir, "users.db")
+        job_store.JOBS_DB = os.path.join(cache_dir, "jobs.db")
+        news_store.NEWS_DB = os.path.join(cache_dir, "news.db")
+        tuning_store.TUNING_DB = os.path.join(cache_dir, "tuning.db")
+
+        frames_cache = {}
+
+        def frames():
+            if "frames" not in frames_cache:
+                frames_cache["frames"] = [preprocess_data(s) for s in symbols]
+            return frames_cache["frames"]
+
+        ctx = {"rows": rows, "symbols": symbols, "frames": frames, "cache_dir": cache_dir}
+
+        try:
+            for name in selected:
+                spec = BENCHMARKS[name]
+                if spec["max_rows"] is not None and rows > spec["max_rows"]:
+                    continue
+                if not spec["per_symbol"] and n_symbols != smallest_symbols:
+                    continue
+
+                fn = spec["setup"](ctx)
+                timings = _time_callable(fn, repeat)
+                best = min(timings)
+                processed = rows * (n_symbols if spec["per_symbol"] else 1)
+
+                result = {
+                    "name": name,
+                    "rows": rows,
+                    "symbols": n_symbols if spec["per_symbol"] else 1,
+                    "repeat": repeat,
+                    "min": best,
+                    "median": statistics.median(timings),
+                    "mean": statistics.fmean(timings),
+                    "rows_per_sec": processed / best if best > 0 else None,
+                }
+                results.append(result)
+                print(
+                    f"  {name:<28} rows={rows:>10,} symbols={result['symbols']:>4} "
+                    f"min={best * 1000:>10.2f} ms  median={result['median'] * 1000:>10.2f} ms",
+                    flush=True,
+                )
+        finally:
+            data_fetcher.CACHE_DIR = original_cache_dir
+            results_store.RESULTS_DB = original_results_db
+            screener_store.SCREENER_DB = original_screener_db
+            auth_database.DB_NAME = original_auth_db
+            job_store.JOBS_DB = original_jobs_db
+            news_store.NEWS_DB = original_news_db
+            tuning_store.TUNING_DB = original_tuning_db
+
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    Compare two result sets on (name, rows, symbols) and return the list
+    of regressions whose min time grew by more than `threshold`.
+    """
+    key = lambda r: (r["name"], r["rows"], r["symbols"])
+    base = {key(r): r for r in baseline["results"]}
+
+    regressions = []
+    print(f"\nComparison vs {baseline['meta'].get('label')} "
+          f"({baseline['meta'].get('revision')}), threshold {threshold:.0%}")
+
+    for r in current["results"]:
+        b = base.get(key(r))
+        if not b or not b["min"]:
+            continue
+        ratio = r["min"] / b["min"]
+        flag = "REGRESSION" if ratio > 1 + threshold else (
+            "improved" if ratio < 1 - threshold else "")
+        print(f"  {r['name']:<28} rows={r['rows']:>10,} symbols={r['symbols']:>4} "
+              f"x{ratio:>6.2f} {flag}")
+        if flag == "REGRESSION":
+            regressions.append((r, b, ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the data & analytics benchmarks.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--rows", type=int, nargs="+", help="override preset row counts")
+    parser.add_argument("--symbols", type=int, nargs="+", help="override preset symbol counts")
+    parser.add_argument("--max-total-rows", type=int, help="skip cases above rows x symbols")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--label", help="result file label (default: git revision)")
+    parser.add_argument("--compare", help="baseline result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, spec in BENCHMARKS.items():
+            print(f"{name:<28} max_rows={spec['max_rows']} per_symbol={spec['per_symbol']}")
+        return 0
+
+    preset = PRESETS[args.preset]
+    row_counts = args.rows or preset["rows"]
+    symbol_counts = args.symbols or preset["symbols"]
+    max_total = args.max_total_rows or preset["max_total_rows"]
+
+    selected = list(BENCHMARKS)
+    if args.only:
+        wanted = [n.strip() for n in args.only.split(",") if n.strip()]
+        unknown = [n for n in wanted if n not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+        selected = wanted
+
+    revision = _git_revision()
+    label = args.label or revision
+
+    results = []
+    for rows in row_counts:
+        for n_symbols in symbol_counts:
+            if rows * n_symbols > max_total:
+                continue
+            print(f"\n[case] rows={rows:,} symbols={n_symbols}", flush=True)
+            results.extend(run_case(rows, n_symbols, selected, args.repeat, min(symbol_counts)))
+
+    report = {
+        "meta": {
+            "label": label,
+            "revision": revision,
+            "preset": args.preset,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {out_path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
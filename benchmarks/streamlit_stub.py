@@ -0,0 +1,159 @@
+# =========================================================
+# streamlit_stub.py
+# Headless stand-in for the `st` module used by page render()
+# =========================================================
+
+import io
+from collections import Counter
+from contextlib import contextmanager
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+
+class _Container:
+    """
+    Result of st.columns / st.tabs / st.expander etc. Supports `with`
+    blocks and forwards any st.* call back to the owning stub.
+    """
+
+    def __init__(self, stub):
+        self._stub = stub
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._stub, name)
+
+
+class StreamlitStub:
+    """
+    Minimal, dependency-free replacement for `streamlit`.
+
+    Widgets return their default value, layout calls return containers,
+    and st.pyplot rasterizes the figure to PNG (as the real server does)
+    so figure rendering cost is part of the measurement.
+    """
+
+    def __init__(self, dpi=200):
+        self.dpi = dpi
+        self.calls = Counter()
+        self.session_state = {}
+        self.sidebar = _Container(self)
+
+    # -------------------------
+    # Layout
+    # -------------------------
+    def columns(self, spec, **kwargs):
+        self.calls["columns"] += 1
+        n = spec if isinstance(spec, int) else len(spec)
+        return [_Container(self) for _ in range(n)]
+
+    def tabs(self, labels):
+        self.calls["tabs"] += 1
+        return [_Container(self) for _ in labels]
+
+    def container(self, **kwargs):
+        return _Container(self)
+
+    def empty(self):
+        return _Container(self)
+
+    def expander(self, *args, **kwargs):
+        return _Container(self)
+
+    @contextmanager
+    def spinner(self, *args, **kwargs):
+        yield
+
+    # -------------------------
+    # Widgets (return defaults)
+    # -------------------------
+    def selectbox(self, label, options, index=0, **kwargs):
+        self.calls["selectbox"] += 1
+        options = list(options)
+        return options[index] if options else None
+
+    def radio(self, label, options, index=0, **kwargs):
+        self.calls["radio"] += 1
+        options = list(options)
+        return options[index] if options else None
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default or [])
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def toggle(self, label, value=False, **kwargs):
+        return value
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def text_input(self, label, value="", **kwargs):
+        return value
+
+    def button(self, *args, **kwargs):
+        return False
+
+    # -------------------------
+    # Charts
+    # -------------------------
+    def pyplot(self, fig=None, **kwargs):
+        self.calls["pyplot"] += 1
+        fig = fig or plt.gcf()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=self.dpi)
+        plt.close(fig)
+        return buf.getbuffer().nbytes
+
+    def image(self, image, **kwargs):
+        self.calls["image"] += 1
+
+    # -------------------------
+    # Caching decorators
+    # -------------------------
+    def cache_data(self, func=None, **kwargs):
+        if func is None:
+            return lambda f: f
+        return func
+
+    cache_resource = cache_data
+
+    # -------------------------
+    # Everything else is a no-op
+    # -------------------------
+    def __getattr__(self, name):
+        def _noop(*args, **kwargs):
+            self.calls[name] += 1
+            return _Container(self)
+        return _noop
+
+
+@contextmanager
+def patched_streamlit(*modules, dpi=200):
+    """
+    Temporarily replace the module-level `st` name in each page module
+    with a StreamlitStub.
+    """
+    stub = StreamlitStub(dpi=dpi)
+    originals = [(m, m.st) for m in modules]
+
+    for module in modules:
+        module.st = stub
+    try:
+        yield stub
+    finally:
+        for module, original in originals:
+            module.st = original
+        plt.close("all")
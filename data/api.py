@@ -0,0 +1,526 @@
+# =========================================================
+# api.py
+# Local read API for downstream consumers: clean prices + features
+# (served through preprocess_data and its caches) and the forecasts the
+# scheduler published, as Arrow IPC streams or Parquet over HTTP
+#
+# Responses are written record batch by record batch with chunked
+# transfer encoding (Arrow buffers zstd-compressed by default), so a bulk
+# pull never builds a CSV or a whole-universe frame in memory. Large
+# price pulls are paged with a keyset cursor (X-Next-Cursor / Link
+# headers), and every response carries an ETag derived from the raw
+# data files or the live results snapshot, so an unchanged re-pull is a
+# 304 without touching the data.
+#
+# Usage (from the repository root):
+#   python -m data.api --port 8765
+#   curl 'http://127.0.0.1:8765/v1/prices?symbols=BTC-USD&start=2023-01-01&columns=Close,Volume'
+#
+# Endpoints (GET):
+#   /v1/symbols     JSON: symbols, timeframes and price columns
+#   /v1/prices      symbols, timeframe, start, end, columns, as_of, format, compression,
+#                   limit, cursor
+#   /v1/forecasts   symbols, timeframe, models, start, end, format, compression
+# =========================================================
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data.data_fetcher as data_fetcher
+from data.bars import TIMEFRAMES
+from data.data_preprocessing import preprocess_data
+from data.results_store import get_symbol_results, live_snapshot_id
+from data.versions import resolve_version
+from util.metrics import track
+
+API_VERSION = 1
+FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+CODECS = ("zstd", "lz4", "none")
+FORECAST_COLUMNS = {
+    "Forecast": "forecast", "Lower": "lower", "Upper": "upper",
+    "yhat": "forecast", "yhat_lower": "lower", "yhat_upper": "upper",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------------------------------
+# Queries
+# -------------------------------------------------
+def available_symbols():
+    """
+    Symbols with cached raw data (the API never downloads).
+    """
+    return data_fetcher.cached_symbols()
+
+
+def _one(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _many(params, name):
+    return [v.strip() for value in params.get(name, []) for v in value.split(",") if v.strip()]
+
+
+def _timestamp(value, name):
+    if value is None:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise ApiError(400, f"{name}: not a date/time: {value!r}")
+
+
+def parse_query(params):
+    """
+    Validated query from parsed query-string `params` ({name: [values]}).
+    Unknown symbols are a 404, every other bad value a 400.
+    """
+    from util.config import API_PAGE_ROWS
+
+    known = available_symbols()
+    symbols = _many(params, "symbols") or known
+    missing = sorted(set(symbols) - set(known))
+    if missing:
+        raise ApiError(404, f"unknown symbols: {', '.join(missing)}")
+
+    timeframe = _one(params, "timeframe")
+    if timeframe is not None and timeframe not in TIMEFRAMES:
+        raise ApiError(400, f"timeframe must be one of {list(TIMEFRAMES)}")
+
+    fmt = _one(params, "format", "arrow")
+    if fmt not in FORMATS:
+        raise ApiError(400, f"format must be one of {list(FORMATS)}")
+    compression = _one(params, "compression", "zstd")
+    if compression not in CODECS:
+        raise ApiError(400, f"compression must be one of {list(CODECS)}")
+
+    try:
+        limit = int(_one(params, "limit", API_PAGE_ROWS))
+    except ValueError:
+        raise ApiError(400, "limit must be an integer")
+    if limit <= 0:
+        raise ApiError(400, "limit must be positive")
+
+    return {
+        "symbols": sorted(dict.fromkeys(symbols)),
+        "timeframe": timeframe,
+        "start": _timestamp(_one(params, "start"), "start"),
+        "end": _timestamp(_one(params, "end"), "end"),
+        "as_of": _timestamp(_one(params, "as_of"), "as_of"),
+        "columns": _many(params, "columns"),
+        "models": _many(params, "models"),
+        "format": fmt,
+        "compression": compression,
+        "limit": limit,
+        "cursor": _one(params, "cursor"),
+    }
+
+
+def encode_cursor(symbol, timestamp_ns):
+    payload = json.dumps([symbol, int(timestamp_ns)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        symbol, timestamp_ns = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(symbol), int(timestamp_ns)
+    except (ValueError, TypeError):
+        raise ApiError(400, "invalid cursor")
+
+
+def _etag(*parts):
+    payload = json.dumps([API_VERSION, *parts], sort_keys=True, default=str)
+    return '"' + hashlib.blake2b(payload.encode(), digest_size=16).hexdigest() + '"'
+
+
+def prices_etag(query):
+    """
+    Changes when any requested symbol's raw data version or file (or the
+    dtype / repair settings the frames are built with) changes.
+    """
+    from util.config import COMPACT_DTYPES, OUTLIER_Z_THRESHOLD, REPAIR_POLICY
+
+    return _etag("prices", query, [data_fetcher.raw_data_signature(s) for s in query["symbols"]],
+                 COMPACT_DTYPES, REPAIR_POLICY, OUTLIER_Z_THRESHOLD)
+
+
+def forecasts_etag(query):
+    return _etag("forecasts", query, live_snapshot_id())
+
+
+# -------------------------------------------------
+# Tables
+# -------------------------------------------------
+def plan_prices(query):
+    """
+    One page of a prices query: ([(symbol, frame, first row, end row)],
+    next cursor or None). Symbols are paged in sorted order, each by
+    time, and at most `limit` rows are planned.
+    """
+    symbols = query["symbols"]
+    after = decode_cursor(query["cursor"]) if query["cursor"] else None
+    if after is not None:
+        if after[0] not in symbols:
+            raise ApiError(400, "cursor does not belong to this query")
+        symbols = symbols[symbols.index(after[0]):]
+
+    remaining = query["limit"]
+    slices = []
+    for symbol in symbols:
+        version = None
+        if query["as_of"] is not None:
+            try:
+                version = resolve_version(symbol, as_of=query["as_of"])
+            except ValueError as exc:
+                raise ApiError(404, str(exc))
+        df = preprocess_data(symbol, query["timeframe"], version=version)
+        missing = [c for c in query["columns"] if c not in df.columns]
+        if missing:
+            raise ApiError(400, f"unknown columns: {', '.join(missing)}")
+
+        times = df.index.asi8
+        lo = 0 if query["start"] is None else times.searchsorted(query["start"].value)
+        hi = len(times) if query["end"] is None else times.searchsorted(query["end"].value, "right")
+        if after is not None and symbol == after[0]:
+            lo = max(lo, times.searchsorted(after[1]))
+        if lo >= hi:
+            continue
+        if remaining == 0:
+            return slices, encode_cursor(symbol, times[lo])
+
+        stop = lo + min(hi - lo, remaining)
+        slices.append((symbol, df, lo, stop))
+        remaining -= stop - lo
+        if stop < hi:
+            return slices, encode_cursor(symbol, times[stop])
+    return slices, None
+
+
+def prices_schema(slices, columns):
+    fields = [pa.field("symbol", pa.dictionary(pa.int32(), pa.string())),
+              pa.field("Date", pa.timestamp("ns"))]
+    frame = slices[0][1] if slices else None
+    for column in columns:
+        dtype = frame[column].dtype if frame is not None else np.dtype(np.float64)
+        fields.append(pa.field(column, pa.from_numpy_dtype(dtype)))
+    return pa.schema(fields)
+
+
+def price_batches(slices, schema, batch_rows):
+    """
+    Record batches of at most `batch_rows` rows over planned slices,
+    built from views of the frames' arrays.
+    """
+    columns = schema.names[2:]
+    for symbol, df, lo, hi in slices:
+        times = df.index.to_numpy()
+        values = [df[c].to_numpy() for c in columns]
+        name = pa.array([symbol])
+        for start in range(lo, hi, batch_rows):
+            stop = min(start + batch_rows, hi)
+            yield pa.record_batch([
+                pa.DictionaryArray.from_arrays(np.zeros(stop - start, dtype=np.int32), name),
+                pa.array(times[start:stop], type=schema.field("Date").type),
+                *(pa.array(v[start:stop], type=schema.field(c).type) for c, v in zip(columns, values)),
+            ], schema=schema)
+
+
+def forecast_table(query):
+    """
+    Long table (symbol, model, steps, Date, forecast, lower, upper) of
+    the published forecasts of each symbol. Forecasts are small, so this
+    endpoint isn't paged.
+    """
+    from analytics.compute import store_key
+
+    frames = []
+    for symbol in query["symbols"]:
+        results = get_symbol_results(store_key(symbol, query["timeframe"]))
+        for (metric, window), payload in sorted(results.items()):
+            model = metric[:-len("_forecast")]
+            if not metric.endswith("_forecast") or (query["models"] and model not in query["models"]):
+                continue
+            fc = payload.rename(columns=FORECAST_COLUMNS)[["forecast", "lower", "upper"]]
+            if query["start"] is not None:
+                fc = fc[fc.index >= query["start"]]
+            if query["end"] is not None:
+                fc = fc[fc.index <= query["end"]]
+            frames.append(pd.DataFrame({
+                "symbol": symbol, "model": model, "steps": int(window),
+                "Date": pd.DatetimeIndex(fc.index).as_unit("ns"),
+                **{c: fc[c].to_numpy(dtype=np.float64) for c in fc.columns},
+            }))
+
+    if not frames:
+        return pa.table({"symbol": pa.array([], pa.string()), "model": pa.array([], pa.string()),
+                         "steps": pa.array([], pa.int64()), "Date": pa.array([], pa.timestamp("ns")),
+                         **{c: pa.array([], pa.float64()) for c in ("forecast", "lower", "upper")}})
+    return pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+
+
+def write_batches(sink, schema, batches, fmt="arrow", compression="zstd"):
+    """
+    Stream record batches to a file-like `sink` as an Arrow IPC stream
+    (buffers compressed with `compression`) or Parquet (zstd, one row
+    group per batch).
+    """
+    if fmt == "parquet":
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return
+
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+    with pa.ipc.new_stream(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+# -------------------------------------------------
+# HTTP
+# -------------------------------------------------
+class _ChunkedWriter:
+    """
+    Write-only file object sending HTTP/1.1 chunks of at least
+    `min_chunk` bytes.
+    """
+
+    closed = False
+
+    def __init__(self, wfile, min_chunk=1 << 20):
+        self.wfile = wfile
+        self.min_chunk = min_chunk
+        self.buffer = bytearray()
+        self.position = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.position += len(data)
+        if len(self.buffer) >= self.min_chunk:
+            self._send()
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def _send(self):
+        if self.buffer:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(self.buffer), bytes(self.buffer)))
+            self.buffer.clear()
+
+    def finish(self):
+        self._send()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path.rstrip("/"))
+        if route is None:
+            self._send_json(404, {"error": f"no such endpoint: {url.path}"})
+            return
+
+        params = parse_qs(url.query)
+        with track(f"api.{url.path.rstrip('/').rsplit('/', 1)[-1]}"):
+            try:
+                route(self, params)
+            except ApiError as exc:
+                self._send_json(exc.status, {"error": str(exc)})
+
+    def _not_modified(self, etag):
+        match = self.headers.get("If-None-Match")
+        if match is None:
+            return False
+        tags = [t.strip().removeprefix("W/") for t in match.split(",")]
+        if "*" not in tags and etag not in tags:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        return True
+
+    def _send_json(self, status, payload, etag=None):
+        body = json.dumps(payload, default=str).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_table(self, query, schema, batches, etag, headers=()):
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[query["format"]])
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+
+        sink = _ChunkedWriter(self.wfile)
+        try:
+            write_batches(sink, schema, batches, query["format"], query["compression"])
+        except Exception:
+            # Headers are gone; a truncated chunked body tells the client
+            self.close_connection = True
+            raise
+        sink.finish()
+
+    def log_message(self, *args):
+        pass
+
+
+def _symbols(handler, params):
+    symbols = available_symbols()
+    etag = _etag("symbols", [data_fetcher.raw_data_signature(s) for s in symbols])
+    if handler._not_modified(etag):
+        return
+    columns = list(preprocess_data(symbols[0]).columns) if symbols else []
+    handler._send_json(200, {"symbols": symbols, "timeframes": list(TIMEFRAMES),
+                             "columns": columns, "formats": list(FORMATS)}, etag=etag)
+
+
+def _prices(handler, params):
+    from util.config import API_BATCH_ROWS
+
+    query = parse_query(params)
+    etag = prices_etag(query)
+    if handler._not_modified(etag):
+        return
+
+    slices, cursor = plan_prices(query)
+    columns = query["columns"] or (list(slices[0][1].columns) if slices else [])
+    schema = prices_schema(slices, columns)
+    headers = [("X-Row-Count", str(sum(hi - lo for _, _, lo, hi in slices)))]
+    if cursor is not None:
+        next_params = {k: v[-1] for k, v in params.items() if k != "cursor"}
+        next_url = f"{urlsplit(handler.path).path}?{urlencode({**next_params, 'cursor': cursor})}"
+        headers += [("X-Next-Cursor", cursor), ("Link", f'<{next_url}>; rel="next"')]
+    handler._send_table(query, schema, price_batches(slices, schema, API_BATCH_ROWS), etag, headers)
+
+
+def _forecasts(handler, params):
+    query = parse_query(params)
+    etag = forecasts_etag(query)
+    if handler._not_modified(etag):
+        return
+
+    table = forecast_table(query)
+    handler._send_table(query, table.schema, table.to_batches(), etag,
+                        [("X-Row-Count", str(table.num_rows))])
+
+
+ROUTES = {
+    "/v1/symbols": _symbols,
+    "/v1/prices": _prices,
+    "/v1/forecasts": _forecasts,
+}
+
+_server = None
+_lock = threading.Lock()
+
+
+def start_api_server(port, host="127.0.0.1"):
+    """
+    Serve the API on a daemon thread. Safe to call on every Streamlit
+    rerun: only the first call starts a server.
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _ApiHandler)
+        except OSError:
+            # Another worker process on this host already owns the port.
+            return None
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+# -------------------------------------------------
+# Client
+# -------------------------------------------------
+def fetch_table(base_url, endpoint="prices", **params):
+    """
+    Every page of `endpoint` as one pyarrow Table, e.g.
+    fetch_table("http://127.0.0.1:8765", symbols="BTC-USD,ETH-USD",
+    start="2023-01-01", columns="Close,Volume").
+    """
+    params = {k: v for k, v in params.items() if v is not None}
+    tables = []
+    while True:
+        url = f"{base_url.rstrip('/')}/v1/{endpoint}?{urlencode(params)}"
+        with urllib.request.urlopen(url) as response:
+            body = response.read()
+            cursor = response.headers.get("X-Next-Cursor")
+        if params.get("format") == "parquet":
+            tables.append(pq.read_table(pa.BufferReader(body)))
+        else:
+            tables.append(pa.ipc.open_stream(body).read_all())
+        if not cursor:
+            return pa.concat_tables(tables)
+        params["cursor"] = cursor
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from util.config import API_HOST, API_PORT
+
+    parser = argparse.ArgumentParser(description="Serve prices, features and forecasts over HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT or 8765)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), _ApiHandler)
+    print(f"[api] serving http://{args.host}:{server.server_port}/v1/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
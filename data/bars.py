@@ -0,0 +1,267 @@
+# =========================================================
+# bars.py
+# Multi-timeframe OHLCV bar engine
+#
+# Aggregates base bars (e.g. 1-minute) into 5m / 1h / 4h / 1d / 1w / 1M
+# bars for many symbols in one vectorized groupby, caches every
+# timeframe, and re-aggregates only the trailing buckets touched when
+# new base bars arrive.
+# =========================================================
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+SECONDS_PER_YEAR = 365 * 24 * 3600  # crypto trades every day
+
+# Bar length in seconds (1M uses the average month)
+TIMEFRAMES = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "1h": 3600,
+    "4h": 4 * 3600,
+    "1d": 86400,
+    "1w": 7 * 86400,
+    "1M": SECONDS_PER_YEAR / 12,
+}
+
+# Pandas frequency of each timeframe, anchored like bucket_start
+PANDAS_FREQ = {
+    "1m": "min",
+    "5m": "5min",
+    "15m": "15min",
+    "1h": "h",
+    "4h": "4h",
+    "1d": "D",
+    "1w": "W-MON",
+    "1M": "MS",
+}
+
+_NS = 1_000_000_000
+_EPOCH_MONDAY_OFFSET = 4 * 86400 * _NS  # 1970-01-01 was a Thursday
+
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+
+# -------------------------------------------------
+# Timeframe helpers
+# -------------------------------------------------
+def periods_per_year(timeframe="1d"):
+    """
+    Number of bars per year, used to annualize volatility (365-day year).
+    """
+    return SECONDS_PER_YEAR / TIMEFRAMES[timeframe]
+
+
+def annualization_factor(timeframe="1d"):
+    return np.sqrt(periods_per_year(timeframe))
+
+
+def infer_timeframe(index):
+    """
+    Closest known timeframe to the median spacing of a DatetimeIndex
+    (defaults to 1d for fewer than two bars).
+    """
+    if len(index) < 2:
+        return "1d"
+    step = np.median(np.diff(index.asi8[: min(len(index), 10_000)])) / _NS
+    return min(TIMEFRAMES, key=lambda tf: abs(np.log(TIMEFRAMES[tf] / step)))
+
+
+def bucket_start(times, timeframe):
+    """
+    Start of the bar containing each timestamp (int64 ns in, datetime64 out).
+    Weeks start on Monday, months on the 1st; everything else is aligned
+    to the Unix epoch (00:00 UTC).
+    """
+    t = np.asarray(times, dtype="datetime64[ns]")
+
+    if timeframe == "1M":
+        return t.astype("datetime64[M]").astype("datetime64[ns]")
+
+    ns = t.astype("int64")
+    step = int(TIMEFRAMES[timeframe] * _NS)
+
+    if timeframe == "1w":
+        ns = (ns - _EPOCH_MONDAY_OFFSET) // step * step + _EPOCH_MONDAY_OFFSET
+    else:
+        ns = ns // step * step
+
+    return ns.astype("datetime64[ns]")
+
+
+# -------------------------------------------------
+# Aggregation
+# -------------------------------------------------
+def to_panel(frames):
+    """
+    {symbol: OHLCV frame indexed by time} -> long panel with a
+    categorical Symbol column and a Date column.
+    """
+    panel = pd.concat(
+        {s: df[OHLCV] for s, df in frames.items()},
+        names=["Symbol", "Date"]
+    ).reset_index()
+    panel["Symbol"] = panel["Symbol"].astype("category")
+    return panel
+
+
+def aggregate_panel(panel, timeframe):
+    """
+    Aggregate a long panel (Symbol, Date, OHLCV; time-sorted within each
+    symbol) into `timeframe` bars for every symbol in one groupby.
+    """
+    bucket = bucket_start(panel["Date"].values, timeframe)
+
+    bars = (
+        panel.assign(Date=bucket)
+        .groupby(["Symbol", "Date"], sort=True, observed=True)
+        .agg(AGGREGATIONS)
+    )
+    return bars
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Aggregate a single-symbol OHLCV frame (indexed by time) to `timeframe`.
+    """
+    bucket = bucket_start(df.index.values, timeframe)
+    bars = df[OHLCV].groupby(pd.DatetimeIndex(bucket, name=df.index.name)).agg(AGGREGATIONS)
+    return bars
+
+
+# -------------------------------------------------
+# Cached multi-timeframe engine
+# -------------------------------------------------
+def merge_bars(old, new):
+    """
+    Combine two partial aggregates of the same buckets (old earlier in
+    time than new).
+    """
+    return pd.DataFrame({
+        "Open": old["Open"],
+        "High": np.maximum(old["High"], new["High"]),
+        "Low": np.minimum(old["Low"], new["Low"]),
+        "Close": new["Close"],
+        "Volume": old["Volume"] + new["Volume"],
+    }, index=old.index)
+
+
+class BarEngine:
+    """
+    Base bars for a universe of symbols plus lazily built, cached
+    aggregates for each requested timeframe.
+
+    update() appends new base bars. When they are newer than everything
+    seen so far (the live case) each cached timeframe is updated by
+    aggregating only the new bars and merging them into the open
+    buckets; late or revised bars rebuild the affected trailing buckets.
+    """
+
+    def __init__(self, base_panel=None):
+        base = base_panel if base_panel is not None else pd.DataFrame(
+            columns=["Symbol", "Date"] + OHLCV
+        )
+        self._chunks = [base]
+        self._last_date = base["Date"].max() if len(base) else None
+        self._bars = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base(self):
+        """
+        All base bars as one long panel (appended chunks are concatenated
+        lazily).
+        """
+        if len(self._chunks) > 1:
+            symbols = pd.api.types.union_categoricals(
+                [c["Symbol"].astype("category") for c in self._chunks]
+            )
+            base = pd.concat(
+                [c.astype({"Symbol": object}) for c in self._chunks], ignore_index=True
+            )
+            base["Symbol"] = pd.Categorical(base["Symbol"], categories=symbols.categories)
+            self._chunks = [base]
+        return self._chunks[0]
+
+    def bars(self, timeframe):
+        """
+        Aggregated panel (MultiIndex Symbol, Date) for `timeframe`.
+        """
+        with self._lock:
+            if timeframe not in self._bars:
+                self._bars[timeframe] = aggregate_panel(self.base, timeframe)
+            return self._bars[timeframe]
+
+    def symbol_bars(self, symbol, timeframe):
+        bars = self.bars(timeframe)
+        if symbol not in bars.index.get_level_values("Symbol"):
+            return pd.DataFrame(columns=OHLCV)
+        return bars.xs(symbol, level="Symbol")
+
+    def update(self, new_bars):
+        """
+        Append new base bars (long panel: Symbol, Date, OHLCV) and refresh
+        every cached timeframe.
+        """
+        if new_bars.empty:
+            return
+
+        with self._lock:
+            first_new = new_bars["Date"].min()
+            in_order = self._last_date is None or first_new > self._last_date
+
+            new = new_bars.astype({"Symbol": "category"})
+            self._chunks.append(new)
+            self._last_date = max(new_bars["Date"].max(), self._last_date or first_new)
+
+            if in_order:
+                for timeframe, cached in self._bars.items():
+                    self._bars[timeframe] = self._merge_new(cached, new, timeframe)
+                return
+
+            base = (
+                self.base.drop_duplicates(subset=["Symbol", "Date"], keep="last")
+                .sort_values(["Symbol", "Date"], kind="stable", ignore_index=True)
+            )
+            self._chunks = [base]
+
+            for timeframe, cached in self._bars.items():
+                cutoff = bucket_start(np.array([first_new]), timeframe)[0]
+                tail = base[base["Date"].values >= cutoff]
+                kept = cached[cached.index.get_level_values("Date") < cutoff]
+                self._bars[timeframe] = pd.concat(
+                    [kept, aggregate_panel(tail, timeframe)]
+                ).sort_index()
+
+    @staticmethod
+    def _merge_new(cached, new, timeframe):
+        fresh = aggregate_panel(new, timeframe)
+        fresh.index = fresh.index.set_levels(
+            fresh.index.levels[0].astype(object), level="Symbol"
+        )
+        cached.index = cached.index.set_levels(
+            cached.index.levels[0].astype(object), level="Symbol"
+        )
+
+        open_buckets = fresh.index.intersection(cached.index)
+        if len(open_buckets):
+            cached = cached.copy()
+            cached.loc[open_buckets] = merge_bars(
+                cached.loc[open_buckets], fresh.loc[open_buckets]
+            ).values
+
+        new_buckets = fresh.drop(open_buckets)
+        if len(new_buckets):
+            cached = pd.concat([cached, new_buckets]).sort_index()
+        return cached
@@ -0,0 +1,140 @@
+# =========================================================
+# compact.py
+# Compact in-memory representation of cached frames
+#
+# Prices, volumes and derived features are stored as float32 (about
+# seven significant digits, plenty for charts and KPIs), integer
+# columns as the smallest integer type that holds them and repeated
+# string keys (symbols) as categoricals. memory_report() accounts the
+# bytes held by every process-level data cache.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+# Integer columns that only need float32 precision when they outgrow int32
+APPROXIMATE_COLUMNS = ("Volume",)
+
+
+# -------------------------------------------------
+# Downcasting
+# -------------------------------------------------
+def _compact_column(col, categorical_ratio, approximate=()):
+    kind = col.dtype.kind
+
+    if kind == "f" and col.dtype.itemsize > 4:
+        values = col.to_numpy()
+        finite = values[np.isfinite(values)]
+        if finite.size and np.abs(finite).max() >= FLOAT32_MAX:
+            return col  # out of float32 range
+        return col.astype(np.float32)
+
+    if kind in "iu" and col.dtype.itemsize > 1:
+        col = pd.to_numeric(col, downcast="integer" if kind == "i" else "unsigned")
+        if col.dtype.itemsize > 4 and col.name in approximate:
+            return col.astype(np.float32)
+        return col
+
+    if kind == "O" and len(col):
+        if col.nunique(dropna=True) <= categorical_ratio * len(col):
+            return col.astype("category")
+
+    return col
+
+
+def compact_frame(df, columns=None, categorical_ratio=0.5, approximate=APPROXIMATE_COLUMNS):
+    """
+    Copy of `df` (optionally projected to `columns`) with float64 ->
+    float32, integers downcast (`approximate` columns to float32 when
+    they don't fit int32) and low-cardinality object columns as
+    categoricals. Works on Series too; attrs are preserved.
+    """
+    if isinstance(df, pd.Series):
+        out = _compact_column(df, categorical_ratio, approximate)
+        out.attrs = dict(df.attrs)
+        return out
+
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+
+    out = pd.DataFrame(
+        {c: _compact_column(df[c], categorical_ratio, approximate) for c in df.columns},
+        index=df.index,
+    )
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def compact_payload(value):
+    """
+    compact_frame() for Series/DataFrame payloads; anything else is
+    returned unchanged.
+    """
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return compact_frame(value)
+    return value
+
+
+# -------------------------------------------------
+# Memory accounting
+# -------------------------------------------------
+def frame_bytes(df):
+    """
+    Bytes held by a frame, including its index and object payloads.
+    """
+    usage = df.memory_usage(deep=True, index=True)
+    return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+
+
+def dtype_summary(df):
+    dtypes = df.dtypes.astype(str) if isinstance(df, pd.DataFrame) else pd.Series([str(df.dtype)])
+    return ", ".join(f"{n}×{t}" for t, n in dtypes.value_counts().items())
+
+
+def memory_report():
+    """
+    One row per cached dataset in this process: the bar cache, the
+    attached shared-cache views and the rendered-figure cache.
+    """
+    from data.data_preprocessing import _bar_cache, _bar_cache_lock
+    from data.shared_cache import get_shared_cache
+    from util.rendering import get_renderer
+
+    rows = []
+    with _bar_cache_lock:
+        bars = dict(_bar_cache)
+    for (symbol, timeframe), (_, df) in sorted(bars.items(), key=lambda kv: str(kv[0])):
+        rows.append({
+            "Cache": "bars",
+            "Dataset": f"{symbol}@{timeframe or 'native'}",
+            "Rows": len(df),
+            "Columns": df.shape[1],
+            "Bytes": frame_bytes(df),
+            "Dtypes": dtype_summary(df),
+        })
+
+    shared = get_shared_cache()
+    for name, (values, index) in sorted(dict(shared._views).items()):
+        rows.append({
+            "Cache": "shared_memory",
+            "Dataset": name,
+            "Rows": len(index),
+            "Columns": values.shape[1] if values.ndim == 2 else 1,
+            "Bytes": int(values.nbytes + index.nbytes),
+            "Dtypes": f"{values.shape[1] if values.ndim == 2 else 1}×{values.dtype} (mapped)",
+        })
+
+    renderer = get_renderer()
+    if renderer._cache:
+        rows.append({
+            "Cache": "render",
+            "Dataset": "figures",
+            "Rows": len(renderer._cache),
+            "Columns": 0,
+            "Bytes": renderer._size,
+            "Dtypes": "png/svg bytes",
+        })
+
+    return pd.DataFrame(rows, columns=["Cache", "Dataset", "Rows", "Columns", "Bytes", "Dtypes"])
@@ -2,20 +2,108 @@ import yfinance as yf
 import pandas as pd
 import os
 
-CACHE_DIR = "data/cached_data"
+from data import versions
+from util.config import DATA_CACHE_DIR, DATA_PROVIDER
+from util.metrics import instrument, record_cache
+
+CACHE_DIR = DATA_CACHE_DIR
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 
-def get_raw_data(symbol="BTC-USD"):
+# -------------------------------------------------
+# Data providers
+# -------------------------------------------------
+def yfinance_provider(symbol):
+    df = yf.download(symbol, start="2023-01-01")
+    df.reset_index(inplace=True)
+    return df
+
+
+def _synthetic_provider(symbol):
+    from data.synthetic import synthetic_provider
+    return synthetic_provider(symbol)
+
+
+PROVIDERS = {
+    "yfinance": yfinance_provider,
+    "synthetic": _synthetic_provider,
+}
+
+
+def register_provider(name, func):
+    """
+    Register a data provider: a callable taking a symbol and returning a
+    frame in the yfinance download layout (Date column + OHLCV).
+    """
+    PROVIDERS[name] = func
+
+
+def raw_data_signature(symbol="BTC-USD"):
+    """
+    (HEAD path, data version) for symbols in the versioned store
+    (data/versions.py), else (path, mtime, size) of the cached raw file,
+    or None if not cached. Used by derived caches to detect when the raw
+    data changed.
+    """
+    version = versions.current_version(symbol)
+    if version is not None:
+        return versions.head_path(symbol), version
+
+    cache_file = os.path.abspath(os.path.join(CACHE_DIR, f"{symbol}.csv"))
+    try:
+        stat = os.stat(cache_file)
+    except OSError:
+        return None
+    return cache_file, stat.st_mtime_ns, stat.st_size
+
+
+def cached_symbols():
+    """
+    Symbols with cached raw data (a CSV or a versioned history).
+    """
+    return sorted(set(
+        f[:-4] for f in os.listdir(CACHE_DIR)
+        if f.endswith(".csv") and "-" in f
+    ) | set(versions.list_symbols()))
+
+
+@instrument("get_raw_data")
+def get_raw_data(symbol="BTC-USD", version=None, as_of=None):
+    """
+    Raw provider-layout frame. Versioned symbols are read from the
+    versioned store at `version` or as of `as_of` (default: the current
+    version); other symbols come from the CSV cache, downloaded on first
+    use.
+    """
+    if as_of is not None:
+        version = versions.resolve_version(symbol, as_of=as_of)
+    if versions.current_version(symbol) is not None:
+        record_cache("raw_data", True)
+        return versions.read_version(symbol, version)
+    if version is not None:
+        raise ValueError(f"{symbol}: not in the versioned store")
+
     cache_file = os.path.join(CACHE_DIR, f"{symbol}.csv")
+    cached = os.path.exists(cache_file)
+    record_cache("raw_data", cached)
 
-    if os.path.exists(cache_file):
+    if cached:
         df = pd.read_csv(cache_file)
     else:
-        df = yf.download(symbol, start="2023-01-01")
-        df.reset_index(inplace=True)
+        df = PROVIDERS[DATA_PROVIDER](symbol)
         df.to_csv(cache_file, index=False)
 
     return df
 
 
+def refresh_raw_data(symbol="BTC-USD"):
+    """
+    Download `symbol` from the data provider and commit the new or
+    revised rows as a new version (the CSV cache, if any, becomes the
+    first version). Returns (version, rows committed).
+    """
+    cache_file = os.path.join(CACHE_DIR, f"{symbol}.csv")
+    if versions.current_version(symbol) is None and os.path.exists(cache_file):
+        versions.commit(symbol, pd.read_csv(cache_file))
+
+    return versions.commit(symbol, PROVIDERS[DATA_PROVIDER](symbol))
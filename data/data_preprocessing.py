@@ -1,11 +1,22 @@
+import threading
+
 import pandas as pd
 import numpy as np
-from data.data_fetcher import get_raw_data
+from data.bars import infer_timeframe, resample_ohlcv, TIMEFRAMES
+from data.compact import compact_frame
+from data.data_fetcher import get_raw_data, raw_data_signature
+from data.versions import current_version
+from data.shared_cache import get_shared_cache
+from data.validation import repair_frame
+from util.config import COMPACT_DTYPES, OUTLIER_Z_THRESHOLD, REPAIR_POLICY, SHARED_CACHE
+from util.metrics import instrument, record_cache
 
+# (symbol, timeframe) -> (raw data signature, OHLCV bars)
+_bar_cache = {}
+_bar_cache_lock = threading.Lock()
 
-def preprocess_data(symbol="BTC-USD"):
-    df = get_raw_data(symbol)
 
+def clean_raw_data(df, symbol="", policy=None):
     # -------------------------
     # FIX 1: Flatten columns (CRITICAL)
     # -------------------------
@@ -28,8 +39,18 @@ def preprocess_data(symbol="BTC-USD"):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df.dropna(subset=["Close"], inplace=True)
+    # -------------------------
+    # Validation & repair (gaps, duplicates, bad ticks, NaNs)
+    # -------------------------
+    df, report = repair_frame(
+        df, symbol, policy=policy or REPAIR_POLICY, z_threshold=OUTLIER_Z_THRESHOLD
+    )
+    df.attrs["quality"] = report
+
+    return df
+
 
+def add_features(df):
     # -------------------------
     # Feature Engineering
     # -------------------------
@@ -44,3 +65,104 @@ def preprocess_data(symbol="BTC-USD"):
     df.dropna(inplace=True)
 
     return df
+
+
+def _is_current(symbol, version):
+    return version is None or version == current_version(symbol)
+
+
+def _tail(bars, since):
+    return bars if since is None else bars.iloc[bars.index.searchsorted(since):]
+
+
+def get_bars(symbol="BTC-USD", timeframe=None, version=None, since=None):
+    """
+    Clean OHLCV bars for `symbol` at `timeframe` (None = native spacing
+    of the stored data), only those at or after `since` when given.
+    Aggregated timeframes are cached per process (float32 when
+    COMPACT_DTYPES is on) and invalidated when the underlying raw data
+    changes. A past `version` of a versioned symbol (data/versions.py)
+    is read uncached.
+    """
+    signature = raw_data_signature(symbol) if _is_current(symbol, version) else None
+    key = (symbol, timeframe)
+
+    with _bar_cache_lock:
+        entry = _bar_cache.get(key)
+    if entry is not None and signature is not None and entry[0] == signature:
+        record_cache("bars", True)
+        return _tail(entry[1], since).copy()
+
+    record_cache("bars", False)
+    bars = clean_raw_data(get_raw_data(symbol, version=version), symbol)
+    native = infer_timeframe(bars.index)
+
+    if timeframe is not None and timeframe != native:
+        if TIMEFRAMES[timeframe] < TIMEFRAMES[native]:
+            raise ValueError(
+                f"{symbol}: cannot build {timeframe} bars from {native} data"
+            )
+        quality = bars.attrs["quality"]
+        bars = resample_ohlcv(bars, timeframe)
+        bars.attrs["quality"] = quality
+
+    bars.attrs["timeframe"] = timeframe or native
+
+    if signature is not None:
+        if COMPACT_DTYPES:
+            bars = compact_frame(bars)
+        with _bar_cache_lock:
+            _bar_cache[key] = (signature, bars)
+        bars = bars.copy()
+
+    return _tail(bars, since)
+
+
+def native_timeframe(symbol="BTC-USD"):
+    """
+    Timeframe of the stored bars of `symbol` (their native spacing).
+    """
+    return get_bars(symbol).attrs["timeframe"]
+
+
+def available_timeframes(symbol="BTC-USD"):
+    """
+    Timeframes that can be built from the stored bars of `symbol`
+    (the native spacing and everything coarser).
+    """
+    native = native_timeframe(symbol)
+    return [tf for tf, seconds in TIMEFRAMES.items() if seconds >= TIMEFRAMES[native]]
+
+
+def compute_features(symbol="BTC-USD", timeframe=None, columns=None, version=None):
+    df = get_bars(symbol, timeframe, version)
+    timeframe = df.attrs["timeframe"]
+
+    # Features are computed in float64 and stored compact
+    df = df.astype({c: np.float64 for c in df.columns if df[c].dtype.kind == "f"})
+    df = add_features(df)
+    df.attrs["timeframe"] = timeframe
+
+    if COMPACT_DTYPES:
+        return compact_frame(df, columns)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+@instrument("preprocess_data")
+def preprocess_data(symbol="BTC-USD", timeframe=None, columns=None, version=None):
+    """
+    Clean bars + features, projected to `columns` when given, from
+    `version` of the raw data (default: the current one). Served as a
+    read-only, zero-copy view from the cross-process shared cache
+    (data/shared_cache.py) when a loader has published this symbol from
+    the current raw data; shared views are returned whole since they
+    hold no private memory.
+    """
+    if SHARED_CACHE and _is_current(symbol, version):
+        df = get_shared_cache().get(symbol, timeframe, raw_data_signature(symbol))
+        if df is not None:
+            return df
+
+    return compute_features(symbol, timeframe, columns, version)
@@ -0,0 +1,336 @@
+# =========================================================
+# job_store.py
+# SQLite queue of long-running analytics jobs (see analytics/jobs.py)
+#
+# A job is (kind, params) with a content key. Submitting a key that is
+# already queued or running returns the in-flight job, and a finished
+# job is served as a cached result until it expires, so many sessions
+# asking for the same forecast share one fit. Sessions subscribe to
+# jobs; a job is cancelled only when its last subscriber leaves.
+# =========================================================
+
+import pickle
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from data.results_store import get_connection
+
+JOBS_DB = "data/results/jobs.db"
+
+
+def _now(offset=0):
+    when = datetime.now(timezone.utc) + timedelta(seconds=offset)
+    return when.isoformat(timespec="seconds")
+
+
+def create_jobs_table(db_path=None):
+    conn = get_connection(db_path or JOBS_DB)
+
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                params BLOB NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                error TEXT,
+                result BLOB,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                heartbeat_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (key, status)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, id)"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_subscribers (
+                job_id INTEGER NOT NULL,
+                subscriber TEXT NOT NULL,
+                PRIMARY KEY (job_id, subscriber)
+            )
+        """)
+
+    conn.close()
+
+
+_created = set()
+
+
+def _connect(db_path):
+    if (db_path or JOBS_DB) not in _created:
+        create_jobs_table(db_path)
+        _created.add(db_path or JOBS_DB)
+    conn = get_connection(db_path or JOBS_DB)
+    conn.row_factory = sqlite3.Row
+    conn.isolation_level = None  # explicit BEGIN IMMEDIATE below
+    return conn
+
+
+def _job_dict(row):
+    job = dict(row)
+    job.pop("params", None)
+    job.pop("result", None)
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+# -------------------------------------------------
+# Submitting & cancelling
+# -------------------------------------------------
+def submit_job(kind, params, key, subscriber=None, result_ttl=3600, db_path=None):
+    """
+    Id of the job computing `key`: an in-flight job, a finished one
+    younger than `result_ttl` seconds, or a newly queued job.
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE key = ? AND (status IN ('queued', 'running') "
+            "OR (status = 'done' AND finished_at >= ?)) ORDER BY id DESC LIMIT 1",
+            (key, _now(-result_ttl))
+        ).fetchone()
+
+        if row is not None:
+            job_id = row["id"]
+        else:
+            job_id = conn.execute(
+                "INSERT INTO jobs (key, kind, params, created_at) VALUES (?, ?, ?, ?)",
+                (key, kind, pickle.dumps(params, protocol=pickle.HIGHEST_PROTOCOL), _now())
+            ).lastrowid
+
+        if subscriber is not None:
+            conn.execute(
+                "INSERT OR IGNORE INTO job_subscribers (job_id, subscriber) VALUES (?, ?)",
+                (job_id, subscriber)
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return job_id
+
+
+def cancel_job(job_id, subscriber=None, db_path=None):
+    """
+    Unsubscribe `subscriber` (None = force) and cancel the job once
+    nobody is waiting for it. Queued jobs are cancelled at once; running
+    jobs stop at their next progress report. Returns True if cancelled.
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if subscriber is not None:
+            conn.execute(
+                "DELETE FROM job_subscribers WHERE job_id = ? AND subscriber = ?",
+                (job_id, subscriber)
+            )
+            waiting = conn.execute(
+                "SELECT COUNT(*) FROM job_subscribers WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            if waiting:
+                conn.execute("COMMIT")
+                return False
+
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (_now(), job_id)
+        )
+        conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+            (job_id,)
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return True
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+def claim_job(worker, kinds=None, job_id=None, db_path=None):
+    """
+    Atomically move the oldest queued job (of `kinds`, or `job_id`
+    itself) to running. Returns (id, kind, params) or None when there is
+    nothing to claim.
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        sql = "SELECT id, kind, params FROM jobs WHERE status = 'queued'"
+        args = []
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            args += list(kinds)
+        if job_id is not None:
+            sql += " AND id = ?"
+            args.append(job_id)
+        row = conn.execute(sql + " ORDER BY id LIMIT 1", args).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        now = _now()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? "
+            "WHERE id = ?",
+            (worker, now, now, row["id"])
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return row["id"], row["kind"], pickle.loads(row["params"])
+
+
+# Every write of a claimed job matches its claim, so a worker whose job
+# was requeued (and perhaps claimed again) can no longer touch it
+_CLAIMED = "id = ? AND status = 'running' AND worker = ?"
+
+
+def report_progress(job_id, worker, progress, message="", db_path=None):
+    """
+    Record progress (0..1) and a heartbeat. Returns True when the job
+    has been asked to stop or `worker` no longer holds its claim.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(
+            f"UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ? WHERE {_CLAIMED}",
+            (float(progress), message, _now(), job_id, worker)
+        )
+        if not cur.rowcount:
+            return True
+        row = conn.execute(
+            "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return bool(row and row["cancel_requested"])
+
+
+def heartbeat(job_id, worker, db_path=None):
+    """
+    Refresh a running job's heartbeat without touching its progress.
+    Returns False when `worker` no longer holds its claim.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(f"UPDATE jobs SET heartbeat_at = ? WHERE {_CLAIMED}",
+                           (_now(), job_id, worker))
+    finally:
+        conn.close()
+    return cur.rowcount > 0
+
+
+def finish_job(job_id, worker, status, result=None, error=None, db_path=None):
+    """
+    Close a running job as done (with its pickled result), failed or
+    cancelled. Returns False (and records nothing) when `worker` no
+    longer holds its claim.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END, "
+            f"result = ?, error = ?, finished_at = ? WHERE {_CLAIMED}",
+            (status, status,
+             pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL) if status == "done" else None,
+             error, _now(), job_id, worker)
+        )
+    finally:
+        conn.close()
+    return cur.rowcount > 0
+
+
+def requeue_stale(timeout, db_path=None):
+    """
+    Put running jobs whose worker stopped reporting for `timeout`
+    seconds back in the queue. Returns how many were requeued.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, progress = 0, "
+            "message = 'requeued' WHERE status = 'running' AND heartbeat_at < ?",
+            (_now(-timeout),)
+        )
+        count = cur.rowcount
+    finally:
+        conn.close()
+    return count
+
+
+def prune_jobs(older_than, db_path=None):
+    """
+    Delete finished jobs (and their cached results) older than
+    `older_than` seconds.
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cutoff = _now(-older_than)
+        conn.execute(
+            "DELETE FROM job_subscribers WHERE job_id IN "
+            "(SELECT id FROM jobs WHERE status IN ('done', 'failed', 'cancelled') "
+            "AND finished_at < ?)",
+            (cutoff,)
+        )
+        count = conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < ?",
+            (cutoff,)
+        ).rowcount
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return count
+
+
+# -------------------------------------------------
+# Queries
+# -------------------------------------------------
+def get_job(job_id, db_path=None):
+    """
+    Job status row (without params / result), or None.
+    """
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _job_dict(row) if row else None
+
+
+def get_job_result(job_id, db_path=None):
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return pickle.loads(row["result"]) if row and row["result"] is not None else None
+
+
+def list_jobs(limit=50, db_path=None):
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT j.*, (SELECT COUNT(*) FROM job_subscribers s WHERE s.job_id = j.id) "
+            "AS subscribers FROM jobs j ORDER BY j.id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [_job_dict(r) for r in rows]
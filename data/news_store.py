@@ -0,0 +1,257 @@
+# =========================================================
+# news_store.py
+# SQLite corpus of fetched headlines, clustered into stories
+# (see analytics/news_dedup.py)
+#
+# Each headline keeps its MinHash signature and one LSH bucket key per
+# band. Finding near-duplicate candidates is an indexed lookup of the
+# new headline's bucket keys, so the cost doesn't grow with the number
+# of stored headlines. A story (cluster) is scored for sentiment once,
+# from its first headline.
+# =========================================================
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from data.results_store import get_connection
+
+NEWS_DB = "data/results/news.db"
+
+
+def _now(offset_days=0):
+    when = datetime.now(timezone.utc) + timedelta(days=offset_days)
+    return when.isoformat(timespec="seconds")
+
+
+def create_news_tables(db_path=None):
+    conn = get_connection(db_path or NEWS_DB)
+
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_clusters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                headline TEXT NOT NULL,
+                size INTEGER NOT NULL DEFAULT 1,
+                sentiment REAL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_headlines (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text_hash TEXT NOT NULL UNIQUE,
+                headline TEXT NOT NULL,
+                source TEXT,
+                published TEXT,
+                fetched_at TEXT NOT NULL,
+                cluster_id INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_headlines_fetched ON news_headlines (fetched_at)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_news_headlines_cluster ON news_headlines (cluster_id)"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_lsh (
+                key INTEGER NOT NULL,
+                headline_id INTEGER NOT NULL,
+                PRIMARY KEY (key, headline_id)
+            ) WITHOUT ROWID
+        """)
+
+    conn.close()
+
+
+_created = set()
+
+
+def _connect(db_path):
+    if (db_path or NEWS_DB) not in _created:
+        create_news_tables(db_path)
+        _created.add(db_path or NEWS_DB)
+    return get_connection(db_path or NEWS_DB)
+
+
+# -------------------------------------------------
+# Lookups
+# -------------------------------------------------
+def find_exact(text_hashes, db_path=None):
+    """
+    {text_hash: cluster_id} for headlines already stored verbatim
+    (after normalization).
+    """
+    if not text_hashes:
+        return {}
+    conn = _connect(db_path)
+    try:
+        found = {}
+        hashes = list(text_hashes)
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            found.update(conn.execute(
+                f"SELECT text_hash, cluster_id FROM news_headlines "
+                f"WHERE text_hash IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+    finally:
+        conn.close()
+    return found
+
+
+def find_candidates(keys, width, limit=256, db_path=None):
+    """
+    Stored headlines sharing at least one LSH bucket with each item of
+    `keys` (a list of bucket-key lists), newest first and at most `limit`
+    per item. Returns one (cluster ids, signature matrix) pair per item;
+    signatures of another length than `width` are skipped.
+    """
+    conn = _connect(db_path)
+    try:
+        out = []
+        for item_keys in keys:
+            item_keys = [int(k) for k in item_keys]
+            rows = conn.execute(
+                f"SELECT h.cluster_id, h.signature FROM news_headlines h WHERE h.id IN "
+                f"(SELECT headline_id FROM news_lsh WHERE key IN "
+                f"({', '.join('?' * len(item_keys))})) AND length(h.signature) = ? "
+                f"ORDER BY h.id DESC LIMIT ?",
+                item_keys + [4 * width, limit]
+            ).fetchall()
+            signatures = np.frombuffer(b"".join(sig for _, sig in rows), dtype=np.uint32)
+            out.append(([cid for cid, _ in rows], signatures.reshape(len(rows), width)))
+    finally:
+        conn.close()
+    return out
+
+
+def get_clusters(cluster_ids, db_path=None):
+    """
+    {cluster_id: {"headline", "size", "sentiment", "first_seen", "last_seen"}}.
+    """
+    ids = [int(c) for c in dict.fromkeys(cluster_ids)]
+    if not ids:
+        return {}
+    conn = _connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for row in conn.execute(
+                f"SELECT * FROM news_clusters WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ):
+                found[row["id"]] = {k: row[k] for k in row.keys() if k != "id"}
+    finally:
+        conn.close()
+    return found
+
+
+# -------------------------------------------------
+# Writes
+# -------------------------------------------------
+def add_headlines(items, db_path=None):
+    """
+    Store new headlines in one transaction. Each item is a dict with
+    text_hash, headline, source, published, signature, keys and
+    cluster: an existing cluster id, None to start a new story, or
+    ("item", i) to join the story of items[i] (an earlier item of the
+    same batch). Returns the cluster id of every item.
+    """
+    conn = _connect(db_path)
+    now = _now()
+    cluster_ids = []
+    try:
+        with conn:
+            for item in items:
+                cluster = item["cluster"]
+                if isinstance(cluster, tuple):
+                    cluster = cluster_ids[cluster[1]]
+                if cluster is None:
+                    cluster = conn.execute(
+                        "INSERT INTO news_clusters (headline, size, first_seen, last_seen) "
+                        "VALUES (?, 0, ?, ?)",
+                        (item["headline"], now, now)
+                    ).lastrowid
+
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO news_headlines "
+                    "(text_hash, headline, source, published, fetched_at, cluster_id, signature) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item["text_hash"], item["headline"], item.get("source"), item.get("published"),
+                     now, cluster, np.asarray(item["signature"], dtype=np.uint32).tobytes())
+                )
+                if cursor.rowcount == 1:  # not a verbatim repeat
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO news_lsh (key, headline_id) VALUES (?, ?)",
+                        [(int(k), cursor.lastrowid) for k in item["keys"]]
+                    )
+                    conn.execute(
+                        "UPDATE news_clusters SET size = size + 1, last_seen = ? WHERE id = ?",
+                        (now, cluster)
+                    )
+                cluster_ids.append(cluster)
+    finally:
+        conn.close()
+    return cluster_ids
+
+
+def set_cluster_sentiment(scores, db_path=None):
+    """
+    Store {cluster_id: sentiment score}.
+    """
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                "UPDATE news_clusters SET sentiment = ? WHERE id = ?",
+                [(float(s), int(c)) for c, s in scores.items()]
+            )
+    finally:
+        conn.close()
+
+
+def prune_news(older_than_days, db_path=None):
+    """
+    Delete headlines fetched more than `older_than_days` ago, their LSH
+    buckets and stories left without headlines. Returns the number of
+    headlines deleted.
+    """
+    conn = _connect(db_path)
+    cutoff = _now(-older_than_days)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE news_clusters SET size = size - (SELECT COUNT(*) FROM news_headlines h "
+                "WHERE h.cluster_id = news_clusters.id AND h.fetched_at < ?) "
+                "WHERE id IN (SELECT cluster_id FROM news_headlines WHERE fetched_at < ?)",
+                (cutoff, cutoff)
+            )
+            conn.execute(
+                "DELETE FROM news_lsh WHERE headline_id IN "
+                "(SELECT id FROM news_headlines WHERE fetched_at < ?)",
+                (cutoff,)
+            )
+            count = conn.execute(
+                "DELETE FROM news_headlines WHERE fetched_at < ?", (cutoff,)
+            ).rowcount
+            conn.execute("DELETE FROM news_clusters WHERE size <= 0")
+    finally:
+        conn.close()
+    return count
+
+
+def news_stats(db_path=None):
+    conn = _connect(db_path)
+    try:
+        headlines, clusters = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM news_headlines), (SELECT COUNT(*) FROM news_clusters)"
+        ).fetchone()
+    finally:
+        conn.close()
+    return {"headlines": headlines, "stories": clusters}
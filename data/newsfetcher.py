@@ -1,6 +1,8 @@
 import pandas as pd
 import feedparser
 
+from util.metrics import instrument
+
 # Google News RSS URLs (crypto-specific)
 GOOGLE_NEWS_RSS = {
     "Bitcoin": "https://news.google.com/rss/search?q=bitcoin+cryptocurrency&hl=en-IN&gl=IN&ceid=IN:en",
@@ -8,6 +10,7 @@ GOOGLE_NEWS_RSS = {
 }
 
 
+@instrument("fetch_news")
 def fetch_news(crypto="Bitcoin", limit=20):
     """
     Fetch latest crypto-related news headlines using Google News RSS
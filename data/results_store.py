@@ -0,0 +1,365 @@
+# =========================================================
+# results_store.py
+# SQLite store of precomputed analytics results
+# keyed by (snapshot, symbol, metric, window) with the data as-of time
+#
+# Writers build a new snapshot and publish it in one transaction
+# (atomic swap of the "live" pointer). Readers resolve the live
+# snapshot once and never see a half-written batch.
+#
+# Payloads are stored once, in the snapshot that computed them; each
+# snapshot's view is a table of references (key -> source snapshot), so
+# carrying unchanged results forward never copies a payload.
+# =========================================================
+
+import os
+import pickle
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from data.compact import compact_payload
+from util.config import COMPACT_DTYPES, RESULTS_BUILD_TIMEOUT_SECONDS
+
+RESULTS_DB = "data/results/results.db"
+
+
+def get_connection(db_path=None):
+    db_path = db_path or RESULTS_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# Payload of every (symbol, metric, window) a snapshot shows
+_VIEW = (
+    "result_refs v JOIN results r ON r.snapshot_id = v.source_id "
+    "AND r.symbol = v.symbol AND r.metric = v.metric AND r.window = v.window"
+)
+
+
+def create_results_table(db_path=None):
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    # Results written before snapshots existed are plain cache; drop them.
+    columns = [r[1] for r in cursor.execute("PRAGMA table_info(results)")]
+    if columns and "snapshot_id" not in columns:
+        cursor.execute("DROP TABLE results")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            published_at TEXT,
+            status TEXT NOT NULL DEFAULT 'building',
+            note TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS results (
+            snapshot_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            window TEXT NOT NULL DEFAULT '',
+            as_of TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            PRIMARY KEY (snapshot_id, symbol, metric, window)
+        )
+    """)
+
+    # Databases from before references were introduced hold a full copy
+    # per snapshot; each row then references itself
+    has_refs = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'result_refs'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS result_refs (
+            snapshot_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            window TEXT NOT NULL DEFAULT '',
+            source_id INTEGER NOT NULL,
+            PRIMARY KEY (snapshot_id, symbol, metric, window)
+        )
+    """)
+    if not has_refs:
+        cursor.execute(
+            "INSERT OR IGNORE INTO result_refs (snapshot_id, symbol, metric, window, source_id) "
+            "SELECT snapshot_id, symbol, metric, window, snapshot_id FROM results"
+        )
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS live_snapshot (
+            name TEXT PRIMARY KEY,
+            snapshot_id INTEGER NOT NULL
+        )
+    """)
+
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_results_lookup "
+        "ON results (symbol, metric, window, as_of)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_result_refs_source "
+        "ON result_refs (source_id, symbol, metric, window)"
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# -------------------------------------------------
+# Snapshots
+# -------------------------------------------------
+def begin_snapshot(note=None, db_path=None):
+    """
+    Start a new (invisible) snapshot and return its id.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO snapshots (created_at, status, note) VALUES (?, 'building', ?)",
+            (_now(), note)
+        )
+    snapshot_id = cursor.lastrowid
+    conn.close()
+    return snapshot_id
+
+
+def live_snapshot_id(db_path=None):
+    """
+    Id of the snapshot readers currently see (None if nothing published).
+    """
+    conn = get_connection(db_path)
+    try:
+        row = conn.execute(
+            "SELECT snapshot_id FROM live_snapshot WHERE name = 'live'"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+    return row[0] if row else None
+
+
+def publish_snapshot(snapshot_id, inherit=True, db_path=None):
+    """
+    Atomically make `snapshot_id` the live snapshot.
+
+    With inherit=True, symbols/metrics not recomputed in this snapshot
+    are carried forward from the previous live snapshot, so partial
+    refreshes don't hide older results. Only references are carried;
+    the payloads stay in the snapshots that computed them.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        previous = conn.execute(
+            "SELECT snapshot_id FROM live_snapshot WHERE name = 'live'"
+        ).fetchone()
+
+        if inherit and previous:
+            conn.execute("""
+                INSERT OR IGNORE INTO result_refs
+                    (snapshot_id, symbol, metric, window, source_id)
+                SELECT ?, symbol, metric, window, source_id
+                FROM result_refs WHERE snapshot_id = ?
+            """, (snapshot_id, previous[0]))
+
+        conn.execute(
+            "UPDATE snapshots SET status = 'ready', published_at = ? WHERE id = ?",
+            (_now(), snapshot_id)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO live_snapshot (name, snapshot_id) VALUES ('live', ?)",
+            (snapshot_id,)
+        )
+    conn.close()
+
+
+def pin_snapshot(snapshot_id, db_path=None):
+    """
+    Finish `snapshot_id` without publishing it (e.g. results recomputed
+    from past data versions); pinned snapshots are never pruned and are
+    read with snapshot_id=.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute(
+            "UPDATE snapshots SET status = 'pinned', published_at = ? WHERE id = ?",
+            (_now(), snapshot_id)
+        )
+    conn.close()
+
+
+def prune_snapshots(keep=3, build_timeout=None, db_path=None):
+    """
+    Delete all but the newest `keep` published snapshots (the live one and
+    pinned ones are always kept) and builds started more than
+    `build_timeout` seconds ago (default RESULTS_BUILD_TIMEOUT_SECONDS),
+    which are taken as abandoned. Payloads are deleted once no kept
+    snapshot references them.
+    """
+    if build_timeout is None:
+        build_timeout = RESULTS_BUILD_TIMEOUT_SECONDS
+    started_after = (datetime.now(timezone.utc) - timedelta(seconds=build_timeout)) \
+        .isoformat(timespec="seconds")
+
+    conn = get_connection(db_path)
+    with conn:
+        live = conn.execute(
+            "SELECT snapshot_id FROM live_snapshot WHERE name = 'live'"
+        ).fetchone()
+        live_id = live[0] if live else -1
+
+        keep_ids = [r[0] for r in conn.execute(
+            "SELECT id FROM snapshots WHERE status = 'ready' ORDER BY id DESC LIMIT ?",
+            (keep,)
+        )]
+        keep_ids.append(live_id)
+
+        # Concurrent writers may each be building one
+        building = [r[0] for r in conn.execute(
+            "SELECT id FROM snapshots WHERE status = 'building' AND created_at >= ?",
+            (started_after,)
+        )]
+        keep_ids.extend(building)
+        keep_ids.extend(r[0] for r in conn.execute(
+            "SELECT id FROM snapshots WHERE status = 'pinned'"
+        ))
+
+        placeholders = ",".join("?" * len(keep_ids))
+        conn.execute(f"DELETE FROM result_refs WHERE snapshot_id NOT IN ({placeholders})",
+                     keep_ids)
+        conn.execute("""
+            DELETE FROM results WHERE NOT EXISTS (
+                SELECT 1 FROM result_refs v WHERE v.source_id = results.snapshot_id
+                AND v.symbol = results.symbol AND v.metric = results.metric
+                AND v.window = results.window
+            )
+        """)
+        conn.execute(f"DELETE FROM snapshots WHERE id NOT IN ({placeholders})", keep_ids)
+    conn.close()
+
+
+def list_snapshots(db_path=None):
+    conn = get_connection(db_path)
+    rows = conn.execute(
+        "SELECT s.id, s.created_at, s.published_at, s.status, s.note, COUNT(v.symbol) "
+        "FROM snapshots s LEFT JOIN result_refs v ON v.snapshot_id = s.id "
+        "GROUP BY s.id ORDER BY s.id DESC"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+# -------------------------------------------------
+# Results
+# -------------------------------------------------
+def _as_of_str(as_of):
+    return as_of.isoformat() if hasattr(as_of, "isoformat") else str(as_of)
+
+
+def put_results(symbol, as_of, results, snapshot_id, db_path=None):
+    """
+    Store {(metric, window): payload} for one symbol in one transaction.
+    Series/DataFrame payloads are stored compact (float32) when
+    COMPACT_DTYPES is on.
+    """
+    created = _now()
+    pack = compact_payload if COMPACT_DTYPES else (lambda payload: payload)
+    rows = [
+        (snapshot_id, symbol, metric, window, _as_of_str(as_of), created,
+         pickle.dumps(pack(payload), protocol=pickle.HIGHEST_PROTOCOL))
+        for (metric, window), payload in results.items()
+    ]
+
+    conn = get_connection(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO results "
+            "(snapshot_id, symbol, metric, window, as_of, created_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO result_refs "
+            "(snapshot_id, symbol, metric, window, source_id) VALUES (?, ?, ?, ?, ?)",
+            [(snapshot_id, symbol, metric, window, snapshot_id)
+             for snapshot_id, symbol, metric, window, *_ in rows]
+        )
+    conn.close()
+    return len(rows)
+
+
+def get_result(symbol, metric, window="", as_of=None, snapshot_id=None, db_path=None):
+    """
+    Payload for (symbol, metric, window) from the live snapshot (or
+    `snapshot_id`). With `as_of`, the newest published result computed
+    from data as of that time. Returns None when nothing is stored.
+    """
+    conn = get_connection(db_path)
+
+    try:
+        if as_of is not None:
+            row = conn.execute(
+                f"SELECT r.payload FROM {_VIEW} JOIN snapshots s ON s.id = v.snapshot_id "
+                "WHERE v.symbol = ? AND v.metric = ? AND v.window = ? AND r.as_of = ? "
+                "AND s.status = 'ready' ORDER BY v.snapshot_id DESC LIMIT 1",
+                (symbol, metric, window, _as_of_str(as_of))
+            ).fetchone()
+        else:
+            row = conn.execute(
+                f"SELECT r.payload FROM {_VIEW} WHERE v.snapshot_id = "
+                "COALESCE(?, (SELECT snapshot_id FROM live_snapshot WHERE name = 'live')) "
+                "AND v.symbol = ? AND v.metric = ? AND v.window = ?",
+                (snapshot_id, symbol, metric, window)
+            ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+
+    conn.close()
+    return pickle.loads(row[0]) if row else None
+
+
+def get_symbol_results(symbol, snapshot_id=None, db_path=None):
+    """
+    Every stored (metric, window) -> payload for one symbol in the live
+    snapshot, fetched in a single query. Returns {} when nothing is stored.
+    """
+    conn = get_connection(db_path)
+
+    try:
+        rows = conn.execute(
+            f"SELECT v.metric, v.window, r.payload FROM {_VIEW} WHERE v.snapshot_id = "
+            "COALESCE(?, (SELECT snapshot_id FROM live_snapshot WHERE name = 'live')) "
+            "AND v.symbol = ?",
+            (snapshot_id, symbol)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+
+    conn.close()
+    return {(metric, window): pickle.loads(payload) for metric, window, payload in rows}
+
+
+def list_symbols(snapshot_id=None, db_path=None):
+    conn = get_connection(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT DISTINCT symbol FROM result_refs WHERE snapshot_id = "
+            "COALESCE(?, (SELECT snapshot_id FROM live_snapshot WHERE name = 'live')) "
+            "ORDER BY symbol",
+            (snapshot_id,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    conn.close()
+    return [r[0] for r in rows]
@@ -0,0 +1,164 @@
+# =========================================================
+# screener_store.py
+# Indexed SQLite table of the latest per-symbol screening metrics
+#
+# One row per (symbol, timeframe), upserted as new bars land. Every
+# filterable / sortable column has its own index so filter + ORDER BY
+# + LIMIT queries over thousands of symbols stay in the milliseconds.
+# =========================================================
+
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data.results_store import get_connection
+
+SCREENER_DB = "data/results/screener.db"
+
+# Screening metrics (all REAL, NULL when not available)
+METRIC_COLUMNS = [
+    "close",
+    "return_1",
+    "return_7",
+    "return_30",
+    "volatility_30",
+    "max_drawdown",
+    "rsi_14",
+    "macd_hist",
+    "adx_14",
+    "atr_pct",
+    "volume_avg_30",
+    "sentiment",
+]
+
+OPERATORS = {"<", "<=", ">", ">=", "=", "!="}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def create_screener_table(db_path=None):
+    conn = get_connection(db_path or SCREENER_DB)
+    columns = ",\n".join(f"{c} REAL" for c in METRIC_COLUMNS)
+
+    with conn:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS screener (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL DEFAULT '1d',
+                as_of TEXT,
+                updated_at TEXT NOT NULL,
+                {columns},
+                PRIMARY KEY (symbol, timeframe)
+            )
+        """)
+        for c in METRIC_COLUMNS:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_screener_{c} ON screener (timeframe, {c})"
+            )
+    conn.close()
+
+
+def upsert_rows(rows, timeframe="1d", db_path=None):
+    """
+    Insert or update screener rows (dicts with "symbol", optional
+    "as_of" and any METRIC_COLUMNS). Only the columns present are
+    written, so e.g. sentiment updates don't clobber price metrics.
+    """
+    if not rows:
+        return 0
+
+    conn = get_connection(db_path or SCREENER_DB)
+    now = _now()
+    written = 0
+
+    # Group by column set so each group is one executemany
+    groups = {}
+    for row in rows:
+        cols = tuple(k for k in row if k in METRIC_COLUMNS or k == "as_of")
+        groups.setdefault(cols, []).append(row)
+
+    with conn:
+        for cols, group in groups.items():
+            names = ", ".join(("symbol", "timeframe", "updated_at") + cols)
+            marks = ", ".join("?" * (3 + len(cols)))
+            updates = ", ".join(f"{c} = excluded.{c}" for c in ("updated_at",) + cols)
+
+            conn.executemany(
+                f"INSERT INTO screener ({names}) VALUES ({marks}) "
+                f"ON CONFLICT (symbol, timeframe) DO UPDATE SET {updates}",
+                [
+                    (r["symbol"], timeframe, now, *(
+                        str(r[c]) if c == "as_of" else _real(r[c]) for c in cols
+                    ))
+                    for r in group
+                ]
+            )
+            written += len(group)
+    conn.close()
+    return written
+
+
+def _real(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+def set_sentiment(symbol, score, timeframe="1d", db_path=None):
+    create_screener_table(db_path)
+    upsert_rows([{"symbol": symbol, "sentiment": score}], timeframe, db_path)
+
+
+def query(filters=(), order_by="return_30", descending=True, limit=20, timeframe="1d",
+          db_path=None):
+    """
+    Filter / sort / top-k over the screener table.
+
+    filters: iterable of (column, operator, value), e.g.
+             [("volatility_30", "<", 0.8), ("rsi_14", ">", 50)]
+    Returns a DataFrame indexed by symbol.
+    """
+    clauses, params = ["timeframe = ?"], [timeframe]
+    for column, op, value in filters:
+        if column not in METRIC_COLUMNS or op not in OPERATORS:
+            raise ValueError(f"invalid filter {column} {op} {value!r}")
+        clauses.append(f"{column} {op} ?")
+        params.append(value)
+
+    if order_by not in METRIC_COLUMNS:
+        raise ValueError(f"cannot sort by {order_by!r}")
+
+    sql = (
+        f"SELECT symbol, as_of, {', '.join(METRIC_COLUMNS)} FROM screener "
+        f"WHERE {' AND '.join(clauses)} AND {order_by} IS NOT NULL "
+        f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+    )
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    conn = get_connection(db_path or SCREENER_DB)
+    try:
+        df = pd.read_sql_query(sql, conn, params=params)
+    except sqlite3.OperationalError:  # table not created yet
+        df = pd.DataFrame(columns=["symbol", "as_of"] + METRIC_COLUMNS)
+    conn.close()
+    df[METRIC_COLUMNS] = df[METRIC_COLUMNS].astype(float)
+    return df.set_index("symbol")
+
+
+def count_symbols(timeframe="1d", db_path=None):
+    conn = get_connection(db_path or SCREENER_DB)
+    try:
+        n = conn.execute(
+            "SELECT COUNT(*) FROM screener WHERE timeframe = ?", (timeframe,)
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        n = 0
+    conn.close()
+    return n
@@ -0,0 +1,283 @@
+# =========================================================
+# shared_cache.py
+# Cross-process, zero-copy cache of preprocessed price/feature frames
+#
+# One loader process publishes every (symbol, timeframe) frame as
+# memory-mapped .npy files (float32/64 values + int64 timestamps) in a new
+# generation directory with a JSON catalog, then flips the CURRENT
+# pointer atomically. Streamlit workers attach read-only views of the
+# current generation, so the page cache holds one copy per host instead
+# of one per worker. Old generations stay readable until pruned.
+#
+# Usage (from the repository root):
+#   python -m data.shared_cache --publish --all-cached --timeframes 1d 1h
+#   python -m data.shared_cache --publish --all-cached --interval 300
+#   python -m data.shared_cache --status
+# =========================================================
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from util.metrics import record_cache
+
+CURRENT = "CURRENT"
+CATALOG = "catalog.json"
+
+
+def default_root():
+    # tmpfs keeps the pages in RAM without touching the disk
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else "data"
+    return os.path.join(base, "crypto-shared-cache")
+
+
+def _entry_name(symbol, timeframe):
+    return f"{symbol}@{timeframe or 'native'}"
+
+
+# -------------------------------------------------
+# Publisher (loader process)
+# -------------------------------------------------
+def _generations(root):
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(d[4:]) for d in os.listdir(root) if d.startswith("gen-") and d[4:].isdigit())
+
+
+def current_generation(root):
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def publish(frames, root=None, keep=2):
+    """
+    Write {(symbol, timeframe): (frame, signature)} as a new generation
+    and make it current. Returns the generation number.
+
+    Frames must be numeric with a DatetimeIndex; attrs (timeframe,
+    quality report) are kept in the catalog. A native-timeframe frame
+    is also listed under its resolved timeframe (e.g. BTC-USD@1d),
+    sharing the same files, so callers asking for it by name hit too.
+    """
+    root = root or default_root()
+    os.makedirs(root, exist_ok=True)
+    generation = max(_generations(root), default=0) + 1
+    tmp = os.path.join(root, f"tmp-{generation}-{os.getpid()}")
+    os.makedirs(tmp)
+
+    catalog = {"generation": generation, "created": time.time(), "entries": {}}
+    for (symbol, timeframe), (df, signature) in frames.items():
+        name = _entry_name(symbol, timeframe)
+        dtype = np.result_type(*df.dtypes) if len(df.columns) else np.float64
+        np.save(os.path.join(tmp, f"{name}.values.npy"),
+                np.ascontiguousarray(df.to_numpy(dtype=dtype)))
+        np.save(os.path.join(tmp, f"{name}.index.npy"),
+                df.index.to_numpy(dtype="datetime64[ns]").view(np.int64))
+        catalog["entries"][name] = {
+            "columns": list(df.columns),
+            "rows": len(df),
+            "itemsize": np.dtype(dtype).itemsize,
+            "signature": list(signature) if signature else None,
+            "attrs": {k: v for k, v in df.attrs.items() if k in ("timeframe", "quality")},
+        }
+
+    # Alias native frames under their resolved timeframe unless that
+    # timeframe was published on its own
+    for (symbol, timeframe), (df, _) in frames.items():
+        resolved = df.attrs.get("timeframe")
+        if timeframe is None and resolved and (symbol, resolved) not in frames:
+            name = _entry_name(symbol, None)
+            catalog["entries"][_entry_name(symbol, resolved)] = dict(
+                catalog["entries"][name], file=name
+            )
+
+    with open(os.path.join(tmp, CATALOG), "w") as f:
+        json.dump(catalog, f, default=int)
+
+    os.rename(tmp, os.path.join(root, f"gen-{generation}"))
+    pointer = os.path.join(root, f"{CURRENT}.tmp")
+    with open(pointer, "w") as f:
+        f.write(str(generation))
+    os.replace(pointer, os.path.join(root, CURRENT))
+
+    # Readers keep their mappings of pruned files until they move on
+    for old in _generations(root)[:-keep]:
+        shutil.rmtree(os.path.join(root, f"gen-{old}"), ignore_errors=True)
+    return generation
+
+
+def build_frames(symbols, timeframes=(None,)):
+    """
+    Preprocess every (symbol, timeframe) locally for publishing.
+    """
+    from data.data_fetcher import raw_data_signature
+    from data.data_preprocessing import compute_features
+
+    frames = {}
+    for symbol in symbols:
+        for timeframe in timeframes:
+            try:
+                frames[(symbol, timeframe)] = (
+                    compute_features(symbol, timeframe), raw_data_signature(symbol)
+                )
+            except Exception as exc:
+                print(f"[shared-cache] skipping {symbol} {timeframe}: {exc}", file=sys.stderr)
+    return frames
+
+
+# -------------------------------------------------
+# Reader (every worker process)
+# -------------------------------------------------
+class SharedCache:
+    """
+    Read-only views of the current generation. Catalog and mappings are
+    reloaded only when the CURRENT pointer changes.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or default_root()
+        self.generation = None
+        self.catalog = {}
+        self._views = {}
+        self._pointer_mtime = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(os.path.join(self.root, CURRENT)).st_mtime_ns
+        except OSError:
+            self.generation, self.catalog, self._views = None, {}, {}
+            return
+        if mtime == self._pointer_mtime:
+            return
+
+        generation = current_generation(self.root)
+        try:
+            with open(os.path.join(self.root, f"gen-{generation}", CATALOG)) as f:
+                catalog = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError):
+            return  # mid-publish or pruned; keep the previous generation
+
+        self.generation, self.catalog, self._views = generation, catalog, {}
+        self._pointer_mtime = mtime
+
+    def get(self, symbol, timeframe=None, signature=None):
+        """
+        Zero-copy, read-only frame for (symbol, timeframe), or None if
+        it is not published (or was published from other raw data than
+        `signature`).
+        """
+        name = _entry_name(symbol, timeframe)
+        with self._lock:
+            self._refresh()
+            entry = self.catalog.get(name)
+            if entry is None or (signature is not None and entry["signature"] != list(signature)):
+                record_cache("shared_memory", False)
+                return None
+
+            view = self._views.get(name)
+            if view is None:
+                path = os.path.join(self.root, f"gen-{self.generation}", entry.get("file", name))
+                try:
+                    values = np.load(f"{path}.values.npy", mmap_mode="r")
+                    index = np.load(f"{path}.index.npy", mmap_mode="r")
+                except OSError:
+                    record_cache("shared_memory", False)
+                    return None
+                view = self._views[name] = (values, index)
+
+        record_cache("shared_memory", True)
+        values, index = view
+        df = pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(index.view("datetime64[ns]"), name="Date"),
+            columns=entry["columns"],
+            copy=False,
+        )
+        df.attrs.update(entry["attrs"])
+        return df
+
+    def status(self):
+        with self._lock:
+            self._refresh()
+            entries = dict(self.catalog)
+        files = [e for e in entries.values() if "file" not in e]
+        return {
+            "root": self.root,
+            "generation": self.generation,
+            "entries": len(entries),
+            "bytes": sum(e["rows"] * (len(e["columns"]) * e.get("itemsize", 8) + 8)
+                         for e in files),
+        }
+
+
+_cache = None
+
+
+def get_shared_cache():
+    global _cache
+    if _cache is None:
+        from util.config import SHARED_CACHE_DIR
+
+        _cache = SharedCache(SHARED_CACHE_DIR or None)
+    return _cache
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from analytics.batch import cached_symbols
+    from data.data_fetcher import raw_data_signature
+
+    parser = argparse.ArgumentParser(description="Publish or inspect the shared data cache.")
+    parser.add_argument("--publish", action="store_true", help="publish a new generation")
+    parser.add_argument("--symbols", nargs="+", help="symbols to publish")
+    parser.add_argument("--all-cached", action="store_true", help="every symbol in the price cache")
+    parser.add_argument("--timeframes", nargs="+", default=["native"],
+                        help="timeframes to publish, e.g. native 1h (native is "
+                             "also served under its resolved timeframe)")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="keep running and republish when raw data changes")
+    parser.add_argument("--keep", type=int, default=2, help="generations to retain")
+    parser.add_argument("--status", action="store_true", help="print the current generation")
+    args = parser.parse_args(argv)
+
+    cache = get_shared_cache()
+    timeframes = [None if tf == "native" else tf for tf in args.timeframes]
+
+    if args.publish:
+        published = None
+        while True:
+            symbols = list(dict.fromkeys(
+                list(args.symbols or []) + (cached_symbols() if args.all_cached else [])
+            ))
+            signatures = {s: raw_data_signature(s) for s in symbols}
+
+            if signatures != published:
+                frames = build_frames(symbols, timeframes)
+                generation = publish(frames, cache.root, keep=args.keep)
+                published = signatures
+                print(f"[shared-cache] generation {generation}: {len(frames)} frames", flush=True)
+
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+
+    if args.status or not args.publish:
+        print(json.dumps(cache.status(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
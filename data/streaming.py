@@ -0,0 +1,288 @@
+# =========================================================
+# streaming.py
+# Live price mode: bars from a pluggable source flow into fixed-size
+# NumPy ring buffers per symbol; rolling features and KPIs update in
+# O(window) per bar, so memory stays bounded regardless of uptime.
+# =========================================================
+
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.bars import periods_per_year
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+# -------------------------------------------------
+# Ring buffer
+# -------------------------------------------------
+class RingBuffer:
+    """
+    Fixed-capacity buffer of float64 rows (one column per field).
+
+    Every row is written twice (at i and i + capacity) so the most recent
+    `n` rows are always one contiguous slice: tail() returns a view, not
+    a copy, and never needs to unwrap.
+    """
+
+    def __init__(self, capacity, width=1):
+        self.capacity = int(capacity)
+        self._data = np.full((2 * self.capacity, width), np.nan)
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, row):
+        i = self._count % self.capacity
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+        self._count += 1
+
+    def tail(self, n=None):
+        """
+        Last n rows (oldest first) as a read-only view.
+        """
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = (self._count - 1) % self.capacity + self.capacity + 1 if self._count else 0
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        return self.tail(1)[0] if self._count else None
+
+
+# -------------------------------------------------
+# Per-symbol incremental state
+# -------------------------------------------------
+class SymbolStream:
+    """
+    Ring buffers for bars and derived features of one symbol, plus O(1)
+    running KPIs (ROI, Welford volatility, max drawdown) since the
+    stream started.
+    """
+
+    FEATURES = ("Returns", "Log_Returns", "MA_7", "MA_30", "Volatility")
+
+    def __init__(self, capacity, timeframe="1d"):
+        self.periods_per_year = periods_per_year(timeframe)
+        self.times = RingBuffer(capacity, 1)
+        self.bars = RingBuffer(capacity, len(FIELDS))
+        self.features = RingBuffer(capacity, len(self.FEATURES))
+        self.returns = RingBuffer(30, 1)
+
+        self.first_close = None
+        self.prev_close = None
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, timestamp, bar):
+        open_, high, low, close, volume = (float(bar[f]) for f in FIELDS)
+
+        self.times.append(pd.Timestamp(timestamp).value)
+        self.bars.append((open_, high, low, close, volume))
+
+        if self.first_close is None:
+            self.first_close = close
+
+        ret = log_ret = np.nan
+        if self.prev_close:
+            ret = close / self.prev_close - 1
+            log_ret = np.log(close / self.prev_close)
+            self.returns.append(ret)
+
+            # Welford running variance of returns
+            self._n += 1
+            delta = ret - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (ret - self._mean)
+
+        self.prev_close = close
+        self.peak = max(self.peak, close)
+        self.max_drawdown = min(self.max_drawdown, close / self.peak - 1)
+
+        closes = self.bars.tail(30)[:, 3]
+        ma_7 = closes[-7:].mean() if len(closes) >= 7 else np.nan
+        ma_30 = closes.mean() if len(closes) >= 30 else np.nan
+        recent = self.returns.tail()[:, 0]
+        vol = recent.std(ddof=1) if len(recent) >= 30 else np.nan
+
+        self.features.append((ret, log_ret, ma_7, ma_30, vol))
+
+    def kpis(self):
+        """
+        Same KPIs as compute.calculate_kpis, maintained incrementally.
+        """
+        if self.first_close is None:
+            return None
+        std = np.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else np.nan
+        return {
+            "roi": (self.prev_close / self.first_close - 1) * 100,
+            "volatility": std * np.sqrt(self.periods_per_year) * 100,
+            "max_drawdown": self.max_drawdown * 100,
+        }
+
+    def frame(self):
+        """
+        Buffered bars and features as a DataFrame (copy, oldest first).
+        """
+        index = pd.to_datetime(self.times.tail()[:, 0].astype("int64"))
+        data = np.hstack([self.bars.tail(), self.features.tail()])
+        return pd.DataFrame(data, index=index, columns=list(FIELDS) + list(self.FEATURES))
+
+
+class StreamEngine:
+    """
+    Thread-safe registry of SymbolStreams fed by a background source.
+    """
+
+    def __init__(self, capacity=2048, timeframe="1d"):
+        self.capacity = capacity
+        self.timeframe = timeframe
+        self.streams = {}
+        self.bars_seen = 0
+        self.last_update = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.listeners = []
+
+    def add_listener(self, callback):
+        """
+        Call callback(symbol, timestamp, bar) after every bar (e.g. the
+        alert engine). Listener errors are reported, not raised.
+        """
+        self.listeners.append(callback)
+
+    def on_bar(self, symbol, timestamp, bar):
+        with self._lock:
+            stream = self.streams.get(symbol)
+            if stream is None:
+                stream = self.streams[symbol] = SymbolStream(self.capacity, self.timeframe)
+            stream.update(timestamp, bar)
+            self.bars_seen += 1
+            self.last_update = time.time()
+
+        for callback in self.listeners:
+            try:
+                callback(symbol, timestamp, bar)
+            except Exception as exc:
+                print(f"[stream] listener failed: {exc}", file=sys.stderr)
+
+    def snapshot(self, symbol):
+        """
+        (frame, kpis) for one symbol, or (None, None) before its first bar.
+        """
+        with self._lock:
+            stream = self.streams.get(symbol)
+            if stream is None:
+                return None, None
+            return stream.frame(), stream.kpis()
+
+    def start(self, source):
+        """
+        Consume `source` (an iterable of (symbol, timestamp, bar)) on a
+        daemon thread. Only the first call starts a thread.
+        """
+        if self._thread is not None:
+            return
+
+        def pump():
+            for symbol, timestamp, bar in source:
+                if self._stop.is_set():
+                    break
+                self.on_bar(symbol, timestamp, bar)
+
+        self._thread = threading.Thread(target=pump, name="price-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+# -------------------------------------------------
+# Sources: iterables of (symbol, timestamp, bar dict)
+# -------------------------------------------------
+def replay_source(symbols, interval=1.0, loop=True):
+    """
+    Replay cached daily bars for `symbols` in time order, one time step
+    every `interval` seconds (a local stand-in for a websocket feed).
+
+    With `loop`, each further pass is moved past the previous one in time
+    and its prices are rescaled to open at the previous pass's last close,
+    so consumers keep seeing one monotonic, continuous stream.
+    """
+    from data.data_preprocessing import preprocess_data
+
+    frames = {s: preprocess_data(s, columns=FIELDS)[list(FIELDS)] for s in symbols}
+    panel = pd.concat(frames, names=["Symbol", "Date"]).swaplevel().sort_index()
+    prices = ["Open", "High", "Low", "Close"]
+
+    dates = panel.index.get_level_values("Date").unique().sort_values()
+    step = dates.to_series().diff().median() if len(dates) > 1 else pd.Timedelta(days=1)
+    span = dates[-1] - dates[0] + step if len(dates) else pd.Timedelta(0)
+    first_open = {s: f["Open"].iloc[0] for s, f in frames.items() if len(f)}
+    last_close = {s: f["Close"].iloc[-1] for s, f in frames.items() if len(f)}
+
+    offset = pd.Timedelta(0)
+    scale = dict.fromkeys(first_open, 1.0)
+
+    while True:
+        for timestamp, group in panel.groupby(level="Date", sort=True):
+            for (_, symbol), row in group.iterrows():
+                if scale[symbol] != 1.0:
+                    row = row.copy()
+                    row[prices] *= scale[symbol]
+                yield symbol, timestamp + offset, row
+            time.sleep(interval)
+        if not loop:
+            return
+
+        offset += span
+        for symbol in scale:
+            scale[symbol] *= last_close[symbol] / first_open[symbol]
+
+
+def synthetic_source(symbols, interval=1.0, freq="1min", seed=0):
+    """
+    Endless synthetic bars (see data.synthetic), timestamped with the
+    wall clock.
+    """
+    from data.synthetic import iter_panel
+
+    last_close = None
+    chunk = 256
+
+    while True:
+        for _, open_, high, low, close, volume in iter_panel(
+            symbols, chunk, freq=freq, seed=seed, start_prices=last_close, chunk_size=chunk
+        ):
+            for i in range(len(close)):
+                now = pd.Timestamp.now()
+                for j, symbol in enumerate(symbols):
+                    yield symbol, now, {
+                        "Open": open_[i, j], "High": high[i, j], "Low": low[i, j],
+                        "Close": close[i, j], "Volume": volume[i, j],
+                    }
+                time.sleep(interval)
+            last_close = close[-1]
+        seed += 1
+
+
+SOURCES = {
+    "replay": replay_source,
+    "synthetic": synthetic_source,
+}
@@ -0,0 +1,279 @@
+# =========================================================
+# synthetic.py
+# Vectorized synthetic market data for load & scale testing
+#
+# Model (per step, all symbols at once):
+#   log-return = drift + sigma_t * eps_t + jumps_t
+#   eps_t      : correlated N(0, 1) shocks (Cholesky of the correlation)
+#   sigma_t    : stochastic volatility, log sigma follows an AR(1) so
+#                calm and turbulent periods cluster (GARCH-like), scaled
+#                so E[sigma_t^2] matches the nominal sigma
+#   jumps_t    : compound Poisson jumps
+#
+# Usage:
+#   python -m data.synthetic --symbols 500 --periods 525600 --freq 1min \
+#       --out data/synthetic_cache
+# =========================================================
+
+import argparse
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+# Annualized defaults, roughly crypto-like
+DEFAULT_PARAMS = {
+    "mu": 0.10,              # drift
+    "sigma": 0.65,           # long-run volatility of the diffusion (before jumps)
+    "vol_persistence": 0.995,  # AR(1) coefficient of log-volatility (per step)
+    "vol_of_vol": 0.08,      # std of log-volatility innovations (per step)
+    "jump_intensity": 12.0,  # expected jumps per year
+    "jump_mean": -0.01,
+    "jump_std": 0.06,
+    # Pairwise correlation (scalar or matrix) of the diffusion shocks and
+    # volatility innovations. Return correlation comes out lower, since
+    # each symbol's volatility path and jumps are its own.
+    "correlation": 0.6,
+}
+
+
+# -------------------------------------------------
+# Utility
+# -------------------------------------------------
+def symbol_seed(symbol, seed=0):
+    """
+    Stable per-symbol seed so single-symbol generation is reproducible.
+    """
+    return (zlib.crc32(symbol.encode()) + seed) % (2 ** 32)
+
+
+def synthetic_symbols(n_symbols):
+    """
+    Symbol names for a synthetic universe. BTC-USD and ETH-USD come first
+    so the dashboard pages find their data.
+    """
+    base = ["BTC-USD", "ETH-USD"]
+    extra = [f"SYN{i:03d}-USD" for i in range(max(n_symbols - len(base), 0))]
+    return (base + extra)[:n_symbols]
+
+
+def correlation_cholesky(correlation, n_symbols):
+    """
+    Lower Cholesky factor of a constant-correlation (scalar) or explicit
+    correlation matrix.
+    """
+    if np.isscalar(correlation):
+        corr = np.full((n_symbols, n_symbols), float(correlation))
+        np.fill_diagonal(corr, 1.0)
+    else:
+        corr = np.asarray(correlation, dtype=float)
+
+    if n_symbols == 1:
+        return np.ones((1, 1))
+    return np.linalg.cholesky(corr)
+
+
+def _step_fraction(freq):
+    return pd.Timedelta(pd.tseries.frequencies.to_offset(freq)).total_seconds() / SECONDS_PER_YEAR
+
+
+# -------------------------------------------------
+# Generator
+# -------------------------------------------------
+def iter_panel(
+    symbols,
+    periods,
+    freq="D",
+    start="2020-01-01",
+    seed=0,
+    start_prices=None,
+    chunk_size=250_000,
+    **params,
+):
+    """
+    Yield (dates, open, high, low, close, volume) chunks of shape
+    (chunk, n_symbols). State (last close, volatility filter) is carried
+    between chunks, so memory stays bounded by chunk_size x n_symbols
+    regardless of the total number of periods.
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    n = len(symbols)
+    rng = np.random.default_rng(seed)
+    dt = _step_fraction(freq)
+
+    chol = correlation_cholesky(p["correlation"], n)
+
+    if start_prices is None:
+        start_prices = np.exp(rng.uniform(np.log(1.0), np.log(50_000.0), n))
+    last_close = np.broadcast_to(np.asarray(start_prices, dtype=float), (n,)).copy()
+
+    sigma_step = p["sigma"] * np.sqrt(dt)
+    drift = (p["mu"] - 0.5 * p["sigma"] ** 2) * dt
+    phi = p["vol_persistence"]
+
+    # Log-vol AR(1) x_t = phi * x_{t-1} + eta_t, started from its
+    # stationary N(0, var_x); E[exp(2x)] = exp(2 var_x), so subtracting
+    # var_x keeps E[vol^2] = sigma_step^2. zi is lfilter's state phi * x_0.
+    var_x = p["vol_of_vol"] ** 2 / (1 - phi ** 2)
+    zi = phi * (rng.standard_normal((1, n)) @ chol.T) * np.sqrt(var_x)
+    index = pd.date_range(start=start, periods=periods, freq=freq)
+
+    for offset in range(0, periods, chunk_size):
+        m = min(chunk_size, periods - offset)
+
+        # Stochastic volatility (vectorized recursive filter); innovations
+        # share the correlation structure so turbulent regimes co-move
+        eta = (rng.standard_normal((m, n)) @ chol.T) * p["vol_of_vol"]
+        log_vol, zi = lfilter([1.0], [1.0, -phi], eta, axis=0, zi=zi)
+        vol = sigma_step * np.exp(log_vol - var_x)
+
+        # Correlated diffusion shocks
+        eps = rng.standard_normal((m, n)) @ chol.T
+
+        # Compound Poisson jumps
+        k = rng.poisson(p["jump_intensity"] * dt, (m, n))
+        jumps = np.where(
+            k > 0,
+            rng.normal(k * p["jump_mean"], np.sqrt(np.maximum(k, 1)) * p["jump_std"]),
+            0.0,
+        )
+
+        log_ret = drift + vol * eps + jumps
+        close = last_close * np.exp(np.cumsum(log_ret, axis=0))
+        open_ = np.vstack([last_close, close[:-1]])
+        last_close = close[-1]
+
+        # Intrabar range scales with the bar's volatility
+        wick = np.abs(rng.normal(0.0, 1.0, (2, m, n))) * vol * 0.5
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+
+        # Volume: lognormal, higher on large moves
+        base_volume = rng.lognormal(mean=16.0, sigma=0.4, size=(m, n))
+        volume = (base_volume * (1 + 25 * np.abs(log_ret))).astype(np.int64)
+
+        yield index[offset:offset + m], open_, high, low, close, volume
+
+
+def generate_panel(symbols, periods, freq="D", start="2020-01-01", seed=0, **kwargs):
+    """
+    Generate a full multi-asset panel in memory.
+
+    Returns {symbol: DataFrame} with columns Date, Close, High, Low, Open,
+    Volume (the column order yfinance produces).
+    """
+    parts = {s: [] for s in symbols}
+
+    for dates, open_, high, low, close, volume in iter_panel(
+        symbols, periods, freq=freq, start=start, seed=seed, **kwargs
+    ):
+        for j, symbol in enumerate(symbols):
+            parts[symbol].append(_frame(dates, open_[:, j], high[:, j], low[:, j],
+                                        close[:, j], volume[:, j]))
+
+    return {s: pd.concat(frames, ignore_index=True) for s, frames in parts.items()}
+
+
+def _frame(dates, open_, high, low, close, volume):
+    return pd.DataFrame({
+        "Date": dates,
+        "Close": close,
+        "High": high,
+        "Low": low,
+        "Open": open_,
+        "Volume": volume,
+    })
+
+
+def to_raw_schema(df, symbol):
+    """
+    Convert a flat OHLCV frame to the layout get_raw_data returns for a
+    fresh download: yfinance-style (field, ticker) column MultiIndex.
+    """
+    out = df.copy()
+    out.columns = pd.MultiIndex.from_tuples(
+        [("Date", "")] + [(c, symbol) for c in df.columns[1:]]
+    )
+    return out
+
+
+# -------------------------------------------------
+# Writers
+# -------------------------------------------------
+def write_cache(
+    symbols,
+    periods,
+    cache_dir,
+    freq="D",
+    start="2020-01-01",
+    seed=0,
+    **kwargs,
+):
+    """
+    Stream a correlated panel to one CSV per symbol in the exact on-disk
+    layout of data/cached_data (header row, ticker row, bars).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = {s: os.path.join(cache_dir, f"{s}.csv") for s in symbols}
+    handles = {s: open(path, "w", newline="") for s, path in paths.items()}
+
+    try:
+        for s, f in handles.items():
+            f.write("Date,Close,High,Low,Open,Volume\n")
+            f.write(f",{s},{s},{s},{s},{s}\n")
+
+        for dates, open_, high, low, close, volume in iter_panel(
+            symbols, periods, freq=freq, start=start, seed=seed, **kwargs
+        ):
+            for j, symbol in enumerate(symbols):
+                _frame(dates, open_[:, j], high[:, j], low[:, j], close[:, j],
+                       volume[:, j]).to_csv(handles[symbol], header=False, index=False)
+    finally:
+        for f in handles.values():
+            f.close()
+
+    return paths
+
+
+# -------------------------------------------------
+# Data provider (see data.data_fetcher)
+# -------------------------------------------------
+def synthetic_provider(symbol, periods=None, freq=None, start=None):
+    """
+    Provider for get_raw_data: an independent synthetic series per
+    symbol, seeded by the symbol name so repeated calls agree.
+    """
+    from util.config import SYNTHETIC_FREQ, SYNTHETIC_PERIODS, SYNTHETIC_START
+
+    periods = periods or SYNTHETIC_PERIODS
+    freq = freq or SYNTHETIC_FREQ
+    start = start or SYNTHETIC_START
+
+    df = generate_panel([symbol], periods, freq=freq, start=start,
+                        seed=symbol_seed(symbol))[symbol]
+    return to_raw_schema(df, symbol)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic OHLCV cache.")
+    parser.add_argument("--symbols", type=int, default=2, help="number of symbols")
+    parser.add_argument("--periods", type=int, default=1_000, help="bars per symbol")
+    parser.add_argument("--freq", default="D", help="pandas frequency, e.g. D, 1h, 1min")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--correlation", type=float, default=DEFAULT_PARAMS["correlation"])
+    parser.add_argument("--out", default="data/synthetic_cache")
+    args = parser.parse_args(argv)
+
+    symbols = synthetic_symbols(args.symbols)
+    write_cache(symbols, args.periods, args.out, freq=args.freq, start=args.start,
+                seed=args.seed, correlation=args.correlation)
+    print(f"Wrote {len(symbols)} symbols x {args.periods:,} bars to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# =========================================================
+# tuning_store.py
+# SQLite cache of Prophet cross-validation folds and the tuned
+# parameters per (symbol, timeframe) (see analytics/tuning.py)
+#
+# A fold is keyed by the fingerprint of the data it saw (history up to
+# the cutoff plus the held-out horizon), the parameter set, the cutoff
+# and the horizon, so a repeat search only fits new configurations and
+# folds whose data changed.
+# =========================================================
+
+import json
+import pickle
+import sqlite3
+from datetime import datetime, timezone
+
+from data.results_store import get_connection
+
+TUNING_DB = "data/results/tuning.db"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def create_tuning_tables(db_path=None):
+    conn = get_connection(db_path or TUNING_DB)
+
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tuning_folds (
+                fingerprint TEXT NOT NULL,
+                params_key TEXT NOT NULL,
+                cutoff TEXT NOT NULL,
+                horizon TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (fingerprint, params_key, cutoff, horizon)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tuned_params (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL DEFAULT '1d',
+                params TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                score REAL,
+                default_score REAL,
+                configs INTEGER NOT NULL,
+                folds INTEGER NOT NULL,
+                tuned_at TEXT NOT NULL,
+                PRIMARY KEY (symbol, timeframe)
+            )
+        """)
+
+    conn.close()
+
+
+# -------------------------------------------------
+# Fold cache
+# -------------------------------------------------
+def get_folds(keys, db_path=None):
+    """
+    {(fingerprint, params_key, cutoff, horizon): fold frame} for the
+    keys that are cached.
+    """
+    if not keys:
+        return {}
+
+    conn = get_connection(db_path or TUNING_DB)
+    found = {}
+    try:
+        for key in keys:
+            row = conn.execute(
+                "SELECT payload FROM tuning_folds WHERE fingerprint = ? AND params_key = ? "
+                "AND cutoff = ? AND horizon = ?",
+                key
+            ).fetchone()
+            if row is not None:
+                found[key] = pickle.loads(row[0])
+    except sqlite3.OperationalError:  # tables not created yet
+        pass
+    conn.close()
+    return found
+
+
+def put_folds(folds, db_path=None):
+    """
+    Store {(fingerprint, params_key, cutoff, horizon): fold frame}.
+    """
+    if not folds:
+        return 0
+
+    create_tuning_tables(db_path)
+    conn = get_connection(db_path or TUNING_DB)
+    now = _now()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO tuning_folds "
+            "(fingerprint, params_key, cutoff, horizon, created_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(*key, now, pickle.dumps(fold, protocol=pickle.HIGHEST_PROTOCOL))
+             for key, fold in folds.items()]
+        )
+    conn.close()
+    return len(folds)
+
+
+# -------------------------------------------------
+# Tuned parameters
+# -------------------------------------------------
+def save_best_params(symbol, params, metric, score, default_score, configs, folds,
+                     timeframe="1d", db_path=None):
+    create_tuning_tables(db_path)
+    conn = get_connection(db_path or TUNING_DB)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO tuned_params "
+            "(symbol, timeframe, params, metric, score, default_score, configs, folds, tuned_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (symbol, timeframe or "1d", json.dumps(params, sort_keys=True), metric,
+             score, default_score, configs, folds, _now())
+        )
+    conn.close()
+
+
+def get_best_params(symbol, timeframe="1d", db_path=None):
+    """
+    Tuned Prophet parameters for (symbol, timeframe), or {} if the
+    symbol has not been tuned.
+    """
+    conn = get_connection(db_path or TUNING_DB)
+    try:
+        row = conn.execute(
+            "SELECT params FROM tuned_params WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe or "1d")
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+    return json.loads(row[0]) if row else {}
+
+
+def get_tuning_summary(symbol, timeframe="1d", db_path=None):
+    """
+    The full tuned_params row for (symbol, timeframe) as a dict, or None.
+    """
+    conn = get_connection(db_path or TUNING_DB)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(
+            "SELECT * FROM tuned_params WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe or "1d")
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+    if row is None:
+        return None
+    summary = dict(row)
+    summary["params"] = json.loads(summary["params"])
+    return summary
@@ -0,0 +1,233 @@
+# =========================================================
+# validation.py
+# Vectorized data-quality checks and repair policies for OHLCV panels
+#
+# A panel is a long frame with Symbol, Date and OHLCV columns. Every
+# check is a column operation over the whole panel (sorted by Symbol,
+# Date), summarized per symbol with a single groupby.
+# =========================================================
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data.bars import OHLCV, TIMEFRAMES, infer_timeframe
+
+logger = logging.getLogger(__name__)
+
+REPAIR_POLICIES = ("ffill", "interpolate", "drop")
+
+REPORT_COLUMNS = [
+    "rows",
+    "missing_values",
+    "duplicates",
+    "gaps",
+    "largest_gap",
+    "zero_volume",
+    "ohlc_inconsistent",
+    "nonpositive_price",
+    "outliers",
+    "spikes",
+]
+
+
+# -------------------------------------------------
+# Row-level flags
+# -------------------------------------------------
+def _position_in_symbol(symbols):
+    return symbols.groupby(symbols, observed=True, sort=False).cumcount().to_numpy()
+
+
+def flag_rows(panel, z_threshold=8.0, window=30):
+    """
+    Boolean issue flags for every row of a (Symbol, Date)-sorted panel.
+
+    outliers: |log return| above z_threshold x the rolling std of the
+              previous `window` returns of the same symbol.
+    spikes:   an outlier immediately reversed by an opposite outlier
+              (the signature of a bad tick rather than a real move).
+    """
+    symbol = panel["Symbol"]
+    pos = _position_in_symbol(symbol)
+    first = pos == 0
+
+    o, h, l, c, v = (panel[col].to_numpy(dtype=float) for col in OHLCV)
+
+    flags = pd.DataFrame(index=panel.index)
+    flags["missing_values"] = panel[OHLCV].isna().any(axis=1).to_numpy()
+    flags["duplicates"] = panel.duplicated(subset=["Symbol", "Date"], keep="last").to_numpy()
+    flags["zero_volume"] = v == 0
+
+    with np.errstate(invalid="ignore"):
+        flags["ohlc_inconsistent"] = (
+            (h < np.fmax(o, c)) | (l > np.fmin(o, c)) | (h < l)
+        )
+        flags["nonpositive_price"] = (np.fmin(np.fmin(o, h), np.fmin(l, c)) <= 0)
+
+        log_ret = np.log(c / np.roll(c, 1))
+    log_ret[first] = np.nan
+
+    # Rolling scale from *previous* returns. A symbol's first `window`
+    # positions would reach into the preceding symbol, so their scale is
+    # recomputed from the symbol's own (expanding) history.
+    scale = pd.Series(log_ret).rolling(window, min_periods=window // 2).std().shift(1).to_numpy()
+    head = pos <= window
+    own = (
+        pd.Series(log_ret[head]).groupby(symbol.to_numpy()[head], sort=False)
+        .expanding(min_periods=window // 2).std()
+        .droplevel(0).sort_index().to_numpy()
+    )
+    own = np.roll(own, 1)
+    own[pos[head] == 0] = np.nan
+    scale[head] = own
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = log_ret / scale
+    outlier = np.abs(z) > z_threshold
+
+    next_z = np.roll(z, -1)
+    same_symbol_next = np.roll(pos, -1) == pos + 1
+    spike = outlier & same_symbol_next & (np.abs(next_z) > z_threshold / 2) & (np.sign(next_z) == -np.sign(z))
+
+    flags["outliers"] = outlier
+    flags["spikes"] = spike
+    flags["z_score"] = z
+    return flags
+
+
+def _gap_counts(panel, timeframe):
+    step = TIMEFRAMES[timeframe] * 1e9
+    pos = _position_in_symbol(panel["Symbol"])
+    diff = np.diff(panel["Date"].to_numpy().astype("int64"), prepend=0).astype(float)
+    diff[pos == 0] = np.nan
+
+    missing = np.where(diff > step * 1.5, np.round(diff / step) - 1, 0)
+    return pd.Series(missing, index=panel.index)
+
+
+# -------------------------------------------------
+# Report
+# -------------------------------------------------
+def sort_panel(panel):
+    return panel.sort_values(["Symbol", "Date"], kind="stable", ignore_index=True)
+
+
+def validate_panel(panel, timeframe=None, z_threshold=8.0, window=30):
+    """
+    Per-symbol quality report (one row per symbol, REPORT_COLUMNS).
+
+    Monthly bars are not checked for gaps (months have unequal length).
+    """
+    panel = sort_panel(panel)
+    timeframe = timeframe or infer_timeframe(pd.DatetimeIndex(panel["Date"]))
+
+    flags = flag_rows(panel, z_threshold, window).drop(columns="z_score")
+    flags["gaps"] = _gap_counts(panel, timeframe) if timeframe != "1M" else 0
+    flags["largest_gap"] = flags["gaps"]
+    flags["rows"] = 1
+    flags["Symbol"] = panel["Symbol"].to_numpy()
+
+    report = flags.groupby("Symbol", observed=True).agg(
+        {**{c: "sum" for c in REPORT_COLUMNS if c != "largest_gap"}, "largest_gap": "max"}
+    )
+    return report[REPORT_COLUMNS].astype(int)
+
+
+def validate_frame(df, symbol="", **kwargs):
+    """
+    Quality report row (as a dict) for a single OHLCV frame indexed by date.
+    """
+    panel = df[OHLCV].rename_axis("Date").reset_index().assign(Symbol=symbol)
+    return validate_panel(panel, **kwargs).iloc[0].to_dict()
+
+
+# -------------------------------------------------
+# Repair
+# -------------------------------------------------
+def _complete_grid(panel, timeframe):
+    """
+    Left-join the panel onto a gap-free time grid per symbol.
+    """
+    step = np.int64(TIMEFRAMES[timeframe] * 1e9)
+    bounds = panel.groupby("Symbol", observed=True)["Date"].agg(["min", "max"])
+
+    starts = bounds["min"].to_numpy().astype("int64")
+    counts = ((bounds["max"].to_numpy().astype("int64") - starts) // step + 1).astype(np.int64)
+
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    grid = pd.DataFrame({
+        "Symbol": np.repeat(bounds.index.to_numpy(), counts),
+        "Date": (np.repeat(starts, counts) + offsets * step).astype("datetime64[ns]"),
+    })
+    return grid.merge(panel.astype({"Symbol": object}), on=["Symbol", "Date"], how="left")
+
+
+def repair_panel(panel, policy="ffill", timeframe=None, z_threshold=8.0, window=30):
+    """
+    Apply a repair policy to a panel and return (repaired panel, report).
+
+    ffill / interpolate: drop duplicate timestamps, blank out bad prices
+        (inconsistent OHLC, non-positive, spikes), insert missing bars and
+        fill them (forward fill, or linear interpolation of Close).
+        Filled bars are flat (O = H = L = C); inserted bars have zero volume.
+    drop: remove duplicates and every flagged row; no gap filling.
+    """
+    if policy not in REPAIR_POLICIES:
+        raise ValueError(f"unknown repair policy {policy!r}; use one of {REPAIR_POLICIES}")
+
+    panel = sort_panel(panel)
+    timeframe = timeframe or infer_timeframe(pd.DatetimeIndex(panel["Date"]))
+    report = validate_panel(panel, timeframe, z_threshold, window)
+
+    flags = flag_rows(panel, z_threshold, window)
+    bad_price = flags["ohlc_inconsistent"] | flags["nonpositive_price"] | flags["spikes"]
+
+    if policy == "drop":
+        keep = ~(flags["duplicates"] | flags["missing_values"] | bad_price)
+        return panel[keep.to_numpy()].reset_index(drop=True), report
+
+    panel = panel[~flags["duplicates"].to_numpy()].reset_index(drop=True)
+    bad_price = bad_price[~flags["duplicates"]].to_numpy()
+    panel.loc[bad_price, ["Open", "High", "Low", "Close"]] = np.nan
+
+    if timeframe != "1M":
+        panel = _complete_grid(panel, timeframe)
+
+    filled_bar = panel["Close"].isna().to_numpy()
+
+    if policy == "ffill":
+        panel["Close"] = panel.groupby("Symbol", sort=False)["Close"].ffill()
+    else:
+        close = panel["Close"].interpolate(limit_area="inside")
+        # Don't let interpolation bridge two different symbols
+        valid = panel["Close"].notna()
+        grouped = valid.groupby(panel["Symbol"], sort=False)
+        inside = grouped.cummax() & grouped.transform(lambda s: s[::-1].cummax()[::-1])
+        panel["Close"] = close.where(inside)
+
+    for col in ["Open", "High", "Low"]:
+        panel.loc[filled_bar, col] = panel.loc[filled_bar, "Close"]
+    panel["Volume"] = panel["Volume"].fillna(0)
+
+    panel = panel.dropna(subset=["Close"]).reset_index(drop=True)
+    return panel, report
+
+
+def repair_frame(df, symbol="", policy="ffill", **kwargs):
+    """
+    Single-symbol wrapper around repair_panel: returns (frame indexed by
+    Date, report dict).
+    """
+    index_name = df.index.name or "Date"
+    panel = df[OHLCV].rename_axis("Date").reset_index().assign(Symbol=symbol)
+    repaired, report = repair_panel(panel, policy=policy, **kwargs)
+
+    out = repaired.set_index("Date")[OHLCV].rename_axis(index_name)
+    report_row = report.iloc[0].to_dict() if len(report) else {}
+
+    issues = {k: v for k, v in report_row.items() if k != "rows" and v}
+    if issues:
+        logger.warning("Data quality issues in %s (%s policy): %s", symbol or "frame", policy, issues)
+
+    return out, report_row
@@ -0,0 +1,477 @@
+# =========================================================
+# versions.py
+# Append-only, versioned raw price store with point-in-time reads
+#
+# Each refresh of a symbol commits a new version holding only the rows
+# that are new or revised since the previous one (one Parquet segment
+# per version); nothing is overwritten. Reading a version (or "as of"
+# a time) replays the segments up to it, so yesterday's KPIs and
+# forecasts can be recomputed from exactly the data they saw. A
+# snapshot pins one version per symbol (manifest rows only, no data is
+# copied). Compaction folds old deltas into full base segments, keeping
+# pinned versions and the retention window readable.
+#
+# A symbol's current version lives in <root>/<symbol>/HEAD and replaces
+# the raw file's mtime in data_fetcher.raw_data_signature(), so every
+# derived cache and job key changes exactly when a new version lands.
+#
+# Usage (from the repository root):
+#   python -m data.versions --refresh --all-cached
+#   python -m data.versions --snapshot month-end
+#   python -m data.versions --compact
+#   python -m data.versions --status
+# =========================================================
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from data.bars import OHLCV
+from data.results_store import get_connection
+
+HEAD = "HEAD"
+MANIFEST = "manifest.db"
+
+
+def default_root():
+    import data.data_fetcher as data_fetcher
+
+    return os.path.join(data_fetcher.CACHE_DIR, "versions")
+
+
+def _now(offset_days=0):
+    when = datetime.now(timezone.utc) + timedelta(days=offset_days)
+    return when.isoformat(timespec="microseconds")
+
+
+def _as_of_str(as_of):
+    ts = pd.Timestamp(as_of)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.to_pydatetime().isoformat(timespec="microseconds")
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+# -------------------------------------------------
+# Manifest
+# -------------------------------------------------
+def create_version_tables(root=None):
+    root = root or default_root()
+    os.makedirs(root, exist_ok=True)
+    conn = get_connection(os.path.join(root, MANIFEST))
+
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS versions (
+                symbol TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                first_date TEXT,
+                last_date TEXT,
+                delta_path TEXT,
+                base_path TEXT,
+                PRIMARY KEY (symbol, version)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshot_versions (
+                name TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                PRIMARY KEY (name, symbol)
+            )
+        """)
+
+    conn.close()
+
+
+_created = set()
+
+
+def _connect(root):
+    if root not in _created:
+        create_version_tables(root)
+        _created.add(root)
+    return get_connection(os.path.join(root, MANIFEST))
+
+
+def head_path(symbol, root=None):
+    return os.path.abspath(os.path.join(root or default_root(), symbol, HEAD))
+
+
+def current_version(symbol, root=None):
+    """
+    The symbol's latest committed version, or None if it isn't versioned.
+    """
+    try:
+        with open(head_path(symbol, root)) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def list_symbols(root=None):
+    root = root or default_root()
+    if not os.path.isdir(root):
+        return []
+    return sorted(s for s in os.listdir(root) if os.path.isfile(os.path.join(root, s, HEAD)))
+
+
+def resolve_version(symbol, as_of=None, snapshot=None, root=None):
+    """
+    The version of `symbol` pinned by `snapshot`, the last one committed
+    at or before `as_of`, or the current one. None when the symbol isn't
+    versioned and neither is given.
+    """
+    root = root or default_root()
+    if snapshot is None and as_of is None:
+        return current_version(symbol, root)
+
+    conn = _connect(root)
+    try:
+        if snapshot is not None:
+            row = conn.execute(
+                "SELECT version FROM snapshot_versions WHERE name = ? AND symbol = ?",
+                (snapshot, symbol)
+            ).fetchone()
+            where = f"in snapshot {snapshot!r}"
+        else:
+            row = conn.execute(
+                "SELECT MAX(version) FROM versions WHERE symbol = ? AND created_at <= ?",
+                (symbol, _as_of_str(as_of))
+            ).fetchone()
+            where = f"as of {as_of}"
+    finally:
+        conn.close()
+
+    if row is None or row[0] is None:
+        raise ValueError(f"{symbol}: no data version {where}")
+    return row[0]
+
+
+def list_versions(symbol=None, root=None):
+    """
+    Manifest rows (newest first) as a DataFrame.
+    """
+    conn = _connect(root or default_root())
+    try:
+        return pd.read_sql_query(
+            "SELECT symbol, version, created_at, rows, first_date, last_date, "
+            "delta_path IS NOT NULL AS has_delta, base_path IS NOT NULL AS has_base "
+            "FROM versions WHERE ? IS NULL OR symbol = ? ORDER BY symbol, version DESC",
+            conn, params=(symbol, symbol)
+        )
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------
+# Reads
+# -------------------------------------------------
+def normalize_raw(df):
+    """
+    Date + OHLCV frame (float64, sorted, one row per date) from the
+    provider layout get_raw_data returns.
+    """
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if "Date" not in df.columns:
+        df = df.reset_index().rename(columns={df.index.name or "index": "Date"})
+
+    out = pd.DataFrame({"Date": pd.to_datetime(df["Date"], errors="coerce")})
+    for col in OHLCV:
+        if col in df.columns:
+            out[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+    out = out.dropna(subset=["Date"])
+    return out.drop_duplicates("Date", keep="last").sort_values("Date").reset_index(drop=True)
+
+
+def read_version(symbol, version=None, root=None):
+    """
+    Raw frame of `symbol` exactly as it was at `version` (default: the
+    current one), with attrs["data_version"] set.
+    """
+    root = root or default_root()
+    version = version if version is not None else current_version(symbol, root)
+    if version is None:
+        raise ValueError(f"{symbol}: not in the versioned store")
+
+    conn = _connect(root)
+    try:
+        rows = conn.execute(
+            "SELECT version, delta_path, base_path FROM versions "
+            "WHERE symbol = ? AND version <= ? ORDER BY version",
+            (symbol, version)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    if not rows or rows[-1][0] != version:
+        raise ValueError(f"{symbol}: version {version} is not in the store")
+    start = max((i for i, (_, _, base) in enumerate(rows) if base), default=None)
+    if start is None:
+        raise ValueError(f"{symbol}: version {version} was compacted away")
+    chain = [os.path.join(root, rows[start][2])]
+    for v, delta, _ in rows[start + 1:]:
+        if delta is None:
+            raise ValueError(f"{symbol}: version {version} was compacted away (delta {v} missing)")
+        chain.append(os.path.join(root, delta))
+
+    df = pd.concat([pd.read_parquet(p) for p in chain], ignore_index=True)
+    if len(chain) > 1:
+        df = df.drop_duplicates("Date", keep="last").sort_values("Date").reset_index(drop=True)
+    df.attrs["data_version"] = version
+    return df
+
+
+# -------------------------------------------------
+# Writes
+# -------------------------------------------------
+def _changed_rows(old, new):
+    """
+    Rows of `new` whose date is not in `old` or whose values differ.
+    """
+    merged = new.merge(old, on="Date", how="left", suffixes=("", "_old"), indicator=True)
+    changed = merged["_merge"] == "left_only"
+    for col in new.columns.drop("Date"):
+        if col + "_old" in merged:
+            a, b = merged[col].to_numpy(), merged[col + "_old"].to_numpy()
+            changed |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    return new[changed.to_numpy()].reset_index(drop=True)
+
+
+def commit(symbol, df, root=None):
+    """
+    Append a new version of `symbol` holding the rows of `df` (provider
+    layout) that are new or revised. Dates missing from `df` are kept as
+    they were. Returns (version, rows committed); nothing is written
+    when nothing changed.
+    """
+    root = root or default_root()
+    new = normalize_raw(df)
+    current = current_version(symbol, root)
+
+    delta = new if current is None else _changed_rows(read_version(symbol, current, root), new)
+    if current is not None and delta.empty:
+        return current, 0
+
+    version = (current or 0) + 1
+    os.makedirs(os.path.join(root, symbol), exist_ok=True)
+    rel = os.path.join(symbol, f"{version:08d}.parquet")
+    _write_atomic(os.path.join(root, rel), lambda p: delta.to_parquet(p, index=False))
+
+    conn = _connect(root)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO versions (symbol, version, created_at, rows, first_date, last_date, "
+                "delta_path, base_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (symbol, version, _now(), len(delta),
+                 str(delta["Date"].min()) if len(delta) else None,
+                 str(delta["Date"].max()) if len(delta) else None,
+                 rel, rel if current is None else None)
+            )
+    finally:
+        conn.close()
+
+    def write_head(path):
+        with open(path, "w") as f:
+            f.write(str(version))
+
+    _write_atomic(head_path(symbol, root), write_head)
+    return version, len(delta)
+
+
+def create_snapshot(name, symbols=None, root=None):
+    """
+    Pin the current version of `symbols` (default: all) under `name`.
+    Returns {symbol: version}.
+    """
+    root = root or default_root()
+    pinned = {s: current_version(s, root) for s in (symbols or list_symbols(root))}
+    pinned = {s: v for s, v in pinned.items() if v is not None}
+
+    conn = _connect(root)
+    try:
+        with conn:
+            conn.execute("INSERT INTO snapshots (name, created_at) VALUES (?, ?)", (name, _now()))
+            conn.executemany(
+                "INSERT INTO snapshot_versions (name, symbol, version) VALUES (?, ?, ?)",
+                [(name, s, v) for s, v in pinned.items()]
+            )
+    except sqlite3.IntegrityError:
+        raise ValueError(f"snapshot {name!r} already exists")
+    finally:
+        conn.close()
+    return pinned
+
+
+def delete_snapshot(name, root=None):
+    conn = _connect(root or default_root())
+    try:
+        with conn:
+            conn.execute("DELETE FROM snapshot_versions WHERE name = ?", (name,))
+            conn.execute("DELETE FROM snapshots WHERE name = ?", (name,))
+    finally:
+        conn.close()
+
+
+def list_snapshots(root=None):
+    conn = _connect(root or default_root())
+    try:
+        return conn.execute(
+            "SELECT s.name, s.created_at, COUNT(v.symbol) FROM snapshots s "
+            "LEFT JOIN snapshot_versions v ON v.name = s.name "
+            "GROUP BY s.name ORDER BY s.created_at DESC"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------
+# Compaction
+# -------------------------------------------------
+def compact(symbol, retention_days, root=None):
+    """
+    Fold the deltas of `symbol` committed before the retention window
+    into a full base segment at the first version inside it (and at the
+    latest version, so current reads touch one file). Snapshot-pinned
+    older versions get their own base segment; other versions older
+    than the window can no longer be read. Returns the number of
+    segment files removed.
+    """
+    root = root or default_root()
+    conn = _connect(root)
+    try:
+        rows = conn.execute(
+            "SELECT version, created_at, delta_path, base_path FROM versions "
+            "WHERE symbol = ? ORDER BY version",
+            (symbol,)
+        ).fetchall()
+        pinned = {v for (v,) in conn.execute(
+            "SELECT version FROM snapshot_versions WHERE symbol = ?", (symbol,)
+        )}
+    finally:
+        conn.close()
+    if not rows:
+        return 0
+
+    cutoff = _now(-retention_days)
+    latest = rows[-1][0]
+    first_kept = next((v for v, created, _, _ in rows if created >= cutoff), latest)
+    targets = {v for v in pinned if v < first_kept} | {first_kept, latest}
+
+    bases = {}
+    for v, _, _, base in rows:
+        if v in targets and base is None:
+            rel = os.path.join(symbol, f"{v:08d}.base.parquet")
+            frame = read_version(symbol, v, root)
+            _write_atomic(os.path.join(root, rel), lambda p: frame.to_parquet(p, index=False))
+            bases[v] = rel
+
+    updates, doomed = [], set()
+    for v, _, delta, base in rows:
+        base = bases.get(v, base)
+        new_delta = delta if v > first_kept else None
+        new_base = base if v in targets else None
+        if (new_delta, new_base) != (delta, base) or v in bases:
+            updates.append((new_delta, new_base, symbol, v))
+        doomed |= {p for p in (delta, base) if p and p not in (new_delta, new_base)}
+
+    conn = _connect(root)
+    try:
+        with conn:
+            conn.executemany(
+                "UPDATE versions SET delta_path = ?, base_path = ? WHERE symbol = ? AND version = ?",
+                updates
+            )
+            still_used = {p for row in conn.execute(
+                "SELECT delta_path, base_path FROM versions WHERE symbol = ?", (symbol,)
+            ) for p in row if p}
+    finally:
+        conn.close()
+
+    removed = 0
+    for rel in doomed - still_used:
+        try:
+            os.remove(os.path.join(root, rel))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv=None):
+    from data.data_fetcher import cached_symbols, refresh_raw_data
+    from util.config import DATA_VERSION_RETENTION_DAYS
+
+    parser = argparse.ArgumentParser(description="Manage the versioned raw price store.")
+    parser.add_argument("--symbols", nargs="+", help="symbols to act on")
+    parser.add_argument("--all-cached", action="store_true", help="every cached or versioned symbol")
+    parser.add_argument("--refresh", action="store_true",
+                        help="fetch from the data provider and commit a new version")
+    parser.add_argument("--snapshot", help="pin the current versions under this name")
+    parser.add_argument("--compact", action="store_true", help="fold deltas older than the retention")
+    parser.add_argument("--retention-days", type=float, default=DATA_VERSION_RETENTION_DAYS)
+    parser.add_argument("--status", action="store_true", help="print versions and snapshots")
+    args = parser.parse_args(argv)
+
+    symbols = list(dict.fromkeys(
+        list(args.symbols or []) + (cached_symbols() if args.all_cached else [])
+    ))
+
+    if args.refresh:
+        if not symbols:
+            parser.error("give --symbols or --all-cached")
+        for symbol in symbols:
+            try:
+                version, rows = refresh_raw_data(symbol)
+            except Exception as exc:
+                print(f"[versions] {symbol}: refresh failed: {exc}", file=sys.stderr, flush=True)
+                continue
+            print(f"[versions] {symbol}: version {version} ({rows} rows new or revised)", flush=True)
+
+    if args.snapshot:
+        pinned = create_snapshot(args.snapshot, symbols or None)
+        print(f"[versions] snapshot {args.snapshot!r}: {len(pinned)} symbols", flush=True)
+
+    if args.compact:
+        for symbol in symbols or list_symbols():
+            removed = compact(symbol, args.retention_days)
+            print(f"[versions] {symbol}: compacted, {removed} segment files removed", flush=True)
+
+    if args.status or not (args.refresh or args.snapshot or args.compact):
+        for symbol in symbols or list_symbols():
+            versions = list_versions(symbol)
+            if versions.empty:
+                continue
+            readable = int((versions["has_delta"] | versions["has_base"]).sum())
+            print(f"{symbol:<12} version {current_version(symbol):>5}  "
+                  f"{len(versions)} committed, {readable} with segments", flush=True)
+        for name, created_at, count in list_snapshots():
+            print(f"snapshot {name:<20} {created_at}  {count} symbols", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from data import job_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def _stall(db, job_id, seconds):
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?",
+                     (job_store._now(-seconds), job_id))
+    conn.close()
+
+
+def test_stale_worker_cannot_finish_a_requeued_job(db):
+    job_id = job_store.submit_job("backtest", {"symbol": "BTC-USD"}, "key", db_path=db)
+    assert job_store.claim_job("w1", db_path=db)[0] == job_id
+
+    _stall(db, job_id, 600)
+    assert job_store.requeue_stale(300, db_path=db) == 1
+    assert job_store.claim_job("w2", db_path=db)[0] == job_id
+
+    # w1 wakes up after the requeue: every write it attempts is rejected
+    assert not job_store.heartbeat(job_id, "w1", db_path=db)
+    assert job_store.report_progress(job_id, "w1", 0.5, db_path=db)
+    assert not job_store.finish_job(job_id, "w1", "done", result="stale", db_path=db)
+    job = job_store.get_job(job_id, db_path=db)
+    assert (job["status"], job["worker"], job["progress"]) == ("running", "w2", 0)
+
+    assert job_store.heartbeat(job_id, "w2", db_path=db)
+    assert not job_store.report_progress(job_id, "w2", 0.5, db_path=db)
+    assert job_store.finish_job(job_id, "w2", "done", result="fresh", db_path=db)
+    assert job_store.get_job_result(job_id, db_path=db) == "fresh"
+
+
+def test_stale_worker_cannot_finish_a_job_still_queued(db):
+    job_id = job_store.submit_job("backtest", {}, "key", db_path=db)
+    job_store.claim_job("w1", db_path=db)
+    _stall(db, job_id, 600)
+    job_store.requeue_stale(300, db_path=db)
+
+    assert not job_store.finish_job(job_id, "w1", "failed", error="boom", db_path=db)
+    assert job_store.get_job(job_id, db_path=db)["status"] == "queued"
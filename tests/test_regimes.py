@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from analytics.regimes import RegimeTracker
+
+SYMBOLS = ["BTC-USD", "ETH-USD"]
+
+
+def _closes(bars=400, seed=7):
+    rng = np.random.default_rng(seed)
+    # calm, volatile, calm again, so the HMM has regimes to find
+    vol = np.repeat([0.01, 0.04, 0.01, 0.03], bars // 4)[:, None]
+    returns = rng.normal(0.0005, 1.0, (bars, len(SYMBOLS))) * vol
+    index = pd.date_range("2022-01-01", periods=bars, freq="D")
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=SYMBOLS)
+
+
+def _tracker():
+    return RegimeTracker(SYMBOLS, n_states=2, fit_bars=120, min_bars=80, history=300)
+
+
+def test_saved_tracker_resumes_like_one_kept_in_memory(tmp_path):
+    close = _closes()
+    path = str(tmp_path / "regimes.pkl")
+
+    kept = _tracker()
+    kept.update(close.iloc[:250])
+    expected = kept.update(close)
+    assert expected and kept.fitted.all()
+
+    saved = _tracker()
+    saved.update(close.iloc[:250])
+    saved.save(path)
+    resumed = RegimeTracker.load(path)
+    # bars up to the saved last_time are skipped, not replayed
+    events = resumed.update(close)
+
+    assert resumed.last_time == close.index[-1]
+    assert events == expected
+    assert (resumed.seen == kept.seen).all()
+    for symbol in SYMBOLS:
+        pd.testing.assert_frame_equal(resumed.frame(symbol), kept.frame(symbol))
+    assert resumed.update(close) == []
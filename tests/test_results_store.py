@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from data import results_store as store
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "results.db")
+    store.create_results_table(path)
+    return path
+
+
+def _publish(db, results, **kwargs):
+    snapshot = store.begin_snapshot(db_path=db)
+    for symbol, payload in results.items():
+        store.put_results(symbol, "2024-01-01", {("kpi", ""): payload}, snapshot, db_path=db)
+    store.publish_snapshot(snapshot, db_path=db, **kwargs)
+    return snapshot
+
+
+def _payload_rows(db):
+    conn = sqlite3.connect(db)
+    rows = conn.execute("SELECT snapshot_id, symbol FROM results ORDER BY symbol").fetchall()
+    conn.close()
+    return rows
+
+
+def test_prune_keeps_payloads_inherited_by_kept_snapshots(db):
+    first = _publish(db, {"BTC-USD": 1.0, "ETH-USD": 2.0})
+    _publish(db, {"BTC-USD": 1.5})
+    last = _publish(db, {"BTC-USD": 1.75})
+
+    store.prune_snapshots(keep=1, db_path=db)
+
+    # ETH was never recomputed: the live snapshot still reads it from the
+    # first snapshot, which holds the only copy of its payload
+    assert store.get_result("ETH-USD", "kpi", db_path=db) == 2.0
+    assert store.get_result("BTC-USD", "kpi", db_path=db) == 1.75
+    assert _payload_rows(db) == [(last, "BTC-USD"), (first, "ETH-USD")]
+    assert [row[0] for row in store.list_snapshots(db)] == [last]
+
+
+def test_prune_drops_payloads_once_nothing_references_them(db):
+    _publish(db, {"BTC-USD": 1.0, "ETH-USD": 2.0})
+    last = _publish(db, {"BTC-USD": 1.5}, inherit=False)
+
+    store.prune_snapshots(keep=1, db_path=db)
+
+    assert store.get_result("ETH-USD", "kpi", db_path=db) is None
+    assert _payload_rows(db) == [(last, "BTC-USD")]
@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import versions
+
+
+def _prices(days, revised=None):
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    close = np.arange(days, dtype=float) + 100
+    if revised is not None:
+        close[revised] += 0.5
+    return pd.DataFrame({"Date": dates, "Open": close, "High": close + 1,
+                         "Low": close - 1, "Close": close, "Volume": close * 10})
+
+
+def _backdate(root, symbol, ages):
+    conn = sqlite3.connect(str(root / versions.MANIFEST))
+    with conn:
+        for version, days in ages.items():
+            when = datetime.now(timezone.utc) - timedelta(days=days)
+            conn.execute("UPDATE versions SET created_at = ? WHERE symbol = ? AND version = ?",
+                         (when.isoformat(timespec="microseconds"), symbol, version))
+    conn.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    Five versions of one symbol committed 40, 30, 20, 5 and 1 days ago;
+    the second is pinned by a snapshot, later ones revise an old bar.
+    """
+    root = str(tmp_path)
+    frames = [_prices(10), _prices(12), _prices(14, revised=3), _prices(16, revised=3),
+              _prices(18, revised=4)]
+    for v, frame in enumerate(frames, start=1):
+        versions.commit("BTC-USD", frame, root=root)
+        if v == 2:
+            versions.create_snapshot("pinned", ["BTC-USD"], root=root)
+    _backdate(tmp_path, "BTC-USD", {1: 40, 2: 30, 3: 20, 4: 5, 5: 1})
+    return root, frames
+
+
+def test_point_in_time_reads_survive_compaction(store):
+    root, frames = store
+    before = {v: versions.read_version("BTC-USD", v, root) for v in range(1, 6)}
+    for v, frame in enumerate(frames, start=1):
+        pd.testing.assert_frame_equal(before[v], versions.normalize_raw(frame))
+
+    assert versions.compact("BTC-USD", retention_days=10, root=root) > 0
+
+    as_of = datetime.now(timezone.utc) - timedelta(days=3)
+    assert versions.resolve_version("BTC-USD", as_of=as_of, root=root) == 4
+    assert versions.resolve_version("BTC-USD", snapshot="pinned", root=root) == 2
+    for v in (2, 4, 5):
+        pd.testing.assert_frame_equal(versions.read_version("BTC-USD", v, root), before[v])
+
+    for v in (1, 3):
+        with pytest.raises(ValueError, match="compacted away"):
+            versions.read_version("BTC-USD", v, root)
+
+
+def test_as_of_before_first_version_is_an_error(store):
+    root, _ = store
+    with pytest.raises(ValueError, match="no data version"):
+        versions.resolve_version("BTC-USD", as_of=datetime.now(timezone.utc) - timedelta(days=60),
+                                 root=root)
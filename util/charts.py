@@ -4,7 +4,11 @@
 # =========================================================
 
 import matplotlib.pyplot as plt
+import pandas as pd
 import seaborn as sns
+from matplotlib.patches import Patch
+
+REGIME_COLORS = {"Bull": "#2ea043", "Bear": "#f85149", "Sideways": "#8b949e"}
 
 # Set global plotting style
 def set_plot_style():
@@ -38,3 +42,138 @@ def show_plot():
     """
     plt.tight_layout()
     plt.show()
+
+
+# -------------------------------------------------
+# Chart builders: module-level, picklable functions that return a
+# figure, so util/rendering.py can build them in worker processes
+# -------------------------------------------------
+def _label(ax, title=None, xlabel=None, ylabel=None):
+    # Like format_axes, but keeps the active style's grid
+    if title:
+        ax.set_title(title)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+
+
+def line_chart(series, title=None, xlabel=None, ylabel=None, color=None, zero_line=False):
+    fig, ax = plt.subplots()
+    ax.plot(series.index, series.values, color=color)
+    if zero_line:
+        ax.axhline(0, linestyle="--", color="black")
+    _label(ax, title, xlabel, ylabel)
+    return fig
+
+
+def lines_chart(frame, title=None, xlabel=None, ylabel=None):
+    """
+    One labelled line per column of `frame`.
+    """
+    fig, ax = plt.subplots()
+    for column in frame.columns:
+        ax.plot(frame.index, frame[column].values, label=column)
+    _label(ax, title, xlabel, ylabel)
+    ax.legend()
+    return fig
+
+
+def regime_chart(series, spans, changepoints=(), title=None, xlabel=None, ylabel=None,
+                 color=None):
+    """
+    `series` over its regimes: one shaded band per row of `spans`
+    (start, end, regime; see analytics/regimes.py) and a dotted line at
+    each changepoint.
+    """
+    fig, ax = plt.subplots()
+    starts = list(spans["start"])
+    for i, (start, end, regime) in enumerate(spans[["start", "end", "regime"]].itertuples(index=False)):
+        stop = starts[i + 1] if i + 1 < len(starts) else end
+        ax.axvspan(start, stop, color=REGIME_COLORS.get(regime, "#d29922"), alpha=0.15, lw=0)
+    for when in changepoints:
+        ax.axvline(when, color="black", linestyle=":", linewidth=0.8, alpha=0.6)
+    ax.plot(series.index, series.values, color=color)
+
+    handles = [Patch(color=REGIME_COLORS.get(r, "#d29922"), alpha=0.3, label=r)
+               for r in dict.fromkeys(spans["regime"])]
+    if handles:
+        ax.legend(handles=handles, loc="upper left")
+    _label(ax, title, xlabel, ylabel)
+    return fig
+
+
+def hist_chart(series, bins=50, kde=True, title=None):
+    fig, ax = plt.subplots()
+    sns.histplot(series, bins=bins, kde=kde, ax=ax)
+    _label(ax, title)
+    return fig
+
+
+def forecast_chart(actual, forecasts, band=None, title=None, actual_color=None):
+    """
+    `actual` followed by one labelled line per column of `forecasts`,
+    with an optional (lower, upper) `band` frame shaded.
+    """
+    fig, ax = plt.subplots()
+    ax.plot(actual.index, actual.values, color=actual_color, label="Actual")
+    for column in forecasts.columns:
+        ax.plot(forecasts.index, forecasts[column].values, label=column)
+    if band is not None:
+        ax.fill_between(band.index, band.iloc[:, 0], band.iloc[:, 1], alpha=0.3)
+    _label(ax, title)
+    ax.legend()
+    return fig
+
+
+def interval_chart(band, title=None):
+    """
+    Lower and upper bounds of a (lower, upper) frame and the band between.
+    """
+    fig, ax = plt.subplots()
+    ax.plot(band.index, band.iloc[:, 0], color="blue", label="Lower Bound")
+    ax.plot(band.index, band.iloc[:, 1], color="orange", label="Upper Bound")
+    ax.fill_between(band.index, band.iloc[:, 0], band.iloc[:, 1], alpha=0.2)
+    _label(ax, title)
+    ax.legend()
+    return fig
+
+
+def prophet_chart(price, forecast, title=None):
+    """
+    Prophet-style chart (observations, fit, uncertainty band) from a
+    stored forecast frame indexed by ds.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(price.index, price, "k.", markersize=2)
+    ax.plot(forecast.index, forecast["yhat"], color="#0072B2")
+    ax.fill_between(
+        forecast.index,
+        forecast["yhat_lower"],
+        forecast["yhat_upper"],
+        color="#0072B2",
+        alpha=0.2
+    )
+    ax.set_xlabel("ds")
+    ax.set_ylabel("y")
+    ax.grid(True, which="major", color="gray", linestyle="-", linewidth=1, alpha=0.2)
+    _label(ax, title)
+    return fig
+
+
+def cone_chart(price, cone, title=None, history=100):
+    """
+    Recent prices followed by Monte Carlo quantile bands (5-95%, 25-75%)
+    and the median path.
+    """
+    step = price.index[-1] - price.index[-2]
+    dates = pd.date_range(price.index[-1] + step, periods=len(cone), freq=step)
+
+    fig, ax = plt.subplots()
+    ax.plot(price[-history:], color="black", label="Actual")
+    ax.fill_between(dates, cone[0.05], cone[0.95], alpha=0.2, label="5–95%")
+    ax.fill_between(dates, cone[0.25], cone[0.75], alpha=0.4, label="25–75%")
+    ax.plot(dates, cone[0.5], linestyle="--", label="Median")
+    _label(ax, title)
+    ax.legend()
+    return fig
@@ -3,12 +3,31 @@
 # Central configuration & constants
 # =========================================================
 
+import os
+
 # Supported cryptocurrencies
 CRYPTO_LIST = {
     "Bitcoin": "BTC-USD",
     "Ethereum": "ETH-USD"
 }
 
+# Price data provider ("yfinance" or "synthetic") and its on-disk cache
+DATA_PROVIDER = os.environ.get("CRYPTO_DATA_PROVIDER", "yfinance")
+DATA_CACHE_DIR = os.environ.get(
+    "CRYPTO_CACHE_DIR",
+    "data/synthetic_cache" if DATA_PROVIDER == "synthetic" else "data/cached_data"
+)
+
+# Synthetic provider settings (bars per symbol, bar frequency, first bar)
+SYNTHETIC_PERIODS = int(os.environ.get("CRYPTO_SYNTHETIC_PERIODS", "1100"))
+SYNTHETIC_FREQ = os.environ.get("CRYPTO_SYNTHETIC_FREQ", "D")
+SYNTHETIC_START = os.environ.get("CRYPTO_SYNTHETIC_START", "2023-01-01")
+
+# Data-quality repair: "ffill", "interpolate" or "drop" (see data/validation.py)
+REPAIR_POLICY = os.environ.get("CRYPTO_REPAIR_POLICY", "ffill")
+# Returns beyond this many rolling standard deviations are flagged as outliers
+OUTLIER_Z_THRESHOLD = float(os.environ.get("CRYPTO_OUTLIER_Z", "8"))
+
 # Default date range (can be overridden)
 DEFAULT_START_DATE = "2020-01-01"
 DEFAULT_END_DATE = None  # None = today
@@ -22,9 +41,90 @@ ROLLING_WINDOWS = {
 # Volatility window
 VOLATILITY_WINDOW = 30
 
+# Annual risk-free rate used for Sharpe ratios
+RISK_FREE_RATE = float(os.environ.get("CRYPTO_RISK_FREE_RATE", "0.0"))
+
 # Forecast horizon (days)
 FORECAST_DAYS = 30
 
+# Cheap models compared on the Forecasting page (see analytics/models.py)
+FORECAST_MODELS = [
+    m.strip() for m in os.environ.get("CRYPTO_FORECAST_MODELS", "naive,ets,theta,gbr").split(",")
+    if m.strip()
+]
+
+# Monte Carlo risk engine (paths per simulation, memory per chunk, pool size)
+RISK_PATHS = int(os.environ.get("CRYPTO_RISK_PATHS", "10000"))
+RISK_MEMORY_MB = int(os.environ.get("CRYPTO_RISK_MEMORY_MB", "256"))
+RISK_WORKERS = int(os.environ.get("CRYPTO_RISK_WORKERS", "1"))  # >1 shards over processes
+
+# Live streaming mode
+STREAM_SOURCE = os.environ.get("CRYPTO_STREAM_SOURCE", "replay")  # "replay" or "synthetic"
+STREAM_BUFFER_SIZE = int(os.environ.get("CRYPTO_STREAM_BUFFER", "2048"))  # bars kept per symbol
+STREAM_INTERVAL_SECONDS = float(os.environ.get("CRYPTO_STREAM_INTERVAL", "1.0"))  # between bars
+STREAM_REFRESH_SECONDS = float(os.environ.get("CRYPTO_STREAM_REFRESH", "5"))  # page refresh cadence
+
+# Cross-process shared data cache (see data/shared_cache.py); the directory
+# defaults to /dev/shm/crypto-shared-cache
+SHARED_CACHE = os.environ.get("CRYPTO_SHARED_CACHE", "1") == "1"
+SHARED_CACHE_DIR = os.environ.get("CRYPTO_SHARED_CACHE_DIR", "")
+
+# Prophet tuning (see analytics/tuning.py): fold-fit processes and the
+# per-symbol time budget of a tuning run
+TUNING_WORKERS = int(os.environ.get("CRYPTO_TUNING_WORKERS", str(os.cpu_count() or 1)))
+TUNING_BUDGET_SECONDS = float(os.environ.get("CRYPTO_TUNING_BUDGET_SECONDS", "1800"))
+
+# Regime detection (see analytics/regimes.py): HMM states, changepoint
+# detector ("cusum" or "bocpd"), bars each HMM is fitted on, and where the
+# scheduler keeps its online tracker between cycles
+REGIME_STATES = int(os.environ.get("CRYPTO_REGIME_STATES", "3"))
+REGIME_CHANGEPOINT = os.environ.get("CRYPTO_REGIME_CHANGEPOINT", "cusum")
+REGIME_FIT_BARS = int(os.environ.get("CRYPTO_REGIME_FIT_BARS", "1000"))
+REGIME_STATE_FILE = os.environ.get("CRYPTO_REGIME_STATE_FILE", "data/results/regimes.pkl")
+
+# Versioned raw data (see data/versions.py): how long every committed
+# version stays readable as of its time (older ones only if a snapshot
+# pins them)
+DATA_VERSION_RETENTION_DAYS = float(os.environ.get("CRYPTO_DATA_VERSION_RETENTION_DAYS", "30"))
+
+# News de-duplication (see analytics/news_dedup.py): MinHash signature
+# length, LSH bands (rows per band = perm / bands; 128 / 32 catches pairs
+# above ~0.4 Jaccard), the similarity that joins a story, and how long
+# stored headlines are kept
+NEWS_MINHASH_PERM = int(os.environ.get("CRYPTO_NEWS_MINHASH_PERM", "128"))
+NEWS_LSH_BANDS = int(os.environ.get("CRYPTO_NEWS_LSH_BANDS", "32"))
+NEWS_DEDUP_THRESHOLD = float(os.environ.get("CRYPTO_NEWS_DEDUP_THRESHOLD", "0.5"))
+NEWS_RETENTION_DAYS = float(os.environ.get("CRYPTO_NEWS_RETENTION_DAYS", "90"))
+
+# Results store (see data/results_store.py): how long an unpublished
+# snapshot build is protected from pruning before it counts as abandoned
+RESULTS_BUILD_TIMEOUT_SECONDS = float(os.environ.get("CRYPTO_RESULTS_BUILD_TIMEOUT", "86400"))
+
+# Compact in-memory frames (see data/compact.py): float32 prices/features,
+# downcast integers and categorical keys in the process-level caches
+COMPACT_DTYPES = os.environ.get("CRYPTO_COMPACT_DTYPES", "1") == "1"
+
+# Figure rendering (see util/rendering.py): worker processes (<= 1 renders
+# inline) and the size of the rendered-bytes cache
+RENDER_WORKERS = int(os.environ.get("CRYPTO_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_CACHE_MB = int(os.environ.get("CRYPTO_RENDER_CACHE_MB", "64"))
+
+# Alerting (see analytics/alert_engine.py): JSON-lines log of fired alerts, the
+# webhook sink target (unset = write payloads to the outbox file), and where
+# the scheduler keeps its alert engine between cycles
+ALERTS_LOG = os.environ.get("CRYPTO_ALERTS_LOG", "data/alerts/alerts.jsonl")
+ALERTS_WEBHOOK_URL = os.environ.get("CRYPTO_ALERTS_WEBHOOK_URL", "")
+ALERTS_OUTBOX = os.environ.get("CRYPTO_ALERTS_OUTBOX", "data/alerts/webhook_outbox.jsonl")
+ALERTS_STATE_FILE = os.environ.get("CRYPTO_ALERTS_STATE_FILE", "data/alerts/engine.pkl")
+
+# Background jobs (see analytics/jobs.py): worker processes each app server
+# starts (0 = run jobs inside the page), how long finished results are
+# reused, when a silent worker's job is requeued, and the page poll period
+JOBS_WORKERS = int(os.environ.get("CRYPTO_JOBS_WORKERS", "1"))
+JOBS_RESULT_TTL = int(os.environ.get("CRYPTO_JOBS_RESULT_TTL", "3600"))
+JOBS_STALE_SECONDS = int(os.environ.get("CRYPTO_JOBS_STALE_SECONDS", "900"))
+JOBS_POLL_SECONDS = float(os.environ.get("CRYPTO_JOBS_POLL_SECONDS", "1.0"))
+
 # Plot colors (consistent across project)
 COLORS = {
     "Bitcoin": "#f7931a",
@@ -32,3 +132,33 @@ COLORS = {
     "Positive": "#2ea043",
     "Negative": "#f85149"
 }
+
+# Users allowed to see the admin / performance panel. Signup is open, so
+# nobody is an admin unless listed explicitly
+ADMIN_USERS = set(
+    u.strip() for u in os.environ.get("CRYPTO_ADMIN_USERS", "").split(",") if u.strip()
+)
+
+# Page profiler (see util/profiling.py): where profiles are saved, the
+# sampling period and how many rows the summaries show
+PROFILE_DIR = os.environ.get("CRYPTO_PROFILE_DIR", "data/profiles")
+PROFILE_INTERVAL_MS = float(os.environ.get("CRYPTO_PROFILE_INTERVAL_MS", "5"))
+PROFILE_TOP_N = int(os.environ.get("CRYPTO_PROFILE_TOP_N", "25"))
+
+# Watchlists (see analytics/watchlist_registry.py): most symbols one user may watch,
+# and how long a session that stopped loading its watchlist (e.g. a closed
+# tab) keeps its cached results referenced
+WATCHLIST_MAX = int(os.environ.get("CRYPTO_WATCHLIST_MAX", "20"))
+WATCHLIST_IDLE_SECONDS = float(os.environ.get("CRYPTO_WATCHLIST_IDLE_SECONDS", "3600"))
+
+# Data API (see data/api.py): the port the app also serves it on (0 =
+# only via `python -m data.api`), rows per page of a prices pull and rows
+# per streamed record batch
+API_PORT = int(os.environ.get("CRYPTO_API_PORT", "0"))
+API_HOST = os.environ.get("CRYPTO_API_HOST", "127.0.0.1")
+API_PAGE_ROWS = int(os.environ.get("CRYPTO_API_PAGE_ROWS", "1000000"))
+API_BATCH_ROWS = int(os.environ.get("CRYPTO_API_BATCH_ROWS", "65536"))
+
+# Metrics export (Prometheus text format)
+METRICS_PORT = int(os.environ.get("CRYPTO_METRICS_PORT", "0")) or None  # None = disabled
+METRICS_FILE = os.environ.get("CRYPTO_METRICS_FILE", "data/metrics/metrics.prom")
@@ -0,0 +1,265 @@
+# =========================================================
+# metrics.py
+# Lightweight hot-path instrumentation & Prometheus export
+# =========================================================
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_PREFIX = "crypto"
+
+_lock = threading.Lock()
+_operations = {}
+_caches = {}
+_server = None
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+# -------------------------------------------------
+# Measurement helpers
+# -------------------------------------------------
+def current_rss():
+    """
+    Resident set size of this process in bytes (None if unavailable).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def count_rows(result):
+    """
+    Best-effort row count of a function result: DataFrames, Series,
+    lists, or the first element of a tuple.
+    """
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    try:
+        return len(result)
+    except TypeError:
+        return 0
+
+
+def _empty_stats():
+    return {
+        "count": 0,
+        "errors": 0,
+        "seconds_sum": 0.0,
+        "seconds_max": 0.0,
+        "seconds_last": 0.0,
+        "rows": 0,
+        "memory_delta_sum": 0,
+        "memory_delta_last": 0,
+    }
+
+
+def record(name, seconds, rows=0, memory_delta=None, error=False):
+    """
+    Record one observation of operation `name`.
+    """
+    with _lock:
+        stats = _operations.setdefault(name, _empty_stats())
+        stats["count"] += 1
+        stats["errors"] += int(error)
+        stats["seconds_sum"] += seconds
+        stats["seconds_max"] = max(stats["seconds_max"], seconds)
+        stats["seconds_last"] = seconds
+        stats["rows"] += rows or 0
+        if memory_delta is not None:
+            stats["memory_delta_sum"] += memory_delta
+            stats["memory_delta_last"] = memory_delta
+
+
+def record_cache(name, hit):
+    """
+    Count a hit or miss for cache `name`.
+    """
+    with _lock:
+        stats = _caches.setdefault(name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+
+class _Span:
+    """
+    Handle yielded by track(); set `.rows` inside the block to report
+    how many rows the operation processed.
+    """
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def track(name):
+    """
+    Context manager timing a block and recording its memory delta.
+    """
+    span = _Span()
+    rss_before = current_rss()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield span
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        rss_after = current_rss()
+        delta = None if rss_before is None or rss_after is None else rss_after - rss_before
+        record(name, elapsed, span.rows, delta, error)
+
+
+def instrument(name=None):
+    """
+    Decorator recording timing, rows returned and memory delta of every
+    call to the wrapped function.
+    """
+    def decorator(func):
+        op_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(op_name) as span:
+                result = func(*args, **kwargs)
+                span.rows = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+# -------------------------------------------------
+# Snapshots & export
+# -------------------------------------------------
+def snapshot():
+    """
+    Copy of all collected metrics: {"operations": {...}, "caches": {...}}.
+    """
+    with _lock:
+        return {
+            "operations": {k: dict(v) for k, v in _operations.items()},
+            "caches": {k: dict(v) for k, v in _caches.items()},
+        }
+
+
+def reset():
+    """
+    Clear all collected metrics.
+    """
+    with _lock:
+        _operations.clear()
+        _caches.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """
+    Render the current metrics in Prometheus text exposition format.
+    """
+    snap = snapshot()
+    p = METRIC_PREFIX
+    lines = []
+
+    def family(metric, kind, help_text, samples):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            label_str = f"{{{label_str}}}" if label_str else ""
+            lines.append(f"{metric}{label_str} {value}")
+
+    ops = sorted(snap["operations"].items())
+    lines.append(f"# HELP {p}_operation_seconds Wall time of instrumented operations.")
+    lines.append(f"# TYPE {p}_operation_seconds summary")
+    for op, s in ops:
+        lines.append(f'{p}_operation_seconds_sum{{op="{_escape(op)}"}} {s["seconds_sum"]}')
+        lines.append(f'{p}_operation_seconds_count{{op="{_escape(op)}"}} {s["count"]}')
+
+    family(f"{p}_operation_seconds_max", "gauge",
+           "Slowest observed call per operation.",
+           [({"op": op}, s["seconds_max"]) for op, s in ops])
+    family(f"{p}_operation_errors_total", "counter",
+           "Calls that raised an exception.",
+           [({"op": op}, s["errors"]) for op, s in ops])
+    family(f"{p}_operation_rows_total", "counter",
+           "Rows returned by instrumented operations.",
+           [({"op": op}, s["rows"]) for op, s in ops])
+    family(f"{p}_operation_memory_delta_bytes", "gauge",
+           "RSS change during the most recent call.",
+           [({"op": op}, s["memory_delta_last"]) for op, s in ops])
+
+    caches = sorted(snap["caches"].items())
+    family(f"{p}_cache_hits_total", "counter", "Cache hits.",
+           [({"cache": c}, s["hits"]) for c, s in caches])
+    family(f"{p}_cache_misses_total", "counter", "Cache misses.",
+           [({"cache": c}, s["misses"]) for c, s in caches])
+    family(f"{p}_cache_hit_ratio", "gauge", "Hits / (hits + misses).",
+           [({"cache": c}, s["hits"] / max(s["hits"] + s["misses"], 1)) for c, s in caches])
+
+    rss = current_rss()
+    if rss is not None:
+        family(f"{p}_process_resident_memory_bytes", "gauge",
+               "Resident memory of the dashboard process.", [({}, rss)])
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path):
+    """
+    Atomically write the Prometheus text to `path` (for node_exporter's
+    textfile collector or ad-hoc inspection).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """
+    Serve /metrics on a daemon thread. Safe to call on every Streamlit
+    rerun: only the first call starts a server.
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            # Another worker process on this host already owns the port.
+            return None
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
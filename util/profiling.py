@@ -0,0 +1,347 @@
+# =========================================================
+# profiling.py
+# Opt-in profiler for one page render (or any block of code)
+#
+# A sampling thread records the profiled thread's Python stack every
+# few milliseconds (flamegraph / speedscope export and per-library time
+# attribution); "deterministic" mode adds cProfile call counts, and
+# tracemalloc captures allocation sites and the peak.
+# =========================================================
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import pandas as pd
+
+PROFILER_MODES = ["sampling", "deterministic"]
+
+# Library -> phase of a page render, matched on the frame's file path
+LIBRARIES = [
+    ("prophet", "model fit", ("/prophet/", "/cmdstanpy/")),
+    ("statsmodels", "model fit", ("/statsmodels/",)),
+    ("sklearn", "model fit", ("/sklearn/",)),
+    ("scipy", "model fit", ("/scipy/",)),
+    ("matplotlib", "rasterization", ("/matplotlib/", "/seaborn/", "/PIL/")),
+    ("pandas", "data", ("/pandas/",)),
+    ("numpy", "data", ("/numpy/",)),
+    ("sqlite3", "data", ("/sqlite3/",)),
+    ("streamlit", "streamlit", ("/streamlit/",)),
+]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def library_of(filename, func=""):
+    """
+    (library, phase) a source file belongs to. cProfile reports C
+    functions with filename "~"; their qualified name is used instead.
+    """
+    if filename == "~":
+        filename = "/" + re.sub(r"\W+", "/", func) + "/"
+    path = filename.replace("\\", "/")
+    for name, phase, fragments in LIBRARIES:
+        if any(f in path for f in fragments):
+            return name, phase
+    if path.startswith(ROOT.replace("\\", "/")) and "site-packages" not in path:
+        return "app", "app"
+    return "python", "other"
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+# -------------------------------------------------
+# Profiler
+# -------------------------------------------------
+class PageProfile:
+    """
+    Context manager profiling the calling thread:
+
+        with PageProfile("EDA") as profile:
+            eda.render()
+        profile.top_functions(), profile.library_breakdown(), profile.save()
+
+    With `out_dir`, the profile is saved on exit (paths in .paths), also
+    when the block is cut short by an exception such as st.rerun().
+
+    Allocation tracking (tracemalloc) is process-wide, so concurrent
+    sessions show up in each other's allocation figures.
+    """
+
+    def __init__(self, name, mode="sampling", interval=0.005, memory=True, out_dir=None,
+                 top_n=25):
+        if mode not in PROFILER_MODES:
+            raise ValueError(f"unknown profiler mode: {mode}")
+        self.name = name
+        self.mode = mode
+        self.interval = interval
+        self.memory = memory
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self.paths = None
+
+        self.wall = self.cpu = 0.0
+        self.samples = Counter()  # stack (outermost first) -> seconds
+        self.stats = None
+        self.peak_bytes = None
+        self.allocations = None
+        self.started_at = None
+
+        self._frames = {}
+        self._stop = threading.Event()
+        self._sampler = None
+        self._cprofile = None
+
+    # -------------------------
+    # Capture
+    # -------------------------
+    def _frame_key(self, code):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        self._frames.setdefault(key, len(self._frames))
+        return key
+
+    def _sample(self, thread_id):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_key(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += now - last
+            last = now
+
+    def __enter__(self):
+        self.started_at = datetime.now()
+        if self.memory:
+            _start_tracemalloc()
+        if self.mode == "deterministic":
+            self._cprofile = cProfile.Profile()
+
+        self._sampler = threading.Thread(
+            target=self._sample, args=(threading.get_ident(),), daemon=True
+        )
+        self._sampler.start()
+        self._wall0, self._cpu0 = time.perf_counter(), time.thread_time()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.stats = pstats.Stats(self._cprofile)
+        self.wall = time.perf_counter() - self._wall0
+        self.cpu = time.thread_time() - self._cpu0
+
+        self._stop.set()
+        self._sampler.join()
+
+        if self.memory:
+            try:
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),
+                ])
+                self.peak_bytes = tracemalloc.get_traced_memory()[1]
+                self.allocations = snapshot.statistics("lineno")
+            finally:
+                _stop_tracemalloc()
+
+        if self.out_dir:
+            self.paths = self.save(self.out_dir, self.top_n)
+        return False
+
+    # -------------------------
+    # Summaries
+    # -------------------------
+    def _self_library(self, stack):
+        # Innermost frame outside the standard library decides
+        for name, filename, _ in reversed(stack):
+            library, phase = library_of(filename)
+            if library != "python":
+                return library, phase
+        return "python", "other"
+
+    def library_breakdown(self):
+        """
+        Sampled seconds per library (self time), with the render phase
+        it belongs to.
+        """
+        seconds = defaultdict(float)
+        for stack, weight in self.samples.items():
+            seconds[self._self_library(stack)] += weight
+
+        total = sum(seconds.values()) or 1.0
+        rows = [
+            {"Library": lib, "Phase": phase, "Seconds": s, "Share": s / total}
+            for (lib, phase), s in seconds.items()
+        ]
+        if not rows:
+            return pd.DataFrame(columns=["Library", "Phase", "Seconds", "Share"])
+        return pd.DataFrame(rows).sort_values("Seconds", ascending=False).reset_index(drop=True)
+
+    def top_functions(self, n=25):
+        """
+        Top-n functions by self time: cProfile figures (with call counts)
+        in deterministic mode, sampled figures otherwise.
+        """
+        rows = []
+        if self.stats is not None:
+            for (filename, line, func), (_, ncalls, tottime, cumtime, _) in self.stats.stats.items():
+                rows.append({
+                    "Function": f"{func} ({os.path.basename(filename)}:{line})",
+                    "Library": library_of(filename, func)[0],
+                    "Calls": ncalls,
+                    "Self (s)": tottime,
+                    "Total (s)": cumtime,
+                })
+        else:
+            self_time, total_time = defaultdict(float), defaultdict(float)
+            for stack, weight in self.samples.items():
+                self_time[stack[-1]] += weight
+                for key in set(stack):
+                    total_time[key] += weight
+            for (func, filename, line), total in total_time.items():
+                rows.append({
+                    "Function": f"{func} ({os.path.basename(filename)}:{line})",
+                    "Library": library_of(filename)[0],
+                    "Calls": None,
+                    "Self (s)": self_time.get((func, filename, line), 0.0),
+                    "Total (s)": total,
+                })
+
+        columns = ["Function", "Library", "Calls", "Self (s)", "Total (s)"]
+        if not rows:
+            return pd.DataFrame(columns=columns)
+        return (pd.DataFrame(rows, columns=columns)
+                .sort_values("Self (s)", ascending=False).head(n).reset_index(drop=True))
+
+    def top_allocations(self, n=25):
+        """
+        Top-n source lines by memory still allocated at the end.
+        """
+        columns = ["Location", "Library", "Size (MB)", "Blocks"]
+        if not self.allocations:
+            return pd.DataFrame(columns=columns)
+        rows = []
+        for stat in self.allocations[:n]:
+            frame = stat.traceback[0]
+            rows.append({
+                "Location": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                "Library": library_of(frame.filename)[0],
+                "Size (MB)": stat.size / 1e6,
+                "Blocks": stat.count,
+            })
+        return pd.DataFrame(rows, columns=columns)
+
+    # -------------------------
+    # Export
+    # -------------------------
+    def folded(self):
+        """
+        Collapsed stacks ("a;b;c <microseconds>"), the input format of
+        flamegraph.pl and speedscope.
+        """
+        lines = []
+        for stack, weight in self.samples.most_common():
+            frames = ";".join(f"{func} ({os.path.basename(f)}:{line})" for func, f, line in stack)
+            lines.append(f"{frames} {max(int(weight * 1e6), 1)}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        """
+        Speedscope sampled-profile document (https://www.speedscope.app).
+        """
+        frames = sorted(self._frames, key=self._frames.get)
+        stacks = list(self.samples.items())
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "crypto-dashboard profiler",
+            "shared": {"frames": [
+                {"name": func, "file": filename, "line": line} for func, filename, line in frames
+            ]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(w for _, w in stacks),
+                "samples": [[self._frames[key] for key in stack] for stack, _ in stacks],
+                "weights": [w for _, w in stacks],
+            }],
+        }
+
+    def summary(self, n=25):
+        return {
+            "page": self.name,
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "wall_seconds": self.wall,
+            "cpu_seconds": self.cpu,
+            "peak_bytes": self.peak_bytes,
+            "libraries": self.library_breakdown().to_dict("records"),
+            "functions": self.top_functions(n).to_dict("records"),
+        }
+
+    def save(self, out_dir, n=25):
+        """
+        Write <page>-<time>.{folded,speedscope.json,summary.json}, plus a
+        .prof (pstats, e.g. for snakeviz) in deterministic mode.
+        Returns {kind: path}.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        stem = "".join(c if c.isalnum() else "_" for c in self.name).strip("_").lower()
+        base = os.path.join(out_dir, f"{stem}-{self.started_at:%Y%m%d-%H%M%S}")
+
+        paths = {"folded": f"{base}.folded", "speedscope": f"{base}.speedscope.json",
+                 "summary": f"{base}.summary.json"}
+        with open(paths["folded"], "w") as f:
+            f.write(self.folded())
+        with open(paths["speedscope"], "w") as f:
+            json.dump(self.speedscope(), f)
+        with open(paths["summary"], "w") as f:
+            json.dump(self.summary(n), f, indent=2, default=str)
+        if self.stats is not None:
+            paths["pstats"] = f"{base}.prof"
+            self.stats.dump_stats(paths["pstats"])
+        return paths
+
+
+def list_profiles(out_dir):
+    """
+    Saved profile files in `out_dir`, newest first.
+    """
+    if not os.path.isdir(out_dir):
+        return []
+    files = [os.path.join(out_dir, f) for f in os.listdir(out_dir)]
+    return sorted((f for f in files if os.path.isfile(f)), key=os.path.getmtime, reverse=True)
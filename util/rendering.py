@@ -0,0 +1,224 @@
+# =========================================================
+# rendering.py
+# Figure rendering service: rasterizes independent matplotlib figures
+# concurrently in a process pool (Agg backend) and caches the bytes
+#
+# A chart is a spec: a picklable builder function (see util/charts.py)
+# plus its arguments. Specs are keyed by builder, parameters and a
+# fingerprint of the data, so unchanged charts are served from the
+# byte cache without rebuilding the figure.
+# =========================================================
+
+import hashlib
+import io
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from util.metrics import record_cache, track
+
+RENDER_DPI = 200  # st.pyplot's default
+RENDER_STYLE = "darkgrid"
+
+
+# -------------------------------------------------
+# Chart specs & cache keys
+# -------------------------------------------------
+class Chart:
+    """
+    builder(*args, **kwargs) -> matplotlib Figure, rendered as `fmt`.
+    """
+
+    def __init__(self, builder, *args, fmt="png", **kwargs):
+        self.builder = builder
+        self.args = args
+        self.kwargs = kwargs
+        self.fmt = fmt
+
+    def key(self, dpi):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{self.builder.__module__}.{self.builder.__qualname__}|{self.fmt}|{dpi}".encode())
+        for value in list(self.args) + sorted(self.kwargs.items()):
+            _fingerprint(h, value)
+        return h.hexdigest()
+
+
+def _fingerprint(h, value):
+    """
+    Feed a content fingerprint of `value` into hash `h`.
+    """
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        names = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        h.update(repr(list(names)).encode())
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, tuple):
+        for item in value:
+            _fingerprint(h, item)
+    else:
+        h.update(repr(value).encode())
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+def _init_worker(style):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import seaborn as sns
+
+    sns.set_style(style)
+
+
+def _rasterize(builder, args, kwargs, fmt, dpi):
+    import matplotlib.pyplot as plt
+
+    fig = builder(*args, **kwargs)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+# -------------------------------------------------
+# Renderer
+# -------------------------------------------------
+class FigureRenderer:
+    """
+    Renders Charts to PNG/SVG bytes with an LRU byte cache.
+
+    workers > 1 uses a (spawned) process pool so figures rasterize in
+    parallel, off the calling thread; workers <= 1 renders inline with
+    the caller's matplotlib style.
+    """
+
+    def __init__(self, workers=1, cache_mb=64, dpi=RENDER_DPI, style=RENDER_STYLE):
+        self.workers = workers
+        self.cache_bytes = int(cache_mb * 1e6)
+        self.dpi = dpi
+        self.style = style
+        self._cache = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.style,),
+                )
+            return self._pool
+
+    def _get(self, key):
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+        record_cache("render", data is not None)
+        return data
+
+    def _put(self, key, data):
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = data
+            self._size += len(data)
+            while self._size > self.cache_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self._size -= len(old)
+
+    def render(self, chart):
+        """
+        Bytes for one chart (cached).
+        """
+        return dict(self.render_iter([chart]))[0]
+
+    def render_iter(self, charts):
+        """
+        Yield (index, bytes) for every chart as soon as it is ready:
+        cache hits first, then pool results in completion order.
+        """
+        keys = [c.key(self.dpi) for c in charts]
+        missing = {}
+        for i, key in enumerate(keys):
+            data = self._get(key)
+            if data is not None:
+                yield i, data
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if not missing:
+            return
+
+        with track("render.figures") as span:
+            span.rows = len(missing)
+
+            if self.workers <= 1:
+                for key, idx in missing.items():
+                    c = charts[idx[0]]
+                    data = _rasterize(c.builder, c.args, c.kwargs, c.fmt, self.dpi)
+                    self._put(key, data)
+                    for i in idx:
+                        yield i, data
+                return
+
+            pool = self._get_pool()
+            futures = {
+                pool.submit(_rasterize, charts[idx[0]].builder, charts[idx[0]].args,
+                            charts[idx[0]].kwargs, charts[idx[0]].fmt, self.dpi): key
+                for key, idx in missing.items()
+            }
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures.pop(future)
+                    data = future.result()
+                    self._put(key, data)
+                    for i in missing[key]:
+                        yield i, data
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+_renderer = None
+
+
+def get_renderer():
+    """
+    Process-wide renderer configured from util.config.
+    """
+    global _renderer
+    if _renderer is None:
+        from util.config import RENDER_CACHE_MB, RENDER_WORKERS
+
+        _renderer = FigureRenderer(workers=RENDER_WORKERS, cache_mb=RENDER_CACHE_MB)
+    return _renderer
+
+
+def draw_charts(charts):
+    """
+    Fill each (placeholder, Chart) slot (e.g. a Streamlit st.empty()) as
+    soon as its image is ready.
+    """
+    for i, image in get_renderer().render_iter([chart for _, chart in charts]):
+        charts[i][0].image(image, use_column_width=True)